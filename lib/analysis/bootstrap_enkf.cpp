@@ -177,7 +177,7 @@ void bootstrap_enkf_updateA(void * module_data ,
             std_enkf_initX(bootstrap_data->std_enkf_data, X, NULL, S_resampled, R, dObs, E, D, rng);
 
 
-          matrix_inplace_matmul_mt1( A_resampled , X , num_cpu_threads );
+          matrix_inplace_dgemm_mt1( A_resampled , X , num_cpu_threads );
           matrix_inplace_add( A_resampled , A0 );
           matrix_copy_column( A , A_resampled, ensemble_members_loop, ensemble_members_loop);
 
@@ -42,6 +42,8 @@
 
 #define UPDATE_OVERLAP_KEY      "OVERLAP_LIMIT"
 #define UPDATE_STD_CUTOFF_KEY   "STD_CUTOFF"
+#define UPDATE_THREADS_KEY      "THREADS"
+#define UPDATE_ROW_BLOCK_KEY    "ROW_BLOCK_SIZE"
 
 
 #define ANALYSIS_CONFIG_TYPE_ID 64431306
@@ -223,6 +225,38 @@ double analysis_config_get_std_cutoff(const analysis_config_type * config) {
 }
 
 
+/*
+  The number of threads used when serializing, updating and
+  deserializing the parameters in the update; the value 0 means that
+  the number of CPUs on the host is used.
+*/
+
+void analysis_config_set_update_threads( analysis_config_type * config , int threads ) {
+  config_settings_set_int_value(config->update_settings, UPDATE_THREADS_KEY, threads );
+}
+
+int analysis_config_get_update_threads(const analysis_config_type * config) {
+  return config_settings_get_int_value(config->update_settings, UPDATE_THREADS_KEY);
+}
+
+
+/*
+  The maximum number of rows in the A matrix when updating with an
+  analysis module which does not need the complete A matrix; the
+  parameters are then serialized, updated and deserialized in blocks
+  of this many rows. The value 0 means that each dataset is updated
+  in one block.
+*/
+
+void analysis_config_set_row_block_size( analysis_config_type * config , int row_block_size ) {
+  config_settings_set_int_value(config->update_settings, UPDATE_ROW_BLOCK_KEY, row_block_size );
+}
+
+int analysis_config_get_row_block_size(const analysis_config_type * config) {
+  return config_settings_get_int_value(config->update_settings, UPDATE_ROW_BLOCK_KEY);
+}
+
+
 void analysis_config_set_log_path(analysis_config_type * config , const char * log_path ) {
   config->log_path        = util_realloc_string_copy(config->log_path , log_path);
 }
@@ -599,6 +633,8 @@ analysis_config_type * analysis_config_alloc_default(void) {
   config->update_settings           = config_settings_alloc( UPDATE_SETTING_KEY );
   config_settings_add_double_setting(config->update_settings, UPDATE_OVERLAP_KEY , DEFAULT_ENKF_ALPHA);
   config_settings_add_double_setting(config->update_settings, UPDATE_STD_CUTOFF_KEY, DEFAULT_ENKF_STD_CUTOFF );
+  config_settings_add_int_setting(config->update_settings, UPDATE_THREADS_KEY, DEFAULT_UPDATE_THREADS );
+  config_settings_add_int_setting(config->update_settings, UPDATE_ROW_BLOCK_KEY, DEFAULT_UPDATE_ROW_BLOCK_SIZE );
 
   analysis_config_set_merge_observations( config       , DEFAULT_MERGE_OBSERVATIONS );
   analysis_config_set_rerun( config                    , DEFAULT_RERUN );
@@ -23,6 +23,7 @@
 #include <ert/util/util.h>
 #include <ert/util/buffer.h>
 #include <ert/util/timer.h>
+#include <ert/util/stringlist.h>
 
 #include <ert/res_util/block_fs.hpp>
 #include <ert/res_util/path_fmt.hpp>
@@ -40,11 +41,14 @@ typedef struct bfs_config_struct bfs_config_type;
 struct bfs_config_struct {
   int             fsync_interval;
   double          fragmentation_limit;
+  double          close_fragmentation_limit;
   bool            read_only;
   bool            preload;
   int             block_size;
   int             max_cache_size;
+  size_t          max_total_cache_size;
   bool            bfs_lock;
+  bool            use_mmap;
 };
 
 
@@ -74,39 +78,58 @@ struct block_fs_driver_struct {
 
 /*****************************************************************/
 
-bfs_config_type * bfs_config_alloc( fs_driver_enum driver_type , bool read_only, bool bfs_lock) {
+bfs_config_type * bfs_config_alloc( fs_driver_enum driver_type , bool read_only, bool bfs_lock, int num_fs) {
   const int PARAMETER_blocksize    = 64;
   const int DYNAMIC_blocksize      = 64;
   const int DEFAULT_blocksize      = 64;
 
   const bool PARAMETER_preload     = false;
-  const bool DYNAMIC_preload       = true;
+  const bool DYNAMIC_preload       = false;  /* The cache is filled on demand. */
   const bool DEFAULT_preload       = false;
 
-  const int max_cache_size         = 512;
+  /*
+    The payload cache is used for the small nodes which are read
+    repeatedly, e.g. GEN_KW parameters and summary vectors when
+    plotting and exporting; max_cache_size is the largest node which
+    is cached, and max_total_cache_size the size of the cache for the
+    whole driver, which is divided evenly between the num_fs block_fs
+    instances. Read-only cases are read through mmap() and do not use
+    the payload cache.
+  */
+  const int PARAMETER_max_cache_size        = 64 * 1024;
+  const int DYNAMIC_max_cache_size          = 256 * 1024;
+  const int DEFAULT_max_cache_size          = 0;
+  const size_t max_total_cache_size         = 4 * 1024 * 1024;
+
   const int fsync_interval         =  10;     /* An fsync() call is issued for every 10'th write. */
-  const double fragmentation_limit = 1.0;     /* 1.0 => NO defrag is run. */
+  const double fragmentation_limit = 1.0;     /* 1.0 => NO defrag is run while the filesystem is in use. */
+  const double close_fragmentation_limit = 0.50;  /* Defrag when the filesystem is closed if more than half the data file is holes. */
 
   {
     bfs_config_type * config = (bfs_config_type *)util_malloc( sizeof * config );
-    config->max_cache_size      = max_cache_size;
+    config->max_total_cache_size = max_total_cache_size / num_fs;
     config->fsync_interval      = fsync_interval;
     config->fragmentation_limit = fragmentation_limit;
+    config->close_fragmentation_limit = close_fragmentation_limit;
     config->read_only           = read_only;
     config->bfs_lock            = bfs_lock;
+    config->use_mmap            = read_only;  /* Read-only cases (plotting, export) read through mmap() - see block_fs_enable_mmap(). */
 
     switch (driver_type) {
     case( DRIVER_PARAMETER ):
       config->block_size = PARAMETER_blocksize;
       config->preload = PARAMETER_preload;
+      config->max_cache_size = PARAMETER_max_cache_size;
       break;
     case(DRIVER_DYNAMIC_FORECAST):
       config->block_size = DYNAMIC_blocksize;
       config->preload = DYNAMIC_preload;
+      config->max_cache_size = DYNAMIC_max_cache_size;
       break;
     default:
       config->block_size = DEFAULT_blocksize;
       config->preload = DEFAULT_preload;
+      config->max_cache_size = DEFAULT_max_cache_size;
     }
     return config;
   }
@@ -165,6 +188,10 @@ static void bfs_mount( bfs_type * bfs) {
                                   config->preload ,
                                   config->read_only,
                                   config->bfs_lock);
+  block_fs_set_close_fragmentation_limit( bfs->block_fs , config->close_fragmentation_limit );
+  block_fs_set_max_total_cache_size( bfs->block_fs , config->max_total_cache_size );
+  if (config->use_mmap)
+    block_fs_enable_mmap( bfs->block_fs );
 }
 
 
@@ -184,6 +211,11 @@ static void bfs_fsync( bfs_type * bfs ) {
 }
 
 
+static void bfs_set_fsync_interval( bfs_type * bfs , int fsync_interval ) {
+  block_fs_set_fsync_interval( bfs->block_fs , fsync_interval );
+}
+
+
 
 /*****************************************************************/
 
@@ -295,6 +327,37 @@ static void block_fs_driver_save_node(void * _driver , const char * node_key , i
 }
 
 
+/*
+  The nodes are distributed over the bfs instances based on
+  iens; the list is split according to bfs instance and each part is
+  written with one call to block_fs_fwrite_buffer_list().
+*/
+
+static void block_fs_driver_save_node_list(void * _driver , const stringlist_type * node_keys , int report_step , const int_vector_type * realizations , const vector_type * buffers) {
+  block_fs_driver_type * driver = (block_fs_driver_type *) _driver;
+  block_fs_driver_assert_cast(driver);
+
+  for (int phase = 0; phase < driver->num_fs; phase++) {
+    stringlist_type * keys = stringlist_alloc_new( );
+    vector_type * phase_buffers = vector_alloc_new( );
+
+    for (int i = 0; i < stringlist_get_size( node_keys ); i++) {
+      int iens = int_vector_iget( realizations , i );
+      if ((iens % driver->num_fs) == phase) {
+        stringlist_append_owned_ref( keys , block_fs_driver_alloc_node_key( driver , stringlist_iget( node_keys , i ) , report_step , iens ));
+        vector_append_ref( phase_buffers , vector_iget_const( buffers , i ));
+      }
+    }
+
+    if (stringlist_get_size( keys ) > 0)
+      block_fs_fwrite_buffer_list( driver->fs_list[phase]->block_fs , keys , phase_buffers );
+
+    vector_free( phase_buffers );
+    stringlist_free( keys );
+  }
+}
+
+
 static void block_fs_driver_save_vector(void * _driver , const char * node_key , int iens ,  buffer_type * buffer) {
   block_fs_driver_type * driver = (block_fs_driver_type *) _driver;
   block_fs_driver_assert_cast(driver);
@@ -306,6 +369,27 @@ static void block_fs_driver_save_vector(void * _driver , const char * node_key ,
   }
 }
 
+/*
+  All the vectors for one realization are stored in the same bfs
+  instance, so the whole list can be written with one call to
+  block_fs_fwrite_buffer_list().
+*/
+
+static void block_fs_driver_save_vector_list(void * _driver , const stringlist_type * node_keys , int iens , const vector_type * buffers) {
+  block_fs_driver_type * driver = (block_fs_driver_type *) _driver;
+  block_fs_driver_assert_cast(driver);
+  {
+    stringlist_type * keys = stringlist_alloc_new( );
+    bfs_type * bfs = block_fs_driver_get_fs( driver , iens );
+
+    for (int i = 0; i < stringlist_get_size( node_keys ); i++)
+      stringlist_append_owned_ref( keys , block_fs_driver_alloc_vector_key( driver , stringlist_iget( node_keys , i ) , iens ));
+
+    block_fs_fwrite_buffer_list( bfs->block_fs , keys , buffers );
+    stringlist_free( keys );
+  }
+}
+
 /*****************************************************************/
 
 void block_fs_driver_unlink_node(void * _driver , const char * node_key , int report_step , int iens ) {
@@ -399,6 +483,20 @@ static void block_fs_driver_fsync( void * _driver ) {
 }
 
 
+/*
+  The fsync_interval is stored in the shared config, and applied to
+  all the block_fs instances which are already mounted.
+*/
+
+static void block_fs_driver_set_fsync_interval( void * _driver , int fsync_interval ) {
+  block_fs_driver_type * driver = block_fs_driver_safe_cast(_driver);
+
+  driver->config->fsync_interval = fsync_interval;
+  for (int driver_nr = 0; driver_nr < driver->num_fs; driver_nr++)
+    bfs_set_fsync_interval( driver->fs_list[driver_nr] , fsync_interval );
+}
+
+
 static block_fs_driver_type * block_fs_driver_alloc(int num_fs) {
   block_fs_driver_type * driver = (block_fs_driver_type *)util_malloc(sizeof * driver );
   {
@@ -407,16 +505,19 @@ static block_fs_driver_type * block_fs_driver_alloc(int num_fs) {
   }
   driver->load_node     = block_fs_driver_load_node;
   driver->save_node     = block_fs_driver_save_node;
+  driver->save_node_list = block_fs_driver_save_node_list;
   driver->unlink_node   = block_fs_driver_unlink_node;
   driver->has_node      = block_fs_driver_has_node;
 
   driver->load_vector   = block_fs_driver_load_vector;
   driver->save_vector   = block_fs_driver_save_vector;
+  driver->save_vector_list = block_fs_driver_save_vector_list;
   driver->unlink_vector = block_fs_driver_unlink_vector;
   driver->has_vector    = block_fs_driver_has_vector;
 
   driver->free_driver   = block_fs_driver_free;
   driver->fsync_driver  = block_fs_driver_fsync;
+  driver->set_fsync_interval = block_fs_driver_set_fsync_interval;
   driver->__id          = BLOCK_FS_DRIVER_ID;
   driver->num_fs        = num_fs;
 
@@ -429,7 +530,7 @@ static block_fs_driver_type * block_fs_driver_alloc(int num_fs) {
 
 static void * block_fs_driver_alloc_new( fs_driver_enum driver_type , bool read_only , int num_fs , const char * mountfile_fmt, bool block_level_lock ) {
   block_fs_driver_type * driver = block_fs_driver_alloc( num_fs);
-  driver->config = bfs_config_alloc( driver_type , read_only, block_level_lock );
+  driver->config = bfs_config_alloc( driver_type , read_only, block_level_lock , num_fs );
   {
     for (int ifs = 0; ifs < driver->num_fs; ifs++)
       driver->fs_list[ifs] = bfs_alloc_new( driver->config , util_alloc_sprintf( mountfile_fmt , ifs) );
@@ -940,6 +940,7 @@ enkf_config_node_type * enkf_config_node_alloc_GEN_DATA_from_config( const confi
       const char * result_file                = (const char *) hash_safe_get( options , RESULT_FILE_KEY);
       const char * forward_string             = (const char *) hash_safe_get( options , FORWARD_INIT_KEY );
       const char * report_steps_string        = (const char *) hash_safe_get( options , REPORT_STEPS_KEY );
+      const char * codec_string               = (const char *) hash_safe_get( options , CODEC_KEY );
       int_vector_type * report_steps          = int_vector_alloc(0,0);
       bool forward_init = false;
       bool valid_input = true;
@@ -995,6 +996,14 @@ enkf_config_node_type * enkf_config_node_alloc_GEN_DATA_from_config( const confi
           if (template_file)
             gen_data_config_set_template( gen_data_config , template_file , data_key);
 
+          if (codec_string) {
+            buffer_codec_type codec;
+            if (buffer_codec_sscanf( codec_string , &codec ))
+              gen_data_config_set_codec( gen_data_config , codec );
+            else
+              fprintf(stderr,"** Warning: codec %s not recognized - using %s \n",codec_string , buffer_codec_get_name( BUFFER_CODEC_DEFAULT ));
+          }
+
           for (int i=0; i < int_vector_size( report_steps ); i++) {
             int report_step = int_vector_iget( report_steps , i );
             gen_data_config_add_report_step( gen_data_config , report_step);
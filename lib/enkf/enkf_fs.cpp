@@ -30,6 +30,7 @@
 #include <ert/util/type_macros.h>
 #include <ert/res_util/arg_pack.hpp>
 #include <ert/util/stringlist.h>
+#include <ert/util/vector.h>
 #include <ert/res_util/arg_pack.hpp>
 
 #include <ert/res_util/path_fmt.hpp>
@@ -213,6 +214,7 @@
 #define MISFIT_ENSEMBLE_FILE      "misfit-ensemble"
 #define CASE_CONFIG_FILE          "case_config"
 #define CUSTOM_KW_CONFIG_SET_FILE "custom_kw_config_set"
+#define FS_SYNC_DEFAULT_INTERVAL  10
 
 struct enkf_fs_struct {
   UTIL_TYPE_ID_DECLARATION;
@@ -228,6 +230,8 @@ struct enkf_fs_struct {
   fs_driver_type         * index ;
 
   bool                        read_only;             /* Whether this filesystem has been mounted read-only. */
+  fs_sync_mode_enum           sync_mode;
+  int                         fsync_interval;        /* Only used for sync_mode == FS_SYNC_INTERVAL. */
   time_map_type             * time_map;
   cases_config_type         * cases_config;
   state_map_type            * state_map;
@@ -306,6 +310,8 @@ static enkf_fs_type * enkf_fs_alloc_empty( const char * mount_point ) {
   fs->parameter              = NULL;
   fs->dynamic_forecast       = NULL;
   fs->read_only              = true;
+  fs->sync_mode              = FS_SYNC_DEFAULT;
+  fs->fsync_interval         = FS_SYNC_DEFAULT_INTERVAL;
   fs->mount_point            = util_alloc_string_copy( mount_point );
   fs->refcount               = 0;
   fs->runcount               = 0;
@@ -679,6 +685,7 @@ enkf_fs_type * enkf_fs_mount(const char * mount_point) {
   }
 
   fclose(stream);
+  enkf_fs_set_sync_mode(fs, fs->sync_mode, fs->fsync_interval);
   enkf_fs_init_path_fmt(fs);
   enkf_fs_fread_time_map(fs);
   enkf_fs_fread_cases_config(fs);
@@ -792,6 +799,40 @@ static void enkf_fs_fsync_driver( fs_driver_type * driver ) {
 
 
 
+static void enkf_fs_set_driver_fsync_interval( fs_driver_type * driver , int fsync_interval) {
+  if ((driver != NULL) && (driver->set_fsync_interval != NULL))
+    driver->set_fsync_interval( driver , fsync_interval );
+}
+
+
+/*
+  Observe that with FS_SYNC_GROUP_COMMIT the storage is only fsync()'ed
+  when enkf_fs_fsync() is called - which is done when loading and
+  updating is complete - and when the filesystem is unmounted.
+*/
+
+void enkf_fs_set_sync_mode( enkf_fs_type * fs , fs_sync_mode_enum sync_mode , int fsync_interval) {
+  int driver_interval = 0;
+
+  if (sync_mode == FS_SYNC_INTERVAL) {
+    if (fsync_interval <= 0)
+      util_abort("%s: invalid fsync_interval:%d - must be positive \n",__func__ , fsync_interval);
+    driver_interval = fsync_interval;
+  }
+
+  fs->sync_mode = sync_mode;
+  fs->fsync_interval = fsync_interval;
+  enkf_fs_set_driver_fsync_interval( fs->parameter , driver_interval );
+  enkf_fs_set_driver_fsync_interval( fs->dynamic_forecast , driver_interval );
+  enkf_fs_set_driver_fsync_interval( fs->index , driver_interval );
+}
+
+
+fs_sync_mode_enum enkf_fs_get_sync_mode( const enkf_fs_type * fs ) {
+  return fs->sync_mode;
+}
+
+
 void enkf_fs_fsync( enkf_fs_type * fs ) {
   enkf_fs_fsync_driver( fs->parameter );
   enkf_fs_fsync_driver( fs->dynamic_forecast );
@@ -865,6 +906,46 @@ void enkf_fs_fwrite_node(enkf_fs_type * enkf_fs , buffer_type * buffer , const c
 }
 
 
+/**
+   Stores a list of nodes for report_step; the node keys, realizations
+   and buffers are matched by index, i.e. element i is stored as
+   node_keys[i] for realization realizations[i]. Drivers which do not
+   implement save_node_list will get one save_node call per element.
+*/
+
+void enkf_fs_fwrite_node_list(enkf_fs_type * enkf_fs , const vector_type * buffers , const stringlist_type * node_keys, enkf_var_type var_type,
+                              int report_step , const int_vector_type * realizations) {
+  if (enkf_fs->read_only)
+    util_abort("%s: attempt to write to read_only filesystem mounted at:%s - aborting. \n",__func__ , enkf_fs->mount_point);
+
+  if ((var_type == PARAMETER) && (report_step > 0))
+    util_abort("%s: Parameters can only be saved for report_step = 0 - report_step:%d\n", __func__ , report_step);
+
+  if ((stringlist_get_size( node_keys ) != vector_get_size( buffers )) || (stringlist_get_size( node_keys ) != int_vector_size( realizations )))
+    util_abort("%s: size mismatch between node_keys:%d, buffers:%d and realizations:%d \n",__func__ ,
+               stringlist_get_size( node_keys ) , vector_get_size( buffers ) , int_vector_size( realizations ));
+
+  if (stringlist_get_size( node_keys ) == 0)
+    return;
+
+  {
+    void * _driver = enkf_fs_select_driver(enkf_fs , var_type , stringlist_iget( node_keys , 0 ));
+    {
+      fs_driver_type * driver = fs_driver_safe_cast(_driver);
+
+      if (driver->save_node_list != NULL)
+        driver->save_node_list(driver , node_keys , report_step , realizations , buffers);
+      else {
+        for (int i = 0; i < stringlist_get_size( node_keys ); i++) {
+          buffer_type * buffer = (buffer_type *) vector_iget( buffers , i );
+          driver->save_node(driver , stringlist_iget( node_keys , i ) , report_step , int_vector_iget( realizations , i ) , buffer);
+        }
+      }
+    }
+  }
+}
+
+
 void enkf_fs_fwrite_vector(enkf_fs_type * enkf_fs , buffer_type * buffer , const char * node_key, enkf_var_type var_type,
                            int iens ) {
   if (enkf_fs->read_only)
@@ -879,6 +960,38 @@ void enkf_fs_fwrite_vector(enkf_fs_type * enkf_fs , buffer_type * buffer , const
 }
 
 
+/**
+   Stores a list of vectors for one realization; the node keys and
+   buffers are matched by index. Drivers which do not implement
+   save_vector_list will get one save_vector call per element.
+*/
+
+void enkf_fs_fwrite_vector_list(enkf_fs_type * enkf_fs , const vector_type * buffers , const stringlist_type * node_keys, enkf_var_type var_type,
+                                int iens ) {
+  if (enkf_fs->read_only)
+    util_abort("%s: attempt to write to read_only filesystem mounted at:%s - aborting. \n",__func__ , enkf_fs->mount_point);
+
+  if (stringlist_get_size( node_keys ) == 0)
+    return;
+
+  {
+    void * _driver = enkf_fs_select_driver(enkf_fs , var_type , stringlist_iget( node_keys , 0 ));
+    {
+      fs_driver_type * driver = fs_driver_safe_cast(_driver);
+
+      if (driver->save_vector_list != NULL)
+        driver->save_vector_list(driver , node_keys , iens , buffers);
+      else {
+        for (int i = 0; i < stringlist_get_size( node_keys ); i++) {
+          buffer_type * buffer = (buffer_type *) vector_iget( buffers , i );
+          driver->save_vector(driver , stringlist_iget( node_keys , i ) , iens , buffer);
+        }
+      }
+    }
+  }
+}
+
+
 
 
 /*****************************************************************/
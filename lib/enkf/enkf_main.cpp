@@ -41,6 +41,7 @@
 #include <ert/util/node_ctype.h>
 #include <ert/util/string_util.h>
 #include <ert/util/type_vector_functions.h>
+#include <ert/util/vector.h>
 
 #include <ert/ecl/ecl_util.h>
 #include <ert/ecl/ecl_io_config.h>
@@ -50,6 +51,8 @@
 #include <ert/res_util/res_log.hpp>
 #include <ert/res_util/res_util_defaults.hpp>
 #include <ert/res_util/matrix.hpp>
+#include <ert/res_util/matrix_blas.hpp>
+#include <ert/res_util/res_portability.hpp>
 
 #include <ert/job_queue/job_queue.hpp>
 #include <ert/job_queue/job_queue_manager.hpp>
@@ -554,6 +557,7 @@ static int __get_active_size(const ensemble_config_type * ensemble_config , enkf
 typedef struct {
   enkf_fs_type               * src_fs;
   enkf_fs_type               * target_fs;
+  enkf_fs_type               * load_fs;  /* Partly active nodes are loaded from this fs before deserializing. */
   const ensemble_config_type * ensemble_config;
   int                          iens1;    /* Inclusive lower limit. */
   int                          iens2;    /* NOT inclusive upper limit. */
@@ -682,7 +686,7 @@ static int enkf_main_serialize_dataset( const ensemble_config_type * ens_config
 }
 
 static void deserialize_node( enkf_fs_type * target_fs,
-                              enkf_fs_type * src_fs,
+                              enkf_fs_type * load_fs,
                               const ensemble_config_type * ensemble_config,
                               const char * key ,
                               int iens,
@@ -696,9 +700,9 @@ static void deserialize_node( enkf_fs_type * target_fs,
   node_id_type node_id = {.report_step = target_step, .iens = iens  };
   enkf_node_type * node = enkf_node_alloc( config_node );
 
-  // If partly active, init node from source fs (deserialize will fill it only in part)
+  // If partly active, init node from load fs (deserialize will fill it only in part)
   if(active_list_get_mode(active_list) != ALL_ACTIVE)
-     enkf_node_load( node , src_fs , node_id);
+     enkf_node_load( node , load_fs , node_id);
 
   // deserialize the matrix into the node (and writes it to the target fs)
   enkf_node_deserialize(node , target_fs , node_id , active_list , A , row_offset , column);
@@ -714,12 +718,36 @@ static void * deserialize_nodes_mt( void * arg ) {
   for (iens = info->iens1; iens < info->iens2; iens++) {
     int column = int_vector_iget( info->iens_active_index , iens );
     if (column >= 0)
-      deserialize_node( info->target_fs , info->src_fs, info->ensemble_config , info->key , iens , info->target_step , info->row_offset , column, info->active_list , info->A );
+      deserialize_node( info->target_fs , info->load_fs, info->ensemble_config , info->key , iens , info->target_step , info->row_offset , column, info->active_list , info->A );
   }
   return NULL;
 }
 
 
+static void enkf_main_deserialize_node( const char * node_key ,
+                                        const active_list_type * active_list ,
+                                        int row_offset ,
+                                        enkf_fs_type * load_fs ,
+                                        thread_pool_type * work_pool ,
+                                        serialize_info_type * serialize_info) {
+
+  /* Multithreaded deserializing*/
+  const int num_cpu_threads = thread_pool_get_max_running( work_pool );
+  int icpu;
+
+  thread_pool_restart( work_pool );
+  for (icpu = 0; icpu < num_cpu_threads; icpu++) {
+    serialize_info[icpu].key         = node_key;
+    serialize_info[icpu].active_list = active_list;
+    serialize_info[icpu].row_offset  = row_offset;
+    serialize_info[icpu].load_fs     = load_fs;
+
+    thread_pool_add_job( work_pool , deserialize_nodes_mt , &serialize_info[icpu]);
+  }
+  thread_pool_join( work_pool );
+}
+
+
 static void enkf_main_deserialize_dataset( ensemble_config_type * ensemble_config ,
                                            const local_dataset_type * dataset ,
                                            const int * active_size ,
@@ -727,7 +755,6 @@ static void enkf_main_deserialize_dataset( ensemble_config_type * ensemble_confi
                                            serialize_info_type * serialize_info ,
                                            thread_pool_type * work_pool ) {
 
-  int num_cpu_threads = thread_pool_get_max_running( work_pool );
   stringlist_type * update_keys = local_dataset_alloc_keys( dataset );
   for (int i = 0; i < stringlist_get_size( update_keys ); i++) {
     const char             * key         = stringlist_iget(update_keys , i);
@@ -742,23 +769,137 @@ static void enkf_main_deserialize_dataset( ensemble_config_type * ensemble_confi
     else {
       if (active_size[i] > 0) {
         const active_list_type * active_list      = local_dataset_get_node_active_list( dataset , key );
+        enkf_main_deserialize_node( key , active_list , row_offset[i] , serialize_info->src_fs , work_pool , serialize_info );
+      }
+    }
+  }
+  stringlist_free( update_keys );
+}
 
-        {
-          /* Multithreaded */
-          int icpu;
-          thread_pool_restart( work_pool );
-          for (icpu = 0; icpu < num_cpu_threads; icpu++) {
-            serialize_info[icpu].key         = key;
-            serialize_info[icpu].active_list = active_list;
-            serialize_info[icpu].row_offset  = row_offset[i];
 
-            thread_pool_add_job( work_pool , deserialize_nodes_mt , &serialize_info[icpu]);
-          }
-          thread_pool_join( work_pool );
+/*
+  Serializes the node segments in one row block into A, multiplies
+  with X and deserializes the updated values back again. A segment
+  which does not start at the first row of its node is deserialized on
+  top of the node already stored in the target fs, so the updates of
+  the node's earlier segments are kept.
+*/
+
+static void enkf_main_update_row_block( matrix_type * A ,
+                                        const matrix_type * X ,
+                                        int block_rows ,
+                                        const stringlist_type * block_keys ,
+                                        const vector_type * block_active_lists ,
+                                        const int_vector_type * block_row_offset ,
+                                        const int_vector_type * block_node_row ,
+                                        thread_pool_type * work_pool ,
+                                        serialize_info_type * serialize_info) {
+
+  matrix_shrink_header( A , block_rows , matrix_get_columns( A ));
+
+  for (int i = 0; i < stringlist_get_size( block_keys ); i++)
+    enkf_main_serialize_node( stringlist_iget( block_keys , i ) ,
+                              (const active_list_type *) vector_iget_const( block_active_lists , i ) ,
+                              int_vector_iget( block_row_offset , i ) ,
+                              work_pool ,
+                              serialize_info );
+
+  matrix_inplace_dgemm_mt2( A , X , work_pool );
+
+  // The deserialize also calls enkf_node_store() functions.
+  for (int i = 0; i < stringlist_get_size( block_keys ); i++) {
+    enkf_fs_type * load_fs = int_vector_iget( block_node_row , i ) > 0 ? serialize_info->target_fs : serialize_info->src_fs;
+    enkf_main_deserialize_node( stringlist_iget( block_keys , i ) ,
+                                (const active_list_type *) vector_iget_const( block_active_lists , i ) ,
+                                int_vector_iget( block_row_offset , i ) ,
+                                load_fs ,
+                                work_pool ,
+                                serialize_info );
+  }
+
+  matrix_full_size( A );
+}
+
+
+/*
+  When the analysis module does not need to see the full A matrix the
+  update A' = A*X can be performed on one block of rows at a time;
+  the dataset is then serialized, updated and deserialized in blocks
+  of at most row_block_size rows, so that the memory used by A is
+  bounded by row_block_size x ens_size.
+
+  Nodes which are larger than the remaining space in the current block
+  are split into segments with a PARTLY_ACTIVE active_list for each
+  segment. For these segments deserialize_node() will load the node
+  before the updated segment is deserialized; the first segment of a
+  node is loaded from the source fs and the following segments from
+  the target fs, where the earlier segments have already been stored.
+*/
+
+static void enkf_main_update_dataset_row_blocked( const ensemble_config_type * ens_config ,
+                                                  const local_dataset_type * dataset ,
+                                                  int report_step ,
+                                                  int row_block_size ,
+                                                  matrix_type * A ,
+                                                  const matrix_type * X ,
+                                                  thread_pool_type * work_pool ,
+                                                  serialize_info_type * serialize_info) {
+
+  stringlist_type * update_keys        = local_dataset_alloc_keys( dataset );
+  stringlist_type * block_keys         = stringlist_alloc_new();
+  vector_type     * block_active_lists = vector_alloc_new();
+  int_vector_type * block_row_offset   = int_vector_alloc( 0 , 0 );
+  int_vector_type * block_node_row     = int_vector_alloc( 0 , 0 );
+  int block_rows = 0;
+
+  for (int ikw = 0; ikw < stringlist_get_size( update_keys ); ikw++) {
+    const char * key = stringlist_iget( update_keys , ikw );
+    enkf_config_node_type * config_node = ensemble_config_get_node( ens_config , key );
+    if ((serialize_info[0].run_mode == SMOOTHER_RUN) && (enkf_config_node_get_var_type( config_node ) != PARAMETER))
+      continue;
+
+    {
+      const active_list_type * active_list = local_dataset_get_node_active_list( dataset , key );
+      const int active_size = __get_active_size( ens_config , serialize_info->src_fs , key , report_step , active_list );
+      int node_row = 0;
+
+      while (node_row < active_size) {
+        int segment_size = util_int_min( active_size - node_row , row_block_size - block_rows );
+
+        if (segment_size == active_size)
+          vector_append_ref( block_active_lists , active_list );
+        else {
+          const int * active_index = active_list_get_active( active_list );
+          active_list_type * segment = active_list_alloc( );
+          for (int i = node_row; i < node_row + segment_size; i++)
+            active_list_add_index( segment , active_index ? active_index[i] : i );
+          vector_append_owned_ref( block_active_lists , segment , active_list_free__ );
+        }
+        stringlist_append_copy( block_keys , key );
+        int_vector_append( block_row_offset , block_rows );
+        int_vector_append( block_node_row , node_row );
+        block_rows += segment_size;
+        node_row += segment_size;
+
+        if (block_rows == row_block_size) {
+          enkf_main_update_row_block( A , X , block_rows , block_keys , block_active_lists , block_row_offset , block_node_row , work_pool , serialize_info );
+          stringlist_clear( block_keys );
+          vector_clear( block_active_lists );
+          int_vector_reset( block_row_offset );
+          int_vector_reset( block_node_row );
+          block_rows = 0;
         }
       }
     }
   }
+
+  if (block_rows > 0)
+    enkf_main_update_row_block( A , X , block_rows , block_keys , block_active_lists , block_row_offset , block_node_row , work_pool , serialize_info );
+
+  int_vector_free( block_node_row );
+  int_vector_free( block_row_offset );
+  vector_free( block_active_lists );
+  stringlist_free( block_keys );
   stringlist_free( update_keys );
 }
 
@@ -788,6 +929,7 @@ static serialize_info_type * serialize_info_alloc( enkf_fs_type * src_fs,
     serialize_info[icpu].run_mode    = run_mode;
     serialize_info[icpu].src_fs      = src_fs;
     serialize_info[icpu].target_fs   = target_fs;
+    serialize_info[icpu].load_fs     = src_fs;
     serialize_info[icpu].target_step = target_step;
     serialize_info[icpu].report_step = report_step;
     serialize_info[icpu].A           = A;
@@ -1041,8 +1183,8 @@ static void enkf_main_update__(enkf_main_type * enkf_main, const int_vector_type
       if (target_state_map != source_state_map) {
         state_map_set_from_inverted_mask(target_state_map, ens_mask, STATE_PARENT_FAILURE);
         state_map_set_from_mask(target_state_map, ens_mask, STATE_INITIALIZED);
-        enkf_fs_fsync(target_fs);
       }
+      enkf_fs_fsync(target_fs);
     }
 
     int_vector_free(ens_active_list);
@@ -1066,27 +1208,38 @@ static void enkf_main_analysis_update( enkf_main_type * enkf_main ,
                                        const meas_data_type * forecast ,
                                        obs_data_type * obs_data) {
 
-  const int cpu_threads       = 4;
+  const analysis_config_type * analysis_config = enkf_main_get_analysis_config(enkf_main);
+  analysis_module_type * module = analysis_config_get_active_module(analysis_config);
+  if ( local_ministep_has_analysis_module (ministep))
+    module = local_ministep_get_analysis_module (ministep);
+
+  /*
+    If the module only needs X, the update A' = A*X is performed in
+    blocks of row_block_size rows, otherwise the full A matrix for
+    each dataset is assembled - growing from matrix_start_size as
+    needed.
+  */
   const int matrix_start_size = 250000;
-  thread_pool_type * tp       = thread_pool_alloc( cpu_threads , false );
+  const bool need_A   = analysis_module_check_option( module , ANALYSIS_USE_A) || analysis_module_check_option(module , ANALYSIS_UPDATE_A);
+  int row_block_size  = need_A ? 0 : analysis_config_get_row_block_size( analysis_config );
+  int cpu_threads     = analysis_config_get_update_threads( analysis_config );
+  if (cpu_threads <= 0)
+    cpu_threads = res_get_num_cpu();
+
+  thread_pool_type * tp = thread_pool_alloc( cpu_threads , false );
   int active_ens_size   = meas_data_get_active_ens_size( forecast );
   int active_size       = obs_data_get_active_size( obs_data );
   matrix_type * X       = matrix_alloc( active_ens_size , active_ens_size );
   matrix_type * S       = meas_data_allocS( forecast );
   matrix_type * R       = obs_data_allocR( obs_data );
   matrix_type * dObs    = obs_data_allocdObs( obs_data );
-  matrix_type * A       = matrix_alloc( matrix_start_size , active_ens_size );
+  matrix_type * A       = matrix_alloc( row_block_size > 0 ? row_block_size : matrix_start_size , active_ens_size );
   matrix_type * E       = NULL;
   matrix_type * D       = NULL;
   matrix_type * localA  = NULL;
   int_vector_type * iens_active_index = bool_vector_alloc_active_index_list(ens_mask , -1);
   const bool_vector_type * obs_mask = obs_data_get_active_mask(obs_data);
 
-  const analysis_config_type * analysis_config = enkf_main_get_analysis_config(enkf_main);
-  analysis_module_type * module = analysis_config_get_active_module(analysis_config);
-  if ( local_ministep_has_analysis_module (ministep))
-    module = local_ministep_get_analysis_module (ministep);
-
   assert_matrix_size(X , "X" , active_ens_size , active_ens_size);
   assert_matrix_size(S , "S" , active_size , active_ens_size);
   assert_matrix_size(R , "R" , active_size , active_size);
@@ -1103,7 +1256,7 @@ static void enkf_main_analysis_update( enkf_main_type * enkf_main ,
   if (analysis_module_check_option( module , ANALYSIS_SCALE_DATA))
     obs_data_scale( obs_data , S , E , D , R , dObs );
 
-  if (analysis_module_check_option( module , ANALYSIS_USE_A) || analysis_module_check_option(module , ANALYSIS_UPDATE_A))
+  if (need_A)
     localA = A;
 
   /*****************************************************************/
@@ -1155,7 +1308,9 @@ static void enkf_main_analysis_update( enkf_main_type * enkf_main ,
     while (!hash_iter_is_complete( dataset_iter )) {
       const char * dataset_name = hash_iter_get_next_key( dataset_iter );
       const local_dataset_type * dataset = local_ministep_get_dataset( ministep , dataset_name );
-      if (local_dataset_get_size( dataset )) {
+      if (local_dataset_get_size( dataset ) && (row_block_size > 0))
+        enkf_main_update_dataset_row_blocked( enkf_main_get_ensemble_config(enkf_main) , dataset , step2 , row_block_size , A , X , tp , serialize_info );
+      else if (local_dataset_get_size( dataset )) {
         int * active_size = (int *)util_calloc( local_dataset_get_size( dataset ) , sizeof * active_size );
         int * row_offset = (int *)util_calloc( local_dataset_get_size( dataset ) , sizeof * row_offset  );
         local_obsdata_type   * local_obsdata = local_ministep_get_obsdata( ministep );
@@ -1175,7 +1330,7 @@ static void enkf_main_analysis_update( enkf_main_type * enkf_main ,
             analysis_module_initX( module , X , localA , S , R , dObs , E , D, enkf_main->shared_rng);
           }
 
-          matrix_inplace_matmul_mt2( A , X , tp );
+          matrix_inplace_dgemm_mt2( A , X , tp );
         }
 
         // The deserialize also calls enkf_node_store() functions.
@@ -1202,6 +1357,7 @@ static void enkf_main_analysis_update( enkf_main_type * enkf_main ,
   matrix_free( dObs );
   matrix_free( X );
   matrix_free( A );
+  thread_pool_free( tp );
 }
 
 
@@ -1352,7 +1508,13 @@ void enkf_main_isubmit_job( enkf_main_type * enkf_main , run_arg_type * run_arg
 
 }
 
-void * enkf_main_icreate_run_path( enkf_main_type * enkf_main, run_arg_type * run_arg, init_mode_type init_mode) {
+/*
+  Creates the runpath for one realization and adds it to the runpath
+  list, without exporting the runpath list file. Must be reentrant;
+  the runpaths of different realizations are created concurrently.
+*/
+
+static void enkf_main_icreate_run_path__( enkf_main_type * enkf_main, run_arg_type * run_arg, init_mode_type init_mode) {
   {
     runpath_list_type * runpath_list = enkf_main_get_runpath_list(enkf_main);
     runpath_list_add( runpath_list ,
@@ -1374,6 +1536,11 @@ void * enkf_main_icreate_run_path( enkf_main_type * enkf_main, run_arg_type * ru
 
   enkf_state_init_eclipse( enkf_main->res_config,
                            run_arg );
+}
+
+
+void * enkf_main_icreate_run_path( enkf_main_type * enkf_main, run_arg_type * run_arg, init_mode_type init_mode) {
+  enkf_main_icreate_run_path__( enkf_main , run_arg , init_mode );
 
   runpath_list_type * runpath_list = enkf_main_get_runpath_list(enkf_main);
   runpath_list_fprintf( runpath_list );
@@ -1381,16 +1548,50 @@ void * enkf_main_icreate_run_path( enkf_main_type * enkf_main, run_arg_type * ru
 }
 
 
+static void * enkf_main_icreate_run_path_mt( void * arg ) {
+  arg_pack_type * arg_pack = arg_pack_safe_cast( arg );
+  enkf_main_type * enkf_main = enkf_main_safe_cast( arg_pack_iget_ptr( arg_pack , 0 ));
+  run_arg_type * run_arg = run_arg_safe_cast( arg_pack_iget_ptr( arg_pack , 1));
+
+  enkf_main_icreate_run_path__( enkf_main , run_arg , INIT_NONE );
+  return NULL;
+}
+
+
+/*
+  The runpaths are created in parallel, and the runpath list file is
+  written once when all the realizations have been added.
+*/
+
 static void * enkf_main_create_run_path__( enkf_main_type * enkf_main,
                                            const ert_run_context_type * run_context) {
 
+  int run_size = ert_run_context_get_size( run_context );
+  arg_pack_type ** arg_pack_list = (arg_pack_type **) util_malloc( run_size * sizeof * arg_pack_list );
+  thread_pool_type * tp = thread_pool_alloc( res_get_num_cpu() , true );
   int iens;
-  for (iens = 0; iens < ert_run_context_get_size( run_context ); iens++) {
+
+  for (iens = 0; iens < run_size; iens++) {
+    arg_pack_list[iens] = arg_pack_alloc( );
     if (ert_run_context_iactive( run_context , iens)) {
       run_arg_type * run_arg = ert_run_context_iget_arg( run_context , iens);
-      enkf_main_icreate_run_path(enkf_main, run_arg, INIT_NONE);
+
+      arg_pack_append_ptr( arg_pack_list[iens] , enkf_main );
+      arg_pack_append_ptr( arg_pack_list[iens] , run_arg );
+      thread_pool_add_job( tp , enkf_main_icreate_run_path_mt , arg_pack_list[iens] );
     }
   }
+  thread_pool_join( tp );
+  thread_pool_free( tp );
+
+  for (iens = 0; iens < run_size; iens++)
+    arg_pack_free( arg_pack_list[iens] );
+  free( arg_pack_list );
+
+  {
+    runpath_list_type * runpath_list = enkf_main_get_runpath_list(enkf_main);
+    runpath_list_fprintf( runpath_list );
+  }
   return NULL;
 }
 
@@ -2313,6 +2514,7 @@ int enkf_main_load_from_forward_model_with_fs(enkf_main_type * enkf_main, int it
 
   thread_pool_join( tp );
   thread_pool_free( tp );
+  enkf_fs_fsync( fs );
   printf("\n");
 
   int loaded = 0;
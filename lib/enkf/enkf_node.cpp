@@ -445,14 +445,47 @@ bool enkf_node_forward_load_vector(enkf_node_type *enkf_node , const forward_loa
 
 
 
-static bool enkf_node_store_buffer( enkf_node_type * enkf_node , enkf_fs_type * fs , int report_step , int iens) {
+static bool enkf_node_write_to_buffer__( enkf_node_type * enkf_node , buffer_type * buffer , int report_step) {
   FUNC_ASSERT(enkf_node->write_to_buffer);
+  buffer_fwrite_time_t( buffer , time(NULL));
+  return enkf_node->write_to_buffer(enkf_node->data , buffer , report_step );
+}
+
+
+/**
+   Serializes a vector node into the buffer in the same format as
+   enkf_node_store_vector() would write to disk; the buffer can then
+   be stored with enkf_fs_fwrite_vector_list().
+*/
+
+bool enkf_node_write_vector_buffer( enkf_node_type * enkf_node , buffer_type * buffer) {
+  if (!enkf_node->vector_storage)
+    util_abort("%s: node:%s does not have vector storage \n",__func__ , enkf_node->node_key);
+
+  return enkf_node_write_to_buffer__( enkf_node , buffer , -1 );
+}
+
+
+/**
+   Serializes a node into the buffer in the same format as
+   enkf_node_store() would write to disk for report_step; the buffer
+   can then be stored with enkf_fs_fwrite_node_list().
+*/
+
+bool enkf_node_write_buffer( enkf_node_type * enkf_node , buffer_type * buffer , int report_step) {
+  if (enkf_node->vector_storage)
+    util_abort("%s: node:%s has vector storage \n",__func__ , enkf_node->node_key);
+
+  return enkf_node_write_to_buffer__( enkf_node , buffer , report_step );
+}
+
+
+static bool enkf_node_store_buffer( enkf_node_type * enkf_node , enkf_fs_type * fs , int report_step , int iens) {
   {
     bool data_written;
     buffer_type * buffer = buffer_alloc( 100 );
     const enkf_config_node_type * config_node = enkf_node_get_config( enkf_node );
-    buffer_fwrite_time_t( buffer , time(NULL));
-    data_written = enkf_node->write_to_buffer(enkf_node->data , buffer , report_step );
+    data_written = enkf_node_write_to_buffer__( enkf_node , buffer , report_step );
     if (data_written) {
       const char * node_key = enkf_config_node_get_key( config_node );
       enkf_var_type var_type = enkf_config_node_get_var_type( config_node );
@@ -634,6 +667,18 @@ void enkf_node_copy(const enkf_config_node_type * config_node ,
   enkf_node_free(enkf_node);
 }
 
+/*
+  Will check whether a vector which has already been loaded, e.g. with
+  enkf_node_try_load_vector(), has data for the report_step. The
+  filesystem is not consulted.
+*/
+
+bool enkf_node_vector_has_data( const enkf_node_type * enkf_node , int report_step) {
+  FUNC_ASSERT(enkf_node->has_data);
+  return enkf_node->has_data( enkf_node->data , report_step );
+}
+
+
 bool enkf_node_has_data( enkf_node_type * enkf_node , enkf_fs_type * fs , node_id_type node_id) {
   if (enkf_node->vector_storage) {
     FUNC_ASSERT(enkf_node->has_data);
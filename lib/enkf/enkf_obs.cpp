@@ -32,6 +32,9 @@
 
 #include <ert/analysis/enkf_linalg.hpp>
 
+#include <ert/res_util/res_portability.hpp>
+#include <ert/res_util/thread_pool.hpp>
+
 #include <ert/enkf/summary_obs.hpp>
 #include <ert/enkf/block_obs.hpp>
 #include <ert/enkf/enkf_fs.hpp>
@@ -327,6 +330,42 @@ int enkf_obs_get_size( const enkf_obs_type * obs ) {
 
 
 
+/*
+  The summary vector of each realization is loaded once, and all the
+  active observation steps are read from it. The realizations are
+  loaded in parallel; every job only writes to its own row of the work
+  buffer, and the meas_block is updated from the calling thread when
+  all jobs have completed.
+*/
+
+typedef struct {
+  const enkf_config_node_type * config_node;
+  enkf_fs_type                * fs;
+  const int_vector_type       * steps;
+  int                           iens;
+  int                           length;
+  double                      * values;
+} summary_measure_job_type;
+
+
+static void * enkf_obs_measure_summary_mt( void * arg ) {
+  summary_measure_job_type * job = (summary_measure_job_type *) arg;
+  enkf_node_type * work_node = enkf_node_alloc( job->config_node );
+  enkf_node_load_vector( work_node , job->fs , job->iens );
+  {
+    const summary_type * summary = (const summary_type *) enkf_node_value_ptr( work_node );
+    job->length = summary_length( summary );
+    for (int i = 0; i < int_vector_size( job->steps ); i++) {
+      int step = int_vector_iget( job->steps , i );
+      if (step < job->length)
+        job->values[i] = summary_get( summary , step );
+    }
+  }
+  enkf_node_free( work_node );
+  return NULL;
+}
+
+
 static void enkf_obs_get_obs_and_measure_summary(const enkf_obs_type      * enkf_obs,
                                                  obs_vector_type          * obs_vector ,
                                                  enkf_fs_type             * fs,
@@ -338,6 +377,7 @@ static void enkf_obs_get_obs_and_measure_summary(const enkf_obs_type      * enkf
                                                  double_vector_type         * obs_std) {
 
   const active_list_type * active_list = local_obsdata_node_get_active_list( obs_node );
+  int_vector_type * active_steps = int_vector_alloc( 0 , 0 );
 
   int active_count          = 0;
   int last_step = -1;
@@ -358,13 +398,43 @@ static void enkf_obs_get_obs_and_measure_summary(const enkf_obs_type      * enkf
       const summary_obs_type * summary_obs = (const summary_obs_type * ) obs_vector_iget_node( obs_vector , step );
       double_vector_iset( obs_std   , active_count , summary_obs_get_std( summary_obs ) * summary_obs_get_std_scaling( summary_obs ));
       double_vector_iset( obs_value , active_count , summary_obs_get_value( summary_obs ));
+      int_vector_append( active_steps , step );
       last_step = step;
       active_count++;
     }
   }
 
-  if (active_count <= 0)
+  if (active_count <= 0) {
+    int_vector_free( active_steps );
     return;
+  }
+
+  /*
+    2: Load the simulated vector of every active realization, and pick
+    out the values at the active steps.
+  */
+
+  int active_size = int_vector_size( ens_active_list );
+  double * values = (double *) util_malloc( active_size * active_count * sizeof * values );
+  summary_measure_job_type * jobs = (summary_measure_job_type *) util_malloc( active_size * sizeof * jobs );
+  {
+    int num_threads = util_int_min( res_get_num_cpu() , active_size );
+    thread_pool_type * tp = thread_pool_alloc( util_int_max( num_threads , 1 ) , true );
+
+    for (int iens_index = 0; iens_index < active_size; iens_index++) {
+      summary_measure_job_type * job = &jobs[iens_index];
+      job->config_node = obs_vector_get_config_node( obs_vector );
+      job->fs          = fs;
+      job->steps       = active_steps;
+      job->iens        = int_vector_iget( ens_active_list , iens_index );
+      job->length      = 0;
+      job->values      = &values[ iens_index * active_count ];
+
+      thread_pool_add_job( tp , enkf_obs_measure_summary_mt , job );
+    }
+    thread_pool_join( tp );
+    thread_pool_free( tp );
+  }
 
   /*
     3: Fill up the obs_block and meas_block structures with this
@@ -375,48 +445,36 @@ static void enkf_obs_get_obs_and_measure_summary(const enkf_obs_type      * enkf
     obs_block_type  * obs_block  = obs_data_add_block( obs_data , obs_vector_get_obs_key( obs_vector ) , active_count , NULL, true);
     meas_block_type * meas_block = meas_data_add_block( meas_data, obs_vector_get_obs_key( obs_vector ) , last_step , active_count );
 
-    enkf_node_type  * work_node  = enkf_node_alloc( obs_vector_get_config_node( obs_vector ));
-
     for (int i=0; i < active_count; i++)
       obs_block_iset( obs_block , i , double_vector_iget( obs_value , i) , double_vector_iget( obs_std , i ));
 
-    int active_size = int_vector_size( ens_active_list );
-    active_count = 0;
-    step = -1;
-    while (true) {
-      step = obs_vector_get_next_active_step( obs_vector , step );
-      if (step < 0)
-        break;
-
-      if (local_obsdata_node_tstep_active(obs_node, step)
-          && obs_vector_iget_active( obs_vector , step )
-          && active_list_iget( active_list , 0 /* Index into the scalar summary observation */)) {
-        for (int iens_index = 0; iens_index < active_size; iens_index++) {
-          const int iens = int_vector_iget( ens_active_list , iens_index );
-          node_id_type node_id = {.report_step = step,
-                                  .iens        = iens};
-          enkf_node_load( work_node , fs , node_id );
-
-          int smlength   = summary_length( (const summary_type * ) enkf_node_value_ptr( work_node ) );
-          if (step >= smlength) {
-            // if obs vector and sim vector have different length
-            // deactivate and continue to next
-            char * msg = util_alloc_sprintf("length of observation vector and simulated differ: %d vs. %d ", step, smlength);
-            meas_block_deactivate(meas_block , active_count);
-            obs_block_deactivate(obs_block , active_count, true, msg);
-            free( msg );
-            break;
-          } else {
-            meas_block_iset(meas_block , iens , active_count ,
-                            summary_get( (const summary_type * ) enkf_node_value_ptr( work_node ),
-                                         node_id.report_step ));
-          }
+    for (int i=0; i < active_count; i++) {
+      step = int_vector_iget( active_steps , i );
+
+      int iens_index;
+      for (iens_index = 0; iens_index < active_size; iens_index++) {
+        int smlength = jobs[iens_index].length;
+        if (step >= smlength) {
+          // if obs vector and sim vector have different length
+          // deactivate and continue to next
+          char * msg = util_alloc_sprintf("length of observation vector and simulated differ: %d vs. %d ", step, smlength);
+          meas_block_deactivate(meas_block , i);
+          obs_block_deactivate(obs_block , i, true, msg);
+          free( msg );
+          break;
         }
-        active_count++;
+      }
+
+      if (iens_index == active_size) {
+        for (iens_index = 0; iens_index < active_size; iens_index++)
+          meas_block_iset(meas_block , jobs[iens_index].iens , i , values[ iens_index * active_count + i ]);
       }
     }
-    enkf_node_free( work_node );
   }
+
+  free( jobs );
+  free( values );
+  int_vector_free( active_steps );
 }
 
 
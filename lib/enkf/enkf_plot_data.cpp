@@ -19,6 +19,7 @@
 #include <stdbool.h>
 
 #include <ert/util/double_vector.h>
+#include <ert/util/int_vector.h>
 #include <ert/util/vector.h>
 #include <ert/util/type_macros.h>
 
@@ -110,6 +111,36 @@ int enkf_plot_data_get_size( const enkf_plot_data_type * plot_data ) {
 }
 
 
+/*
+  Bulk export of already loaded data into a caller supplied row major
+  buffer with shape [num_realizations x num_steps], where
+  num_realizations is the length of the realizations vector. The
+  active buffer has the same shape, see enkf_plot_tvector_export_values()
+  for the treatment of inactive elements.
+*/
+
+void enkf_plot_data_export_values( const enkf_plot_data_type * plot_data ,
+                                   const int_vector_type * realizations ,
+                                   int step_offset ,
+                                   int num_steps ,
+                                   double * data ,
+                                   bool * active) {
+
+  for (int index = 0; index < int_vector_size( realizations ); index++) {
+    int iens = int_vector_iget( realizations , index );
+    double * row_data = &data[ index * num_steps ];
+    bool * row_active = &active[ index * num_steps ];
+
+    if (iens >= 0 && iens < plot_data->size)
+      enkf_plot_tvector_export_values( plot_data->ensemble[iens] , step_offset , num_steps , row_data , row_active );
+    else {
+      for (int i = 0; i < num_steps; i++)
+        row_active[i] = false;
+    }
+  }
+}
+
+
 
 
 void enkf_plot_data_load( enkf_plot_data_type * plot_data ,
@@ -21,6 +21,7 @@
 
 #include <ert/util/bool_vector.h>
 #include <ert/util/double_vector.h>
+#include <ert/util/int_vector.h>
 #include <ert/util/type_macros.h>
 
 #include <ert/enkf/enkf_config_node.hpp>
@@ -145,3 +146,31 @@ bool enkf_plot_gen_kw_should_use_log_scale(const enkf_plot_gen_kw_type * gen_kw
     const gen_kw_config_type * gen_kw_config = (const gen_kw_config_type *)enkf_config_node_get_ref( gen_kw->config_node );
     return gen_kw_config_should_use_log_scale(gen_kw_config, index);
 }
+
+
+/*
+  Will copy all the keywords of the loaded realizations into the
+  caller supplied row major buffer data with shape [num_realizations x
+  keyword_count], where num_realizations is the length of the
+  realizations vector. Realizations which have not been loaded are
+  left untouched in the buffer.
+*/
+
+void enkf_plot_gen_kw_export_values( const enkf_plot_gen_kw_type * plot_gen_kw ,
+                                     const int_vector_type * realizations ,
+                                     double * data) {
+  int keyword_count = enkf_plot_gen_kw_get_keyword_count( plot_gen_kw );
+
+  for (int index = 0; index < int_vector_size( realizations ); index++) {
+    int iens = int_vector_iget( realizations , index );
+
+    if (iens >= 0 && iens < plot_gen_kw->size) {
+      const enkf_plot_gen_kw_vector_type * vector = plot_gen_kw->ensemble[iens];
+      int size = util_int_min( keyword_count , enkf_plot_gen_kw_vector_get_size( vector ));
+      double * row = &data[ index * keyword_count ];
+
+      for (int i_kw = 0; i_kw < size; i_kw++)
+        row[i_kw] = enkf_plot_gen_kw_vector_iget( vector , i_kw );
+    }
+  }
+}
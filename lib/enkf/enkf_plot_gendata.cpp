@@ -129,21 +129,15 @@ static void enkf_plot_gendata_reset( enkf_plot_gendata_type * plot_gendata , int
 
 
 
-void enkf_plot_gendata_load( enkf_plot_gendata_type * plot_data ,
-                                 enkf_fs_type * fs ,
-                                 int report_step ,
-                                 const bool_vector_type * input_mask){
-
-    state_map_type * state_map = enkf_fs_get_state_map( fs );
-    int ens_size = state_map_get_size( state_map );
-    bool_vector_type * mask;
-
-    if (input_mask)
-      mask = bool_vector_alloc_copy( input_mask );
-    else
-      mask = bool_vector_alloc( ens_size , false );
+/*
+  Loads the realizations selected in mask, in parallel.
+*/
 
-    state_map_select_matching( state_map , mask , STATE_HAS_DATA );
+static void enkf_plot_gendata_load__( enkf_plot_gendata_type * plot_data ,
+                                      enkf_fs_type * fs ,
+                                      int report_step ,
+                                      int ens_size ,
+                                      const bool_vector_type * mask){
 
     enkf_plot_gendata_resize( plot_data , ens_size );
     enkf_plot_gendata_reset( plot_data , report_step );
@@ -166,11 +160,84 @@ void enkf_plot_gendata_load( enkf_plot_gendata_type * plot_data ,
       thread_pool_join( tp );
       thread_pool_free( tp );
     }
+}
+
+
+void enkf_plot_gendata_load( enkf_plot_gendata_type * plot_data ,
+                                 enkf_fs_type * fs ,
+                                 int report_step ,
+                                 const bool_vector_type * input_mask){
 
+    state_map_type * state_map = enkf_fs_get_state_map( fs );
+    int ens_size = state_map_get_size( state_map );
+    bool_vector_type * mask;
+
+    if (input_mask)
+      mask = bool_vector_alloc_copy( input_mask );
+    else
+      mask = bool_vector_alloc( ens_size , false );
+
+    state_map_select_matching( state_map , mask , STATE_HAS_DATA );
+    enkf_plot_gendata_load__( plot_data , fs , report_step , ens_size , mask );
     bool_vector_free( mask );
+}
+
+
+/*
+  As enkf_plot_gendata_load(), but only the realizations in the
+  realizations vector are loaded - and only those of them which have
+  data. The other realizations are left empty, also when they have data
+  in the storage.
+*/
+
+void enkf_plot_gendata_load_realizations( enkf_plot_gendata_type * plot_data ,
+                                          enkf_fs_type * fs ,
+                                          int report_step ,
+                                          const int_vector_type * realizations){
+
+    state_map_type * state_map = enkf_fs_get_state_map( fs );
+    int ens_size = state_map_get_size( state_map );
+    bool_vector_type * mask = bool_vector_alloc( ens_size , false );
 
+    for (int index = 0; index < int_vector_size( realizations ); index++) {
+      int iens = int_vector_iget( realizations , index );
+      if (iens >= 0 && iens < ens_size && state_map_iget( state_map , iens ) == STATE_HAS_DATA)
+        bool_vector_iset( mask , iens , true );
+    }
+
+    enkf_plot_gendata_load__( plot_data , fs , report_step , ens_size , mask );
+    bool_vector_free( mask );
 }
 
+/*
+  Will copy the loaded data into the caller supplied row major buffer
+  data with shape [num_realizations x data_size], where
+  num_realizations is the length of the realizations vector. Row i is
+  filled with at most data_size values for realization
+  realizations[i]; realizations which have not been loaded are left
+  untouched in the buffer.
+*/
+
+void enkf_plot_gendata_export_values( const enkf_plot_gendata_type * plot_data ,
+                                      const int_vector_type * realizations ,
+                                      int data_size ,
+                                      double * data) {
+
+  for (int index = 0; index < int_vector_size( realizations ); index++) {
+    int iens = int_vector_iget( realizations , index );
+
+    if (iens >= 0 && iens < plot_data->size) {
+      const enkf_plot_genvector_type * vector = plot_data->ensemble[iens];
+      int size = util_int_min( data_size , enkf_plot_genvector_get_size( vector ));
+      double * row = &data[ index * data_size ];
+
+      for (int i = 0; i < size; i++)
+        row[i] = enkf_plot_genvector_iget( vector , i );
+    }
+  }
+}
+
+
 void enkf_plot_gendata_find_min_max_values__(enkf_plot_gendata_type * plot_data){
     for (int iens = 0; iens < plot_data->size; iens++){
         enkf_plot_genvector_type * vector = enkf_plot_gendata_iget(plot_data, iens);
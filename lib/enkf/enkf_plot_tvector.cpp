@@ -125,6 +125,30 @@ bool enkf_plot_tvector_iget_active( const enkf_plot_tvector_type * plot_tvector
 }
 
 
+/*
+  Will copy the values in the interval [step_offset, step_offset +
+  num_steps) into the caller supplied buffers data and active; both
+  buffers must have room for at least num_steps elements. Elements
+  which are not active, or which are beyond the end of the vector,
+  will get active[i] == false and the corresponding data element is
+  left untouched - i.e. the caller can prefill the data buffer with a
+  suitable missing value.
+*/
+
+void enkf_plot_tvector_export_values( const enkf_plot_tvector_type * plot_tvector , int step_offset , int num_steps , double * data , bool * active) {
+  int size = enkf_plot_tvector_size( plot_tvector );
+
+  for (int i = 0; i < num_steps; i++) {
+    int index = step_offset + i;
+    if (index < size && bool_vector_iget( plot_tvector->mask , index )) {
+      data[i] = double_vector_iget( plot_tvector->data , index );
+      active[i] = true;
+    } else
+      active[i] = false;
+  }
+}
+
+
 
 
 
@@ -33,6 +33,8 @@
 #include <ert/util/node_ctype.h>
 #include <ert/util/timer.h>
 #include <ert/util/time_t_vector.h>
+#include <ert/util/vector.h>
+#include <ert/util/buffer.h>
 #include <ert/util/rng.h>
 #include <ert/res_util/subst_list.hpp>
 
@@ -368,6 +370,11 @@ static void enkf_state_check_for_missing_eclipse_summary_data(const ensemble_con
   stringlist_free(keys);
 }
 
+static void enkf_state_buffer_free__( void * arg ) {
+  buffer_free( (buffer_type *) arg );
+}
+
+
 static bool enkf_state_internalize_dynamic_eclipse_results(ensemble_config_type * ens_config,
                                                            forward_load_context_type * load_context ,
                                                            const model_config_type * model_config) {
@@ -412,25 +419,46 @@ static bool enkf_state_internalize_dynamic_eclipse_results(ensemble_config_type
 
         const ecl_smspec_type * smspec = ecl_sum_get_smspec(summary);
 
+        /*
+          All the summary vectors for this realization are assembled in
+          memory and written to storage in one batch, and the summary
+          keys are added to the key set in one go.
+
+          The vectors currently on file only need to be loaded when
+          the simulation has been restarted, i.e. load_start > 1;
+          otherwise every report step which is not garbage will be
+          overwritten by the forward load anyway.
+        */
+        bool merge_existing = (load_start > 1);
+        stringlist_type * keys = stringlist_alloc_new( );
+        vector_type * buffers = vector_alloc_new( );
+
         for(int i = 0; i < ecl_smspec_num_nodes(smspec); i++) {
           const ecl::smspec_node& smspec_node = ecl_smspec_iget_node_w_node_index(smspec, i);
           const char * key = smspec_node.get_gen_key1();
 
           if(summary_key_matcher_match_summary_key(matcher, key)) {
-            summary_key_set_type * key_set = enkf_fs_get_summary_key_set(sim_fs);
-            summary_key_set_add_summary_key(key_set, key);
-
             enkf_config_node_type * config_node = ensemble_config_get_or_create_summary_node(ens_config, key);
             enkf_node_type * node = enkf_node_alloc( config_node );
+            buffer_type * buffer = buffer_alloc( 100 );
 
-            enkf_node_try_load_vector( node , sim_fs , iens );  // Ensure that what is currently on file is loaded before we update.
+            if (merge_existing)
+              enkf_node_try_load_vector( node , sim_fs , iens );  // Ensure that what is currently on file is loaded before we update.
 
             enkf_node_forward_load_vector( node , load_context , time_index);
-            enkf_node_store_vector( node , sim_fs , iens );
+            enkf_node_write_vector_buffer( node , buffer );
+
+            stringlist_append_copy( keys , key );
+            vector_append_owned_ref( buffers , buffer , enkf_state_buffer_free__ );
             enkf_node_free( node );
           }
         }
 
+        summary_key_set_add_summary_keys( enkf_fs_get_summary_key_set(sim_fs) , keys );
+        enkf_fs_fwrite_vector_list( sim_fs , buffers , keys , DYNAMIC_RESULT , iens );
+
+        vector_free( buffers );
+        stringlist_free( keys );
         int_vector_free( time_index );
 
         /*
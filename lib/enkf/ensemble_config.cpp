@@ -627,6 +627,16 @@ void ensemble_config_init_FIELD( ensemble_config_type * ensemble_config , const
         } else
           util_abort("%s: field type: %s is not recognized\n",__func__ , var_type_string);
 
+        if (hash_has_key( options , CODEC_KEY)) {
+          const char * codec_string = (const char *) hash_get( options , CODEC_KEY );
+          buffer_codec_type codec;
+
+          if (buffer_codec_sscanf( codec_string , &codec ))
+            field_config_set_codec( (field_config_type *) enkf_config_node_get_ref( config_node ) , codec );
+          else
+            fprintf(stderr,"** Warning: codec %s not recognized - using %s \n",codec_string , buffer_codec_get_name( BUFFER_CODEC_DEFAULT ));
+        }
+
         hash_free( options );
       }
     }
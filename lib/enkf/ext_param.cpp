@@ -22,11 +22,13 @@
 #include <stdio.h>
 
 #include <ert/util/util.h>
+#include <ert/util/vector.h>
 
 #include <ert/enkf/enkf_macros.hpp>
 #include <ert/enkf/enkf_util.hpp>
 #include <ert/enkf/ext_param_config.hpp>
 #include <ert/enkf/ext_param.hpp>
+#include <ert/enkf/enkf_node.hpp>
 #include <ert/enkf/value_export.hpp>
 
 GET_DATA_SIZE_HEADER(ext_param);
@@ -62,6 +64,73 @@ ext_param_type * ext_param_alloc(const ext_param_config_type * config) {
 }
 
 
+static void ext_param_buffer_free__( void * arg ) {
+  buffer_type * buffer = (buffer_type *) arg;
+  buffer_free( buffer );
+}
+
+
+/*
+  Will store the EXT_PARAM nodes given by keys for all the
+  realizations with one enkf_fs_fwrite_node_list() call. The data
+  argument is a row major buffer with shape [num_realizations x
+  row_size], where num_realizations is the length of the realizations
+  vector and row_size is the sum of the data sizes of the nodes; row i
+  holds the values for realization realizations[i], with the values
+  for the nodes following each other in the order given by keys.
+*/
+
+void ext_param_store_values(enkf_fs_type * fs, const ensemble_config_type * ens_config, const stringlist_type * keys,
+                            int report_step, const int_vector_type * realizations, const double * data) {
+  vector_type * nodes = vector_alloc_new( );
+  int row_size = 0;
+
+  for (int k = 0; k < stringlist_get_size( keys ); k++) {
+    const enkf_config_node_type * config_node = ensemble_config_get_node( ens_config , stringlist_iget( keys , k ));
+    if (enkf_config_node_get_impl_type( config_node ) != EXT_PARAM)
+      util_abort("%s: node:%s is not an EXT_PARAM node \n",__func__ , stringlist_iget( keys , k ));
+
+    {
+      enkf_node_type * node = enkf_node_alloc( config_node );
+      row_size += ext_param_get_size( ext_param_safe_cast_const( enkf_node_value_ptr( node )));
+      vector_append_owned_ref( nodes , node , enkf_node_free__ );
+    }
+  }
+
+  {
+    stringlist_type * node_keys = stringlist_alloc_new( );
+    int_vector_type * node_realizations = int_vector_alloc( 0 , 0 );
+    vector_type * buffers = vector_alloc_new( );
+
+    for (int index = 0; index < int_vector_size( realizations ); index++) {
+      const double * row = &data[ index * row_size ];
+      int offset = 0;
+
+      for (int k = 0; k < vector_get_size( nodes ); k++) {
+        enkf_node_type * node = (enkf_node_type *) vector_iget( nodes , k );
+        ext_param_type * ext_param = ext_param_safe_cast( enkf_node_value_ptr( node ));
+        buffer_type * buffer = buffer_alloc( 100 );
+
+        memcpy( ext_param->data , &row[offset] , ext_param->size * sizeof * ext_param->data );
+        offset += ext_param->size;
+
+        enkf_node_write_buffer( node , buffer , report_step );
+        stringlist_append_copy( node_keys , stringlist_iget( keys , k ));
+        int_vector_append( node_realizations , int_vector_iget( realizations , index ));
+        vector_append_owned_ref( buffers , buffer , ext_param_buffer_free__ );
+      }
+    }
+
+    enkf_fs_fwrite_node_list( fs , buffers , node_keys , EXT_PARAMETER , report_step , node_realizations );
+
+    vector_free( buffers );
+    int_vector_free( node_realizations );
+    stringlist_free( node_keys );
+  }
+  vector_free( nodes );
+}
+
+
 bool ext_param_key_set( ext_param_type * param, const char * key, double value) {
   int index = ext_param_config_get_key_index( param->config, key);
   if (index < 0)
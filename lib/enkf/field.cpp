@@ -36,6 +36,8 @@
 #include <ert/rms/rms_type.hpp>
 #include <ert/rms/rms_util.hpp>
 
+#include <ert/res_util/buffer_codec.hpp>
+
 #include <ert/enkf/field.hpp>
 #include <ert/enkf/field_config.hpp>
 #include <ert/enkf/enkf_serialize.hpp>
@@ -391,10 +393,7 @@ void field_copy(const field_type *src , field_type * target ) {
 void field_read_from_buffer(field_type * field , buffer_type * buffer, enkf_fs_type * fs, int report_step) {
   int byte_size = field_config_get_byte_size(field->config);
   enkf_util_assert_buffer_type(buffer, FIELD); // FIXME flaky runpath_list test
-  buffer_fread_compressed(buffer,
-                          buffer_get_remaining_size(buffer),
-                          field->data,
-                          byte_size);
+  buffer_codec_fread(buffer, field->data, byte_size);
 }
 
 
@@ -537,7 +536,11 @@ void field_ROFF_export(const field_type * field , const char * export_filename,
 bool field_write_to_buffer(const field_type * field , buffer_type * buffer , int report_step) {
   int byte_size = field_config_get_byte_size( field->config );
   buffer_fwrite_int( buffer , FIELD );
-  buffer_fwrite_compressed( buffer , field->data , byte_size );
+  buffer_codec_fwrite( buffer ,
+                       field_config_get_codec( field->config ) ,
+                       field->data ,
+                       byte_size ,
+                       field_config_get_sizeof_ctype( field->config ));
   return true;
 }
 
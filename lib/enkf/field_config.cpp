@@ -142,6 +142,7 @@ struct field_config_struct {
   ecl_data_type           internal_data_type;
   bool                    __enkf_mode;          /* See doc of functions field_config_set_key() / field_config_enkf_OFF() */
   bool                    write_compressed;
+  buffer_codec_type       codec;                /* The codec used when the field data is stored in the enkf_fs. */
 
   field_type_enum           type;
   field_type              * min_std;
@@ -352,6 +353,7 @@ field_config_type * field_config_alloc_empty( const char * ecl_kw_name , ecl_gri
   config->__enkf_mode         = true;
   config->grid                = NULL;
   config->write_compressed    = true;
+  config->codec               = BUFFER_CODEC_DEFAULT;
   config->type                = UNKNOWN_FIELD_TYPE;
 
   config->output_transform      = NULL;
@@ -575,6 +577,10 @@ void field_config_get_ijk( const field_config_type * config , int active_index ,
 
 bool field_config_write_compressed(const field_config_type * config) { return config->write_compressed; }
 
+buffer_codec_type field_config_get_codec(const field_config_type * config) { return config->codec; }
+
+void field_config_set_codec(field_config_type * config , buffer_codec_type codec) { config->codec = codec; }
+
 
 
 void field_config_set_truncation(field_config_type * config , int truncation, double min_value, double max_value) {
@@ -873,6 +879,9 @@ void field_config_fprintf_config( const field_config_type * config ,
 
   if (config->truncation & TRUNCATE_MAX)
     fprintf( stream , CONFIG_FLOAT_OPTION_FORMAT , MAX_KEY , config->max_value );
+
+  if (config->codec != BUFFER_CODEC_DEFAULT)
+    fprintf( stream , CONFIG_OPTION_FORMAT , CODEC_KEY , buffer_codec_get_name( config->codec ));
 }
 
 
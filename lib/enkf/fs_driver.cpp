@@ -39,16 +39,19 @@ void fs_driver_init(fs_driver_type * driver) {
 
   driver->load_node   = NULL;
   driver->save_node   = NULL;
+  driver->save_node_list = NULL;
   driver->has_node    = NULL;
   driver->unlink_node = NULL;
 
   driver->load_vector   = NULL;
   driver->save_vector   = NULL;
+  driver->save_vector_list = NULL;
   driver->has_vector    = NULL;
   driver->unlink_vector = NULL;
 
   driver->free_driver   = NULL;
   driver->fsync_driver  = NULL;
+  driver->set_fsync_interval = NULL;
 }
 
 void fs_driver_assert_cast(const fs_driver_type * driver) {
@@ -33,6 +33,7 @@
 #include <ert/ecl/ecl_util.h>
 
 #include <ert/res_util/res_log.hpp>
+#include <ert/res_util/buffer_codec.hpp>
 
 #include <ert/enkf/enkf_serialize.hpp>
 #include <ert/enkf/enkf_types.hpp>
@@ -153,7 +154,11 @@ bool gen_data_write_to_buffer(const gen_data_type * gen_data , buffer_type * buf
       buffer_fwrite_int( buffer , size );
       buffer_fwrite_int( buffer , report_step);   /* Why the heck do I need to store this ????  It was a mistake ...*/
 
-      buffer_fwrite_compressed( buffer , gen_data->data , byte_size);
+      buffer_codec_fwrite( buffer ,
+                           gen_data_config_get_codec( gen_data->config ) ,
+                           gen_data->data ,
+                           byte_size ,
+                           ecl_type_get_sizeof_ctype( gen_data_config_get_internal_data_type( gen_data->config )));
       return true;
     } else
       return false;   /* When false is returned - the (empty) file will be removed */
@@ -169,9 +174,8 @@ void gen_data_read_from_buffer(gen_data_type * gen_data , buffer_type * buffer ,
   buffer_fskip_int( buffer );  /* Skipping report_step from the buffer - was a mistake to store it - I think ... */
   {
     size_t byte_size       = size * ecl_type_get_sizeof_ctype( gen_data_config_get_internal_data_type ( gen_data->config ));
-    size_t compressed_size = buffer_get_remaining_size( buffer );
     gen_data->data         = (char *) util_realloc( gen_data->data , byte_size );
-    buffer_fread_compressed( buffer , compressed_size , gen_data->data , byte_size );
+    buffer_codec_fread( buffer , gen_data->data , byte_size );
   }
   gen_data_assert_size( gen_data , size , report_step );
 
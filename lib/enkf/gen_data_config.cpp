@@ -67,6 +67,7 @@ struct gen_data_config_struct {
   int                            template_buffer_size;  /* The total size (bytes) of the template buffer .*/
   gen_data_file_format_type      input_format;          /* The format used for loading gen_data instances when the forward model has completed *AND* for loading the initial files.*/
   gen_data_file_format_type      output_format;         /* The format used when gen_data instances are written to disk for the forward model. */
+  buffer_codec_type              codec;                 /* The codec used when gen_data instances are stored in the enkf_fs. */
   int_vector_type              * data_size_vector;      /* Data size, i.e. number of elements , indexed with report_step */
   int_vector_type              * active_report_steps;   /* The report steps where we expect to load data for this instance. */
   pthread_mutex_t                update_lock;
@@ -93,6 +94,10 @@ UTIL_SAFE_CAST_FUNCTION_CONST(gen_data_config , GEN_DATA_CONFIG_ID)
 gen_data_file_format_type gen_data_config_get_input_format ( const gen_data_config_type * config) { return config->input_format; }
 gen_data_file_format_type gen_data_config_get_output_format( const gen_data_config_type * config) { return config->output_format; }
 
+buffer_codec_type gen_data_config_get_codec( const gen_data_config_type * config) { return config->codec; }
+
+void gen_data_config_set_codec( gen_data_config_type * config , buffer_codec_type codec) { config->codec = codec; }
+
 
 
 ecl_data_type gen_data_config_get_internal_data_type(const gen_data_config_type * config) {
@@ -166,6 +171,7 @@ static gen_data_config_type * gen_data_config_alloc( const char * key , bool dyn
   memcpy(&config->internal_type, &data_type, sizeof data_type);
   config->input_format       = GEN_DATA_UNDEFINED;
   config->output_format      = GEN_DATA_UNDEFINED;
+  config->codec              = BUFFER_CODEC_DEFAULT;
   config->data_size_vector   = int_vector_alloc( 0 , -1 );   /* The default value: -1 - indicates "NOT SET" */
   config->active_report_steps= int_vector_alloc( 0 , 0 );
   config->active_mask        = bool_vector_alloc(0 , true ); /* Elements are explicitly set to FALSE - this MUST default to true. */
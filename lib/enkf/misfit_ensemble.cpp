@@ -20,6 +20,7 @@
 #include <stdio.h>
 #include <math.h>
 #include <stdbool.h>
+#include <pthread.h>
 
 #include <ert/util/util.h>
 #include <ert/util/hash.h>
@@ -27,12 +28,16 @@
 #include <ert/util/double_vector.h>
 #include <ert/util/buffer.h>
 
+#include <ert/res_util/res_portability.hpp>
+#include <ert/res_util/thread_pool.hpp>
+
 #include <ert/enkf/enkf_obs.hpp>
 #include <ert/enkf/enkf_fs.hpp>
 #include <ert/enkf/enkf_util.hpp>
 #include <ert/enkf/misfit_ensemble.hpp>
 #include <ert/enkf/misfit_member.hpp>
 #include <ert/enkf/misfit_ts.hpp>
+#include <ert/enkf/state_map.hpp>
 
 
 /**
@@ -57,6 +62,7 @@ struct misfit_ensemble_struct {
   bool                  initialized;
   int                   history_length;
   vector_type         * ensemble;           /* Vector of misfit_member_type instances - one for each ensemble member. */
+  int                   state_map_generation;  /* Generation of the state_map the misfit was calculated from. */
 };
 
 
@@ -76,6 +82,69 @@ static void  __2d_free(double ** d , int rows) {
 }
 
 
+/*
+  The chi2 for the observation keys are evaluated in parallel, one job
+  for each key. The internalization into the misfit_member instances
+  is serialized with the mutex, because the members are shared between
+  all the keys.
+*/
+
+typedef struct {
+  misfit_ensemble_type * misfit_ensemble;
+  obs_vector_type      * obs_vector;
+  const char           * obs_key;
+  enkf_fs_type         * fs;
+  int                    ens_size;
+  pthread_mutex_t      * mutex;
+} misfit_job_type;
+
+
+static void * misfit_ensemble_update_key_mt( void * arg ) {
+  misfit_job_type * job = (misfit_job_type *) arg;
+  misfit_ensemble_type * misfit_ensemble = job->misfit_ensemble;
+  int ens_size                   = job->ens_size;
+  double ** chi2_work            = __2d_malloc( misfit_ensemble->history_length + 1 , ens_size );
+  bool_vector_type * iens_valid  = bool_vector_alloc( ens_size , true );
+
+  obs_vector_ensemble_chi2( job->obs_vector ,
+                            job->fs ,
+                            iens_valid ,
+                            0 ,
+                            misfit_ensemble->history_length,
+                            0 ,
+                            ens_size ,
+                            chi2_work);
+
+  /**
+      Internalizing the results from the chi2_work table into the misfit structure.
+  */
+  pthread_mutex_lock( job->mutex );
+  for (int iens = 0; iens < ens_size; iens++) {
+    misfit_member_type * node = misfit_ensemble_iget_member( misfit_ensemble , iens );
+    if (bool_vector_iget( iens_valid , iens))
+      misfit_member_update( node , job->obs_key , misfit_ensemble->history_length , iens , (const double **) chi2_work);
+  }
+  pthread_mutex_unlock( job->mutex );
+
+  bool_vector_free( iens_valid );
+  __2d_free( chi2_work , misfit_ensemble->history_length + 1);
+  return NULL;
+}
+
+
+/*
+  The misfit is recalculated if the state_map of the filesystem has
+  been set since the last time the misfit was initialized; that
+  includes loading the results of a rerun, even if the states are
+  unchanged. Nodes written directly to the filesystem without updating
+  the state_map are not detected.
+*/
+
+static bool misfit_ensemble_state_map_changed( const misfit_ensemble_type * misfit_ensemble , enkf_fs_type * fs ) {
+  return misfit_ensemble->state_map_generation != state_map_get_generation( enkf_fs_get_state_map( fs ));
+}
+
+
 void misfit_ensemble_initialize( misfit_ensemble_type * misfit_ensemble ,
                                  const ensemble_config_type * ensemble_config ,
                                  const enkf_obs_type * enkf_obs ,
@@ -84,47 +153,43 @@ void misfit_ensemble_initialize( misfit_ensemble_type * misfit_ensemble ,
                                  int history_length,
                                  bool force_init) {
 
-  if (force_init || !misfit_ensemble->initialized) {
+  if (force_init || !misfit_ensemble->initialized || misfit_ensemble_state_map_changed( misfit_ensemble , fs )) {
     misfit_ensemble_clear( misfit_ensemble );
 
-    double ** chi2_work            = __2d_malloc( history_length + 1 , ens_size );
-    bool_vector_type * iens_valid  = bool_vector_alloc( ens_size , true );
-
-    hash_iter_type * obs_iter = enkf_obs_alloc_iter( enkf_obs );
-    const char * obs_key      = hash_iter_get_next_key( obs_iter );
+    hash_iter_type * obs_iter  = enkf_obs_alloc_iter( enkf_obs );
+    misfit_job_type * jobs     = (misfit_job_type *) util_malloc( enkf_obs_get_size( enkf_obs ) * sizeof * jobs );
+    pthread_mutex_t mutex;
 
     misfit_ensemble->history_length = history_length;
     misfit_ensemble_set_ens_size( misfit_ensemble , ens_size );
 
-    while (obs_key != NULL) {
-      obs_vector_type * obs_vector = enkf_obs_get_vector( enkf_obs , obs_key );
-
-      bool_vector_reset( iens_valid );
-      bool_vector_iset( iens_valid , ens_size - 1 , true );
-      obs_vector_ensemble_chi2( obs_vector ,
-                                fs ,
-                                iens_valid ,
-                                0 ,
-                                misfit_ensemble->history_length,
-                                0 ,
-                                ens_size ,
-                                chi2_work);
-
-      /**
-          Internalizing the results from the chi2_work table into the misfit structure.
-      */
-      for (int iens = 0; iens < ens_size; iens++) {
-        misfit_member_type * node = misfit_ensemble_iget_member( misfit_ensemble , iens );
-        if (bool_vector_iget( iens_valid , iens))
-          misfit_member_update( node , obs_key , misfit_ensemble->history_length , iens , (const double **) chi2_work);
+    pthread_mutex_init( &mutex , NULL );
+    {
+      thread_pool_type * tp = thread_pool_alloc( res_get_num_cpu() , true );
+      const char * obs_key  = hash_iter_get_next_key( obs_iter );
+      int ikey = 0;
+      while (obs_key != NULL) {
+        misfit_job_type * job = &jobs[ikey];
+        job->misfit_ensemble = misfit_ensemble;
+        job->obs_key         = obs_key;
+        job->obs_vector      = enkf_obs_get_vector( enkf_obs , job->obs_key );
+        job->fs              = fs;
+        job->ens_size        = ens_size;
+        job->mutex           = &mutex;
+
+        thread_pool_add_job( tp , misfit_ensemble_update_key_mt , job );
+        obs_key = hash_iter_get_next_key( obs_iter );
+        ikey++;
       }
-      obs_key = hash_iter_get_next_key( obs_iter );
+      thread_pool_join( tp );
+      thread_pool_free( tp );
     }
+    pthread_mutex_destroy( &mutex );
 
-    bool_vector_free( iens_valid );
+    free( jobs );
     hash_iter_free( obs_iter );
 
-    __2d_free( chi2_work , misfit_ensemble->history_length + 1);
+    misfit_ensemble->state_map_generation = state_map_get_generation( enkf_fs_get_state_map( fs ));
     misfit_ensemble->initialized = true;
   }
 }
@@ -157,6 +222,7 @@ static misfit_ensemble_type * misfit_ensemble_alloc_empty() {
 
   table->initialized     = false;
   table->ensemble        = vector_alloc_new();
+  table->state_map_generation = -1;
 
   return table;
 }
@@ -221,11 +287,13 @@ misfit_member_type * misfit_ensemble_iget_member( const misfit_ensemble_type * t
 
 void misfit_ensemble_clear( misfit_ensemble_type * table) {
   vector_clear( table->ensemble );
+  table->state_map_generation = -1;
   table->initialized = false;
 }
 
 
 void misfit_ensemble_free(misfit_ensemble_type * table ) {
+  misfit_ensemble_clear( table );
   vector_free( table->ensemble );
   free( table );
 }
@@ -989,6 +989,45 @@ double obs_vector_chi2(const obs_vector_type * obs_vector , enkf_fs_type * fs ,
 
 //This will not work for container observations .....
 
+/*
+  For nodes with vector storage the full vector is loaded once for
+  each realization, and the chi2 values for all the report steps are
+  evaluated from the loaded vector.
+*/
+
+static void obs_vector_ensemble_chi2_vector(const obs_vector_type * obs_vector ,
+                                            enkf_fs_type * fs,
+                                            bool_vector_type * valid ,
+                                            int step1 ,
+                                            int step2 ,
+                                            int iens1 ,
+                                            int iens2 ,
+                                            double ** chi2) {
+
+  enkf_node_type * enkf_node = enkf_node_alloc( obs_vector->config_node );
+  node_id_type node_id;
+  for (int iens = iens1; iens < iens2; iens++) {
+    bool has_vector = enkf_node_try_load_vector( enkf_node , fs , iens );
+    node_id.iens = iens;
+    for (int step = step1; step <= step2; step++) {
+      void * obs_node = (void *)vector_iget( obs_vector->nodes , step);
+      node_id.report_step = step;
+
+      if (obs_node == NULL)
+        chi2[step][iens] = 0;
+      else if (has_vector && enkf_node_vector_has_data( enkf_node , step ))
+        chi2[step][iens] = obs_vector_chi2__(obs_vector , step , enkf_node , node_id);
+      else {
+        chi2[step][iens] = 0;
+        // Missing data - this member will be marked as invalid in the misfit calculations.
+        bool_vector_iset( valid , iens , false );
+      }
+    }
+  }
+  enkf_node_free( enkf_node );
+}
+
+
 void obs_vector_ensemble_chi2(const obs_vector_type * obs_vector ,
                               enkf_fs_type * fs,
                               bool_vector_type * valid ,
@@ -998,6 +1037,11 @@ void obs_vector_ensemble_chi2(const obs_vector_type * obs_vector ,
                               int iens2 ,
                               double ** chi2) {
 
+  if (enkf_config_node_vector_storage( obs_vector->config_node )) {
+    obs_vector_ensemble_chi2_vector( obs_vector , fs , valid , step1 , step2 , iens1 , iens2 , chi2 );
+    return;
+  }
+
   int step;
   enkf_node_type * enkf_node = enkf_node_alloc( obs_vector->config_node );
   node_id_type node_id;
@@ -1039,13 +1083,18 @@ double obs_vector_total_chi2(const obs_vector_type * obs_vector , enkf_fs_type *
   double sum_chi2 = 0;
   enkf_node_type * enkf_node = enkf_node_deep_alloc( obs_vector->config_node );
   node_id_type node_id = {.report_step = 0, .iens = iens };
+  bool vector_storage = enkf_config_node_vector_storage( obs_vector->config_node );
+  bool has_vector = vector_storage && enkf_node_try_load_vector( enkf_node , fs , iens );
 
   int vec_size = vector_get_size( obs_vector->nodes );
   for (int report_step = 0; report_step < vec_size; report_step++) {
     if (vector_iget(obs_vector->nodes , report_step) != NULL) {
       node_id.report_step = report_step;
 
-      if (enkf_node_try_load( enkf_node , fs , node_id))
+      if (vector_storage) {
+        if (has_vector && enkf_node_vector_has_data( enkf_node , report_step ))
+          sum_chi2 += obs_vector_chi2__(obs_vector , report_step , enkf_node, node_id);
+      } else if (enkf_node_try_load( enkf_node , fs , node_id))
         sum_chi2 += obs_vector_chi2__(obs_vector , report_step , enkf_node, node_id);
 
     }
@@ -1066,7 +1115,10 @@ void obs_vector_ensemble_total_chi2(const obs_vector_type * obs_vector , enkf_fs
   for (iens = 0; iens < ens_size; iens++)
     sum_chi2[iens] = 0;
 
-  {
+  if (enkf_config_node_vector_storage( obs_vector->config_node )) {
+    for (iens = 0; iens < ens_size; iens++)
+      sum_chi2[iens] = obs_vector_total_chi2( obs_vector , fs , iens );
+  } else {
     node_id_type node_id = {.report_step = 0, .iens = iens };
     enkf_node_type * enkf_node = enkf_node_alloc( obs_vector->config_node );
     int vec_size = vector_get_size( obs_vector->nodes);
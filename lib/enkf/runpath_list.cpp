@@ -219,7 +219,7 @@ char * runpath_list_iget_basename( runpath_list_type * list , int index) {
 }
 
 void runpath_list_fprintf(runpath_list_type * list ) {
-  pthread_rwlock_rdlock( &list->lock );
+  pthread_rwlock_wrlock( &list->lock );
   {
     FILE * stream = util_mkdir_fopen( list->export_file , "w");
     const char * line_fmt = runpath_list_get_line_fmt( list );
@@ -36,6 +36,7 @@ struct state_map_struct {
   int_vector_type  * state;
   pthread_rwlock_t mutable rw_lock;
   bool               read_only;
+  int                generation;   /* Incremented every time the map is set. */
 };
 
 
@@ -48,6 +49,7 @@ state_map_type * state_map_alloc( ) {
   map->state = int_vector_alloc( 0 , STATE_UNDEFINED );
   pthread_rwlock_init( &map->rw_lock , NULL);
   map->read_only = false;
+  map->generation = 0;
   return map;
 }
 
@@ -114,6 +116,24 @@ bool state_map_equal(const state_map_type * map1, const state_map_type * map2) {
 }
 
 
+/*
+  The generation is incremented every time the map is set, also when
+  a realization is set to the state it already has, e.g. when the
+  results of a rerun are loaded. It can be used to detect that data
+  derived from the filesystem content is stale.
+*/
+
+int state_map_get_generation(const state_map_type * map) {
+  int generation;
+  pthread_rwlock_rdlock( &map->rw_lock );
+  {
+    generation = map->generation;
+  }
+  pthread_rwlock_unlock( &map->rw_lock );
+  return generation;
+}
+
+
 realisation_state_enum state_map_iget(const state_map_type * map , int index) {
   realisation_state_enum state;
   pthread_rwlock_rdlock( &map->rw_lock );
@@ -163,6 +183,7 @@ void state_map_iset( state_map_type * map ,int index , realisation_state_enum st
   pthread_rwlock_wrlock( &map->rw_lock );
   {
     state_map_iset__( map , index , state );
+    map->generation++;
   }
   pthread_rwlock_unlock( &map->rw_lock );
 }
@@ -211,6 +232,7 @@ bool state_map_fread( state_map_type * map , const char * filename) {
       file_exists = true;
     } else
       int_vector_reset( map->state );
+    map->generation++;
   }
   pthread_rwlock_unlock( &map->rw_lock );
   return file_exists;
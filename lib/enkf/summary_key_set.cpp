@@ -97,6 +97,30 @@ bool summary_key_set_add_summary_key(summary_key_set_type * set, const char * su
     return writable_and_non_existent;
 }
 
+/*
+  Adds all the keys in the list while holding the write lock only
+  once; returns the number of keys which were not already present.
+*/
+int summary_key_set_add_summary_keys(summary_key_set_type * set, const stringlist_type * summary_keys) {
+    int added = 0;
+
+    pthread_rwlock_wrlock( &set->rw_lock);
+    {
+        if (!set->read_only) {
+            for (int i = 0; i < stringlist_get_size(summary_keys); i++) {
+                const char * summary_key = stringlist_iget(summary_keys, i);
+                if (!hash_has_key(set->key_set, summary_key)) {
+                    hash_insert_int(set->key_set, summary_key, 1);
+                    added++;
+                }
+            }
+        }
+    }
+    pthread_rwlock_unlock( &set->rw_lock );
+
+    return added;
+}
+
 bool summary_key_set_has_summary_key(summary_key_set_type * set, const char * summary_key) {
     bool has_key = false;
 
@@ -26,6 +26,7 @@
 #include <ert/enkf/ext_param.hpp>
 #include <ert/enkf/ext_param_config.hpp>
 #include <ert/enkf/enkf_types.hpp>
+#include <ert/enkf/ensemble_config.hpp>
 
 enkf_config_node_type * create_config_node__( const char * outfile)
 {
@@ -156,6 +157,76 @@ void test_fs() {
 }
 
 
+void test_store_values() {
+  test_work_area_type * work_area = test_work_area_alloc( "test_store_values");
+  ensemble_config_type * ens_config = ensemble_config_alloc( NULL , NULL , NULL );
+  stringlist_type * keys = stringlist_alloc_new( );
+  int_vector_type * realizations = int_vector_alloc( 0 , 0 );
+  int num_realizations = 40;
+  int row_size = 6;
+  double * data = (double *) util_calloc( num_realizations * row_size , sizeof * data );
+
+  {
+    stringlist_type * var_keys = stringlist_alloc_new( );
+    stringlist_append_copy( var_keys , "W1");
+    stringlist_append_copy( var_keys , "W2");
+    ensemble_config_add_node( ens_config , enkf_config_node_alloc_EXT_PARAM("CTRL1" , var_keys , NULL));
+    stringlist_append_copy( var_keys , "W3");
+    stringlist_append_copy( var_keys , "W4");
+    ensemble_config_add_node( ens_config , enkf_config_node_alloc_EXT_PARAM("CTRL2" , var_keys , NULL));
+    stringlist_free( var_keys );
+  }
+  stringlist_append_copy( keys , "CTRL1");
+  stringlist_append_copy( keys , "CTRL2");
+
+  for (int index = 0; index < num_realizations; index++) {
+    int_vector_append( realizations , 2 * index + 1 );
+    for (int i = 0; i < row_size; i++)
+      data[index * row_size + i] = 100 * index + i;
+  }
+
+  {
+    enkf_fs_type * fs = enkf_fs_create_fs("mnt" , BLOCK_FS_DRIVER_ID , NULL , true);
+    ext_param_store_values( fs , ens_config , keys , 0 , realizations , data );
+    test_assert_int_equal( enkf_fs_decref( fs ), 0 );
+  }
+
+  {
+    enkf_fs_type * fs = enkf_fs_mount("mnt");
+    enkf_node_type * node1 = enkf_node_alloc( ensemble_config_get_node( ens_config , "CTRL1"));
+    enkf_node_type * node2 = enkf_node_alloc( ensemble_config_get_node( ens_config , "CTRL2"));
+    ext_param_type * ext_param1 = (ext_param_type *) enkf_node_value_ptr( node1 );
+    ext_param_type * ext_param2 = (ext_param_type *) enkf_node_value_ptr( node2 );
+
+    for (int index = 0; index < num_realizations; index++) {
+      node_id_type node_id = {.report_step = 0 , .iens = int_vector_iget( realizations , index )};
+      const double * row = &data[index * row_size];
+
+      enkf_node_load( node1 , fs , node_id );
+      enkf_node_load( node2 , fs , node_id );
+      for (int i = 0; i < 2; i++)
+        test_assert_double_equal( ext_param_iget( ext_param1 , i ) , row[i] );
+      for (int i = 0; i < 4; i++)
+        test_assert_double_equal( ext_param_iget( ext_param2 , i ) , row[2 + i] );
+    }
+    {
+      node_id_type node_id = {.report_step = 0 , .iens = 0};
+      test_assert_false( enkf_node_has_data( node1 , fs , node_id ));
+    }
+
+    enkf_node_free( node1 );
+    enkf_node_free( node2 );
+    enkf_fs_decref( fs );
+  }
+
+  free( data );
+  int_vector_free( realizations );
+  stringlist_free( keys );
+  ensemble_config_free( ens_config );
+  test_work_area_free( work_area );
+}
+
+
 int main( int argc , char **argv ) {
   util_install_signals();
   test_create_invalid_keys();
@@ -164,5 +235,6 @@ int main( int argc , char **argv ) {
   test_create_data();
   test_forward_write();
   test_fs();
+  test_store_values();
   exit(0);
 }
@@ -75,6 +75,33 @@ void test_refcount() {
   test_work_area_free( work_area );
 }
 
+void test_set_invalid_interval( void * arg ) {
+  enkf_fs_type * fs = enkf_fs_safe_cast( arg );
+  enkf_fs_set_sync_mode( fs , FS_SYNC_INTERVAL , 0 );
+}
+
+
+void test_sync_mode() {
+  test_work_area_type * work_area = test_work_area_alloc("enkf_fs/sync_mode");
+
+  enkf_fs_create_fs("mnt" , BLOCK_FS_DRIVER_ID , NULL , false);
+  {
+    enkf_fs_type * fs = enkf_fs_mount( "mnt" );
+    test_assert_int_equal( enkf_fs_get_sync_mode( fs ) , FS_SYNC_DEFAULT );
+
+    enkf_fs_set_sync_mode( fs , FS_SYNC_INTERVAL , 5 );
+    test_assert_int_equal( enkf_fs_get_sync_mode( fs ) , FS_SYNC_INTERVAL );
+    test_assert_util_abort( "enkf_fs_set_sync_mode" , test_set_invalid_interval , fs );
+
+    enkf_fs_set_sync_mode( fs , FS_SYNC_NONE , 0 );
+    test_assert_int_equal( enkf_fs_get_sync_mode( fs ) , FS_SYNC_NONE );
+    enkf_fs_fsync( fs );
+    enkf_fs_decref( fs );
+  }
+  test_work_area_free( work_area );
+}
+
+
 void createFS() {
 
  pthread_mutex_lock(&data->mutex1);
@@ -151,6 +178,7 @@ void test_read_only2() {
 int main(int argc, char ** argv) {
   test_mount();
   test_refcount();
+  test_sync_mode();
   test_read_only2();
   exit(0);
 }
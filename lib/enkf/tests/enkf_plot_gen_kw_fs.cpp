@@ -58,6 +58,22 @@ void test_load(const char * config_file) {
       for (int i=0; i < enkf_plot_gen_kw_vector_get_size( vector ); i++)
         test_assert_string_equal( enkf_plot_gen_kw_iget_key( plot_gen_kw , i ) , gen_kw_config_iget_name( gen_kw_config , i));
     }
+
+    {
+      int_vector_type * realizations = int_vector_alloc( 0 , 0 );
+      double * data = (double *) util_calloc( 2 * 4 , sizeof * data );
+
+      int_vector_append( realizations , 1 );
+      int_vector_append( realizations , 0 );
+      enkf_plot_gen_kw_export_values( plot_gen_kw , realizations , data );
+      for (int i=0; i < 4; i++) {
+        test_assert_double_equal( enkf_plot_gen_kw_vector_iget( enkf_plot_gen_kw_iget( plot_gen_kw , 1 ) , i ) , data[i] );
+        test_assert_double_equal( enkf_plot_gen_kw_vector_iget( enkf_plot_gen_kw_iget( plot_gen_kw , 0 ) , i ) , data[4 + i] );
+      }
+
+      free( data );
+      int_vector_free( realizations );
+    }
     bool_vector_free( input_mask );
   }
 
@@ -102,11 +102,44 @@ void test_iget() {
 
 
 
+void test_export_values() {
+  enkf_config_node_type * config_node = enkf_config_node_alloc_summary("KEY" , LOAD_FAIL_SILENT);
+  enkf_plot_tvector_type * tvector = enkf_plot_tvector_alloc( config_node , 0);
+  double data[6];
+  bool active[6];
+
+  enkf_plot_tvector_iset( tvector , 0 , 0 , 0 );
+  enkf_plot_tvector_iset( tvector , 1 , 100 , 10 );
+  enkf_plot_tvector_iset( tvector , 2 , 200 , 20 );
+  enkf_plot_tvector_iset( tvector , 4 , 400 , 40 );
+
+  for (int i=0; i < 6; i++)
+    data[i] = -1;
+
+  enkf_plot_tvector_export_values( tvector , 1 , 6 , data , active );
+  test_assert_true( active[0] );
+  test_assert_double_equal( 10 , data[0] );
+  test_assert_true( active[1] );
+  test_assert_double_equal( 20 , data[1] );
+  test_assert_false( active[2] );
+  test_assert_double_equal( -1 , data[2] );
+  test_assert_true( active[3] );
+  test_assert_double_equal( 40 , data[3] );
+  test_assert_false( active[4] );
+  test_assert_false( active[5] );
+  test_assert_double_equal( -1 , data[5] );
+
+  enkf_plot_tvector_free( tvector );
+}
+
+
+
 int main(int argc , char ** argv) {
   create_test();
   test_iset();
   test_all_active();
   test_iget();
+  test_export_values();
 
   exit(0);
 }
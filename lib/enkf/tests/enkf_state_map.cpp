@@ -153,6 +153,27 @@ void test_update_undefined( ) {
 }
 
 
+void test_generation( ) {
+  state_map_type * map = state_map_alloc( );
+  int generation = state_map_get_generation( map );
+
+  state_map_iset( map , 0 , STATE_INITIALIZED );
+  test_assert_true( state_map_get_generation( map ) > generation );
+  generation = state_map_get_generation( map );
+
+  /* Setting the current state again, e.g. loading a rerun, is also counted. */
+  state_map_iset( map , 0 , STATE_HAS_DATA );
+  state_map_iset( map , 0 , STATE_HAS_DATA );
+  test_assert_int_equal( generation + 2 , state_map_get_generation( map ));
+
+  /* Unchanged by reading. */
+  state_map_iget( map , 0 );
+  test_assert_int_equal( generation + 2 , state_map_get_generation( map ));
+
+  state_map_free( map );
+}
+
+
 void test_update_matching( ) {
   state_map_type * map = state_map_alloc( );
 
@@ -358,6 +379,7 @@ int main(int argc , char ** argv) {
   test_copy();
   test_io();
   test_update_undefined( );
+  test_generation( );
   test_select_matching();
   test_count_matching();
   test_transitions();
@@ -0,0 +1,93 @@
+/*
+   Copyright (C) 2018  Statoil ASA, Norway.
+
+   The file 'enkf_update_row_block.cpp' is part of ERT - Ensemble based Reservoir Tool.
+
+   ERT is free software: you can redistribute it and/or modify
+   it under the terms of the GNU General Public License as published by
+   the Free Software Foundation, either version 3 of the License, or
+   (at your option) any later version.
+
+   ERT is distributed in the hope that it will be useful, but WITHOUT ANY
+   WARRANTY; without even the implied warranty of MERCHANTABILITY or
+   FITNESS FOR A PARTICULAR PURPOSE.
+
+   See the GNU General Public License at <http://www.gnu.org/licenses/gpl.html>
+   for more details.
+*/
+#include <stdlib.h>
+#include <stdbool.h>
+
+#include <ert/util/test_util.h>
+#include <ert/util/double_vector.h>
+
+#include <ert/enkf/enkf_main.hpp>
+#include <ert/enkf/ert_test_context.hpp>
+#include <ert/enkf/gen_kw.hpp>
+
+
+/*
+  Runs a smoother update from the case "default_0" to a new case and
+  returns the updated SNAKE_OIL_PARAM values for all realizations.
+*/
+
+static double_vector_type * alloc_updated_values( const char * config_file , const char * test_name , int row_block_size ) {
+  ert_test_context_type * test_context = ert_test_context_alloc( test_name , config_file );
+  enkf_main_type * enkf_main = ert_test_context_get_main( test_context );
+  analysis_config_type * analysis_config = (analysis_config_type *) enkf_main_get_analysis_config( enkf_main );
+  double_vector_type * values = double_vector_alloc( 0 , 0 );
+
+  analysis_config_set_row_block_size( analysis_config , row_block_size );
+  {
+    enkf_fs_type * source_fs = enkf_main_mount_alt_fs( enkf_main , "default_0" , false );
+    enkf_fs_type * target_fs = enkf_main_mount_alt_fs( enkf_main , "target" , true );
+    const enkf_config_node_type * config_node = ensemble_config_get_node( enkf_main_get_ensemble_config( enkf_main ) , "SNAKE_OIL_PARAM" );
+    enkf_node_type * node = enkf_node_alloc( config_node );
+
+    test_assert_true( source_fs != target_fs );
+    test_assert_true( enkf_main_smoother_update( enkf_main , source_fs , target_fs ));
+
+    for (int iens = 0; iens < enkf_main_get_ensemble_size( enkf_main ); iens++) {
+      node_id_type node_id = {.report_step = 0 , .iens = iens };
+      const gen_kw_type * gen_kw;
+
+      enkf_node_load( node , target_fs , node_id );
+      gen_kw = (const gen_kw_type *) enkf_node_value_ptr( node );
+      for (int i = 0; i < gen_kw_data_size( gen_kw ); i++)
+        double_vector_append( values , gen_kw_data_iget( gen_kw , i , false ));
+    }
+
+    enkf_node_free( node );
+    enkf_fs_decref( target_fs );
+    enkf_fs_decref( source_fs );
+  }
+  ert_test_context_free( test_context );
+  return values;
+}
+
+
+/*
+  With a row block size of three the ten SNAKE_OIL_PARAM values are
+  split over four blocks; the result must be the same as when the
+  whole dataset is updated in one block.
+*/
+
+void test_split_node( const char * config_file ) {
+  double_vector_type * full_values    = alloc_updated_values( config_file , "UPDATE_FULL" , 0 );
+  double_vector_type * blocked_values = alloc_updated_values( config_file , "UPDATE_BLOCKED" , 3 );
+
+  test_assert_int_equal( double_vector_size( full_values ) , double_vector_size( blocked_values ));
+  test_assert_true( double_vector_size( full_values ) > 0 );
+  for (int i = 0; i < double_vector_size( full_values ); i++)
+    test_assert_double_equal( double_vector_iget( full_values , i ) , double_vector_iget( blocked_values , i ));
+
+  double_vector_free( blocked_values );
+  double_vector_free( full_values );
+}
+
+
+int main(int argc , char ** argv) {
+  const char * config_file = argv[1];
+  test_split_node( config_file );
+  exit(0);
+}
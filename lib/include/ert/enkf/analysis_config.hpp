@@ -87,6 +87,10 @@ void                   analysis_config_set_penalised_press( analysis_config_type
 void                   analysis_config_set_log_path(analysis_config_type * config , const char * log_path );
 void                   analysis_config_set_std_cutoff( analysis_config_type * config , double std_cutoff );
 double                 analysis_config_get_std_cutoff( const analysis_config_type * config );
+void                   analysis_config_set_update_threads( analysis_config_type * config , int threads );
+int                    analysis_config_get_update_threads( const analysis_config_type * config );
+void                   analysis_config_set_row_block_size( analysis_config_type * config , int row_block_size );
+int                    analysis_config_get_row_block_size( const analysis_config_type * config );
 void                   analysis_config_add_config_items( config_parser_type * config );
 void                   analysis_config_fprintf_config( analysis_config_type * config , FILE * stream);
 
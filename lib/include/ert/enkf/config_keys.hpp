@@ -25,6 +25,7 @@ extern "C" {
 
 /* These keys are used as options in KEY:VALUE statements */
 #define  BASE_SURFACE_KEY                  "BASE_SURFACE"
+#define  CODEC_KEY                         "CODEC"
 #define  DEFINE_KEY                        "DEFINE"
 #define  DYNAMIC_KEY                       "DYNAMIC"
 #define  ECL_FILE_KEY                      "ECL_FILE"
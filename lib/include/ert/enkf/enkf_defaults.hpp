@@ -113,6 +113,8 @@ const char * enkf_defaults_get_default_gen_kw_export_name();
 #define DEFAULT_ENKF_TRUNCATION            0.99
 #define DEFAULT_ENKF_ALPHA                 3.0
 #define DEFAULT_ENKF_STD_CUTOFF            1e-6
+#define DEFAULT_UPDATE_THREADS             0        /* 0: Use the number of CPUs on the host. */
+#define DEFAULT_UPDATE_ROW_BLOCK_SIZE      250000   /* 0: Serialize the complete dataset in one block. */
 #define DEFAULT_MERGE_OBSERVATIONS         false
 #define DEFAULT_RERUN                      false
 #define DEFAULT_RERUN_START                0
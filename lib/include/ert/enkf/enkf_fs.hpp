@@ -45,6 +45,8 @@ extern "C" {
   const      char * enkf_fs_get_case_name( const enkf_fs_type * fs );
   bool              enkf_fs_is_read_only(const enkf_fs_type * fs);
   void              enkf_fs_fsync( enkf_fs_type * fs );
+  void              enkf_fs_set_sync_mode( enkf_fs_type * fs , fs_sync_mode_enum sync_mode , int fsync_interval);
+  fs_sync_mode_enum enkf_fs_get_sync_mode( const enkf_fs_type * fs );
   void              enkf_fs_add_index_node(enkf_fs_type *  , int , int , const char * , enkf_var_type, ert_impl_type);
 
   enkf_fs_type    * enkf_fs_get_ref( enkf_fs_type * fs );
@@ -58,12 +60,25 @@ extern "C" {
   void              enkf_fs_fwrite_node(enkf_fs_type * enkf_fs , buffer_type * buffer , const char * node_key, enkf_var_type var_type,
                                         int report_step , int iens);
 
+  void              enkf_fs_fwrite_node_list(enkf_fs_type * enkf_fs ,
+                                             const vector_type * buffers ,
+                                             const stringlist_type * node_keys,
+                                             enkf_var_type var_type,
+                                             int report_step ,
+                                             const int_vector_type * realizations);
+
   void              enkf_fs_fwrite_vector(enkf_fs_type * enkf_fs ,
                                           buffer_type * buffer ,
                                           const char * node_key,
                                           enkf_var_type var_type,
                                           int iens);
 
+  void              enkf_fs_fwrite_vector_list(enkf_fs_type * enkf_fs ,
+                                               const vector_type * buffers ,
+                                               const stringlist_type * node_keys,
+                                               enkf_var_type var_type,
+                                               int iens);
+
   bool              enkf_fs_exists( const char * mount_point );
 
   void              enkf_fs_fread_node(enkf_fs_type * enkf_fs , buffer_type * buffer ,
@@ -126,6 +126,7 @@ extern "C" {
 
   bool             enkf_node_forward_init(enkf_node_type * enkf_node , const char * run_path , int iens);
   bool             enkf_node_has_data( enkf_node_type * enkf_node , enkf_fs_type * fs , node_id_type node_id);
+  bool             enkf_node_vector_has_data( const enkf_node_type * enkf_node , int report_step);
   //void             enkf_node_free_data(enkf_node_type * );
   void             enkf_node_free__(void *);
   void             enkf_initialize(enkf_node_type * , int);
@@ -168,6 +169,8 @@ extern "C" {
   void              enkf_node_load_vector( enkf_node_type * enkf_node , enkf_fs_type * fs , int iens);
   bool              enkf_node_store(enkf_node_type * enkf_node , enkf_fs_type * fs , bool force_vectors , node_id_type node_id);
   bool              enkf_node_store_vector(enkf_node_type *enkf_node , enkf_fs_type * fs , int iens );
+  bool              enkf_node_write_vector_buffer( enkf_node_type * enkf_node , buffer_type * buffer);
+  bool              enkf_node_write_buffer( enkf_node_type * enkf_node , buffer_type * buffer , int report_step);
   bool              enkf_node_try_load(enkf_node_type *enkf_node , enkf_fs_type * fs , node_id_type node_id);
   bool              enkf_node_try_load_vector(enkf_node_type *enkf_node , enkf_fs_type * fs , int iens );
   bool              enkf_node_exists( enkf_node_type *enkf_node , enkf_fs_type * fs , int report_step , int iens);
@@ -26,6 +26,7 @@ extern "C" {
 #include <stdbool.h>
 
 #include <ert/util/bool_vector.h>
+#include <ert/util/int_vector.h>
 #include <ert/util/type_macros.h>
 
 #include <ert/enkf/enkf_config_node.hpp>
@@ -43,6 +44,12 @@ extern "C" {
                                              const bool_vector_type * input_mask);
   int                   enkf_plot_data_get_size( const enkf_plot_data_type * plot_data );
   enkf_plot_tvector_type * enkf_plot_data_iget( const enkf_plot_data_type * plot_data , int index);
+  void                  enkf_plot_data_export_values( const enkf_plot_data_type * plot_data ,
+                                                      const int_vector_type * realizations ,
+                                                      int step_offset ,
+                                                      int num_steps ,
+                                                      double * data ,
+                                                      bool * active);
 
   UTIL_IS_INSTANCE_HEADER( enkf_plot_data );
 
@@ -25,6 +25,7 @@ extern "C" {
 #endif
 
 #include <ert/util/bool_vector.h>
+#include <ert/util/int_vector.h>
 #include <ert/util/stringlist.h>
 #include <ert/util/type_macros.h>
 
@@ -46,6 +47,9 @@ extern "C" {
   const char                   * enkf_plot_gen_kw_iget_key( const enkf_plot_gen_kw_type * plot_gen_kw, int index);
   int                            enkf_plot_gen_kw_get_keyword_count( const enkf_plot_gen_kw_type * gen_kw );
   bool                           enkf_plot_gen_kw_should_use_log_scale(const enkf_plot_gen_kw_type * gen_kw , int index);
+  void                           enkf_plot_gen_kw_export_values( const enkf_plot_gen_kw_type * plot_gen_kw ,
+                                                                 const int_vector_type * realizations ,
+                                                                 double * data);
 
   UTIL_IS_INSTANCE_HEADER( enkf_plot_gen_kw );
 
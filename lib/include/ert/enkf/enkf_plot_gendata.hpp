@@ -22,6 +22,7 @@
 
 #include <ert/util/type_macros.h>
 #include <ert/util/double_vector.h>
+#include <ert/util/int_vector.h>
 
 #include <ert/enkf/obs_vector.hpp>
 #include <ert/enkf/enkf_fs.hpp>
@@ -44,6 +45,14 @@ void                        enkf_plot_gendata_load( enkf_plot_gendata_type * plo
                                                     enkf_fs_type * fs ,
                                                     int report_step ,
                                                     const bool_vector_type * input_mask);
+void                        enkf_plot_gendata_load_realizations( enkf_plot_gendata_type * plot_data ,
+                                                                 enkf_fs_type * fs ,
+                                                                 int report_step ,
+                                                                 const int_vector_type * realizations);
+void                        enkf_plot_gendata_export_values( const enkf_plot_gendata_type * plot_data ,
+                                                             const int_vector_type * realizations ,
+                                                             int data_size ,
+                                                             double * data);
 
 double_vector_type * enkf_plot_gendata_get_min_values(enkf_plot_gendata_type * plot_data);
 double_vector_type * enkf_plot_gendata_get_max_values(enkf_plot_gendata_type * plot_data);
@@ -52,6 +52,7 @@ extern "C" {
   time_t                  enkf_plot_tvector_iget_time( const enkf_plot_tvector_type * plot_tvector , int index);
   bool                    enkf_plot_tvector_iget_active( const enkf_plot_tvector_type * plot_tvector , int index);
   bool                    enkf_plot_tvector_all_active( const enkf_plot_tvector_type * plot_tvector );
+  void                    enkf_plot_tvector_export_values( const enkf_plot_tvector_type * plot_tvector , int step_offset , int num_steps , double * data , bool * active);
 
 
 #ifdef __cplusplus
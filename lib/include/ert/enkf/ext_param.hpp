@@ -18,6 +18,13 @@
 
 #ifndef EXT_PARAM_H
 #define EXT_PARAM_H
+
+#include <ert/util/stringlist.h>
+#include <ert/util/int_vector.h>
+
+#include <ert/enkf/enkf_fs.hpp>
+#include <ert/enkf/ensemble_config.hpp>
+
 #ifdef __cplusplus
 extern "C" {
 #endif
@@ -37,6 +44,8 @@ typedef struct ext_param_struct ext_param_type;
   const char* ext_param_iget_key(const ext_param_type * param, int index);
   void ext_param_free(ext_param_type *ext_param);
   ext_param_type * ext_param_alloc(const ext_param_config_type * config);
+  void ext_param_store_values(enkf_fs_type * fs, const ensemble_config_type * ens_config, const stringlist_type * keys,
+                              int report_step, const int_vector_type * realizations, const double * data);
 
 
 UTIL_SAFE_CAST_HEADER(ext_param);
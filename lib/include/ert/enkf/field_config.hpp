@@ -32,6 +32,8 @@
 
 #include <ert/rms/rms_file.hpp>
 
+#include <ert/res_util/buffer_codec.hpp>
+
 #include <ert/enkf/enkf_util.hpp>
 #include <ert/enkf/enkf_macros.hpp>
 #include <ert/enkf/enkf_types.hpp>
@@ -126,6 +128,8 @@ void                    field_config_get_ijk( const field_config_type * config ,
 field_type            * field_config_get_min_std( const field_config_type * field_config );
 const char            * field_config_default_extension(field_file_format_type , bool );
 bool                    field_config_write_compressed(const field_config_type * );
+buffer_codec_type       field_config_get_codec(const field_config_type * config);
+void                    field_config_set_codec(field_config_type * config , buffer_codec_type codec);
 field_file_format_type  field_config_guess_file_type(const char * );
 ecl_data_type           field_config_get_ecl_data_type(const field_config_type *);
 rms_type_enum           field_config_get_rms_type(const field_config_type * );
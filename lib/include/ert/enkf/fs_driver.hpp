@@ -20,6 +20,8 @@
 #define ERT_FS_DRIVER_H
 #include <ert/util/buffer.h>
 #include <ert/util/stringlist.h>
+#include <ert/util/vector.h>
+#include <ert/util/int_vector.h>
 
 #include <ert/enkf/enkf_node.hpp>
 #include <ert/enkf/fs_types.hpp>
@@ -166,15 +168,18 @@ extern "C" {
 
   typedef void (load_node_ftype)    (void * driver, const char * , int , int , buffer_type * );
   typedef void (save_node_ftype)    (void * driver, const char * , int , int , buffer_type * );
+  typedef void (save_node_list_ftype) (void * driver, const stringlist_type * , int , const int_vector_type * , const vector_type * );
   typedef void (unlink_node_ftype)  (void * driver, const char * , int , int );
   typedef bool (has_node_ftype)     (void * driver, const char * , int , int );
 
   typedef void (load_vector_ftype)    (void * driver, const char * , int , buffer_type * );
   typedef void (save_vector_ftype)    (void * driver, const char * , int , buffer_type * );
+  typedef void (save_vector_list_ftype) (void * driver, const stringlist_type * , int , const vector_type * );
   typedef void (unlink_vector_ftype)  (void * driver, const char * , int );
   typedef bool (has_vector_ftype)     (void * driver, const char * , int );
 
   typedef void (fsync_driver_ftype) (void * driver);
+  typedef void (set_fsync_interval_ftype) (void * driver , int fsync_interval);
   typedef void (free_driver_ftype)  (void * driver);
 
 
@@ -202,14 +207,17 @@ extern "C" {
 #define FS_DRIVER_FIELDS                   \
 load_node_ftype           * load_node;     \
 save_node_ftype           * save_node;     \
+save_node_list_ftype      * save_node_list; \
 has_node_ftype            * has_node;      \
 unlink_node_ftype         * unlink_node;   \
 load_vector_ftype         * load_vector;   \
 save_vector_ftype         * save_vector;   \
+save_vector_list_ftype    * save_vector_list; \
 has_vector_ftype          * has_vector;    \
 unlink_vector_ftype       * unlink_vector; \
 free_driver_ftype         * free_driver;   \
 fsync_driver_ftype        * fsync_driver;  \
+set_fsync_interval_ftype  * set_fsync_interval; \
 int                         type_id
 
 
@@ -72,6 +72,32 @@ typedef enum {
 
 
 
+/*
+  How the block_fs storage files are fsync()'ed while writing; this is
+  a runtime setting of the mounted enkf_fs instance and is NOT stored
+  on disk.
+
+    FS_SYNC_NONE: fsync() is never called; the data is flushed to disk
+       by the operating system, and when the filesystem is unmounted.
+
+    FS_SYNC_INTERVAL: fsync() is called for every n'th write to each
+       storage file.
+
+    FS_SYNC_GROUP_COMMIT: fsync() is called once for each storage file
+       when a batch of writes - e.g. loading results for the ensemble
+       or writing the updated parameters - is complete, i.e. in
+       enkf_fs_fsync().
+*/
+
+typedef enum {
+  FS_SYNC_NONE          = 0,
+  FS_SYNC_INTERVAL      = 1,
+  FS_SYNC_GROUP_COMMIT  = 2
+} fs_sync_mode_enum;
+
+#define FS_SYNC_DEFAULT  FS_SYNC_GROUP_COMMIT
+
+
 
 fs_driver_impl    fs_types_lookup_string_name(const char * driver_name);
 const char      * fs_types_get_driver_name(fs_driver_enum driver_type);
@@ -24,6 +24,8 @@
 #include <ert/util/util.h>
 #include <ert/util/bool_vector.h>
 
+#include <ert/res_util/buffer_codec.hpp>
+
 #include <ert/enkf/forward_load_context.hpp>
 #include <ert/enkf/enkf_fs_type.hpp>
 #include <ert/enkf/enkf_types.hpp>
@@ -58,6 +60,8 @@ typedef enum { GEN_DATA_UNDEFINED = 0,
   gen_data_config_type       * gen_data_config_alloc_GEN_DATA_state( const char * key , gen_data_file_format_type output_format , gen_data_file_format_type input_format);
   void                         gen_data_config_set_ens_size( gen_data_config_type * config , int ens_size );
   gen_data_file_format_type    gen_data_config_get_input_format ( const gen_data_config_type * );
+  buffer_codec_type            gen_data_config_get_codec( const gen_data_config_type * config );
+  void                         gen_data_config_set_codec( gen_data_config_type * config , buffer_codec_type codec );
   gen_data_file_format_type    gen_data_config_get_output_format ( const gen_data_config_type * );
   ecl_data_type                gen_data_config_get_internal_data_type(const gen_data_config_type *);
   gen_data_config_type       * gen_data_config_alloc_with_options(const char * key , bool , const stringlist_type *);
@@ -37,6 +37,7 @@ extern "C" {
   bool                     state_map_is_readonly(const state_map_type * state_map);
   void                     state_map_free( state_map_type * map );
   int                      state_map_get_size(const state_map_type * map);
+  int                      state_map_get_generation(const state_map_type * map);
   realisation_state_enum   state_map_iget(const state_map_type * map , int index);
   void                     state_map_update_undefined( state_map_type * map , int index , realisation_state_enum new_state);
   void                     state_map_update_matching( state_map_type * map , int index , int state_mask , realisation_state_enum new_state);
@@ -16,6 +16,7 @@ extern "C" {
   void                     summary_key_set_free(summary_key_set_type * set);
   int                      summary_key_set_get_size(summary_key_set_type * set);
   bool                     summary_key_set_add_summary_key(summary_key_set_type * set, const char * summary_key);
+  int                      summary_key_set_add_summary_keys(summary_key_set_type * set, const stringlist_type * summary_keys);
   bool                     summary_key_set_has_summary_key(summary_key_set_type * set, const char * summary_key);
   stringlist_type *        summary_key_set_alloc_keys(summary_key_set_type * set);
   bool                     summary_key_set_is_read_only(const summary_key_set_type * set);
@@ -0,0 +1,47 @@
+/*
+   Copyright (C) 2018  Statoil ASA, Norway.
+
+   The file 'file_watch.hpp' is part of ERT - Ensemble based Reservoir Tool.
+
+   ERT is free software: you can redistribute it and/or modify
+   it under the terms of the GNU General Public License as published by
+   the Free Software Foundation, either version 3 of the License, or
+   (at your option) any later version.
+
+   ERT is distributed in the hope that it will be useful, but WITHOUT ANY
+   WARRANTY; without even the implied warranty of MERCHANTABILITY or
+   FITNESS FOR A PARTICULAR PURPOSE.
+
+   See the GNU General Public License at <http://www.gnu.org/licenses/gpl.html>
+   for more details.
+*/
+
+#ifndef ERT_FILE_WATCH_H
+#define ERT_FILE_WATCH_H
+
+
+#ifdef __cplusplus
+extern "C" {
+#endif
+
+#include <stdbool.h>
+
+#include <ert/util/type_macros.hpp>
+
+typedef struct file_watch_struct file_watch_type;
+typedef void (file_watch_callback_ftype) (void *);
+
+  file_watch_type * file_watch_alloc( file_watch_callback_ftype * callback , void * callback_arg );
+  void file_watch_free( file_watch_type * file_watch );
+  bool file_watch_is_active( const file_watch_type * file_watch );
+  bool file_watch_add_path( file_watch_type * file_watch , const char * path );
+  void file_watch_remove_path( file_watch_type * file_watch , const char * path );
+  long file_watch_get_event_count( file_watch_type * file_watch );
+
+  UTIL_SAFE_CAST_HEADER( file_watch );
+  UTIL_IS_INSTANCE_HEADER( file_watch );
+
+#ifdef __cplusplus
+}
+#endif
+#endif
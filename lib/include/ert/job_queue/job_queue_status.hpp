@@ -25,6 +25,7 @@ extern "C" {
 #include <time.h>
 
 #include <ert/util/type_macros.hpp>
+#include <ert/util/int_vector.hpp>
 #include <ert/job_queue/queue_driver.hpp>
 
   typedef struct job_queue_status_struct job_queue_status_type;
@@ -37,6 +38,11 @@ extern "C" {
   bool job_queue_status_transition( job_queue_status_type * status_count , job_status_type src_status , job_status_type target_status);
   int job_queue_status_get_total_count( const job_queue_status_type * status );
   time_t job_queue_status_get_timestamp(const job_queue_status_type * status);
+  void job_queue_status_signal_event( job_queue_status_type * status );
+  long job_queue_status_get_event_count( job_queue_status_type * status );
+  bool job_queue_status_wait_event( job_queue_status_type * status , long event_count , unsigned long usec_timeout);
+  void job_queue_status_push_ready( job_queue_status_type * status , job_status_type job_status , int queue_index);
+  void job_queue_status_pop_ready( job_queue_status_type * status , int job_status_mask , int_vector_type * queue_index_list);
 
   UTIL_IS_INSTANCE_HEADER( job_queue_status );
   UTIL_SAFE_CAST_HEADER( job_queue_status );
@@ -131,6 +131,14 @@ typedef enum {
 
 #define JOB_QUEUE_COMPLETE_STATUS (JOB_QUEUE_IS_KILLED + JOB_QUEUE_SUCCESS + JOB_QUEUE_FAILED)
 
+  /*
+    Jobs entering one of these states are waiting for the queue
+    manager to act on them; the queue index of the job is then
+    registered in the ready list of the job_queue_status instance, so
+    the queue manager does not need to scan all the jobs.
+   */
+#define JOB_QUEUE_READY_STATUS (JOB_QUEUE_DONE + JOB_QUEUE_EXIT + JOB_QUEUE_DO_KILL + JOB_QUEUE_DO_KILL_NODE_FAILURE)
+
 
 const char * job_status_get_name(job_status_type status);
 
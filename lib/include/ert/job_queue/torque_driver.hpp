@@ -24,6 +24,7 @@ extern "C" {
 #include <stdio.h>
 
 #include <ert/util/type_macros.hpp>
+#include <ert/util/hash.hpp>
 #include <ert/job_queue/queue_driver.hpp>
 
   /*
@@ -40,11 +41,13 @@ extern "C" {
 #define TORQUE_JOB_PREFIX_KEY    "JOB_PREFIX"
 #define TORQUE_SUBMIT_SLEEP      "SUBMIT_SLEEP"
 #define TORQUE_DEBUG_OUTPUT      "DEBUG_OUTPUT"
+#define TORQUE_QSTAT_REFRESH_INTERVAL "QSTAT_REFRESH_INTERVAL"   // Seconds; a value > 0 turns on the cached bulk qstat mode.
 
 #define TORQUE_DEFAULT_QSUB_CMD      "qsub"
 #define TORQUE_DEFAULT_QSTAT_CMD     "qstat"
 #define TORQUE_DEFAULT_QDEL_CMD      "qdel"
 #define TORQUE_DEFAULT_SUBMIT_SLEEP  "0"
+#define TORQUE_DEFAULT_QSTAT_REFRESH_INTERVAL "0"
 
 
   typedef struct torque_driver_struct torque_driver_type;
@@ -77,6 +80,8 @@ extern "C" {
   int torque_driver_get_submit_sleep( const torque_driver_type * driver );
   FILE * torque_driver_get_debug_stream( const torque_driver_type * driver );
   job_status_type torque_driver_parse_status(const char * qstat_file, const char * jobnr);
+  int torque_driver_parse_status_table(const char * qstat_file, hash_type * status_table);
+  int torque_driver_get_qstat_refresh_interval( const torque_driver_type * driver );
 
   UTIL_SAFE_CAST_HEADER(torque_driver);
 
@@ -20,6 +20,7 @@
 #define ERT_BLOCK_FS
 #include <ert/util/buffer.hpp>
 #include <ert/util/vector.hpp>
+#include <ert/util/stringlist.hpp>
 #include <ert/util/type_macros.hpp>
 
 #ifdef __cplusplus
@@ -36,9 +37,14 @@ extern "C" {
   } block_fs_sort_type;
 
   size_t          block_fs_get_cache_usage( const block_fs_type * block_fs );
+  size_t          block_fs_get_cache_hits( const block_fs_type * block_fs );
+  size_t          block_fs_get_cache_misses( const block_fs_type * block_fs );
+  void            block_fs_set_max_total_cache_size( block_fs_type * block_fs , size_t max_total_cache_size);
   double          block_fs_get_fragmentation( const block_fs_type * block_fs );
   bool            block_fs_rotate( block_fs_type * block_fs , double fragmentation_limit);
   void            block_fs_fsync( block_fs_type * block_fs );
+  void            block_fs_set_fsync_interval( block_fs_type * block_fs , int fsync_interval);
+  int             block_fs_get_fsync_interval( const block_fs_type * block_fs );
   bool            block_fs_is_mount( const char * mount_file );
   bool            block_fs_is_readonly( const block_fs_type * block_fs);
   block_fs_type * block_fs_mount( const char * mount_file ,
@@ -52,6 +58,7 @@ extern "C" {
   void            block_fs_close( block_fs_type * block_fs , bool unlink_empty);
   void            block_fs_fwrite_file(block_fs_type * block_fs , const char * filename , const void * ptr , size_t byte_size);
   void            block_fs_fwrite_buffer(block_fs_type * block_fs , const char * filename , const buffer_type * buffer);
+  void            block_fs_fwrite_buffer_list(block_fs_type * block_fs , const stringlist_type * filenames , const vector_type * buffers);
   void            block_fs_fread_file( block_fs_type * block_fs , const char * filename , void * ptr);
   int             block_fs_get_filesize( block_fs_type * block_fs , const char * filename);
   void            block_fs_fread_realloc_buffer( block_fs_type * block_fs , const char * filename , buffer_type * buffer);
@@ -60,6 +67,11 @@ extern "C" {
   bool            block_fs_has_file( block_fs_type * block_fs , const char * filename);
   vector_type   * block_fs_alloc_filelist( block_fs_type * block_fs  , const char * pattern , block_fs_sort_type sort_mode , bool include_free_nodes );
   void            block_fs_defrag( block_fs_type * block_fs );
+  void            block_fs_set_close_fragmentation_limit( block_fs_type * block_fs , double fragmentation_limit);
+  bool            block_fs_enable_mmap( block_fs_type * block_fs );
+  bool            block_fs_use_mmap( const block_fs_type * block_fs );
+  const void    * block_fs_aquire_view( block_fs_type * block_fs , const char * filename , size_t * data_size);
+  void            block_fs_release_view( block_fs_type * block_fs );
 
   long int        user_file_node_get_node_offset( const user_file_node_type * user_file_node );
   long int        user_file_node_get_data_offset( const user_file_node_type * user_file_node );
@@ -0,0 +1,54 @@
+/*
+   Copyright (C) 2019  Statoil ASA, Norway.
+
+   The file 'buffer_codec.hpp' is part of ERT - Ensemble based Reservoir Tool.
+
+   ERT is free software: you can redistribute it and/or modify
+   it under the terms of the GNU General Public License as published by
+   the Free Software Foundation, either version 3 of the License, or
+   (at your option) any later version.
+
+   ERT is distributed in the hope that it will be useful, but WITHOUT ANY
+   WARRANTY; without even the implied warranty of MERCHANTABILITY or
+   FITNESS FOR A PARTICULAR PURPOSE.
+
+   See the GNU General Public License at <http://www.gnu.org/licenses/gpl.html>
+   for more details.
+*/
+
+#ifndef ERT_BUFFER_CODEC_H
+#define ERT_BUFFER_CODEC_H
+
+#include <stdbool.h>
+#include <stdlib.h>
+
+#include <ert/util/buffer.hpp>
+
+#ifdef __cplusplus
+extern "C" {
+#endif
+
+  /*
+    BUFFER_CODEC_ZLIB is the historical storage format: a bare zlib
+    stream without any header. The other codecs write a small header
+    with a format version, so a reader can always tell the formats
+    apart and old cases remain readable whatever codec is configured.
+  */
+  typedef enum {
+    BUFFER_CODEC_ZLIB       = 0,
+    BUFFER_CODEC_RAW        = 1,
+    BUFFER_CODEC_SHUFFLE_LZ = 2
+  } buffer_codec_type;
+
+#define BUFFER_CODEC_DEFAULT BUFFER_CODEC_ZLIB
+
+  const char * buffer_codec_get_name( buffer_codec_type codec );
+  bool         buffer_codec_sscanf( const char * name , buffer_codec_type * codec );
+
+  size_t       buffer_codec_fwrite( buffer_type * buffer , buffer_codec_type codec , const void * data , size_t byte_size , int element_size);
+  void         buffer_codec_fread( buffer_type * buffer , void * target , size_t byte_size );
+
+#ifdef __cplusplus
+}
+#endif
+#endif
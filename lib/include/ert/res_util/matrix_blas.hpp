@@ -21,6 +21,7 @@
 #include <stdbool.h>
 
 #include <ert/res_util/matrix.hpp>
+#include <ert/res_util/thread_pool.hpp>
 
 
 #ifdef __cplusplus
@@ -36,6 +37,11 @@ void          matrix_dgemv(const matrix_type * A , const double * x , double * y
 void          matrix_mul_vector(const matrix_type * A , const double * x , double * y);
 void          matrix_gram_set( const matrix_type * X , matrix_type * G, bool col);
 matrix_type * matrix_alloc_gram( const matrix_type * X , bool col);
+void          matrix_inplace_dgemm(matrix_type * A, const matrix_type * B);
+void          matrix_inplace_dgemm_mt1(matrix_type * A, const matrix_type * B , int num_threads);
+#ifdef ERT_HAVE_THREAD_POOL
+void          matrix_inplace_dgemm_mt2(matrix_type * A, const matrix_type * B , thread_pool_type * thread_pool);
+#endif
 
 
 #ifdef __cplusplus
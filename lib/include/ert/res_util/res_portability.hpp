@@ -24,6 +24,7 @@ extern "C" {
 #endif
 
 void res_yield();
+int  res_get_num_cpu();
 
 #ifdef __cplusplus
 }
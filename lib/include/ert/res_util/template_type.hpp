@@ -15,6 +15,8 @@
 extern "C" {
 #endif
 
+typedef struct template_cache_struct template_cache_type;
+
 struct template_struct {
   UTIL_TYPE_ID_DECLARATION;
   char            * template_file;           /* The template file - if internalize_template == false this filename can contain keys which will be replaced at instantiation time. */
@@ -22,6 +24,7 @@ struct template_struct {
   bool              internalize_template;    /* Should the template be loadad and internalized at template_alloc(). */
   subst_list_type * arg_list;                /* Key-value mapping established at alloc time. */
   char            * arg_string;              /* A string representation of the arguments - ONLY used for a _get_ function. */
+  template_cache_type * cache;               /* The content of the last template file loaded at instantiation time. */
   #ifdef ERT_HAVE_REGEXP
   regex_t start_regexp;
   regex_t end_regexp;
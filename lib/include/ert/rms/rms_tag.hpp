@@ -40,6 +40,7 @@ rms_tagkey_type * rms_tag_get_datakey(const rms_tag_type *);
 void              rms_tag_free(rms_tag_type *);
 void              rms_tag_free__(void * arg);
 rms_tag_type    * rms_tag_fread_alloc(FILE *, hash_type *, bool , bool *);
+rms_tag_type    * rms_tag_fread_alloc_header(FILE *, hash_type *, bool , bool *);
 bool              rms_tag_name_eq(const rms_tag_type *, const char * , const char *, const char *);
 rms_tagkey_type * rms_tag_get_key(const rms_tag_type *, const char *);
 void              rms_tag_fwrite_filedata(const char * , FILE *stream);
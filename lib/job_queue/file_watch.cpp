@@ -0,0 +1,225 @@
+/*
+   Copyright (C) 2018  Statoil ASA, Norway.
+
+   The file 'file_watch.cpp' is part of ERT - Ensemble based Reservoir Tool.
+
+   ERT is free software: you can redistribute it and/or modify
+   it under the terms of the GNU General Public License as published by
+   the Free Software Foundation, either version 3 of the License, or
+   (at your option) any later version.
+
+   ERT is distributed in the hope that it will be useful, but WITHOUT ANY
+   WARRANTY; without even the implied warranty of MERCHANTABILITY or
+   FITNESS FOR A PARTICULAR PURPOSE.
+
+   See the GNU General Public License at <http://www.gnu.org/licenses/gpl.html>
+   for more details.
+*/
+
+#include <stdbool.h>
+#include <stdlib.h>
+#include <pthread.h>
+#include <unistd.h>
+
+#ifdef HAVE_INOTIFY
+#include <poll.h>
+#include <sys/inotify.h>
+#endif
+
+#include <ert/util/util.hpp>
+#include <ert/util/hash.hpp>
+
+#include <ert/res_util/res_log.hpp>
+#include <ert/job_queue/file_watch.hpp>
+
+/*
+  The file_watch is a small wrapper around the Linux inotify
+  functionality; a directory is registered with
+  file_watch_add_path(), and every time a file is created, moved into
+  or closed after writing in one of the watched directories the event
+  counter is incremented and the callback is invoked. The events are
+  collected by a separate thread, the callback is invoked from that
+  thread.
+
+  The file_watch does not report which file has changed; the calling
+  scope should check the files it is interested in when the event
+  counter has changed. Observe that inotify does not report changes
+  made by other hosts on network file systems like NFS, the calling
+  scope must therefor still poll for the files - at a lower frequency.
+
+  When inotify is not available file_watch_add_path() will return
+  false, and the event counter is never incremented.
+*/
+
+#define FILE_WATCH_TYPE_ID 771054190
+#define FILE_WATCH_POLL_TIMEOUT 500       /* Milliseconds - how often the watch thread checks if it should exit. */
+
+struct file_watch_struct {
+  UTIL_TYPE_ID_DECLARATION;
+  int                          fd;
+  bool                         running;
+  long                         event_count;
+  hash_type                  * watch_id;     /* path -> watch descriptor */
+  hash_type                  * watch_count;  /* path -> number of file_watch_add_path() calls */
+  file_watch_callback_ftype  * callback;
+  void                       * callback_arg;
+  pthread_mutex_t              mutex;
+  pthread_t                    thread;
+};
+
+
+UTIL_IS_INSTANCE_FUNCTION( file_watch , FILE_WATCH_TYPE_ID )
+UTIL_SAFE_CAST_FUNCTION( file_watch , FILE_WATCH_TYPE_ID )
+
+
+#ifdef HAVE_INOTIFY
+
+static bool file_watch_is_running( file_watch_type * file_watch ) {
+  bool running;
+  pthread_mutex_lock( &file_watch->mutex );
+  running = file_watch->running;
+  pthread_mutex_unlock( &file_watch->mutex );
+  return running;
+}
+
+
+static void * file_watch_thread( void * arg ) {
+  file_watch_type * file_watch = file_watch_safe_cast( arg );
+  char buffer[4096] __attribute__ ((aligned(__alignof__(struct inotify_event))));
+  struct pollfd poll_fd;
+
+  poll_fd.fd = file_watch->fd;
+  poll_fd.events = POLLIN;
+
+  while (file_watch_is_running( file_watch )) {
+    int poll_return = poll( &poll_fd , 1 , FILE_WATCH_POLL_TIMEOUT );
+    if (poll_return > 0 && (poll_fd.revents & POLLIN)) {
+      ssize_t bytes = read( file_watch->fd , buffer , sizeof buffer );
+      if (bytes > 0) {
+        pthread_mutex_lock( &file_watch->mutex );
+        file_watch->event_count++;
+        pthread_mutex_unlock( &file_watch->mutex );
+
+        if (file_watch->callback)
+          file_watch->callback( file_watch->callback_arg );
+      }
+    }
+  }
+  return NULL;
+}
+
+#endif
+
+
+file_watch_type * file_watch_alloc( file_watch_callback_ftype * callback , void * callback_arg ) {
+  file_watch_type * file_watch = (file_watch_type*)util_malloc( sizeof * file_watch );
+  UTIL_TYPE_ID_INIT( file_watch , FILE_WATCH_TYPE_ID );
+  file_watch->fd = -1;
+  file_watch->running = false;
+  file_watch->event_count = 0;
+  file_watch->watch_id = hash_alloc();
+  file_watch->watch_count = hash_alloc();
+  file_watch->callback = callback;
+  file_watch->callback_arg = callback_arg;
+  pthread_mutex_init( &file_watch->mutex , NULL );
+
+#ifdef HAVE_INOTIFY
+  file_watch->fd = inotify_init1( IN_NONBLOCK | IN_CLOEXEC );
+  if (file_watch->fd >= 0) {
+    file_watch->running = true;
+    if (pthread_create( &file_watch->thread , NULL , file_watch_thread , file_watch ) != 0) {
+      file_watch->running = false;
+      close( file_watch->fd );
+      file_watch->fd = -1;
+    }
+  }
+
+  if (file_watch->fd < 0)
+    res_log_fwarning("Failed to initialize inotify - will only poll for files");
+#endif
+
+  return file_watch;
+}
+
+
+void file_watch_free( file_watch_type * file_watch ) {
+  bool running;
+
+  pthread_mutex_lock( &file_watch->mutex );
+  running = file_watch->running;
+  file_watch->running = false;
+  pthread_mutex_unlock( &file_watch->mutex );
+
+  if (running)
+    pthread_join( file_watch->thread , NULL );
+
+  if (file_watch->fd >= 0)
+    close( file_watch->fd );
+
+  hash_free( file_watch->watch_id );
+  hash_free( file_watch->watch_count );
+  pthread_mutex_destroy( &file_watch->mutex );
+  free( file_watch );
+}
+
+
+bool file_watch_is_active( const file_watch_type * file_watch ) {
+  return (file_watch->fd >= 0);
+}
+
+
+/*
+  The same path can be added several times, the path is watched until
+  file_watch_remove_path() has been called the same number of times.
+*/
+
+bool file_watch_add_path( file_watch_type * file_watch , const char * path ) {
+  bool watched = false;
+  if (!file_watch_is_active( file_watch ))
+    return false;
+
+  pthread_mutex_lock( &file_watch->mutex );
+  {
+    if (hash_has_key( file_watch->watch_count , path )) {
+      hash_insert_int( file_watch->watch_count , path , hash_get_int( file_watch->watch_count , path ) + 1);
+      watched = true;
+    } else {
+#ifdef HAVE_INOTIFY
+      int wd = inotify_add_watch( file_watch->fd , path , IN_CREATE | IN_MOVED_TO | IN_CLOSE_WRITE );
+      if (wd >= 0) {
+        hash_insert_int( file_watch->watch_id , path , wd );
+        hash_insert_int( file_watch->watch_count , path , 1 );
+        watched = true;
+      }
+#endif
+    }
+  }
+  pthread_mutex_unlock( &file_watch->mutex );
+  return watched;
+}
+
+
+void file_watch_remove_path( file_watch_type * file_watch , const char * path ) {
+  pthread_mutex_lock( &file_watch->mutex );
+  if (hash_has_key( file_watch->watch_count , path )) {
+    int count = hash_get_int( file_watch->watch_count , path ) - 1;
+    if (count == 0) {
+#ifdef HAVE_INOTIFY
+      inotify_rm_watch( file_watch->fd , hash_get_int( file_watch->watch_id , path ));
+#endif
+      hash_del( file_watch->watch_id , path );
+      hash_del( file_watch->watch_count , path );
+    } else
+      hash_insert_int( file_watch->watch_count , path , count );
+  }
+  pthread_mutex_unlock( &file_watch->mutex );
+}
+
+
+long file_watch_get_event_count( file_watch_type * file_watch ) {
+  long event_count;
+  pthread_mutex_lock( &file_watch->mutex );
+  event_count = file_watch->event_count;
+  pthread_mutex_unlock( &file_watch->mutex );
+  return event_count;
+}
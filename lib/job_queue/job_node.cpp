@@ -413,7 +413,7 @@ void job_queue_node_run_EXIT_callback( job_queue_node_type * node ) {
     node->exit_callback( node->callback_arg );
 }
 
-static void job_queue_node_set_status(job_queue_node_type * node , job_status_type new_status) {
+static void job_queue_node_set_status(job_queue_node_type * node , job_queue_status_type * status , job_status_type new_status) {
   if (new_status == node->job_status)
     return;
 
@@ -435,6 +435,12 @@ static void job_queue_node_set_status(job_queue_node_type * node , job_status_ty
   if (new_status == JOB_QUEUE_RUNNING)
     node->sim_start = time( NULL );
 
+  /*
+    Register the job with the queue manager if it has entered one of
+    the states where the job_queue must act on it.
+  */
+  if (node->queue_index != INVALID_QUEUE_INDEX)
+    job_queue_status_push_ready( status , new_status , node->queue_index );
 
   if (!(new_status & JOB_QUEUE_COMPLETE_STATUS))
     return;
@@ -495,7 +501,7 @@ submit_status_type job_queue_node_submit(job_queue_node_type * node,
     job_queue_node free function must be called on it.
   */
   submit_status = SUBMIT_OK;
-  job_queue_node_set_status( node , new_status);
+  job_queue_node_set_status( node , status , new_status);
   job_queue_status_transition(status, old_status, new_status);
 
 
@@ -562,7 +568,7 @@ bool job_queue_node_update_status(job_queue_node_type * node,
                     node->submit_attempt);
       job_status_type new_status = JOB_QUEUE_DO_KILL_NODE_FAILURE;
       status_change = job_queue_status_transition(status, current_status, new_status);
-      job_queue_node_set_status(node, new_status);
+      job_queue_node_set_status(node , status , new_status);
     }
   }
 
@@ -570,7 +576,7 @@ bool job_queue_node_update_status(job_queue_node_type * node,
   if (current_status & JOB_QUEUE_CAN_UPDATE_STATUS) {
     job_status_type new_status = queue_driver_get_status( driver , node->job_data);
     status_change = job_queue_status_transition(status , current_status , new_status);
-    job_queue_node_set_status(node,new_status);
+    job_queue_node_set_status(node , status ,new_status);
   }
 
 cleanup:
@@ -589,7 +595,7 @@ bool job_queue_node_status_transition(job_queue_node_type * node,
   status_change = job_queue_status_transition(status , old_status, new_status);
 
   if (status_change)
-    job_queue_node_set_status( node , new_status );
+    job_queue_node_set_status( node , status , new_status );
 
   pthread_mutex_unlock( &node->data_mutex );
   return status_change;
@@ -625,7 +631,7 @@ bool job_queue_node_kill(job_queue_node_type * node,
       node->job_data = NULL;
     }
     job_queue_status_transition(status, current_status, JOB_QUEUE_IS_KILLED);
-    job_queue_node_set_status( node , JOB_QUEUE_IS_KILLED);
+    job_queue_node_set_status( node , status , JOB_QUEUE_IS_KILLED);
     res_log_finfo("job %s set to killed",
                   node->job_name);
     result = true;
@@ -680,7 +686,7 @@ void job_queue_node_restart(job_queue_node_type * node,
 
   job_status_type current_status = job_queue_node_get_status( node );
   job_queue_status_transition(status, current_status, JOB_QUEUE_WAITING);
-  job_queue_node_set_status( node , JOB_QUEUE_WAITING);
+  job_queue_node_set_status( node , status , JOB_QUEUE_WAITING);
   job_queue_node_reset_submit_attempt(node);
 
   pthread_mutex_unlock( &node->data_mutex );
@@ -25,8 +25,11 @@
 #include <stdio.h>
 #include <pthread.h>
 #include <unistd.h>
+#include <sys/time.h>
 
 #include <ert/util/util.hpp>
+#include <ert/util/int_vector.hpp>
+#include <ert/util/time_t_vector.hpp>
 #include <ert/res_util/arg_pack.hpp>
 #include <ert/res_util/res_log.hpp>
 #include <ert/res_util/thread_pool.hpp>
@@ -36,6 +39,7 @@
 #include <ert/job_queue/job_node.hpp>
 #include <ert/job_queue/job_list.hpp>
 #include <ert/job_queue/job_queue_status.hpp>
+#include <ert/job_queue/file_watch.hpp>
 #include <ert/job_queue/queue_driver.hpp>
 
 
@@ -211,6 +215,7 @@
 /*****************************************************************/
 
 #define JOB_QUEUE_TYPE_ID 665210
+#define JOB_QUEUE_OK_POLL_INTERVAL 1.0   /* Seconds between each check for OK/EXIT files when no file events have been seen. */
 
 struct job_queue_struct {
   UTIL_TYPE_ID_DECLARATION;
@@ -228,6 +233,8 @@ struct job_queue_struct {
   bool                       submit_complete;
 
   int                        max_submit;                        /* The maximum number of submit attempts for one job. */
+  int                        submit_batch_size;                 /* The maximum number of jobs submitted in one pass through the main loop, 0 = unlimited. */
+  int                        submit_cursor;                     /* The queue index where the next search for waiting jobs starts. */
   int                        max_ok_wait_time;                  /* Seconds to wait for an OK file - when the job itself has said all OK. */
   int                        max_duration;                      /* Maximum allowed time for a job to run, 0 = unlimited */
   time_t                     stop_time;                         /* A job is only allowed to run until this time. 0 = no time set, ignore stop_time */
@@ -235,6 +242,9 @@ struct job_queue_struct {
   unsigned long              usleep_time;                       /* The sleep time before checking for updates. */
   pthread_mutex_t            run_mutex;                         /* This mutex is used to ensure that ONLY one thread is executing the job_queue_run_jobs(). */
   thread_pool_type         * work_pool;
+  file_watch_type          * file_watch;                        /* Watches the run_path of the jobs waiting for an OK or EXIT file. */
+  int_vector_type          * done_wait_list;                    /* Queue index of DONE jobs waiting for an OK or EXIT file. */
+  time_t_vector_type       * done_wait_start;                   /* When the jobs in done_wait_list started waiting. */
 };
 
 
@@ -637,6 +647,13 @@ static void job_queue_user_exit__( job_queue_type * queue ) {
 }
 
 
+/*
+  Checks the OK and EXIT files of a job which has completed. The job
+  is not dispatched to the DONE callback before either of the files
+  has been found, or max_ok_wait_time has passed; see
+  job_queue_check_done_wait(). I.e. this function does not wait.
+*/
+
 static bool job_queue_check_node_status_files(const job_queue_type * job_queue,
                                               job_queue_node_type * node) {
   const char * exit_file = job_queue_node_get_exit_file( node );
@@ -649,21 +666,26 @@ static bool job_queue_check_node_status_files(const job_queue_type * job_queue,
   if (!ok_file)
     return true;
 
-  int ok_sleep_time   = 1; // Time to wait between checks for OK|EXIT file
-  int total_wait_time = 0;
+  return util_file_exists( ok_file );
+}
 
-  /* Wait for OK file */
-  while (total_wait_time < job_queue->max_ok_wait_time) {
-    if (util_file_exists( ok_file ))
-      return true;
 
-    if (exit_file && util_file_exists(exit_file))
-      return false;  // job has failed
+static bool job_queue_node_status_files_ready(const job_queue_type * job_queue,
+                                              job_queue_node_type * node,
+                                              time_t wait_start) {
+  const char * ok_file = job_queue_node_get_ok_file( node );
+  const char * exit_file = job_queue_node_get_exit_file( node );
 
-    sleep( ok_sleep_time );
-    total_wait_time += ok_sleep_time;
-  }
-  return false;
+  if (!ok_file)
+    return true;
+
+  if (util_file_exists( ok_file ))
+    return true;
+
+  if (exit_file && util_file_exists( exit_file ))
+    return true;
+
+  return (difftime( time(NULL) , wait_start ) >= job_queue->max_ok_wait_time);
 }
 
 
@@ -691,13 +713,58 @@ static void * job_queue_run_DONE_callback( void * arg ) {
   return NULL;
 }
 
+static void job_queue_dispatch_DONE( job_queue_type * queue , int queue_index) {
+  arg_pack_type * arg_pack = arg_pack_alloc();
+  arg_pack_append_ptr( arg_pack , queue );
+  arg_pack_append_int( arg_pack , queue_index );
+  thread_pool_add_job( queue->work_pool , job_queue_run_DONE_callback , arg_pack );
+}
+
+
+/*
+  When the driver reports a job as DONE the OK file - or the EXIT file
+  - might not yet be visible; in particular on a network file
+  system. Instead of occupying a worker thread while waiting, the job
+  is put on the done_wait_list and the run_path is registered with the
+  file_watch. The list is checked by job_queue_check_done_wait() from
+  the main loop, and the job is dispatched to the DONE callback when
+  the files are in place.
+*/
+
 static void job_queue_handle_DONE( job_queue_type * queue , job_queue_node_type * node) {
+  int queue_index = job_queue_node_get_queue_index(node);
   job_queue_change_node_status(queue , node , JOB_QUEUE_RUNNING_DONE_CALLBACK );
-  {
-    arg_pack_type * arg_pack = arg_pack_alloc();
-    arg_pack_append_ptr( arg_pack , queue );
-    arg_pack_append_int( arg_pack , job_queue_node_get_queue_index(node));
-    thread_pool_add_job( queue->work_pool , job_queue_run_DONE_callback , arg_pack );
+
+  if (job_queue_node_status_files_ready( queue , node , time(NULL) ))
+    job_queue_dispatch_DONE( queue , queue_index );
+  else {
+    int_vector_append( queue->done_wait_list , queue_index );
+    time_t_vector_append( queue->done_wait_start , time(NULL) );
+    file_watch_add_path( queue->file_watch , job_queue_node_get_run_path( node ));
+  }
+}
+
+
+/*
+  Dispatches the jobs in the done_wait_list which have got an OK or
+  EXIT file, or which have waited longer than max_ok_wait_time. If
+  @force is true all the waiting jobs are dispatched.
+*/
+
+static void job_queue_check_done_wait( job_queue_type * queue , bool force) {
+  int wait_index = 0;
+  while (wait_index < int_vector_size( queue->done_wait_list )) {
+    int queue_index = int_vector_iget( queue->done_wait_list , wait_index );
+    time_t wait_start = time_t_vector_iget( queue->done_wait_start , wait_index );
+    job_queue_node_type * node = job_list_iget_job( queue->job_list , queue_index );
+
+    if (force || job_queue_node_status_files_ready( queue , node , wait_start )) {
+      file_watch_remove_path( queue->file_watch , job_queue_node_get_run_path( node ));
+      job_queue_dispatch_DONE( queue , queue_index );
+      int_vector_idel( queue->done_wait_list , wait_index );
+      time_t_vector_idel( queue->done_wait_start , wait_index );
+    } else
+      wait_index++;
   }
 }
 
@@ -822,62 +889,79 @@ bool job_queue_accept_jobs(const job_queue_type * queue) {
 
 /* Submit new jobs and return whether we actually did.
  *
- * And we do if we have waiting jobs are allowed to submit jobs
+ * And we do if we have waiting jobs are allowed to submit jobs.
+ *
+ * The search for waiting jobs starts at the submit_cursor, where the
+ * previous search stopped, and wraps around the job list; the search
+ * is terminated as soon as all the waiting jobs have been visited.
  */
 static bool submit_new_jobs(job_queue_type * queue) {
-
-  int max_submit     = 5; /* This is the maximum number of jobs submitted in one while() { ... } below.
-                             Only to ensure that the waiting time before a status update is not too long. */
+  int num_waiting    = job_queue_status_get_count(queue->status, JOB_QUEUE_WAITING);
   int total_active   = job_queue_status_get_count(queue->status, JOB_QUEUE_PENDING)
                      + job_queue_status_get_count(queue->status, JOB_QUEUE_RUNNING);
 
 
   int max_running = job_queue_get_max_running(queue);
-  int num_submit_new = util_int_min(max_submit,  max_running - total_active);
+  int num_submit_new = max_running - total_active;
 
   // If max_running == 0 that should be interpreted as no limit; i.e. the queue
   // layer will attempt to send an unlimited number of jobs to the driver - the
   // driver can reject the jobs.
   if (max_running == 0)
-    num_submit_new = util_int_min(max_submit,
-                                  job_queue_status_get_count(queue->status,
-                                                             JOB_QUEUE_WAITING));
+    num_submit_new = num_waiting;
 
+  if (queue->submit_batch_size > 0)
+    num_submit_new = util_int_min(queue->submit_batch_size, num_submit_new);
 
   bool new_jobs = false;
-  if (job_queue_status_get_count(queue->status, JOB_QUEUE_WAITING) > 0)   /* We have waiting jobs at all           */
+  if (num_waiting > 0)                                                    /* We have waiting jobs at all           */
     if (num_submit_new > 0)                                               /* The queue can allow more running jobs */
       new_jobs = true;
 
   if (new_jobs) {
-    int submit_count = 0;
-    int queue_index  = 0;
+    int job_size    = job_list_get_size(queue->job_list);
+    int queue_index = queue->submit_cursor % job_size;
+    int visited     = 0;
 
-    while ((queue_index < job_list_get_size(queue->job_list)) && (num_submit_new > 0)) {
+    while ((visited < job_size) && (num_submit_new > 0) && (num_waiting > 0)) {
       job_queue_node_type * node = job_list_iget_job(queue->job_list, queue_index);
       if (job_queue_node_get_status(node) == JOB_QUEUE_WAITING) {
         submit_status_type submit_status = job_queue_submit_job(queue, queue_index);
 
         if (submit_status == SUBMIT_OK) {
           num_submit_new--;
-          submit_count++;
+          num_waiting--;
         } else if ((submit_status == SUBMIT_DRIVER_FAIL) || (submit_status == SUBMIT_QUEUE_CLOSED))
-          break;
+          break;   /* The cursor is left at this job, which will be retried first the next time. */
       }
-      queue_index++;
+      visited++;
+      queue_index = (queue_index + 1) % job_size;
     }
+    queue->submit_cursor = queue_index;
   }
 
   return new_jobs;
 }
 
 
-static void run_handlers(job_queue_type * queue) {
-  /*
-    Checking for complete / exited / overtime jobs
-  */
-  for (int i = 0; i < job_list_get_size(queue->job_list); ++i) {
-    job_queue_node_type * node = job_list_iget_job(queue->job_list, i);
+/*
+  The jobs which need attention from the queue manager register
+  themselves in the ready lists of the job_queue_status instance when
+  entering one of the JOB_QUEUE_READY_STATUS states; i.e. we only visit
+  those jobs instead of scanning the complete job list. The job might
+  have moved on since it was registered, so the current status of the
+  node is checked before any action is taken.
+*/
+
+static void run_handlers(job_queue_type * queue, int_vector_type * ready_list) {
+  job_queue_status_pop_ready(queue->status, JOB_QUEUE_READY_STATUS, ready_list);
+
+  for (int i = 0; i < int_vector_size(ready_list); ++i) {
+    int queue_index = int_vector_iget(ready_list, i);
+    if (queue_index >= job_list_get_size(queue->job_list))
+      continue;
+
+    job_queue_node_type * node = job_list_iget_job(queue->job_list, queue_index);
 
     switch (job_queue_node_get_status(node)) {
     case(JOB_QUEUE_DONE):
@@ -900,6 +984,13 @@ static void run_handlers(job_queue_type * queue) {
 }
 
 
+static double job_queue_loop_time() {
+  struct timeval now;
+  gettimeofday( &now , NULL );
+  return now.tv_sec + 1e-6 * now.tv_usec;
+}
+
+
 /*
  * UI code: if verbose update spinner and print summary
  */
@@ -925,10 +1016,21 @@ static void job_queue_loop(job_queue_type * queue, int num_total_run, bool verbo
   bool exit     = false;  // the user has indic
 
   int phase = 0; // UI code: this is the visual spinner
+  double last_update = 0;
+  double last_file_check = 0;
+  long file_event_count = 0;
+  int_vector_type * ready_list = int_vector_alloc(0, 0);
 
   do { // while !complete && !exit
     job_list_get_rdlock(queue->job_list);
 
+    /*
+      The event count is recorded before the jobs are inspected, so
+      that status changes occuring while we are working will wake up
+      the wait at the bottom of the loop immediately.
+    */
+    long event_count = job_queue_status_get_event_count(queue->status);
+
     if (queue->user_exit)  {/* An external thread has called the job_queue_user_exit() function, and we should kill
                                all jobs, do some clearing up and go home. Observe that we will go through the
                                queue handling codeblock below ONE LAST TIME before exiting. */
@@ -939,7 +1041,17 @@ static void job_queue_loop(job_queue_type * queue, int num_total_run, bool verbo
 
     job_queue_check_expired(queue);
 
-    bool update_status = job_queue_update_status(queue); // this has side effects
+    /*
+      The drivers must be polled for status; that is limited to once
+      every usleep_time microseconds. All other status changes,
+      i.e. new jobs and completed callbacks, will trigger a new pass
+      through the loop immediately.
+    */
+    bool update_status = false;
+    if ((job_queue_loop_time() - last_update) * 1000000 >= queue->usleep_time) {
+      update_status = job_queue_update_status(queue); // this has side effects
+      last_update = job_queue_loop_time();
+    }
     loop_status_spinner(queue, update_status, new_jobs, &phase, verbose); // UI code
 
     int num_complete = job_queue_status_get_count(queue->status, JOB_QUEUE_SUCCESS)
@@ -968,7 +1080,22 @@ static void job_queue_loop(job_queue_type * queue, int num_total_run, bool verbo
 
     if (!complete) {
       new_jobs = submit_new_jobs(queue);
-      run_handlers(queue);
+      run_handlers(queue, ready_list);
+
+      /*
+        The jobs waiting for an OK or EXIT file are checked when the
+        file_watch has seen a new file, and in addition polled once
+        every second - inotify will not see files created on other
+        hosts on a network file system.
+      */
+      if (int_vector_size(queue->done_wait_list) > 0) {
+        long current_file_event_count = file_watch_get_event_count(queue->file_watch);
+        if (exit || (current_file_event_count != file_event_count) || (job_queue_loop_time() - last_file_check >= JOB_QUEUE_OK_POLL_INTERVAL)) {
+          job_queue_check_done_wait(queue, exit);
+          file_event_count = current_file_event_count;
+          last_file_check = job_queue_loop_time();
+        }
+      }
     } else
       /* print an updated status to stdout before exiting. */
       if (verbose)
@@ -977,11 +1104,15 @@ static void job_queue_loop(job_queue_type * queue, int num_total_run, bool verbo
     job_list_unlock(queue->job_list);
 
     if (!exit) {
-      res_yield();
-      job_list_reader_wait(queue->job_list, queue->usleep_time, 8 * queue->usleep_time);
+      double elapsed_usec = (job_queue_loop_time() - last_update) * 1000000;
+      if (elapsed_usec < queue->usleep_time) {
+        res_yield();
+        job_queue_status_wait_event(queue->status, event_count, queue->usleep_time - (unsigned long) elapsed_usec);
+      }
     }
 
   } while (!complete && !exit);
+  int_vector_free(ready_list);
 
   if (verbose)
     printf("\n");
@@ -995,6 +1126,12 @@ static void job_queue_loop(job_queue_type * queue, int num_total_run, bool verbo
  *
  * Its sole purpose is to set up the work_pool thread and initiate the main loop
  */
+static void job_queue_file_watch_callback(void * arg) {
+  job_queue_status_type * status = job_queue_status_safe_cast(arg);
+  job_queue_status_signal_event(status);
+}
+
+
 static void handle_run_jobs(job_queue_type * queue, int num_total_run, bool verbose) {
 
   // Check if queue is open. Fails hard if not open
@@ -1009,11 +1146,16 @@ static void handle_run_jobs(job_queue_type * queue, int num_total_run, bool verb
   queue->work_pool = thread_pool_alloc(NUM_WORKER_THREADS, true);
   res_log_debug("Allocated thread pool in job_queue_run_jobs");
 
+  queue->file_watch = file_watch_alloc(job_queue_file_watch_callback, queue->status);
+
   queue->running = true;
   job_queue_loop(queue, num_total_run, verbose);
 
   thread_pool_join(queue->work_pool);
   thread_pool_free(queue->work_pool);
+
+  file_watch_free(queue->file_watch);
+  queue->file_watch = NULL;
 }
 
 
@@ -1203,6 +1345,8 @@ job_queue_type * job_queue_alloc(int  max_submit               ,
   queue->max_duration     = 0;
   queue->stop_time        = 0;
   queue->max_submit       = max_submit;
+  queue->submit_batch_size = 0;
+  queue->submit_cursor    = 0;
   queue->driver           = NULL;
   queue->ok_file          = util_alloc_string_copy( ok_file );
   queue->exit_file        = util_alloc_string_copy( exit_file );
@@ -1213,6 +1357,9 @@ job_queue_type * job_queue_alloc(int  max_submit               ,
   queue->running          = false;
   queue->submit_complete  = false;
   queue->work_pool        = NULL;
+  queue->file_watch       = NULL;
+  queue->done_wait_list   = int_vector_alloc( 0 , 0 );
+  queue->done_wait_start  = time_t_vector_alloc( 0 , 0 );
   queue->job_list         = job_list_alloc(  );
   queue->status           = job_queue_status_alloc( );
   queue->progress_timestamp = time(NULL);
@@ -1270,6 +1417,27 @@ int job_queue_get_max_submit(const job_queue_type * job_queue ) {
 }
 
 
+/**
+   The submit batch size is the maximum number of jobs which will be
+   submitted in one pass through the main loop of the queue; a small
+   value will give more frequent status updates while a large number
+   of jobs are submitted. The default value 0 means that all the
+   waiting jobs are submitted, limited only by the max_running
+   setting of the driver.
+*/
+
+void job_queue_set_submit_batch_size( job_queue_type * job_queue , int submit_batch_size ) {
+  if (submit_batch_size < 0)
+    util_abort("%s: invalid submit batch size:%d \n",__func__ , submit_batch_size);
+  job_queue->submit_batch_size = submit_batch_size;
+}
+
+
+int job_queue_get_submit_batch_size(const job_queue_type * job_queue ) {
+  return job_queue->submit_batch_size;
+}
+
+
 /**
    Returns true if the queue is currently paused, which means that no
    more jobs are submitted.
@@ -1329,6 +1497,8 @@ void job_queue_free(job_queue_type * queue) {
   free( queue->status_file );
   job_list_free( queue->job_list );
   job_queue_status_free( queue->status );
+  int_vector_free( queue->done_wait_list );
+  time_t_vector_free( queue->done_wait_start );
   free(queue);
 }
 
@@ -16,6 +16,8 @@
    for more details.
 */
 #include <pthread.h>
+#include <sys/time.h>
+#include <errno.h>
 
 #include <ert/util/type_macros.hpp>
 #include <ert/util/util.hpp>
@@ -31,6 +33,18 @@ struct job_queue_status_struct {
   pthread_rwlock_t rw_lock;
   int status_index[JOB_QUEUE_MAX_STATE];
   time_t timestamp;
+
+  /*
+    The event counter is incremented, and the waiting threads are
+    woken up, every time a job changes status. The ready lists contain
+    the queue index of the jobs which have entered one of the
+    JOB_QUEUE_READY_STATUS states and not yet been picked up by the
+    queue manager.
+  */
+  pthread_mutex_t  event_mutex;
+  pthread_cond_t   event_cond;
+  long             event_count;
+  int_vector_type *ready_list[JOB_QUEUE_MAX_STATE];
 };
 
 
@@ -58,6 +72,12 @@ job_queue_status_type * job_queue_status_alloc() {
   job_queue_status_type * status = (job_queue_status_type*)util_malloc( sizeof * status );
   UTIL_TYPE_ID_INIT( status ,   JOB_QUEUE_STATUS_TYPE_ID );
   pthread_rwlock_init( &status->rw_lock , NULL);
+  pthread_mutex_init( &status->event_mutex , NULL );
+  pthread_cond_init( &status->event_cond , NULL );
+  status->event_count = 0;
+  for (int index = 0; index < JOB_QUEUE_MAX_STATE; index++)
+    status->ready_list[index] = int_vector_alloc( 0 , 0 );
+
   job_queue_status_clear( status );
   status->timestamp = time(NULL);
 
@@ -82,6 +102,11 @@ job_queue_status_type * job_queue_status_alloc() {
 
 
 void job_queue_status_free( job_queue_status_type * status ) {
+  for (int index = 0; index < JOB_QUEUE_MAX_STATE; index++)
+    int_vector_free( status->ready_list[index] );
+
+  pthread_cond_destroy( &status->event_cond );
+  pthread_mutex_destroy( &status->event_mutex );
   free( status );
 }
 
@@ -129,6 +154,8 @@ void job_queue_status_inc( job_queue_status_type * status_count , job_status_typ
   }
   status_count->timestamp = time(NULL);
   pthread_rwlock_unlock( &status_count->rw_lock );
+
+  job_queue_status_signal_event( status_count );
 }
 
 
@@ -179,3 +206,103 @@ int job_queue_status_get_total_count( const job_queue_status_type * status ) {
 time_t job_queue_status_get_timestamp(const job_queue_status_type * status) {
   return status->timestamp;
 }
+
+
+/*
+  Wakes up the threads waiting in job_queue_status_wait_event(); this
+  is called on every status change, and can also be called by other
+  event sources - e.g. when a file has been created in a run_path.
+*/
+
+void job_queue_status_signal_event( job_queue_status_type * status ) {
+  pthread_mutex_lock( &status->event_mutex );
+  status->event_count++;
+  pthread_cond_broadcast( &status->event_cond );
+  pthread_mutex_unlock( &status->event_mutex );
+}
+
+
+long job_queue_status_get_event_count( job_queue_status_type * status ) {
+  long event_count;
+  pthread_mutex_lock( &status->event_mutex );
+  event_count = status->event_count;
+  pthread_mutex_unlock( &status->event_mutex );
+  return event_count;
+}
+
+
+/*
+  Will block until the event counter has moved past the @event_count
+  value, or until @usec_timeout microseconds have passed. The return
+  value is true if there has been a new event, and false on timeout.
+  The typical use is:
+
+     long event_count = job_queue_status_get_event_count( status );
+     ... inspect the jobs ...
+     job_queue_status_wait_event( status , event_count , timeout );
+
+  so that events occuring while the jobs are inspected are not lost.
+*/
+
+bool job_queue_status_wait_event( job_queue_status_type * status , long event_count , unsigned long usec_timeout) {
+  bool new_event;
+  struct timespec abs_timeout;
+  {
+    struct timeval now;
+    gettimeofday( &now , NULL );
+    unsigned long long nsec = (unsigned long long) now.tv_usec * 1000 + (unsigned long long) usec_timeout * 1000;
+    abs_timeout.tv_sec = now.tv_sec + nsec / 1000000000;
+    abs_timeout.tv_nsec = nsec % 1000000000;
+  }
+
+  pthread_mutex_lock( &status->event_mutex );
+  {
+    int wait_return = 0;
+    while ((status->event_count == event_count) && (wait_return != ETIMEDOUT))
+      wait_return = pthread_cond_timedwait( &status->event_cond , &status->event_mutex , &abs_timeout );
+
+    new_event = (status->event_count != event_count);
+  }
+  pthread_mutex_unlock( &status->event_mutex );
+  return new_event;
+}
+
+
+void job_queue_status_push_ready( job_queue_status_type * status , job_status_type job_status , int queue_index) {
+  if ((job_status & JOB_QUEUE_READY_STATUS) == 0)
+    return;
+
+  {
+    int index = STATUS_INDEX( status , job_status );
+    pthread_mutex_lock( &status->event_mutex );
+    int_vector_append( status->ready_list[index] , queue_index );
+    status->event_count++;
+    pthread_cond_broadcast( &status->event_cond );
+    pthread_mutex_unlock( &status->event_mutex );
+  }
+}
+
+
+/*
+  Will move the queue index of all jobs registered in the ready lists
+  of the states in @job_status_mask over to @queue_index_list; the
+  ready lists are cleared. Observe that the job might have changed
+  state after it was registered, the caller must therefor check the
+  current status of the job before acting on it.
+*/
+
+void job_queue_status_pop_ready( job_queue_status_type * status , int job_status_mask , int_vector_type * queue_index_list) {
+  int_vector_reset( queue_index_list );
+  pthread_mutex_lock( &status->event_mutex );
+  {
+    for (int index = 0; index < JOB_QUEUE_MAX_STATE; index++) {
+      if ((status->status_index[index] & job_status_mask) != 0) {
+        int_vector_type * ready_list = status->ready_list[index];
+        for (int i = 0; i < int_vector_size( ready_list ); i++)
+          int_vector_append( queue_index_list , int_vector_iget( ready_list , i ));
+        int_vector_reset( ready_list );
+      }
+    }
+  }
+  pthread_mutex_unlock( &status->event_mutex );
+}
@@ -0,0 +1,93 @@
+/*
+   Copyright (C) 2018  Statoil ASA, Norway.
+
+   The file 'file_watch_test.cpp' is part of ERT - Ensemble based Reservoir Tool.
+
+   ERT is free software: you can redistribute it and/or modify
+   it under the terms of the GNU General Public License as published by
+   the Free Software Foundation, either version 3 of the License, or
+   (at your option) any later version.
+
+   ERT is distributed in the hope that it will be useful, but WITHOUT ANY
+   WARRANTY; without even the implied warranty of MERCHANTABILITY or
+   FITNESS FOR A PARTICULAR PURPOSE.
+
+   See the GNU General Public License at <http://www.gnu.org/licenses/gpl.html>
+   for more details.
+*/
+
+#include <stdlib.h>
+#include <stdbool.h>
+
+#include <ert/util/util.hpp>
+#include <ert/util/test_util.hpp>
+#include <ert/util/test_work_area.hpp>
+
+#include <ert/job_queue/file_watch.hpp>
+
+
+void callback( void * arg ) {
+  int * count = (int *) arg;
+  (*count)++;
+}
+
+
+void touch( const char * filename ) {
+  FILE * stream = util_fopen( filename , "w");
+  fclose( stream );
+}
+
+
+bool wait_for_event( file_watch_type * file_watch , long event_count ) {
+  for (int i = 0; i < 100; i++) {
+    if (file_watch_get_event_count( file_watch ) != event_count)
+      return true;
+    util_usleep( 50000 );
+  }
+  return false;
+}
+
+
+void test_create() {
+  file_watch_type * file_watch = file_watch_alloc( NULL , NULL );
+  test_assert_true( file_watch_is_instance( file_watch ));
+  test_assert_int_equal( file_watch_get_event_count( file_watch ) , 0 );
+  file_watch_free( file_watch );
+}
+
+
+void test_watch() {
+  test_work_area_type * work_area = test_work_area_alloc("file_watch");
+  int callback_count = 0;
+  file_watch_type * file_watch = file_watch_alloc( callback , &callback_count );
+
+  util_make_path( "run_path" );
+  if (file_watch_is_active( file_watch )) {
+    long event_count = file_watch_get_event_count( file_watch );
+    test_assert_true( file_watch_add_path( file_watch , "run_path" ));
+    test_assert_true( file_watch_add_path( file_watch , "run_path" ));
+
+    touch( "run_path/OK" );
+    test_assert_true( wait_for_event( file_watch , event_count ));
+    test_assert_true( callback_count > 0 );
+
+    /* Still watched after one remove. */
+    file_watch_remove_path( file_watch , "run_path" );
+    event_count = file_watch_get_event_count( file_watch );
+    touch( "run_path/EXIT" );
+    test_assert_true( wait_for_event( file_watch , event_count ));
+
+    file_watch_remove_path( file_watch , "run_path" );
+  } else
+    test_assert_false( file_watch_add_path( file_watch , "run_path" ));
+
+  file_watch_free( file_watch );
+  test_work_area_free( work_area );
+}
+
+
+int main( int argc , char ** argv) {
+  test_create();
+  test_watch();
+  exit(0);
+}
@@ -434,6 +434,32 @@ void test16(char ** argv) {
 }
 
 
+void test17(char ** argv) {
+  printf("017: Running JobQueueSetSubmitBatchSize_AllJobsAreFinished\n");
+
+  int number_of_jobs = 25;
+  test_work_area_type * work_area = test_work_area_alloc("job_queue");
+  job_queue_type * queue = job_queue_alloc(number_of_jobs, "OK.status", "STATUS", "ERROR");
+
+  queue_driver_type * driver = queue_driver_alloc_local();
+  job_queue_set_driver(queue, driver);
+
+  test_assert_int_equal(0, job_queue_get_submit_batch_size(queue));
+  job_queue_set_submit_batch_size(queue, 3);
+  test_assert_int_equal(3, job_queue_get_submit_batch_size(queue));
+
+  submit_jobs_to_queue(queue, work_area, argv[1], number_of_jobs, 0, "0", "0");
+
+  job_queue_run_jobs(queue, number_of_jobs, false);
+
+  test_assert_int_equal(number_of_jobs, job_queue_get_num_complete(queue));
+  test_assert_bool_equal(false, job_queue_get_open(queue));
+  job_queue_free(queue);
+  queue_driver_free(driver);
+  test_work_area_free(work_area);
+}
+
+
 int main(int argc, char ** argv) {
   util_install_signals();
 
@@ -453,6 +479,7 @@ int main(int argc, char ** argv) {
   test14(argv);
   test15(argv);
   test16(argv);
+  test17(argv);
 
   exit(0);
 }
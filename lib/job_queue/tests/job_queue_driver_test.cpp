@@ -99,6 +99,7 @@ void get_driver_option_lists() {
     test_assert_true(stringlist_contains(option_list, TORQUE_NUM_NODES));
     test_assert_true(stringlist_contains(option_list, TORQUE_KEEP_QSUB_OUTPUT));
     test_assert_true(stringlist_contains(option_list, TORQUE_CLUSTER_LABEL));
+    test_assert_true(stringlist_contains(option_list, TORQUE_QSTAT_REFRESH_INTERVAL));
 
     stringlist_free(option_list);
     queue_driver_free(driver_torque);
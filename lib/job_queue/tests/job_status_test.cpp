@@ -24,6 +24,7 @@
 #include <ert/job_queue/job_queue_status.hpp>
 #include <ert/job_queue/queue_driver.hpp>
 #include <ert/util/test_util.hpp>
+#include <ert/util/int_vector.hpp>
 
 
 void call_get_status( void * arg ) {
@@ -195,9 +196,58 @@ void test_index() {
   job_queue_status_free( status );
 }
 
+void test_ready_list() {
+  job_queue_status_type * status = job_queue_status_alloc();
+  int_vector_type * ready_list = int_vector_alloc(0,0);
+
+  job_queue_status_push_ready( status , JOB_QUEUE_RUNNING , 1 );
+  job_queue_status_push_ready( status , JOB_QUEUE_DONE , 2 );
+  job_queue_status_push_ready( status , JOB_QUEUE_EXIT , 3 );
+  job_queue_status_push_ready( status , JOB_QUEUE_DONE , 4 );
+
+  job_queue_status_pop_ready( status , JOB_QUEUE_DONE , ready_list );
+  test_assert_int_equal( int_vector_size( ready_list ) , 2 );
+  test_assert_int_equal( int_vector_iget( ready_list , 0 ) , 2 );
+  test_assert_int_equal( int_vector_iget( ready_list , 1 ) , 4 );
+
+  job_queue_status_pop_ready( status , JOB_QUEUE_READY_STATUS , ready_list );
+  test_assert_int_equal( int_vector_size( ready_list ) , 1 );
+  test_assert_int_equal( int_vector_iget( ready_list , 0 ) , 3 );
+
+  job_queue_status_pop_ready( status , JOB_QUEUE_READY_STATUS , ready_list );
+  test_assert_int_equal( int_vector_size( ready_list ) , 0 );
+
+  int_vector_free( ready_list );
+  job_queue_status_free( status );
+}
+
+
+void test_wait_event() {
+  job_queue_status_type * status = job_queue_status_alloc();
+  long event_count = job_queue_status_get_event_count( status );
+
+  test_assert_false( job_queue_status_wait_event( status , event_count , 1000 ));
+
+  job_queue_status_inc( status , JOB_QUEUE_WAITING );
+  test_assert_true( job_queue_status_wait_event( status , event_count , 1000 ));
+
+  event_count = job_queue_status_get_event_count( status );
+  {
+    pthread_t thread;
+    pthread_create( &thread , NULL , user_done , status );
+    test_assert_true( job_queue_status_wait_event( status , event_count , 10000000 ));
+    pthread_join( thread , NULL );
+  }
+  test_assert_int_equal( job_queue_status_get_count( status , JOB_QUEUE_DONE ) , 1 );
+
+  job_queue_status_free( status );
+}
+
 int main( int argc , char ** argv) {
   util_install_signals();
   test_create();
+  test_ready_list();
+  test_wait_event();
   test_index();
   test_update();
 }
@@ -42,6 +42,8 @@ void setoption_setalloptions_optionsset() {
   test_option(driver, TORQUE_KEEP_QSUB_OUTPUT, "0");
   test_option(driver, TORQUE_CLUSTER_LABEL, "thecluster");
   test_option(driver, TORQUE_JOB_PREFIX_KEY, "coolJob");
+  test_option(driver, TORQUE_QSTAT_REFRESH_INTERVAL, "15");
+  test_assert_int_equal( 15 , torque_driver_get_qstat_refresh_interval(driver));
 
   test_assert_int_equal( 0 , torque_driver_get_submit_sleep(driver));
   test_assert_NULL( torque_driver_get_debug_stream(driver) );
@@ -83,6 +85,8 @@ void setoption_set_typed_options_wrong_format_returns_false() {
   test_assert_false(torque_driver_set_option(driver, TORQUE_KEEP_QSUB_OUTPUT, "22"));
   test_assert_false(torque_driver_set_option(driver, TORQUE_KEEP_QSUB_OUTPUT, "1.1"));
   test_assert_false(torque_driver_set_option(driver, TORQUE_SUBMIT_SLEEP, "X45"));
+  test_assert_false(torque_driver_set_option(driver, TORQUE_QSTAT_REFRESH_INTERVAL, "ten"));
+  test_assert_false(torque_driver_set_option(driver, TORQUE_QSTAT_REFRESH_INTERVAL, "-1"));
 }
 
 void getoption_nooptionsset_defaultoptionsreturned() {
@@ -95,6 +99,8 @@ void getoption_nooptionsset_defaultoptionsreturned() {
   test_assert_string_equal((const char *) torque_driver_get_option(driver, TORQUE_NUM_NODES), "1");
   test_assert_string_equal((const char *) torque_driver_get_option(driver, TORQUE_CLUSTER_LABEL), NULL );
   test_assert_string_equal((const char *) torque_driver_get_option(driver, TORQUE_JOB_PREFIX_KEY), NULL);
+  test_assert_string_equal((const char *) torque_driver_get_option(driver, TORQUE_QSTAT_REFRESH_INTERVAL), TORQUE_DEFAULT_QSTAT_REFRESH_INTERVAL);
+  test_assert_int_equal( 0 , torque_driver_get_qstat_refresh_interval(driver));
 
   printf("Default options OK\n");
   torque_driver_free(driver);
@@ -151,6 +157,143 @@ void test_parse_invalid( ) {
 }
 
 
+void test_parse_status_table( ) {
+  test_work_area_type * work_area = (test_work_area_type *) test_work_area_alloc("job_torque_test");
+  {
+    FILE * stream = util_fopen("qstat.stdout", "w");
+    fprintf(stream, "Job id                    Name             User            Time Use S Queue\n");
+    fprintf(stream, "------------------------- ---------------- --------------- -------- - -----\n");
+    fprintf(stream, "1612427.st-lcmm            ...130getupdates fama            00:00:01 R normal\n");
+    fprintf(stream, "1612428.st-lcmm            ...130getupdates fama            00:00:00 Q normal\n");
+    fprintf(stream, "1612429.st-lcmm            ...130getupdates fama            00:01:01 C normal\n");
+    fprintf(stream, "1612430.st-lcmm            ...130getupdates fama            00:01:01 X normal\n");
+    fprintf(stream, "Garbage\n");
+    fprintf(stream, "1612431                    ...130getupdates fama            00:01:01 E normal\n");
+    fclose( stream );
+  }
+  {
+    hash_type * status_table = hash_alloc();
+    test_assert_int_equal( 4 , torque_driver_parse_status_table( "qstat.stdout" , status_table ));
+    test_assert_int_equal( JOB_QUEUE_RUNNING , hash_get_int( status_table , "1612427"));
+    test_assert_int_equal( JOB_QUEUE_PENDING , hash_get_int( status_table , "1612428"));
+    test_assert_int_equal( JOB_QUEUE_DONE    , hash_get_int( status_table , "1612429"));
+    test_assert_int_equal( JOB_QUEUE_DONE    , hash_get_int( status_table , "1612431"));
+    test_assert_false( hash_has_key( status_table , "1612430"));
+
+    test_assert_int_equal( 0 , torque_driver_parse_status_table( "/file/does/not/exist" , status_table ));
+    hash_free( status_table );
+  }
+
+  /* The alternative format used by qstat -u user. */
+  {
+    FILE * stream = util_fopen("qstat_user.stdout", "w");
+    fprintf(stream, "\n");
+    fprintf(stream, "st-lcmm:\n");
+    fprintf(stream, "                                                                         Req'd       Req'd       Elap\n");
+    fprintf(stream, "Job ID                  Username    Queue    Jobname          SessID  NDS   TSK   Memory      Time    S   Time\n");
+    fprintf(stream, "----------------------- ----------- -------- ---------------- ------ ----- ------ --------- --------- - ---------\n");
+    fprintf(stream, "1612427.st-lcmm         fama        normal   getupdates        4711     1      1       --   01:00:00 R  00:00:01\n");
+    fprintf(stream, "1612428.st-lcmm         fama        normal   getupdates          --     1      1       --   01:00:00 Q       --\n");
+    fclose( stream );
+  }
+  {
+    hash_type * status_table = hash_alloc();
+    test_assert_int_equal( 2 , torque_driver_parse_status_table( "qstat_user.stdout" , status_table ));
+    test_assert_int_equal( JOB_QUEUE_RUNNING , hash_get_int( status_table , "1612427"));
+    test_assert_int_equal( JOB_QUEUE_PENDING , hash_get_int( status_table , "1612428"));
+    hash_free( status_table );
+  }
+  test_work_area_free( work_area );
+}
+
+
+static int count_lines(const char * filename) {
+  int num_lines = 0;
+  if (util_file_exists(filename)) {
+    FILE * stream = util_fopen(filename, "r");
+    int c;
+    while ((c = fgetc(stream)) != EOF)
+      if (c == '\n')
+        num_lines++;
+    fclose(stream);
+  }
+  return num_lines;
+}
+
+
+/*
+  The bulk qstat call should list only the jobs of the user. The
+  jobs are missing from the bulk qstat listing; repeated status
+  queries should neither trigger new bulk qstat calls nor repeated
+  qstat calls for the individual jobs.
+*/
+
+void test_cached_status_missing_job( ) {
+  test_work_area_type * work_area = (test_work_area_type *) test_work_area_alloc("job_torque_test");
+  char * cwd = util_alloc_cwd( );
+  char * qsub_cmd = util_alloc_filename( cwd , "qsub" , NULL);
+  char * qstat_cmd = util_alloc_filename( cwd , "qstat" , NULL);
+  char * bulk_count = util_alloc_filename( cwd , "bulk" , "count");
+  char * single_count = util_alloc_filename( cwd , "single" , "count");
+  char * submit_count = util_alloc_filename( cwd , "submit" , "count");
+  {
+    FILE * stream = util_fopen(qsub_cmd, "w");
+    fprintf(stream, "#!/bin/sh\n");
+    fprintf(stream, "echo submit >> %s\n", submit_count);
+    fprintf(stream, "echo 777$(wc -l < %s).st-lcmm\n", submit_count);
+    fclose( stream );
+  }
+  {
+    FILE * stream = util_fopen(qstat_cmd, "w");
+    fprintf(stream, "#!/bin/sh\n");
+    fprintf(stream, "echo \"Job id                    Name             User            Time Use S Queue\"\n");
+    fprintf(stream, "echo \"------------------------- ---------------- --------------- -------- - -----\"\n");
+    fprintf(stream, "if [ \"$1\" = \"-u\" ]; then\n");
+    fprintf(stream, "  echo $2 >> %s\n", bulk_count);
+    fprintf(stream, "  echo \"1612427.st-lcmm            ...130getupdates fama            00:00:01 R normal\"\n");
+    fprintf(stream, "else\n");
+    fprintf(stream, "  echo single >> %s\n", single_count);
+    fprintf(stream, "  echo \"$1.st-lcmm            ...130getupdates fama            00:01:01 C normal\"\n");
+    fprintf(stream, "fi\n");
+    fclose( stream );
+  }
+  util_addmode_if_owner( qsub_cmd , S_IRUSR | S_IWUSR | S_IXUSR );
+  util_addmode_if_owner( qstat_cmd , S_IRUSR | S_IWUSR | S_IXUSR );
+
+  {
+    torque_driver_type * driver = (torque_driver_type *) torque_driver_alloc();
+    test_assert_true( torque_driver_set_option( driver , TORQUE_QSUB_CMD , qsub_cmd ));
+    test_assert_true( torque_driver_set_option( driver , TORQUE_QSTAT_CMD , qstat_cmd ));
+    test_assert_true( torque_driver_set_option( driver , TORQUE_QSTAT_REFRESH_INTERVAL , "3600" ));
+    {
+      void * job1 = torque_driver_submit_job( driver , "job_program.py" , 1 , cwd , "job1" , 0 , NULL );
+      void * job2 = torque_driver_submit_job( driver , "job_program.py" , 1 , cwd , "job2" , 0 , NULL );
+      test_assert_not_NULL( job1 );
+      test_assert_not_NULL( job2 );
+
+      for (int i = 0; i < 5; i++) {
+        test_assert_int_equal( JOB_QUEUE_DONE , torque_driver_get_job_status( driver , job1 ));
+        test_assert_int_equal( JOB_QUEUE_DONE , torque_driver_get_job_status( driver , job2 ));
+      }
+
+      test_assert_int_equal( 1 , count_lines( bulk_count ));
+      test_assert_int_equal( 2 , count_lines( single_count ));
+      torque_driver_free_job( job2 );
+      torque_driver_free_job( job1 );
+    }
+    torque_driver_free( driver );
+  }
+
+  free( submit_count );
+  free( single_count );
+  free( bulk_count );
+  free( qstat_cmd );
+  free( qsub_cmd );
+  free( cwd );
+  test_work_area_free( work_area );
+}
+
+
 int main(int argc, char ** argv) {
   getoption_nooptionsset_defaultoptionsreturned();
   setoption_setalloptions_optionsset();
@@ -158,5 +301,7 @@ int main(int argc, char ** argv) {
   setoption_set_typed_options_wrong_format_returns_false();
   create_submit_script_script_according_to_input();
   test_parse_invalid( );
+  test_parse_status_table( );
+  test_cached_status_missing_job( );
   exit(0);
 }
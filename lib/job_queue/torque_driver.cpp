@@ -17,10 +17,15 @@
  */
 #include <stdio.h>
 #include <string.h>
+#include <pthread.h>
+#include <time.h>
 #include <unistd.h>
+#include <pwd.h>
 
 #include <ert/util/util.hpp>
 #include <ert/util/type_macros.hpp>
+#include <ert/util/hash.hpp>
+#include <ert/util/stringlist.hpp>
 
 #include <ert/job_queue/torque_driver.hpp>
 
@@ -44,6 +49,13 @@ struct torque_driver_struct {
   char * cluster_label;
   int    submit_sleep;
   FILE * debug_stream;
+
+  int               qstat_refresh_interval;   /* 0: call qstat once for every job when checking status. */
+  char            * qstat_refresh_interval_char;
+  time_t            last_qstat_update;
+  hash_type       * qstat_cache;              /* Status of all jobs in the qstat output, keyed by job number. */
+  char            * qstat_user;               /* The bulk qstat call only lists the jobs of this user; can be NULL. */
+  pthread_mutex_t   qstat_mutex;              /* Only one thread should update the qstat_cache table. */
 };
 
 struct torque_job_struct {
@@ -73,6 +85,21 @@ void * torque_driver_alloc() {
   torque_driver->cluster_label = NULL;
   torque_driver->job_prefix = NULL;
   torque_driver->debug_stream = NULL;
+  torque_driver->qstat_refresh_interval = 0;
+  torque_driver->qstat_refresh_interval_char = NULL;
+  torque_driver->last_qstat_update = 0;
+  torque_driver->qstat_cache = hash_alloc();
+  torque_driver->qstat_user = NULL;
+  {
+    const char * user = getenv("USER");
+    if (user == NULL) {
+      struct passwd * pw = getpwuid( getuid() );
+      if (pw != NULL)
+        user = pw->pw_name;
+    }
+    torque_driver->qstat_user = util_alloc_string_copy( user );
+  }
+  pthread_mutex_init( &torque_driver->qstat_mutex , NULL );
 
   torque_driver_set_option(torque_driver, TORQUE_QSUB_CMD, TORQUE_DEFAULT_QSUB_CMD);
   torque_driver_set_option(torque_driver, TORQUE_QSTAT_CMD, TORQUE_DEFAULT_QSTAT_CMD);
@@ -80,6 +107,7 @@ void * torque_driver_alloc() {
   torque_driver_set_option(torque_driver, TORQUE_NUM_CPUS_PER_NODE, "1");
   torque_driver_set_option(torque_driver, TORQUE_NUM_NODES, "1");
   torque_driver_set_option(torque_driver, TORQUE_SUBMIT_SLEEP, TORQUE_DEFAULT_SUBMIT_SLEEP);
+  torque_driver_set_option(torque_driver, TORQUE_QSTAT_REFRESH_INTERVAL, TORQUE_DEFAULT_QSTAT_REFRESH_INTERVAL);
 
   return torque_driver;
 }
@@ -121,6 +149,26 @@ static bool torque_driver_set_submit_sleep(torque_driver_type * driver, const ch
 }
 
 
+void torque_driver_set_qstat_refresh_interval(torque_driver_type * driver, int refresh_interval) {
+  driver->qstat_refresh_interval = refresh_interval;
+  free( driver->qstat_refresh_interval_char );
+  driver->qstat_refresh_interval_char = util_alloc_sprintf("%d", refresh_interval);
+}
+
+static bool torque_driver_set_qstat_refresh_interval_option(torque_driver_type * driver, const char * refresh_interval_char) {
+  int refresh_interval = 0;
+  if (util_sscanf_int(refresh_interval_char, &refresh_interval) && refresh_interval >= 0) {
+    torque_driver_set_qstat_refresh_interval(driver, refresh_interval);
+    return true;
+  } else
+    return false;
+}
+
+int torque_driver_get_qstat_refresh_interval( const torque_driver_type * driver ) {
+  return driver->qstat_refresh_interval;
+}
+
+
 static bool torque_driver_set_num_nodes(torque_driver_type * driver, const char* num_nodes_char) {
   int num_nodes = 0;
   if (util_sscanf_int(num_nodes_char, &num_nodes)) {
@@ -189,6 +237,8 @@ bool torque_driver_set_option(void * __driver, const char * option_key, const vo
       torque_driver_set_debug_output(driver, value);
     else if (strcmp(TORQUE_SUBMIT_SLEEP, option_key) == 0)
       option_set = torque_driver_set_submit_sleep(driver, value);
+    else if (strcmp(TORQUE_QSTAT_REFRESH_INTERVAL, option_key) == 0)
+      option_set = torque_driver_set_qstat_refresh_interval_option(driver, value);
     else
       option_set = false;
   }
@@ -216,6 +266,8 @@ const void * torque_driver_get_option(const void * __driver, const char * option
       return driver->cluster_label;
     else if(strcmp(TORQUE_JOB_PREFIX_KEY, option_key) == 0)
       return driver->job_prefix;
+    else if (strcmp(TORQUE_QSTAT_REFRESH_INTERVAL, option_key) == 0)
+      return driver->qstat_refresh_interval_char;
     else {
       util_abort("%s: option_id:%s not recognized for TORQUE driver \n", __func__, option_key);
       return NULL;
@@ -233,6 +285,7 @@ void torque_driver_init_option_list(stringlist_type * option_list) {
   stringlist_append_copy(option_list, TORQUE_KEEP_QSUB_OUTPUT);
   stringlist_append_copy(option_list, TORQUE_CLUSTER_LABEL);
   stringlist_append_copy(option_list, TORQUE_JOB_PREFIX_KEY);
+  stringlist_append_copy(option_list, TORQUE_QSTAT_REFRESH_INTERVAL);
 }
 
 torque_job_type * torque_job_alloc() {
@@ -481,6 +534,62 @@ static job_status_type torque_driver_get_qstat_status(torque_driver_type * drive
   return status;
 }
 
+static job_status_type torque_driver_parse_status_char(char status_char) {
+  switch( status_char ) {
+  case 'R':
+    return JOB_QUEUE_RUNNING;
+  case 'E':
+    return JOB_QUEUE_DONE;
+  case 'C':
+    return JOB_QUEUE_DONE;
+  case 'Q':
+    return JOB_QUEUE_PENDING;
+  default:
+    return JOB_QUEUE_STATUS_FAILURE;
+  }
+}
+
+
+/*
+  Parses one line of qstat output, either in the default format, i.e.
+
+     1612427.st-lcmm            ...130getupdates fama            00:00:01 R normal
+
+  or in the alternative format used by 'qstat -u user', i.e.
+
+     1612427.st-lcmm  fama  normal  getupdates  4711  1  1  --  01:00:00 R 00:00:01
+
+  In both formats the job id is the first column and the one character
+  status is the second last column. The numerical part of the job id is
+  returned in the newly allocated *jobnr_char; the caller must free it.
+  Will return false if the line can not be parsed.
+*/
+
+static bool torque_driver_parse_status_line(const char * line, char ** jobnr_char, job_status_type * status) {
+  stringlist_type * tokens = stringlist_alloc_from_split( line , " \t" );
+  int num_tokens = stringlist_get_size( tokens );
+  bool parsed = false;
+
+  if (num_tokens >= 6) {
+    const char * job_id_full_string = stringlist_iget( tokens , 0 );
+    const char * string_status = stringlist_iget( tokens , num_tokens - 2 );
+
+    if (strlen( string_status ) == 1) {
+      const char * dotPtr = strchr(job_id_full_string, '.');
+      if (dotPtr)
+        *jobnr_char = util_alloc_substring_copy(job_id_full_string, 0, dotPtr - job_id_full_string);
+      else
+        *jobnr_char = util_alloc_string_copy(job_id_full_string);
+
+      *status = torque_driver_parse_status_char( string_status[0] );
+      parsed = true;
+    }
+  }
+  stringlist_free( tokens );
+  return parsed;
+}
+
+
 job_status_type torque_driver_parse_status(const char * qstat_file, const char * jobnr_char) {
   job_status_type status = JOB_QUEUE_STATUS_FAILURE;
 
@@ -495,44 +604,124 @@ job_status_type torque_driver_parse_status(const char * qstat_file, const char *
     }
 
     if (line) {
-      char job_id_full_string[32];
-      char   string_status[2];
+      char * job_id_as_char_ptr = NULL;
+      job_status_type line_status;
 
-      if (sscanf(line, "%s %*s %*s %*s %s %*s", job_id_full_string, string_status) == 2) {
-        const char *dotPtr = strchr(job_id_full_string, '.');
-        int dotPosition = dotPtr - job_id_full_string;
-
-        {
-          char* job_id_as_char_ptr = util_alloc_substring_copy(job_id_full_string, 0, dotPosition);
-          if (util_string_equal(job_id_as_char_ptr, jobnr_char)) {
+      if (torque_driver_parse_status_line(line, &job_id_as_char_ptr, &line_status)) {
+        if (util_string_equal(job_id_as_char_ptr, jobnr_char))
+          status = line_status;
+        free(job_id_as_char_ptr);
+      }
+      free(line);
+    }
+  }
+  if (status == JOB_QUEUE_STATUS_FAILURE)
+    fprintf(stderr,"** Warning: failed to get job status for job:%s from file:%s\n",jobnr_char , qstat_file );
 
-            switch( string_status[0] ) {
-            case 'R':
-              status = JOB_QUEUE_RUNNING;
-              break;
+  return status;
+}
 
-            case 'E':
-              status = JOB_QUEUE_DONE;
-              break;
 
-            case 'C':
-              status = JOB_QUEUE_DONE;
-              break;
+/*
+  Parses the output from a qstat call without job arguments, i.e. the
+  status of all jobs of the user, and inserts the status of every job in the
+  status_table hash, keyed by the numerical job id. Lines which can not
+  be parsed, or which have an unrecognized status, are skipped. Returns
+  the number of jobs inserted in the table.
+*/
 
-            case 'Q':
-              status = JOB_QUEUE_PENDING;
-              break;
-            }
+int torque_driver_parse_status_table(const char * qstat_file, hash_type * status_table) {
+  int num_jobs = 0;
 
-            free(job_id_as_char_ptr);
+  if (util_file_exists(qstat_file)) {
+    FILE * stream = util_fopen(qstat_file, "r");
+    bool at_eof = false;
+    util_fskip_lines(stream, 2);
+    while (!at_eof) {
+      char * line = util_fscanf_alloc_line(stream, &at_eof);
+      if (line) {
+        char * jobnr_char = NULL;
+        job_status_type status;
+
+        if (torque_driver_parse_status_line(line, &jobnr_char, &status)) {
+          if (status != JOB_QUEUE_STATUS_FAILURE) {
+            hash_insert_int(status_table, jobnr_char, status);
+            num_jobs++;
           }
+          free(jobnr_char);
         }
+        free(line);
       }
-      free(line);
+    }
+    fclose(stream);
+  }
+  return num_jobs;
+}
+
+
+/*
+  Lists the jobs of the current user with one qstat call; without the
+  -u option qstat would list every job on the cluster.
+*/
+
+static void torque_driver_update_qstat_table(torque_driver_type * driver) {
+  char * tmp_file = (char*)util_alloc_tmp_file("/tmp", "enkf-qstat", true);
+
+  if (driver->qstat_user != NULL) {
+    const char * argv[2] = { "-u" , driver->qstat_user };
+    util_spawn_blocking(driver->qstat_cmd, 2, argv, tmp_file, NULL);
+  } else
+    util_spawn_blocking(driver->qstat_cmd, 0, NULL, tmp_file, NULL);
+  hash_clear(driver->qstat_cache);
+  if (util_file_exists( tmp_file )) {
+    int num_jobs = torque_driver_parse_status_table(tmp_file, driver->qstat_cache);
+    torque_debug(driver, "Bulk qstat: status for %d jobs", num_jobs);
+    unlink(tmp_file);
+  } else
+    fprintf(stderr, "No such file: %s - reading qstat status failed \n", tmp_file );
+
+  free(tmp_file);
+}
+
+
+/*
+  In the cached mode all the job status queries are served from the
+  qstat_cache table, which is refreshed with one qstat call for all
+  jobs when it is older than qstat_refresh_interval seconds. Jobs which
+  are not found in the table, e.g. because they have been evicted from
+  the qstat listing, fall back to a qstat call for the individual job.
+
+  The result of the fallback call is stored in the qstat_cache table,
+  i.e. it is valid until the next refresh. The job queue does not ask
+  for the status of a job again when it is DONE, so a job which has
+  left the qstat listing is only queried individually once.
+*/
+
+static job_status_type torque_driver_get_cached_status(torque_driver_type * driver, const char * jobnr_char) {
+  job_status_type status = JOB_QUEUE_STATUS_FAILURE;
+  bool found;
+
+  pthread_mutex_lock( &driver->qstat_mutex );
+  {
+    if (difftime(time(NULL), driver->last_qstat_update) > driver->qstat_refresh_interval) {
+      torque_driver_update_qstat_table(driver);
+      driver->last_qstat_update = time( NULL );
+    }
+
+    found = hash_has_key( driver->qstat_cache, jobnr_char );
+    if (found)
+      status = (job_status_type) hash_get_int( driver->qstat_cache, jobnr_char );
+  }
+  pthread_mutex_unlock( &driver->qstat_mutex );
+
+  if (!found) {
+    status = torque_driver_get_qstat_status(driver, jobnr_char);
+    if (status != JOB_QUEUE_STATUS_FAILURE) {
+      pthread_mutex_lock( &driver->qstat_mutex );
+      hash_insert_int( driver->qstat_cache, jobnr_char, status );
+      pthread_mutex_unlock( &driver->qstat_mutex );
     }
   }
-  if (status == JOB_QUEUE_STATUS_FAILURE)
-    fprintf(stderr,"** Warning: failed to get job status for job:%s from file:%s\n",jobnr_char , qstat_file );
 
   return status;
 }
@@ -542,7 +731,11 @@ job_status_type torque_driver_parse_status(const char * qstat_file, const char *
 job_status_type torque_driver_get_job_status(void * __driver, void * __job) {
   torque_driver_type * driver = torque_driver_safe_cast(__driver);
   torque_job_type * job = torque_job_safe_cast(__job);
-  return torque_driver_get_qstat_status(driver, job->torque_jobnr_char);
+
+  if (driver->qstat_refresh_interval > 0)
+    return torque_driver_get_cached_status(driver, job->torque_jobnr_char);
+  else
+    return torque_driver_get_qstat_status(driver, job->torque_jobnr_char);
 }
 
 
@@ -561,6 +754,10 @@ void torque_driver_free(torque_driver_type * driver) {
   free(driver->qsub_cmd);
   free(driver->num_cpus_per_node_char);
   free(driver->num_nodes_char);
+  free(driver->qstat_refresh_interval_char);
+  hash_free(driver->qstat_cache);
+  free(driver->qstat_user);
+  pthread_mutex_destroy( &driver->qstat_mutex );
   if (driver->job_prefix)
     free(driver->job_prefix);
 
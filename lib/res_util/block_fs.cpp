@@ -25,10 +25,19 @@
 #include <pthread.h>
 #include <time.h>
 #include <fnmatch.h>
+#include <sys/mman.h>
+#include <sys/stat.h>
+#include <fcntl.h>
+#include <stdint.h>
+
+#include <map>
+#include <set>
+#include <utility>
 
 #include <ert/util/hash.hpp>
 #include <ert/util/util.hpp>
 #include <ert/util/vector.hpp>
+#include <ert/util/stringlist.hpp>
 #include <ert/util/buffer.hpp>
 #include <ert/util/long_vector.hpp>
 
@@ -38,9 +47,8 @@
 #define MOUNT_MAP_MAGIC_INT  8861290
 #define BLOCK_FS_TYPE_ID     7100652
 #define INDEX_MAGIC_INT      1213775
-#define INDEX_FORMAT_VERSION       1
-
-// #define ENABLE_CACHE
+#define INDEX_FORMAT_VERSION       2
+#define INDEX_FORMAT_VERSION_HASH  1    /* The original unsorted index format; can still be loaded. */
 
 
 /*
@@ -58,6 +66,25 @@
 #define DEFAULT_INDEX_SIZE 2048
 
 
+/*
+  When the data file is memory mapped the mapping is grown in chunks
+  of this size, so that appending to the data file does not lead to a
+  remap on every write. Only the part of the mapping which is backed
+  by the file is ever dereferenced.
+*/
+
+#define DATA_MAP_CHUNK_SIZE (64 * 1024 * 1024)
+
+
+/*
+  The smallest free node which can be split off from a larger free
+  node; it must at least have room for the header of a free node, i.e.
+  status, node_size, data_size and the NODE_END_TAG.
+*/
+
+#define FREE_NODE_MIN_SIZE ((int) (4 * sizeof(int)))
+
+
 
 /**
    These should be bitwise "smart" - so it is possible
@@ -81,18 +108,18 @@ typedef enum {
 } node_status_type;
 
 
-/**
-   The free_node_struct is used to implement a doubly linked list of
-   free nodes; i.e. holes in the file which are available for other use.
-*/
 typedef struct file_node_struct file_node_type;
-typedef struct free_node_struct free_node_type;
+typedef struct cache_node_struct cache_node_type;
 
-struct free_node_struct {
-  free_node_type * next;
-  free_node_type * prev;
-  file_node_type * file_node;
-};
+/**
+   The free nodes, i.e. holes in the file which are available for
+   other use, are indexed both on offset and on (size, offset). The
+   size index is used to find the best fitting hole when a new node is
+   needed, and the offset index is used to find the neighbours of a
+   node which is freed, so that adjacent holes can be merged.
+*/
+typedef std::set< std::pair<int , long int> > free_size_index_type;
+typedef std::map< long int , file_node_type * > free_offset_index_type;
 
 
 
@@ -103,19 +130,67 @@ struct free_node_struct {
 */
 
 struct file_node_struct{
-  long int           node_offset;   /* The offset into the data_file of this node. NEVER Changed. */
+  long int           node_offset;   /* The offset into the data_file of this node. Only changed when free nodes are merged. */
   int                data_offset;   /* The offset from the node start to the start of actual data - i.e. data starts at absolute position: node_offset + data_offset. */
-  int                node_size;     /* The size in bytes of this node - must be >= data_size. NEVER Changed. */
+  int                node_size;     /* The size in bytes of this node - must be >= data_size. Only changed when free nodes are split or merged. */
   int                data_size;     /* The size of the data stored in this node - in addition the node might need to store header information. */
   node_status_type   status;        /* This should be: NODE_IN_USE | NODE_FREE; in addition the disk can have NODE_WRITE_ACTIVE for incomplete writes. */
+  cache_node_type  * cache;         /* The cached content of the node, NULL if the node is not in the cache. */
+};
+
 
-#ifdef ENABLE_CACHE
-  char             * cache;
-  int                cache_size;
-#endif
+/*
+  The payload cache is a doubly linked list of cache_node instances in
+  LRU order, the most recently used node is at the head of the list.
+  Since readers only hold the read lock the cache is protected with the
+  separate cache_lock.
+*/
+
+struct cache_node_struct {
+  cache_node_type  * prev;
+  cache_node_type  * next;
+  file_node_type   * file_node;
+  char             * data;
+  int                data_size;
 };
 
 
+/*
+  On disk layout of the sorted index file (INDEX_FORMAT_VERSION 2):
+
+     index_header_type
+     index_record_type  x num_active   <- Sorted on filename.
+     index_record_type  x num_free
+     char               x string_size  <- \0 terminated filenames.
+
+  The checksum is calculated over everything following the header.
+  The file is written to a temporary file which is renamed into place,
+  so a reader will never see a partially written index.
+*/
+
+typedef struct {
+  int32_t   magic;
+  int32_t   version;
+  int64_t   data_mtime;
+  int64_t   data_file_size;
+  int64_t   num_active;
+  int64_t   num_free;
+  int64_t   string_size;
+  uint32_t  checksum;
+  uint32_t  reserved;
+} index_header_type;
+
+
+typedef struct {
+  int64_t   name_offset;    /* Offset into the string table; -1 for free nodes. */
+  int64_t   node_offset;
+  int32_t   node_size;
+  int32_t   data_offset;
+  int32_t   data_size;
+  int32_t   status;
+} index_record_type;
+
+
 /**
    data_size   : manipulated in block_fs_fwrite__() and block_fs_insert_free_node().
    status      : manipulated in block_fs_fwrite__() and block_fs_unlink_file__();
@@ -150,20 +225,48 @@ struct block_fs_struct {
   pthread_mutex_t  io_lock;         /* Lock held during fread of the data file. */
   pthread_rwlock_t rw_lock;         /* Read-write lock during all access to the fs. */
 
-  int              num_free_nodes;
-  hash_type      * index;           /* THE HASH table of all the nodes/files which have been stored. */
-  free_node_type * free_nodes;
-  vector_type    * file_nodes;      /* This vector owns all the file_node instances - the index and free_nodes structures
-                                       only contain pointers to the objects stored in this vector. */
+  int                      num_free_nodes;
+  hash_type              * index;           /* THE HASH table of all the nodes/files which have been stored. */
+  free_size_index_type   * free_sizes;
+  free_offset_index_type * free_nodes;
+  vector_type            * file_nodes;      /* This vector owns all the file_node instances - the index and free_nodes structures
+                                               only contain pointers to the objects stored in this vector. */
   int              write_count;     /* This just counts the number of writes since the file system was mounted. */
-  int              max_cache_size;
+  int              max_cache_size;        /* Nodes larger than this are not cached. */
   size_t           total_cache_size;
-  size_t           max_total_cache_size;
+  size_t           max_total_cache_size;  /* The total size of the cache; the least recently used nodes are evicted to stay below this. */
+  cache_node_type * cache_head;
+  cache_node_type * cache_tail;
+  size_t           cache_hits;
+  size_t           cache_misses;
+  pthread_mutex_t  cache_lock;
   float            fragmentation_limit;  /* If fragmentation (amount of wasted space) is above this limit - do a rotate.
                                             fragmentation_limit == 1.0 : Never rotate.
                                             fragmentation_limit == 0.0 : Rotate when one byte is wasted. */
+  double           close_fragmentation_limit;  /* As fragmentation_limit, but only checked when the filesystem is closed. */
   bool             data_owner;
   int              fsync_interval;  /* 0: never  n: every nth iteration. */
+
+  bool             use_mmap;        /* Read through a read-only mmap() of the data file instead of the data_stream. */
+  char           * data_map;        /* The mapping; NULL if use_mmap == false or the data file does not exist. */
+  size_t           data_map_size;
+
+  /*
+    When the filesystem is mounted from a sorted index file the index
+    file is mmap()ed, and the active nodes are looked up with binary
+    search in index_records instead of through the index hash table;
+    the file_node instances are created on demand in index_nodes.
+    Before the first write the sorted index is moved over to the hash
+    table, see block_fs_materialize_index().
+  */
+  char                    * index_map;
+  size_t                    index_map_size;
+  const index_record_type * index_records;
+  const char              * index_strings;
+  int                       num_index_records;
+  file_node_type         ** index_nodes;
+  pthread_mutex_t           index_lock;
+  bool                      index_dirty;      /* The index file on disk must be updated when closing. */
 };
 
 /*****************************************************************/
@@ -207,11 +310,7 @@ static file_node_type * file_node_alloc( node_status_type status , long int offs
   file_node->data_size   = 0;
   file_node->data_offset = 0;
   file_node->status      = status;
-
-#ifdef ENABLE_CACHE
-  file_node->cache      = NULL;
-  file_node->cache_size = 0;
-#endif
+  file_node->cache       = NULL;
 
   return file_node;
 }
@@ -230,45 +329,8 @@ static file_node_type * file_node_alloc( node_status_type status , long int offs
 
 
 
-#ifdef ENABLE_CACHE
-static void file_node_read_from_cache( const file_node_type * file_node , void * ptr , size_t read_bytes) {
-  memcpy(ptr , file_node->cache , read_bytes);
-  /*
-    Could check: (ext_offset + file_node->cache_size <= read_bytes) - else
-    we are reading beyond the end of the cache.
-  */
-}
-
-
-static void file_node_buffer_read_from_cache( const file_node_type * file_node , buffer_type * buffer ) {
-  buffer_fwrite( buffer , file_node->cache , 1 , file_node->cache_size );
-}
-
-
-static void file_node_update_cache( file_node_type * file_node , int data_size , const void * data) {
-  if (data_size != file_node->cache_size) {
-    file_node->cache = util_realloc_copy( file_node->cache , data , data_size );
-    file_node->cache_size = data_size;
-  } else
-    memcpy( file_node->cache , data , data_size);
-}
-
-
-static void file_node_clear_cache( file_node_type * file_node ) {
-  if (file_node->cache != NULL) {
-    file_node->cache_size = 0;
-    free(file_node->cache);
-    file_node->cache = NULL;
-  }
-}
-#endif
-
-
 static void file_node_free( file_node_type * file_node ) {
   free( file_node );
-#ifdef ENABLE_CACHE
-  free( file_node->cache );
-#endif
 }
 
 
@@ -414,16 +476,6 @@ static void file_node_set_data_offset( file_node_type * file_node, const char *
 
 
 
-static void file_node_dump_index( const file_node_type * file_node , FILE * index_stream) {
-  util_fwrite_int( file_node->status , index_stream );
-  util_fwrite_long( file_node->node_offset , index_stream );
-  util_fwrite_int( file_node->node_size   , index_stream );
-  util_fwrite_int( file_node->data_offset , index_stream );
-  util_fwrite_int( file_node->data_size   , index_stream );
-}
-
-
-
 /*
 static file_node_type * file_node_index_fread_alloc( FILE * stream ) {
   node_status_type status = util_fread_int( stream );
@@ -439,6 +491,26 @@ static file_node_type * file_node_index_fread_alloc( FILE * stream ) {
 }
 */
 
+static file_node_type * file_node_alloc_from_record( const index_record_type * record ) {
+  file_node_type * file_node = file_node_alloc( (node_status_type) record->status , record->node_offset , record->node_size );
+
+  file_node->data_offset = record->data_offset;
+  file_node->data_size   = record->data_size;
+
+  return file_node;
+}
+
+
+static void file_node_init_record( const file_node_type * file_node , index_record_type * record , int64_t name_offset) {
+  record->name_offset = name_offset;
+  record->node_offset = file_node->node_offset;
+  record->node_size   = file_node->node_size;
+  record->data_offset = file_node->data_offset;
+  record->data_size   = file_node->data_size;
+  record->status      = file_node->status;
+}
+
+
 static file_node_type * file_node_index_buffer_fread_alloc( buffer_type * buffer) {
   node_status_type status = (node_status_type)buffer_fread_int( buffer );
   long int node_offset    = buffer_fread_long( buffer );
@@ -456,38 +528,133 @@ static file_node_type * file_node_index_buffer_fread_alloc( buffer_type * buffer
 /* file_node functions - end. */
 /*****************************************************************/
 
-static free_node_type * free_node_alloc( file_node_type * file_node ) {
-  free_node_type * free_node = (free_node_type*)util_malloc( sizeof * free_node );
+/*****************************************************************/
+/* Sorted index functions */
+
+static uint32_t block_fs_index_checksum( uint32_t checksum , const char * data , size_t size) {
+  /* FNV-1a */
+  for (size_t i = 0; i < size; i++) {
+    checksum ^= (unsigned char) data[i];
+    checksum *= 16777619U;
+  }
+  return checksum;
+}
+
+#define INDEX_CHECKSUM_INIT 2166136261U
+
+
+static const char * block_fs_index_iget_name( const block_fs_type * block_fs , int index ) {
+  return &block_fs->index_strings[ block_fs->index_records[index].name_offset ];
+}
+
+
+/*
+  Returns the position of filename in the sorted index, or -1 if the
+  file is not in the index.
+*/
+
+static int block_fs_index_lookup( const block_fs_type * block_fs , const char * filename ) {
+  int lower = 0;
+  int upper = block_fs->num_index_records - 1;
+
+  while (lower <= upper) {
+    int mid = lower + (upper - lower) / 2;
+    int cmp = strcmp( filename , block_fs_index_iget_name( block_fs , mid ));
+    if (cmp == 0)
+      return mid;
 
-  free_node->file_node = file_node;
-  free_node->next = NULL;
-  free_node->prev = NULL;
+    if (cmp < 0)
+      upper = mid - 1;
+    else
+      lower = mid + 1;
+  }
+  return -1;
+}
+
+
+/*
+  Readers only hold the read lock, so creation of the file_node
+  instances is protected by the separate index_lock.
+*/
 
-  return free_node;
+static file_node_type * block_fs_index_iget_node( block_fs_type * block_fs , int index ) {
+  file_node_type * node;
+  pthread_mutex_lock( &block_fs->index_lock );
+  {
+    node = block_fs->index_nodes[index];
+    if (node == NULL) {
+      node = file_node_alloc_from_record( &block_fs->index_records[index] );
+      block_fs->index_nodes[index] = node;
+    }
+  }
+  pthread_mutex_unlock( &block_fs->index_lock );
+  return node;
 }
 
 
-static void free_node_free( free_node_type * free_node ) {
-  free( free_node );
+static void block_fs_unmap_index( block_fs_type * block_fs ) {
+  if (block_fs->index_map != NULL) {
+    munmap( block_fs->index_map , block_fs->index_map_size );
+    block_fs->index_map         = NULL;
+    block_fs->index_map_size    = 0;
+    block_fs->index_records     = NULL;
+    block_fs->index_strings     = NULL;
+    block_fs->num_index_records = 0;
+  }
 }
 
-static void free_node_free_list( free_node_type * head ) {
-  free_node_type * current = head;
-  free_node_type * next;
-  while (current != NULL) {
-    next = current->next;
-    free_node_free( current );
-    current = next;
+
+static void block_fs_insert_index_node( block_fs_type * block_fs , const char * filename , const file_node_type * file_node);
+static void block_fs_install_node(block_fs_type * block_fs , file_node_type * node);
+
+
+/**
+   Moves all the active nodes from the sorted index into the index hash
+   table; this must be done before the filesystem is modified. Must be
+   called with the write lock held, or before the instance is shared
+   between threads.
+*/
+
+static void block_fs_materialize_index( block_fs_type * block_fs ) {
+  if (block_fs->index_map == NULL)
+    return;
+
+  hash_resize( block_fs->index , block_fs->num_index_records * 2 + 64);
+  for (int i = 0; i < block_fs->num_index_records; i++) {
+    file_node_type * node = block_fs_index_iget_node( block_fs , i );
+    block_fs_install_node( block_fs , node );
+    block_fs_insert_index_node( block_fs , block_fs_index_iget_name( block_fs , i ) , node );
   }
+  free( block_fs->index_nodes );
+  block_fs->index_nodes = NULL;
+  block_fs_unmap_index( block_fs );
+  block_fs->index_dirty = true;
 }
 
 
+/*
+  Frees the sorted index without installing the nodes; used when the
+  filesystem is closed before it has been modified.
+*/
+
+static void block_fs_free_sorted_index( block_fs_type * block_fs ) {
+  if (block_fs->index_map != NULL) {
+    for (int i = 0; i < block_fs->num_index_records; i++)
+      free( block_fs->index_nodes[i] );
+
+    free( block_fs->index_nodes );
+    block_fs->index_nodes = NULL;
+    block_fs_unmap_index( block_fs );
+  }
+}
 
 /*****************************************************************/
+
 static inline void block_fs_aquire_wlock( block_fs_type * block_fs ) {
-  if (block_fs->data_owner)
+  if (block_fs->data_owner) {
     pthread_rwlock_wrlock( &block_fs->rw_lock );
-  else
+    block_fs_materialize_index( block_fs );
+  } else
     util_abort("%s: tried to write to read only filesystem mounted at: %s \n",__func__ , block_fs->mount_file );
 }
 
@@ -514,81 +681,36 @@ static void block_fs_insert_index_node( block_fs_type * block_fs , const char *
 
 
 /**
-   Looks through the list of free nodes - looking for a node with
-   offset 'node_offset'. If no such node can be found, NULL will be
-   returned.
+   Looks for a free node with offset 'node_offset'. If no such node
+   can be found, NULL will be returned.
 */
 
 static file_node_type * block_fs_lookup_free_node( const block_fs_type * block_fs , long int node_offset) {
-  free_node_type * current = block_fs->free_nodes;
-  while (current != NULL && (current->file_node->node_offset != node_offset))
-    current = current->next;
-
-  if (current == NULL)
+  free_offset_index_type::const_iterator iter = block_fs->free_nodes->find( node_offset );
+  if (iter == block_fs->free_nodes->end())
     return NULL;
   else
-    return current->file_node;
+    return iter->second;
 }
 
 
-
-
-
-
-
-
-
 /**
-   Inserts a file_node instance in the linked list of free nodes. The
-   list is sorted in order of increasing node size.
+   Inserts a file_node instance in the free node indices.
 */
 
 static void block_fs_insert_free_node( block_fs_type * block_fs , file_node_type * file_node ) {
-  free_node_type * _new = free_node_alloc( file_node );
-
-  /* Special case: starting with a empty list. */
-  if (block_fs->free_nodes == NULL) {
-    _new->next = NULL;
-    _new->prev = NULL;
-    block_fs->free_nodes = _new;
-  } else {
-    free_node_type * current = block_fs->free_nodes;
-    free_node_type * prev    = NULL;
+  block_fs->free_nodes->insert( std::make_pair( file_node->node_offset , file_node ));
+  block_fs->free_sizes->insert( std::make_pair( file_node->node_size , file_node->node_offset ));
+  block_fs->num_free_nodes++;
+  block_fs->free_size += file_node->node_size;
+}
 
-    while ( current != NULL && (current->file_node->node_size < file_node->node_size)) {
-      prev = current;
-      current = current->next;
-    }
 
-    if (current == NULL) {
-      /*
-         The new node should be added at the end of the list - i.e. it
-         will not have a next node.
-      */
-      _new->next = NULL;
-      _new->prev = prev;
-      prev->next = _new;
-    } else {
-      /*
-        The new node should be placed BEFORE the current node.
-      */
-      if (prev == NULL) {
-        /* The new node should become the new list head. */
-        block_fs->free_nodes = _new;
-        _new->prev = NULL;
-      } else {
-        prev->next = _new;
-        _new->prev  = prev;
-      }
-      current->prev = _new;
-      _new->next  = current;
-    }
-    if (_new != NULL)     if (_new->next == _new) util_abort("%s: broken LIST1 \n",__func__);
-    if (prev != NULL)    if (prev->next == prev) util_abort("%s: broken LIST2 \n",__func__);
-    if (current != NULL) if (current->next == current) util_abort("%s: Broken LIST3 \n",__func__);
-  }
-  block_fs->num_free_nodes++;
-  block_fs->free_size += _new->file_node->node_size;
+static void block_fs_unlink_free_node( block_fs_type * block_fs , file_node_type * file_node) {
+  block_fs->free_nodes->erase( file_node->node_offset );
+  block_fs->free_sizes->erase( std::make_pair( file_node->node_size , file_node->node_offset ));
+  block_fs->num_free_nodes--;
+  block_fs->free_size -= file_node->node_size;
 }
 
 
@@ -630,7 +752,8 @@ static void block_fs_set_filenames( block_fs_type * block_fs ) {
 static void block_fs_reinit( block_fs_type * block_fs ) {
   block_fs->index               = hash_alloc();
   block_fs->file_nodes          = vector_alloc_new();
-  block_fs->free_nodes          = NULL;
+  block_fs->free_nodes          = new free_offset_index_type();
+  block_fs->free_sizes          = new free_size_index_type();
   block_fs->num_free_nodes      = 0;
   block_fs->write_count         = 0;
   block_fs->data_file_size      = 0;
@@ -658,8 +781,25 @@ static block_fs_type * block_fs_alloc_empty( const char * mount_file ,
   block_fs->max_cache_size       = max_cache_size;
   block_fs->total_cache_size     = 0;
   block_fs->max_total_cache_size = 512 * 1024 * 1024;  /* 512 MB */
+  block_fs->cache_head           = NULL;
+  block_fs->cache_tail           = NULL;
+  block_fs->cache_hits           = 0;
+  block_fs->cache_misses         = 0;
+  pthread_mutex_init( &block_fs->cache_lock , NULL );
 
   block_fs->fragmentation_limit = fragmentation_limit;
+  block_fs->close_fragmentation_limit = 1.0;
+  block_fs->use_mmap            = false;
+  block_fs->data_map            = NULL;
+  block_fs->data_map_size       = 0;
+  block_fs->index_map           = NULL;
+  block_fs->index_map_size      = 0;
+  block_fs->index_records       = NULL;
+  block_fs->index_strings       = NULL;
+  block_fs->num_index_records   = 0;
+  block_fs->index_nodes         = NULL;
+  block_fs->index_dirty         = true;
+  pthread_mutex_init( &block_fs->index_lock , NULL);
   util_alloc_file_components( mount_file , &block_fs->path , &block_fs->base_name, NULL );
   pthread_mutex_init( &block_fs->io_lock  , NULL);
   pthread_rwlock_init( &block_fs->rw_lock , NULL);
@@ -810,47 +950,196 @@ static void block_fs_open_data( block_fs_type * block_fs , bool read_write) {
     block_fs->data_fd = fileno( block_fs->data_stream );
 }
 
-#ifdef ENABLE_CACHE
 
-static void block_fs_clear_cache_node( block_fs_type * block_fs , file_node_type * node ) {
-  if (node->cache_size > 0) {
-    block_fs->total_cache_size -= node->cache_size;
-    file_node_clear_cache( node );
+static void block_fs_unmap_data( block_fs_type * block_fs ) {
+  if (block_fs->data_map != NULL) {
+    munmap( block_fs->data_map , block_fs->data_map_size );
+    block_fs->data_map      = NULL;
+    block_fs->data_map_size = 0;
   }
 }
 
-static void block_fs_update_cache_node( block_fs_type * block_fs, file_node_type * node, int data_size, const void * data) {
-  int delta_size = data_size - node->cache_size;
-  if (delta_size < 0) {
-    file_node_update_cache( node , data_size , data );
-    block_fs->total_cache_size += delta_size;
-  } else {
-    if (((block_fs->total_cache_size + delta_size) <= block_fs->max_total_cache_size) &&   /* Check total cache usage */
-        (data_size <= block_fs->max_cache_size)) {                                         /* Chech cache size of this node */
-      block_fs->total_cache_size += delta_size;
-      file_node_update_cache( node , data_size , data );
-    } else
-      block_fs_clear_cache_node( block_fs , node );
+
+/**
+   Makes sure the mapping of the data file is up to date with what has
+   been written: the data_stream is flushed so the content is visible
+   through the mapping, and the file is remapped if it has grown
+   beyond the current mapping. Must be called with the write lock
+   held, or before the instance is shared between threads.
+
+   If the mmap() call fails the instance falls back to reading through
+   the data_stream.
+*/
+
+static void block_fs_update_data_map( block_fs_type * block_fs ) {
+  if (!block_fs->use_mmap || (block_fs->data_stream == NULL))
+    return;
+
+  if (block_fs->data_owner)
+    fflush( block_fs->data_stream );
+
+  if ((block_fs->data_map == NULL) || ((size_t) block_fs->data_file_size > block_fs->data_map_size)) {
+    size_t map_size = ((block_fs->data_file_size / DATA_MAP_CHUNK_SIZE) + 1) * (size_t) DATA_MAP_CHUNK_SIZE;
+    void * map;
+
+    block_fs_unmap_data( block_fs );
+    map = mmap( NULL , map_size , PROT_READ , MAP_SHARED , block_fs->data_fd , 0 );
+    if (map == MAP_FAILED) {
+      fprintf(stderr,"** Warning: failed to mmap() %s: %s - falling back to normal reads.\n", block_fs->data_file , strerror( errno ));
+      block_fs->use_mmap = false;
+    } else {
+      block_fs->data_map      = (char *) map;
+      block_fs->data_map_size = map_size;
+    }
   }
 }
 
+
+static const void * block_fs_get_node_map_data( const block_fs_type * block_fs , const file_node_type * file_node ) {
+  return &block_fs->data_map[ file_node->node_offset + file_node->data_offset ];
+}
+
+/*****************************************************************/
+/* Payload cache functions. All the block_fs_cache_xxx__() functions
+   must be called with the cache_lock held. */
+
+static void block_fs_cache_unlink__( block_fs_type * block_fs , cache_node_type * cache_node ) {
+  if (cache_node->prev == NULL)
+    block_fs->cache_head = cache_node->next;
+  else
+    cache_node->prev->next = cache_node->next;
+
+  if (cache_node->next == NULL)
+    block_fs->cache_tail = cache_node->prev;
+  else
+    cache_node->next->prev = cache_node->prev;
+
+  cache_node->prev = NULL;
+  cache_node->next = NULL;
+}
+
+
+static void block_fs_cache_push_front__( block_fs_type * block_fs , cache_node_type * cache_node ) {
+  cache_node->prev = NULL;
+  cache_node->next = block_fs->cache_head;
+  if (block_fs->cache_head != NULL)
+    block_fs->cache_head->prev = cache_node;
+  else
+    block_fs->cache_tail = cache_node;
+  block_fs->cache_head = cache_node;
+}
+
+
+static void block_fs_cache_drop__( block_fs_type * block_fs , cache_node_type * cache_node ) {
+  block_fs_cache_unlink__( block_fs , cache_node );
+  cache_node->file_node->cache = NULL;
+  block_fs->total_cache_size -= cache_node->data_size;
+  free( cache_node->data );
+  free( cache_node );
+}
+
+
+static void block_fs_cache_insert__( block_fs_type * block_fs , file_node_type * node , const void * data , int data_size) {
+  if ((node->cache != NULL) || (data_size <= 0) || (data_size > block_fs->max_cache_size) || ((size_t) data_size > block_fs->max_total_cache_size))
+    return;
+
+  while (block_fs->total_cache_size + data_size > block_fs->max_total_cache_size)
+    block_fs_cache_drop__( block_fs , block_fs->cache_tail );
+
+  {
+    cache_node_type * cache_node = (cache_node_type *) util_malloc( sizeof * cache_node );
+    cache_node->file_node = node;
+    cache_node->data      = (char *) util_alloc_copy( data , data_size );
+    cache_node->data_size = data_size;
+
+    node->cache = cache_node;
+    block_fs->total_cache_size += data_size;
+    block_fs_cache_push_front__( block_fs , cache_node );
+  }
+}
+
+
+/*
+  Removes the node from the cache; must be called before the content
+  of the node is changed, i.e. on write and unlink. The calling scope
+  holds the write lock.
+*/
+
+static void block_fs_cache_invalidate( block_fs_type * block_fs , file_node_type * node ) {
+  pthread_mutex_lock( &block_fs->cache_lock );
+  if (node->cache != NULL)
+    block_fs_cache_drop__( block_fs , node->cache );
+  pthread_mutex_unlock( &block_fs->cache_lock );
+}
+
+
+static void block_fs_cache_clear( block_fs_type * block_fs ) {
+  pthread_mutex_lock( &block_fs->cache_lock );
+  while (block_fs->cache_head != NULL)
+    block_fs_cache_drop__( block_fs , block_fs->cache_head );
+  pthread_mutex_unlock( &block_fs->cache_lock );
+}
+
+
+static void block_fs_cache_insert( block_fs_type * block_fs , file_node_type * node , const void * data , int data_size) {
+  if (block_fs->max_cache_size > 0) {
+    pthread_mutex_lock( &block_fs->cache_lock );
+    block_fs_cache_insert__( block_fs , node , data , data_size );
+    pthread_mutex_unlock( &block_fs->cache_lock );
+  }
+}
+
+
+/*
+  Will copy the cached content of the node to ptr, or append it to
+  buffer if ptr is NULL. Returns false if the node is not in the
+  cache. The hit/miss counters are only updated when the cache is
+  enabled.
+*/
+
+static bool block_fs_cache_fread( block_fs_type * block_fs , file_node_type * node , void * ptr , buffer_type * buffer , size_t read_bytes) {
+  bool hit = false;
+  if (block_fs->max_cache_size > 0) {
+    pthread_mutex_lock( &block_fs->cache_lock );
+    {
+      cache_node_type * cache_node = node->cache;
+      if (cache_node != NULL) {
+        if (ptr != NULL)
+          memcpy( ptr , cache_node->data , read_bytes );
+        else
+          buffer_fwrite( buffer , cache_node->data , 1 , read_bytes );
+
+        block_fs_cache_unlink__( block_fs , cache_node );
+        block_fs_cache_push_front__( block_fs , cache_node );
+        block_fs->cache_hits++;
+        hit = true;
+      } else
+        block_fs->cache_misses++;
+    }
+    pthread_mutex_unlock( &block_fs->cache_lock );
+  }
+  return hit;
+}
+
+
 /**
-   This function will load all the small (i.e. with size less than the
-   maximum cache size) nodes, and fill the cache.
+   This function will load the small (i.e. with size less than the
+   maximum cache size) nodes, and fill the cache until it is full.
 */
 
 static void block_fs_preload( block_fs_type * block_fs ) {
+  block_fs_materialize_index( block_fs );
   if ((block_fs->max_cache_size > 0) && (block_fs->data_stream != NULL) && (block_fs->max_total_cache_size > 0)) {
     void * buffer = util_malloc( block_fs->max_cache_size );
     hash_iter_type * index_iter = hash_iter_alloc( block_fs->index );
 
     while (!hash_iter_is_complete( index_iter )) {
-      file_node_type * node = hash_iter_get_next_value( index_iter );
-      if ((node->data_size < block_fs->max_cache_size) &&                                         /* Check the size of this node */
-          (block_fs->total_cache_size + node->data_size < block_fs->max_total_cache_size)) {      /* Check the total cache size */
+      file_node_type * node = (file_node_type *) hash_iter_get_next_value( index_iter );
+      if ((node->data_size <= block_fs->max_cache_size) &&                                         /* Check the size of this node */
+          (block_fs->total_cache_size + node->data_size <= block_fs->max_total_cache_size)) {      /* Check the total cache size */
         block_fs_fseek_node_data(block_fs , node);
         util_fread( buffer , 1 , node->data_size , block_fs->data_stream , __func__);
-        block_fs_update_cache_node( block_fs , node , node->data_size , buffer );
+        block_fs_cache_insert( block_fs , node , buffer , node->data_size );
       }
     }
 
@@ -858,11 +1147,6 @@ static void block_fs_preload( block_fs_type * block_fs ) {
     free( buffer );
   }
 }
-#else
-static void block_fs_clear_cache_node( block_fs_type * block_fs , file_node_type * node ) { return; }
-static void block_fs_update_cache_node( block_fs_type * block_fs, file_node_type * node, int data_size, const void * data) { return ;}
-static void block_fs_preload( block_fs_type * block_fs ) { return; }
-#endif
 
 
 
@@ -880,7 +1164,7 @@ static void block_fs_preload( block_fs_type * block_fs ) { return; }
 
 
 static void block_fs_fix_nodes( block_fs_type * block_fs , long_vector_type * offset_list ) {
-  if (block_fs->data_owner) {
+  if (block_fs->data_owner && (long_vector_size( offset_list ) > 0)) {
     fsync( block_fs->data_fd );
     {
       char * key = NULL;
@@ -975,9 +1259,110 @@ static void block_fs_build_index( block_fs_type * block_fs , long_vector_type *
 
 
 /**
-   Load an index for (slightly) faster mounting of the filesystem. The
-   function starts be reading a header and check if the current index
-   file is applicable.
+   Loads an index in the original INDEX_FORMAT_VERSION_HASH format,
+   i.e. a list of (filename, node) pairs which are inserted one by one
+   in the index hash table.
+*/
+
+static void block_fs_load_index_hash( block_fs_type * block_fs ) {
+  /* Read the whole index file in one single read operation. */
+  buffer_type * buffer = buffer_fread_alloc( block_fs->index_file );
+
+  buffer_fskip( buffer , sizeof( time_t ) + 2 * sizeof( int ));
+  /*1: Loading all the active nodes. */
+  {
+    int num_active_nodes = buffer_fread_int( buffer );
+    hash_resize( block_fs->index , num_active_nodes * 2 + 64);
+
+    for (int i=0; i < num_active_nodes; i++) {
+      const char * filename = buffer_fread_string( buffer );
+      file_node_type * file_node = file_node_index_buffer_fread_alloc( buffer );
+      block_fs_install_node( block_fs , file_node);
+      block_fs_insert_index_node(block_fs , filename , file_node);
+    }
+  }
+
+  /*2: Loading all the free nodes. */
+  {
+    int num_free_nodes = buffer_fread_int( buffer );
+    for (int i=0; i < num_free_nodes; i++) {
+      file_node_type * file_node = file_node_index_buffer_fread_alloc( buffer );
+      block_fs_install_node( block_fs , file_node);
+      block_fs_insert_free_node(block_fs , file_node);
+    }
+  }
+  buffer_free( buffer );
+}
+
+
+/**
+   Mounts the sorted index file with mmap(). The active nodes are not
+   inserted in the hash table, they are looked up in the sorted index
+   with binary search; only the free nodes are loaded right away.
+
+   Returns false if the index is not consistent with the data file, or
+   the checksum does not match; in that case the calling scope must
+   rebuild the index from the data file.
+*/
+
+static bool block_fs_load_index_sorted( block_fs_type * block_fs , time_t data_mtime ) {
+  bool loaded = false;
+  int fd = open( block_fs->index_file , O_RDONLY );
+  if (fd == -1)
+    return false;
+
+  {
+    struct stat index_stat;
+    if ((fstat( fd , &index_stat ) == 0) && ((size_t) index_stat.st_size >= sizeof(index_header_type))) {
+      size_t map_size = index_stat.st_size;
+      void * map = mmap( NULL , map_size , PROT_READ , MAP_SHARED , fd , 0 );
+
+      if (map != MAP_FAILED) {
+        const index_header_type * header = (const index_header_type *) map;
+        const char * payload = (const char *) map + sizeof(index_header_type);
+        size_t payload_size  = map_size - sizeof(index_header_type);
+
+        if ((header->data_mtime == data_mtime) &&
+            (header->num_active >= 0) && (header->num_free >= 0) && (header->string_size >= 0) &&
+            (payload_size == (header->num_active + header->num_free) * sizeof(index_record_type) + header->string_size) &&
+            (header->checksum == block_fs_index_checksum( INDEX_CHECKSUM_INIT , payload , payload_size )))
+          loaded = true;
+
+        if (loaded) {
+          const index_record_type * records = (const index_record_type *) payload;
+
+          block_fs->index_map         = (char *) map;
+          block_fs->index_map_size    = map_size;
+          block_fs->index_records     = records;
+          block_fs->num_index_records = header->num_active;
+          block_fs->index_strings     = payload + (header->num_active + header->num_free) * sizeof(index_record_type);
+          block_fs->index_nodes       = (file_node_type **) util_calloc( header->num_active , sizeof * block_fs->index_nodes );
+          for (int i = 0; i < header->num_active; i++)
+            block_fs->index_nodes[i] = NULL;
+
+          for (int i = 0; i < header->num_free; i++) {
+            file_node_type * file_node = file_node_alloc_from_record( &records[ header->num_active + i ] );
+            block_fs_install_node( block_fs , file_node);
+            block_fs_insert_free_node(block_fs , file_node);
+          }
+          block_fs->data_file_size = util_size_t_max( block_fs->data_file_size , header->data_file_size );
+          block_fs->index_dirty    = false;
+        } else {
+          fprintf(stderr,"** Warning: index file:%s is not consistent with the data file - will be rebuilt.\n", block_fs->index_file);
+          munmap( map , map_size );
+        }
+      }
+    }
+  }
+  close( fd );
+  return loaded;
+}
+
+
+/**
+   Load an index for faster mounting of the filesystem. The function
+   starts be reading a header and check if the current index file is
+   applicable.
 
    Will return true of the loading succedeed, and false if no index
    was loaded.
@@ -991,45 +1376,28 @@ static bool block_fs_load_index( block_fs_type * block_fs ) {
     if (stream != NULL) {
       int    id          = util_fread_int( stream );
       int    version     = util_fread_int( stream );
-      time_t index_mtime = util_fread_time_t( stream );
-
       time_t data_mtime  = data_stat.st_mtime;
-      fclose( stream );
-
-      if ((id == INDEX_MAGIC_INT) &&               /* This is indeed an index file. */
-          (version == INDEX_FORMAT_VERSION) &&     /* The version on disk agrees with this version. */
-          (index_mtime == data_mtime)) {           /* The time stamp agrees with the time stamp of the data. */
 
-        /* Read the whole index file in one single read operation. */
-        buffer_type * buffer = buffer_fread_alloc( block_fs->index_file );
+      if (id != INDEX_MAGIC_INT) {      /* This is not an index file. */
+        fclose( stream );
+        return false;
+      }
 
-        buffer_fskip( buffer , sizeof( time_t ) + 2 * sizeof( int ));
-        /*1: Loading all the active nodes. */
-        {
-          int num_active_nodes = buffer_fread_int( buffer );
-          hash_resize( block_fs->index , num_active_nodes * 2 + 64);
+      if (version == INDEX_FORMAT_VERSION) {
+        fclose( stream );
+        return block_fs_load_index_sorted( block_fs , data_mtime );
+      }
 
-          for (int i=0; i < num_active_nodes; i++) {
-            const char * filename = buffer_fread_string( buffer );
-            file_node_type * file_node = file_node_index_buffer_fread_alloc( buffer );
-            block_fs_install_node( block_fs , file_node);
-            block_fs_insert_index_node(block_fs , filename , file_node);
-          }
-        }
+      if (version == INDEX_FORMAT_VERSION_HASH) {
+        time_t index_mtime = util_fread_time_t( stream );
+        fclose( stream );
 
-        /*2: Loading all the free nodes. */
-        {
-          int num_free_nodes = buffer_fread_int( buffer );
-          for (int i=0; i < num_free_nodes; i++) {
-            file_node_type * file_node = file_node_index_buffer_fread_alloc( buffer );
-            block_fs_install_node( block_fs , file_node);
-            block_fs_insert_free_node(block_fs , file_node);
-          }
+        if (index_mtime == data_mtime) {   /* The time stamp agrees with the time stamp of the data. */
+          block_fs_load_index_hash( block_fs );
+          return true;
         }
-        buffer_free( buffer );
-
-        return true;
-      }
+      } else
+        fclose( stream );
     }
   }
   /** No index was loaded - for whatever reason. */
@@ -1042,6 +1410,32 @@ size_t block_fs_get_cache_usage( const block_fs_type * block_fs ) {
 }
 
 
+size_t block_fs_get_cache_hits( const block_fs_type * block_fs ) {
+  return block_fs->cache_hits;
+}
+
+
+size_t block_fs_get_cache_misses( const block_fs_type * block_fs ) {
+  return block_fs->cache_misses;
+}
+
+
+/**
+   Sets the total size of the payload cache; the least recently used
+   nodes are evicted from the cache to stay below this size. Nodes
+   larger than the max_cache_size argument given when mounting are
+   never cached, and with max_cache_size == 0 the cache is disabled.
+*/
+
+void block_fs_set_max_total_cache_size( block_fs_type * block_fs , size_t max_total_cache_size) {
+  pthread_mutex_lock( &block_fs->cache_lock );
+  block_fs->max_total_cache_size = max_total_cache_size;
+  while (block_fs->total_cache_size > block_fs->max_total_cache_size)
+    block_fs_cache_drop__( block_fs , block_fs->cache_tail );
+  pthread_mutex_unlock( &block_fs->cache_lock );
+}
+
+
 bool block_fs_is_mount( const char * mount_file ) {
   FILE * stream            = util_fopen( mount_file , "r");
   int id                   = util_fread_int( stream );
@@ -1096,64 +1490,61 @@ block_fs_type * block_fs_mount( const char * mount_file ,
 
 
 
-static void block_fs_unlink_free_node( block_fs_type * block_fs , free_node_type * node) {
-  free_node_type * prev = node->prev;
-  free_node_type * next = node->next;
-
-  if (prev == NULL)
-    /* Special case: popping off the head of the list. */
-    block_fs->free_nodes = next;
-  else
-    prev->next = next;
-
-  if (next != NULL)
-    next->prev = prev;
-
-  block_fs->num_free_nodes--;
-  block_fs->free_size -= node->file_node->node_size;
-  free_node_free( node );
-}
-
-
-
 /**
-   This function first checks the free nodes if any of them can be
-   used, otherwise a new node is created.
+   This function first checks the free nodes for the smallest node
+   which is large enough, otherwise a new node is created. If the free
+   node is more than one block larger than the required size, the
+   tail is split off and inserted as a new free node.
+
+   When the tail is split off, the header of the new free node is
+   written before the node is handed out; if the application dies
+   before the new content has been completely written, the rebuilt
+   index will see either the old free node (covering both parts) or
+   an incomplete node followed by the new free node.
 */
 
 static file_node_type * block_fs_get_new_node( block_fs_type * block_fs , const char * filename , size_t min_size) {
+  int node_size;
+  {
+    div_t d   = div( min_size , block_fs->block_size );
+    node_size = d.quot * block_fs->block_size;
+    if (d.rem)
+      node_size += block_fs->block_size;
+  }
 
-  free_node_type * current = block_fs->free_nodes;
+  {
+    free_size_index_type::iterator iter = block_fs->free_sizes->lower_bound( std::make_pair( (int) min_size , 0L ));
+    if (iter != block_fs->free_sizes->end()) {
+      /*
+         iter points to the best fitting free node. Before we return it we must:
 
-  while (current != NULL && (current->file_node->node_size < min_size)) {
-    current = current->next;
-  }
-  if (current != NULL) {
-    /*
-       Current points to a file_node which can be used. Before we return current we must:
+         1. Remove it from the free node indices.
+         2. Possibly split off the unused tail as a new free node.
 
-       1. Remove current from the free_nodes list.
-       2. Add current to the index hash.
+         The calling scope will add it to the index hash.
+      */
+      file_node_type * file_node = block_fs_lookup_free_node( block_fs , iter->second );
+      int tail_size = file_node->node_size - node_size;
+      block_fs_unlink_free_node( block_fs , file_node );
 
-    */
-    file_node_type * file_node = current->file_node;
-    block_fs_unlink_free_node( block_fs , current );
+      if ((block_fs->data_stream != NULL) && (tail_size >= block_fs->block_size) && (tail_size >= FREE_NODE_MIN_SIZE)) {
+        file_node_type * tail_node = file_node_alloc( NODE_FREE , file_node->node_offset + node_size , tail_size );
+        file_node->node_size = node_size;
 
-    return file_node;
-  } else {
-    /* No usable nodes in the free nodes list - must allocate a brand new one. */
+        file_node_fwrite( tail_node , NULL , block_fs->data_stream );
+        block_fs_install_node( block_fs , tail_node );
+        block_fs_insert_free_node( block_fs , tail_node );
+      }
 
+      return file_node;
+    }
+  }
+
+  {
+    /* No usable nodes in the free nodes list - must allocate a brand new one. */
     long int offset;
-    int node_size;
     file_node_type * new_node;
 
-    {
-      div_t d   = div( min_size , block_fs->block_size );
-      node_size = d.quot * block_fs->block_size;
-      if (d.rem)
-        node_size += block_fs->block_size;
-    }
-
     /* Must lock the total size here ... */
     offset = block_fs->data_file_size;
     new_node = file_node_alloc(NODE_IN_USE , offset , node_size);
@@ -1164,11 +1555,79 @@ static file_node_type * block_fs_get_new_node( block_fs_type * block_fs , const
 }
 
 
+/**
+   Merges the free node with adjacent free nodes on both sides, and
+   inserts the resulting node in the free node indices. The merged
+   node is the first of the nodes, and only its header is rewritten;
+   the END_TAG of the last node becomes the END_TAG of the merged
+   node. The absorbed file_node instances are still owned by the
+   file_nodes vector, but are not referenced from anywhere else.
+*/
+
+static void block_fs_merge_free_node( block_fs_type * block_fs , file_node_type * node ) {
+  bool merged = false;
+
+  if (block_fs->data_stream != NULL) {
+    file_node_type * next = block_fs_lookup_free_node( block_fs , node->node_offset + node->node_size );
+    if (next != NULL) {
+      block_fs_unlink_free_node( block_fs , next );
+      node->node_size += next->node_size;
+      merged = true;
+    }
+
+    {
+      free_offset_index_type::iterator iter = block_fs->free_nodes->lower_bound( node->node_offset );
+      if (iter != block_fs->free_nodes->begin()) {
+        file_node_type * prev = (--iter)->second;
+        if (prev->node_offset + prev->node_size == node->node_offset) {
+          block_fs_unlink_free_node( block_fs , prev );
+          prev->node_size += node->node_size;
+          node = prev;
+          merged = true;
+        }
+      }
+    }
+
+    if (merged)
+      file_node_fwrite( node , NULL , block_fs->data_stream );
+  }
+  block_fs_insert_free_node( block_fs , node );
+}
+
+
 
 
 
 bool block_fs_has_file__( const block_fs_type * block_fs , const char * filename) {
-  return hash_has_key( block_fs->index , filename );
+  if (block_fs->index_map != NULL)
+    return (block_fs_index_lookup( block_fs , filename ) >= 0);
+  else
+    return hash_has_key( block_fs->index , filename );
+}
+
+
+/*
+  Lookup of an active node, both when the filesystem is mounted from
+  a sorted index and when the nodes are in the hash table. Will abort
+  if the file does not exist.
+*/
+
+static file_node_type * block_fs_get_node__( block_fs_type * block_fs , const char * filename) {
+  if (block_fs->index_map != NULL) {
+    int index = block_fs_index_lookup( block_fs , filename );
+    if (index < 0)
+      util_abort("%s: no file:%s in filesystem mounted at:%s \n",__func__ , filename , block_fs->mount_file);
+    return block_fs_index_iget_node( block_fs , index );
+  } else
+    return (file_node_type*)hash_get( block_fs->index , filename );
+}
+
+
+static int block_fs_get_num_files__( const block_fs_type * block_fs ) {
+  if (block_fs->index_map != NULL)
+    return block_fs->num_index_records;
+  else
+    return hash_get_size( block_fs->index );
 }
 
 
@@ -1188,18 +1647,25 @@ bool block_fs_has_file( block_fs_type * block_fs , const char * filename) {
 
 static void block_fs_unlink_file__( block_fs_type * block_fs , const char * filename ) {
   file_node_type * node = (file_node_type*)hash_pop( block_fs->index , filename );
-  block_fs_clear_cache_node( block_fs , node );
+  block_fs_cache_invalidate( block_fs , node );
 
   node->status      = NODE_FREE;
   node->data_offset = 0;
   node->data_size   = 0;
   if (block_fs->data_stream != NULL) {
-    fsync( block_fs->data_fd );
+    /*
+      With fsync_interval == 0 the syncing is left to the caller,
+      i.e. group commit with one block_fs_fsync() call when a batch of
+      writes is complete.
+    */
+    if (block_fs->fsync_interval)
+      fsync( block_fs->data_fd );
     block_fs_fseek(block_fs , node->node_offset);
     file_node_fwrite( node , NULL , block_fs->data_stream );
-    fsync( block_fs->data_fd );
+    if (block_fs->fsync_interval)
+      fsync( block_fs->data_fd );
   }
-  block_fs_insert_free_node( block_fs , node );
+  block_fs_merge_free_node( block_fs , node );
 }
 
 /**
@@ -1259,6 +1725,7 @@ bool block_fs_rotate( block_fs_type * block_fs , double fragmentation_limit) {
 
 void block_fs_fsync( block_fs_type * block_fs ) {
   if (block_fs->data_owner) {
+    fflush( block_fs->data_stream );
     //fdatasync( block_fs->data_fd );
     fsync( block_fs->data_fd );
     block_fs_fseek( block_fs , block_fs->data_file_size );
@@ -1269,6 +1736,34 @@ void block_fs_fsync( block_fs_type * block_fs ) {
 
 
 
+/**
+   Sets how often the data file is fsync()'ed: for fsync_interval ==
+   n > 0 an fsync() is issued for every n'th write, for fsync_interval
+   == 0 block_fs never calls fsync() while writing and it is the
+   responsibility of the caller to call block_fs_fsync() when a batch
+   of writes is complete. Crash safety of the individual nodes does
+   not depend on this; a node which was only partially written is
+   recognized by the NODE_WRITE_ACTIVE markers when the file is
+   mounted.
+
+   The fsync_interval can also be set on read only instances, so the
+   lock is taken directly instead of with block_fs_aquire_wlock().
+*/
+
+void block_fs_set_fsync_interval( block_fs_type * block_fs , int fsync_interval) {
+  pthread_rwlock_wrlock( &block_fs->rw_lock );
+  block_fs->fsync_interval = fsync_interval;
+  block_fs_release_rwlock( block_fs );
+}
+
+
+int block_fs_get_fsync_interval( const block_fs_type * block_fs ) {
+  return block_fs->fsync_interval;
+}
+
+
+
+
 /**
    The single lowest-level write function:
 
@@ -1290,17 +1785,8 @@ void block_fs_fsync( block_fs_type * block_fs ) {
 
 
 static void block_fs_fwrite__(block_fs_type * block_fs , const char * filename , file_node_type * node , const void * ptr , int data_size) {
-
-#ifdef ENABLE_CACHE
-  if ((node->cache_size == data_size) && (memcmp( ptr , node->cache , data_size ) == 0))
-    /* The current cache is identical to the data we are attempting to write - can leave immediately. */
-    return;
-#else
-  if (false)
-    return;
-#endif
-
-  else {
+  block_fs_cache_invalidate( block_fs , node );
+  {
     block_fs_fseek(block_fs , node->node_offset);
     node->status      = NODE_IN_USE;
     node->data_size   = data_size;
@@ -1316,7 +1802,6 @@ static void block_fs_fwrite__(block_fs_type * block_fs , const char * filename ,
     /* Writes the file node header data, including the NODE_END_TAG. */
     file_node_fwrite( node , filename , block_fs->data_stream );
 
-    block_fs_update_cache_node( block_fs , node , data_size , ptr);
     block_fs->write_count++;
     if (block_fs->fsync_interval && ((block_fs->write_count % block_fs->fsync_interval) == 0))
       block_fs_fsync( block_fs );
@@ -1368,6 +1853,42 @@ void block_fs_fwrite_file(block_fs_type * block_fs , const char * filename , con
     if ((block_fs->free_size * 1.0 / block_fs->data_file_size) > block_fs->fragmentation_limit)
       block_fs_rotate__( block_fs );
 
+    block_fs_update_data_map( block_fs );
+  }
+  block_fs_release_rwlock( block_fs );
+}
+
+
+/**
+   Writes a list of files in one go; the write lock is only taken
+   once, the fsync() which is normally issued every fsync_interval
+   writes is replaced with one fsync() when the whole list has been
+   written, and the fragmentation check is only performed at the
+   end. The filenames and buffers are matched by index.
+*/
+
+void block_fs_fwrite_buffer_list(block_fs_type * block_fs , const stringlist_type * filenames , const vector_type * buffers) {
+  if (stringlist_get_size( filenames ) != vector_get_size( buffers ))
+    util_abort("%s: size mismatch between filenames:%d and buffers:%d \n",__func__ , stringlist_get_size( filenames ) , vector_get_size( buffers ));
+
+  block_fs_aquire_wlock( block_fs );
+  {
+    int fsync_interval = block_fs->fsync_interval;
+    block_fs->fsync_interval = 0;
+
+    for (int i = 0; i < stringlist_get_size( filenames ); i++) {
+      const buffer_type * buffer = (const buffer_type *) vector_iget_const( buffers , i );
+      block_fs_fwrite_file_unlocked( block_fs , stringlist_iget( filenames , i ) , buffer_get_data( buffer ) , buffer_get_size( buffer ));
+    }
+
+    block_fs->fsync_interval = fsync_interval;
+    if (block_fs->fsync_interval && (stringlist_get_size( filenames ) > 0))
+      block_fs_fsync( block_fs );
+
+    if ((block_fs->free_size * 1.0 / block_fs->data_file_size) > block_fs->fragmentation_limit)
+      block_fs_rotate__( block_fs );
+
+    block_fs_update_data_map( block_fs );
   }
   block_fs_release_rwlock( block_fs );
 }
@@ -1380,6 +1901,17 @@ void block_fs_defrag( block_fs_type * block_fs ) {
 }
 
 
+/**
+   When the filesystem is closed it will be defragmented if the
+   fragmentation is above this limit; the default is 1.0, i.e. the
+   filesystem is never defragmented on close.
+*/
+
+void block_fs_set_close_fragmentation_limit( block_fs_type * block_fs , double fragmentation_limit) {
+  block_fs->close_fragmentation_limit = fragmentation_limit;
+}
+
+
 void block_fs_fwrite_buffer(block_fs_type * block_fs , const char * filename , const buffer_type * buffer) {
   block_fs_fwrite_file( block_fs , filename , buffer_get_data( buffer ) , buffer_get_size( buffer ));
 }
@@ -1389,23 +1921,22 @@ void block_fs_fwrite_buffer(block_fs_type * block_fs , const char * filename , c
    Need extra locking here - because the global rwlock allows many
    concurrent readers.
 */
-static void block_fs_fread__(block_fs_type * block_fs , const file_node_type * file_node , void * ptr , size_t read_bytes) {
+static void block_fs_fread__(block_fs_type * block_fs , file_node_type * file_node , void * ptr , size_t read_bytes) {
+  /* The mapped data is already in memory; the payload cache is not used in mmap mode. */
+  if (block_fs->data_map != NULL) {
+    memcpy( ptr , block_fs_get_node_map_data( block_fs , file_node ) , read_bytes );
+    return;
+  }
 
-#ifdef ENABLE_CACHE
-  if (file_node->cache != NULL)
-    file_node_read_from_cache( file_node , ptr , read_bytes);
-  else
-#else
-    if (true)
-#endif
+  if (block_fs_cache_fread( block_fs , file_node , ptr , NULL , read_bytes ))
+    return;
 
-  {
-    pthread_mutex_lock( &block_fs->io_lock );
-    block_fs_fseek_node_data( block_fs , file_node );
-    util_fread( ptr , 1 , read_bytes , block_fs->data_stream , __func__);
-    //file_node_verify_end_tag( file_node , block_fs->data_stream );
-    pthread_mutex_unlock( &block_fs->io_lock );
-  }
+  pthread_mutex_lock( &block_fs->io_lock );
+  block_fs_fseek_node_data( block_fs , file_node );
+  util_fread( ptr , 1 , read_bytes , block_fs->data_stream , __func__);
+  //file_node_verify_end_tag( file_node , block_fs->data_stream );
+  pthread_mutex_unlock( &block_fs->io_lock );
+  block_fs_cache_insert( block_fs , file_node , ptr , read_bytes );
 }
 
 
@@ -1416,7 +1947,7 @@ static void block_fs_fread__(block_fs_type * block_fs , const file_node_type * f
 void block_fs_fread_realloc_buffer( block_fs_type * block_fs , const char * filename , buffer_type * buffer) {
   block_fs_aquire_rlock( block_fs );
   {
-    file_node_type * node = (file_node_type*)hash_get( block_fs->index , filename);
+    file_node_type * node = block_fs_get_node__( block_fs , filename );
 
     buffer_clear( buffer );   /* Setting: content_size = 0; pos = 0;  */
     {
@@ -1425,20 +1956,15 @@ void block_fs_fread_realloc_buffer( block_fs_type * block_fs , const char * file
          block_fs_fread__():
       */
 
-#ifdef ENABLE_CACHE
-      if (node->cache != NULL)
-        file_node_buffer_read_from_cache( node , buffer );
-      else
-#else
-      if (true)
-#endif
-
-      {
+      if (block_fs->data_map != NULL)
+        buffer_fwrite( buffer , block_fs_get_node_map_data( block_fs , node ) , 1 , node->data_size );
+      else if (!block_fs_cache_fread( block_fs , node , NULL , buffer , node->data_size )) {
         pthread_mutex_lock( &block_fs->io_lock );
         block_fs_fseek_node_data(block_fs , node );
         buffer_stream_fread( buffer , node->data_size , block_fs->data_stream );
         //file_node_verify_end_tag( node , block_fs->data_stream );
         pthread_mutex_unlock( &block_fs->io_lock );
+        block_fs_cache_insert( block_fs , node , buffer_get_data( buffer ) , node->data_size );
       }
 
     }
@@ -1453,6 +1979,68 @@ void block_fs_fread_realloc_buffer( block_fs_type * block_fs , const char * file
 
 
 
+/**
+   Switches the instance to read through a read-only mmap() of the data
+   file. Readers then copy directly out of the mapping, without the
+   seek + fread sequence under the io_lock, so many threads can read
+   in parallel. The mapping is refreshed after every write, and
+   recreated when the data file grows beyond the mapping or is
+   rotated. The payload cache is not used in mmap mode.
+
+   Returns true if the data file could be mapped.
+*/
+
+bool block_fs_enable_mmap( block_fs_type * block_fs ) {
+  bool mapped;
+  pthread_rwlock_wrlock( &block_fs->rw_lock );
+  {
+    block_fs->use_mmap = true;
+    block_fs_update_data_map( block_fs );
+    mapped = (block_fs->data_map != NULL);
+    block_fs->use_mmap = mapped;
+    if (mapped)
+      block_fs_cache_clear( block_fs );
+  }
+  block_fs_release_rwlock( block_fs );
+  return mapped;
+}
+
+
+bool block_fs_use_mmap( const block_fs_type * block_fs ) {
+  return block_fs->use_mmap;
+}
+
+
+/**
+   Returns a pointer directly into the mapped data file for
+   'filename', and the number of bytes in *data_size. There is no
+   copy involved. When the function returns non NULL the read lock is
+   held, and the calling scope must call block_fs_release_view() when
+   it is done with the data; the calling thread can not write to the
+   filesystem in the meantime.
+
+   If mmap mode is not enabled, or the file does not exist, the
+   function returns NULL and no lock is held.
+*/
+
+const void * block_fs_aquire_view( block_fs_type * block_fs , const char * filename , size_t * data_size) {
+  block_fs_aquire_rlock( block_fs );
+  if ((block_fs->data_map != NULL) && block_fs_has_file__( block_fs , filename )) {
+    const file_node_type * node = block_fs_get_node__( block_fs , filename );
+    *data_size = node->data_size;
+    return block_fs_get_node_map_data( block_fs , node );
+  }
+  block_fs_release_rwlock( block_fs );
+  return NULL;
+}
+
+
+void block_fs_release_view( block_fs_type * block_fs ) {
+  block_fs_release_rwlock( block_fs );
+}
+
+
+
 /*
   This function will read all the data stored in 'filename' - it is
   the responsability of the calling scope that ptr is sufficiently
@@ -1464,7 +2052,7 @@ void block_fs_fread_realloc_buffer( block_fs_type * block_fs , const char * file
 void block_fs_fread_file( block_fs_type * block_fs , const char * filename , void * ptr) {
   block_fs_aquire_rlock( block_fs );
   {
-    file_node_type * node = (file_node_type*)hash_get( block_fs->index , filename);
+    file_node_type * node = block_fs_get_node__( block_fs , filename );
     block_fs_fread__( block_fs , node , ptr , node->data_size);
   }
   block_fs_release_rwlock( block_fs );
@@ -1476,7 +2064,7 @@ int block_fs_get_filesize( block_fs_type * block_fs , const char * filename) {
   int data_size;
   block_fs_aquire_rlock( block_fs );
   {
-    file_node_type * node = (file_node_type*)hash_get( block_fs->index , filename );
+    file_node_type * node = block_fs_get_node__( block_fs , filename );
     data_size = node->data_size;
   }
   block_fs_release_rwlock( block_fs );
@@ -1484,45 +2072,78 @@ int block_fs_get_filesize( block_fs_type * block_fs , const char * filename) {
 }
 
 
+/**
+   Writes the index in the sorted INDEX_FORMAT_VERSION format; the
+   index is written to a temporary file which is then renamed to the
+   real index file. The index is only written if the filesystem has
+   been changed since it was mounted.
+*/
+
 static void block_fs_dump_index( block_fs_type * block_fs ) {
-  if (block_fs->data_owner) {
+  if (block_fs->data_owner && block_fs->index_dirty) {
     struct stat stat_buffer;
     int stat_return = stat(block_fs->data_file , &stat_buffer);
     if (stat_return != 0)
       return;
     {
-      time_t data_mtime = stat_buffer.st_mtime;
-      FILE * index_stream = util_fopen( block_fs->index_file , "w");
-      util_fwrite_int( INDEX_MAGIC_INT , index_stream );
-      util_fwrite_int( INDEX_FORMAT_VERSION , index_stream );
-      util_fwrite_time_t( data_mtime , index_stream );
+      stringlist_type * keys = hash_alloc_stringlist( block_fs->index );
+      int num_active = stringlist_get_size( keys );
+      int num_records = num_active + block_fs->num_free_nodes;
+      index_record_type * records = (index_record_type *) util_calloc( num_records , sizeof * records );
+      buffer_type * strings = buffer_alloc( 1024 );
+      index_header_type header;
+
+      stringlist_sort( keys , NULL );
+
+      /* 1: The active nodes, sorted on filename. */
+      for (int i = 0; i < num_active; i++) {
+        const char * key = stringlist_iget( keys , i );
+        const file_node_type * file_node = (const file_node_type*)hash_get( block_fs->index , key );
+
+        file_node_init_record( file_node , &records[i] , buffer_get_size( strings ));
+        buffer_fwrite( strings , key , 1 , strlen( key ) + 1 );
+      }
 
-      /* 1: Dumping the hash table of active nodes. */
+      /* 2: Information about empty slots in the datafile. */
       {
-        hash_iter_type * index_iter = hash_iter_alloc( block_fs->index );
-
-        util_fwrite_int( hash_get_size( block_fs->index ) , index_stream);
-        while (!hash_iter_is_complete( index_iter )) {
-          const char * key = hash_iter_get_next_key( index_iter );
-          const file_node_type * file_node = (const file_node_type*)hash_get( block_fs->index , key );
-
-          util_fwrite_string( key , index_stream);
-          file_node_dump_index( file_node , index_stream );
+        int i = num_active;
+        for (free_offset_index_type::const_iterator iter = block_fs->free_nodes->begin(); iter != block_fs->free_nodes->end(); ++iter) {
+          file_node_init_record( iter->second , &records[i] , -1 );
+          i++;
         }
-        hash_iter_free( index_iter );
       }
 
-      /* 2: Dumping information about empty slots in the datafile. */
-      util_fwrite_int( block_fs->num_free_nodes , index_stream );
+      memset( &header , 0 , sizeof header );
+      header.magic          = INDEX_MAGIC_INT;
+      header.version        = INDEX_FORMAT_VERSION;
+      header.data_mtime     = stat_buffer.st_mtime;
+      header.data_file_size = block_fs->data_file_size;
+      header.num_active     = num_active;
+      header.num_free       = block_fs->num_free_nodes;
+      header.string_size    = buffer_get_size( strings );
+      header.checksum       = block_fs_index_checksum( INDEX_CHECKSUM_INIT , (const char *) records , num_records * sizeof * records );
+      header.checksum       = block_fs_index_checksum( header.checksum , (const char *) buffer_get_data( strings ) , buffer_get_size( strings ));
+
       {
-        free_node_type * current = block_fs->free_nodes;
-        while ( current != NULL) {
-          file_node_dump_index( current->file_node , index_stream );
-          current = current->next;
+        char * tmp_file = util_alloc_sprintf( "%s.tmp" , block_fs->index_file );
+        FILE * index_stream = util_fopen( tmp_file , "w");
+
+        util_fwrite( &header , sizeof header , 1 , index_stream , __func__);
+        util_fwrite( records , sizeof * records , num_records , index_stream , __func__);
+        util_fwrite( buffer_get_data( strings ) , 1 , buffer_get_size( strings ) , index_stream , __func__);
+        fsync( fileno( index_stream ));
+        fclose( index_stream );
+
+        if (rename( tmp_file , block_fs->index_file ) != 0) {
+          fprintf(stderr,"** Warning: failed to rename %s -> %s: %s \n", tmp_file , block_fs->index_file , strerror( errno ));
+          util_unlink_existing( tmp_file );
         }
+        free( tmp_file );
       }
 
-      fclose( index_stream );
+      buffer_free( strings );
+      free( records );
+      stringlist_free( keys );
     }
   }
 }
@@ -1537,11 +2158,19 @@ static void block_fs_dump_index( block_fs_type * block_fs ) {
 */
 
 void block_fs_close( block_fs_type * block_fs , bool unlink_empty) {
+  if (block_fs->data_owner && (block_fs_get_fragmentation( block_fs ) > block_fs->close_fragmentation_limit))
+    block_fs_defrag( block_fs );
+
   block_fs_fsync( block_fs );
 
+  /*
+    Not using block_fs_aquire_wlock() here; that would move a sorted
+    index over to the hash table for no reason.
+  */
   if (block_fs->data_owner)
-    block_fs_aquire_wlock( block_fs );
+    pthread_rwlock_wrlock( &block_fs->rw_lock );
 
+  block_fs_unmap_data( block_fs );
   if (block_fs->data_stream != NULL)
     fclose( block_fs->data_stream );
 
@@ -1554,7 +2183,7 @@ void block_fs_close( block_fs_type * block_fs , bool unlink_empty) {
   }
 
   if (block_fs->data_owner) {
-    if ( unlink_empty && (hash_get_size( block_fs->index) == 0)) {
+    if ( unlink_empty && (block_fs_get_num_files__( block_fs ) == 0)) {
       util_unlink_existing( block_fs->data_file );
       util_unlink_existing( block_fs->index_file );
       util_unlink_existing( block_fs->mount_file );
@@ -1569,7 +2198,11 @@ void block_fs_close( block_fs_type * block_fs , bool unlink_empty) {
   free( block_fs->path );
   free( block_fs->mount_file );
 
-  free_node_free_list( block_fs->free_nodes );
+  block_fs_cache_clear( block_fs );
+  pthread_mutex_destroy( &block_fs->cache_lock );
+  block_fs_free_sorted_index( block_fs );
+  delete block_fs->free_nodes;
+  delete block_fs->free_sizes;
   hash_free( block_fs->index );
   vector_free( block_fs->file_nodes );
   free( block_fs );
@@ -1597,13 +2230,15 @@ static void block_fs_rotate__( block_fs_type * block_fs ) {
   block_fs->version++;
   block_fs_fwrite_mount_info__( block_fs->mount_file , block_fs->version );
   {
-    vector_type    * old_nodes         = block_fs->file_nodes;
-    hash_type      * old_index         = block_fs->index;
-    FILE           * old_data_stream   = block_fs->data_stream;
-    free_node_type * old_free_nodes    = block_fs->free_nodes;
-    char           * old_data_file     = util_alloc_string_copy( block_fs->data_file );
-    char           * old_lock_file     = util_alloc_string_copy( block_fs->lock_file );
-
+    vector_type            * old_nodes         = block_fs->file_nodes;
+    hash_type              * old_index         = block_fs->index;
+    FILE                   * old_data_stream   = block_fs->data_stream;
+    free_offset_index_type * old_free_nodes    = block_fs->free_nodes;
+    free_size_index_type   * old_free_sizes    = block_fs->free_sizes;
+    char                   * old_data_file     = util_alloc_string_copy( block_fs->data_file );
+    char                   * old_lock_file     = util_alloc_string_copy( block_fs->lock_file );
+
+    block_fs_cache_clear( block_fs );   /* The cache refers to the old file_node instances. */
     block_fs_reinit( block_fs );
     /**
         Now the block_fs pointers point to the new copy. Must use the
@@ -1640,12 +2275,15 @@ static void block_fs_rotate__( block_fs_type * block_fs ) {
 
     */
     fclose( old_data_stream );
+    block_fs_unmap_data( block_fs );
+    block_fs_update_data_map( block_fs );
     unlink( old_data_file );
     unlink( old_lock_file );
     free( old_lock_file );
     free( old_data_file );
 
-    free_node_free_list( old_free_nodes );
+    delete old_free_nodes;
+    delete old_free_sizes;
     hash_free( old_index );
     vector_free( old_nodes );
   }
@@ -1768,7 +2406,15 @@ vector_type * block_fs_alloc_filelist( block_fs_type * block_fs  , const char *
 
   /* Inserting the nodes from the index. */
   block_fs_aquire_rlock( block_fs );
-  {
+  if (block_fs->index_map != NULL) {
+    for (int i = 0; i < block_fs->num_index_records; i++) {
+      const char * key = block_fs_index_iget_name( block_fs , i );
+      if (pattern_match( pattern , key )) {
+        user_file_node_type * unode = user_file_node_alloc( key , block_fs_index_iget_node( block_fs , i ));
+        vector_append_owned_ref( sort_vector , unode , user_file_node_free__ );
+      }
+    }
+  } else {
     hash_iter_type * iter        = hash_iter_alloc( block_fs->index );
     while ( !hash_iter_is_complete( iter )) {
       const char * key            = hash_iter_get_next_key( iter );
@@ -1787,11 +2433,9 @@ vector_type * block_fs_alloc_filelist( block_fs_type * block_fs  , const char *
 
   /* Inserting the free nodes - the holes. */
   if (include_free_nodes) {
-    free_node_type * current = block_fs->free_nodes;
-    while (current != NULL) {
-      user_file_node_type * unode = user_file_node_alloc( NULL , current->file_node );
+    for (free_offset_index_type::const_iterator iter = block_fs->free_nodes->begin(); iter != block_fs->free_nodes->end(); ++iter) {
+      user_file_node_type * unode = user_file_node_alloc( NULL , iter->second );
       vector_append_owned_ref( sort_vector , unode , user_file_node_free__ );
-      current = current->next;
     }
   }
 
@@ -0,0 +1,424 @@
+/*
+   Copyright (C) 2019  Statoil ASA, Norway.
+
+   The file 'buffer_codec.cpp' is part of ERT - Ensemble based Reservoir Tool.
+
+   ERT is free software: you can redistribute it and/or modify
+   it under the terms of the GNU General Public License as published by
+   the Free Software Foundation, either version 3 of the License, or
+   (at your option) any later version.
+
+   ERT is distributed in the hope that it will be useful, but WITHOUT ANY
+   WARRANTY; without even the implied warranty of MERCHANTABILITY or
+   FITNESS FOR A PARTICULAR PURPOSE.
+
+   See the GNU General Public License at <http://www.gnu.org/licenses/gpl.html>
+   for more details.
+*/
+
+#include <stdint.h>
+#include <string.h>
+
+#include <ert/util/util.hpp>
+#include <ert/util/buffer.hpp>
+
+#include <ert/res_util/buffer_codec.hpp>
+
+/*
+  Codecs used when storing the (potentially very large) payload of
+  parameter and data nodes, e.g. a FIELD or GEN_DATA instance, in a
+  buffer. Apart from BUFFER_CODEC_ZLIB, which writes a bare zlib stream
+  as ERT always has done, all payloads are prefixed with a header:
+
+     int     BUFFER_CODEC_MAGIC
+     int     format version
+     int     codec actually used
+     int     element size used by the shuffle filter
+     int64   decoded size in bytes
+     int64   encoded size in bytes
+     ...     encoded payload
+
+  The magic is chosen so that its first byte is not a valid zlib CMF
+  byte, hence a reader can distinguish a header from a legacy zlib
+  stream, and cases written before the codecs were introduced remain
+  readable.
+
+  The BUFFER_CODEC_SHUFFLE_LZ codec first applies a byte-shuffle
+  filter, i.e. byte k of all the elements are stored consecutively.
+  For arrays of float/double values this collects the slowly varying
+  sign/exponent bytes in long runs, which the LZ stage can then
+  compress cheaply. The LZ stage is a small LZ77 variant in the LZ4
+  block format: a token with literal length in the upper and match
+  length in the lower nibble, the literals, a two byte little endian
+  offset and optionally extended lengths. When the LZ stage does not
+  reduce the size the data is stored with BUFFER_CODEC_RAW instead.
+*/
+
+#define BUFFER_CODEC_MAGIC    0x7AC0DEC5
+#define BUFFER_CODEC_VERSION  1
+#define BUFFER_CODEC_HEADER_SIZE (4 * sizeof(int) + 2 * sizeof(int64_t))
+
+#define LZ_HASH_LOG         16
+#define LZ_HASH_SIZE        (1 << LZ_HASH_LOG)
+#define LZ_MIN_MATCH        4
+#define LZ_MAX_OFFSET       65535
+#define LZ_LAST_LITERALS    8
+
+
+const char * buffer_codec_get_name( buffer_codec_type codec ) {
+  switch (codec) {
+  case(BUFFER_CODEC_ZLIB):
+    return "ZLIB";
+  case(BUFFER_CODEC_RAW):
+    return "RAW";
+  case(BUFFER_CODEC_SHUFFLE_LZ):
+    return "SHUFFLE_LZ";
+  default:
+    util_abort("%s: unrecognized codec:%d \n",__func__ , codec);
+    return NULL;
+  }
+}
+
+
+bool buffer_codec_sscanf( const char * name , buffer_codec_type * codec ) {
+  if (util_string_equal( name , "ZLIB" ))
+    *codec = BUFFER_CODEC_ZLIB;
+  else if (util_string_equal( name , "RAW" ))
+    *codec = BUFFER_CODEC_RAW;
+  else if (util_string_equal( name , "SHUFFLE_LZ" ))
+    *codec = BUFFER_CODEC_SHUFFLE_LZ;
+  else
+    return false;
+
+  return true;
+}
+
+/*****************************************************************/
+
+static void buffer_codec_shuffle( const unsigned char * src , unsigned char * target , size_t byte_size , int element_size) {
+  size_t num_elements = byte_size / element_size;
+  size_t tail_offset  = num_elements * element_size;
+
+  for (int k = 0; k < element_size; k++) {
+    unsigned char * target_ptr = &target[ k * num_elements ];
+    for (size_t i = 0; i < num_elements; i++)
+      target_ptr[i] = src[i * element_size + k];
+  }
+  memcpy( &target[tail_offset] , &src[tail_offset] , byte_size - tail_offset );
+}
+
+
+static void buffer_codec_unshuffle( const unsigned char * src , unsigned char * target , size_t byte_size , int element_size) {
+  size_t num_elements = byte_size / element_size;
+  size_t tail_offset  = num_elements * element_size;
+
+  for (int k = 0; k < element_size; k++) {
+    const unsigned char * src_ptr = &src[ k * num_elements ];
+    for (size_t i = 0; i < num_elements; i++)
+      target[i * element_size + k] = src_ptr[i];
+  }
+  memcpy( &target[tail_offset] , &src[tail_offset] , byte_size - tail_offset );
+}
+
+/*****************************************************************/
+
+static size_t lz_compress_bound( size_t byte_size ) {
+  return byte_size + byte_size / 255 + 16;
+}
+
+
+static uint32_t lz_read32( const unsigned char * ptr ) {
+  uint32_t value;
+  memcpy( &value , ptr , sizeof value );
+  return value;
+}
+
+
+static uint32_t lz_hash( uint32_t sequence ) {
+  return (sequence * 2654435761U) >> (32 - LZ_HASH_LOG);
+}
+
+
+static size_t lz_write_length( unsigned char * target , size_t op , size_t length ) {
+  while (length >= 255) {
+    target[op++] = 255;
+    length -= 255;
+  }
+  target[op++] = (unsigned char) length;
+  return op;
+}
+
+
+static size_t lz_write_sequence( unsigned char * target , size_t op , const unsigned char * literals , size_t literal_length , size_t offset , size_t match_length) {
+  size_t token_literal = literal_length < 15 ? literal_length : 15;
+  size_t token_match   = 0;
+
+  if (match_length > 0)
+    token_match = (match_length - LZ_MIN_MATCH) < 15 ? (match_length - LZ_MIN_MATCH) : 15;
+
+  target[op++] = (unsigned char) ((token_literal << 4) | token_match);
+  if (literal_length >= 15)
+    op = lz_write_length( target , op , literal_length - 15 );
+
+  memcpy( &target[op] , literals , literal_length );
+  op += literal_length;
+
+  if (match_length > 0) {
+    target[op++] = (unsigned char) (offset & 0xFF);
+    target[op++] = (unsigned char) (offset >> 8);
+    if (match_length - LZ_MIN_MATCH >= 15)
+      op = lz_write_length( target , op , match_length - LZ_MIN_MATCH - 15 );
+  }
+  return op;
+}
+
+
+/*
+  The hash table stores position + 1, so that zero can be used for an
+  empty slot. The last LZ_LAST_LITERALS bytes are always emitted as
+  literals, and the stream ends with a sequence without a match.
+*/
+
+static size_t lz_compress( const unsigned char * src , size_t byte_size , unsigned char * target ) {
+  size_t op = 0;
+  size_t anchor = 0;
+
+  if (byte_size > LZ_LAST_LITERALS + LZ_MIN_MATCH) {
+    size_t * table = (size_t *) util_malloc( LZ_HASH_SIZE * sizeof * table );   /* util_calloc() does not clear the memory. */
+    size_t match_limit = byte_size - LZ_LAST_LITERALS;
+    size_t ip = 0;
+    memset( table , 0 , LZ_HASH_SIZE * sizeof * table );
+
+    while (ip + LZ_MIN_MATCH <= match_limit) {
+      uint32_t sequence = lz_read32( &src[ip] );
+      uint32_t h = lz_hash( sequence );
+      size_t ref = table[h];
+
+      table[h] = ip + 1;
+      if ((ref > 0) && (ip - (ref - 1) <= LZ_MAX_OFFSET) && (lz_read32( &src[ref - 1]) == sequence)) {
+        size_t match_pos = ref - 1;
+        size_t match_length = LZ_MIN_MATCH;
+
+        while ((ip + match_length < match_limit) && (src[match_pos + match_length] == src[ip + match_length]))
+          match_length++;
+
+        op = lz_write_sequence( target , op , &src[anchor] , ip - anchor , ip - match_pos , match_length );
+        ip += match_length;
+        anchor = ip;
+      } else
+        ip++;
+    }
+    free( table );
+  }
+
+  return lz_write_sequence( target , op , &src[anchor] , byte_size - anchor , 0 , 0 );
+}
+
+
+static size_t lz_read_length( const unsigned char * src , size_t src_size , size_t * ip ) {
+  size_t length = 0;
+  unsigned char byte;
+  do {
+    if (*ip >= src_size)
+      util_abort("%s: corrupt input - length extends beyond end of data \n",__func__);
+    byte = src[(*ip)++];
+    length += byte;
+  } while (byte == 255);
+  return length;
+}
+
+
+static void lz_decompress( const unsigned char * src , size_t src_size , unsigned char * target , size_t target_size) {
+  size_t ip = 0;
+  size_t op = 0;
+
+  while (ip < src_size) {
+    unsigned char token = src[ip++];
+    size_t literal_length = token >> 4;
+    if (literal_length == 15)
+      literal_length += lz_read_length( src , src_size , &ip );
+
+    if ((literal_length > src_size - ip) || (literal_length > target_size - op))
+      util_abort("%s: corrupt input - literals extend beyond end of data \n",__func__);
+
+    memcpy( &target[op] , &src[ip] , literal_length );
+    ip += literal_length;
+    op += literal_length;
+
+    if (ip == src_size)
+      break;
+
+    if (src_size - ip < 2)
+      util_abort("%s: corrupt input - truncated match offset \n",__func__);
+    {
+      size_t offset = src[ip] | (src[ip + 1] << 8);
+      size_t match_length = (token & 0x0F) + LZ_MIN_MATCH;
+      ip += 2;
+
+      if ((token & 0x0F) == 15)
+        match_length += lz_read_length( src , src_size , &ip );
+
+      if ((offset == 0) || (offset > op) || (match_length > target_size - op))
+        util_abort("%s: corrupt input - invalid match \n",__func__);
+
+      /* The match can overlap the output; must copy byte by byte. */
+      {
+        const unsigned char * match_ptr = &target[op - offset];
+        for (size_t i = 0; i < match_length; i++)
+          target[op + i] = match_ptr[i];
+      }
+      op += match_length;
+    }
+  }
+
+  if (op != target_size)
+    util_abort("%s: corrupt input - decoded %zd bytes - expected %zd \n",__func__ , op , target_size);
+}
+
+/*****************************************************************/
+
+static void buffer_codec_fwrite_header( buffer_type * buffer , buffer_codec_type codec , int element_size , size_t byte_size , size_t encoded_size) {
+  int64_t size;
+
+  buffer_fwrite_int( buffer , BUFFER_CODEC_MAGIC );
+  buffer_fwrite_int( buffer , BUFFER_CODEC_VERSION );
+  buffer_fwrite_int( buffer , codec );
+  buffer_fwrite_int( buffer , element_size );
+
+  size = byte_size;
+  buffer_fwrite( buffer , &size , sizeof size , 1 );
+  size = encoded_size;
+  buffer_fwrite( buffer , &size , sizeof size , 1 );
+}
+
+
+static bool buffer_codec_has_header( const buffer_type * buffer ) {
+  if (buffer_get_remaining_size( buffer ) >= BUFFER_CODEC_HEADER_SIZE) {
+    const char * data = (const char *) buffer_get_data( buffer );
+    int magic;
+
+    memcpy( &magic , &data[ buffer_get_offset( buffer ) ] , sizeof magic );
+    return (magic == BUFFER_CODEC_MAGIC);
+  }
+  return false;
+}
+
+
+/*
+  Will write byte_size bytes from data to the buffer using the codec
+  @codec. The element_size argument is the size of the individual
+  elements in data, e.g. sizeof(float), and is used by the shuffle
+  filter. Returns the number of payload bytes written, excluding the
+  header.
+*/
+
+size_t buffer_codec_fwrite( buffer_type * buffer , buffer_codec_type codec , const void * data , size_t byte_size , int element_size) {
+  if (element_size < 1)
+    element_size = 1;
+
+  switch (codec) {
+  case(BUFFER_CODEC_ZLIB):
+#ifdef ERT_HAVE_ZLIB
+    return buffer_fwrite_compressed( buffer , data , byte_size );
+#else
+    util_abort("%s: ERT compiled without zlib support \n",__func__);
+    return 0;
+#endif
+  case(BUFFER_CODEC_RAW):
+    buffer_codec_fwrite_header( buffer , BUFFER_CODEC_RAW , element_size , byte_size , byte_size );
+    buffer_fwrite( buffer , data , 1 , byte_size );
+    return byte_size;
+  case(BUFFER_CODEC_SHUFFLE_LZ):
+    {
+      const unsigned char * src = (const unsigned char *) data;
+      unsigned char * shuffled = NULL;
+      unsigned char * encoded = (unsigned char *) util_malloc( lz_compress_bound( byte_size ));
+      size_t encoded_size;
+
+      if (element_size > 1) {
+        shuffled = (unsigned char *) util_malloc( byte_size );
+        buffer_codec_shuffle( src , shuffled , byte_size , element_size );
+        src = shuffled;
+      }
+
+      encoded_size = lz_compress( src , byte_size , encoded );
+      if (encoded_size < byte_size) {
+        buffer_codec_fwrite_header( buffer , BUFFER_CODEC_SHUFFLE_LZ , element_size , byte_size , encoded_size );
+        buffer_fwrite( buffer , encoded , 1 , encoded_size );
+      } else {
+        encoded_size = byte_size;
+        buffer_codec_fwrite_header( buffer , BUFFER_CODEC_RAW , element_size , byte_size , byte_size );
+        buffer_fwrite( buffer , data , 1 , byte_size );
+      }
+
+      free( encoded );
+      free( shuffled );
+      return encoded_size;
+    }
+  default:
+    util_abort("%s: unrecognized codec:%d \n",__func__ , codec);
+    return 0;
+  }
+}
+
+
+/*
+  Will read a payload written with buffer_codec_fwrite() and decode it
+  into target, which must have room for byte_size bytes. The codec is
+  inferred from the data, and payloads without the codec header are
+  treated as legacy zlib streams extending to the end of the buffer.
+  The data is always copied into target, also for the RAW codec; the
+  nodes own their data, and can not refer into the storage buffer.
+*/
+
+void buffer_codec_fread( buffer_type * buffer , void * target , size_t byte_size ) {
+  if (buffer_codec_has_header( buffer )) {
+    int version, codec, element_size;
+    int64_t stored_size, encoded_size;
+
+    buffer_fskip_int( buffer );
+    version = buffer_fread_int( buffer );
+    if (version != BUFFER_CODEC_VERSION)
+      util_abort("%s: unsupported storage format version:%d \n",__func__ , version);
+
+    codec = buffer_fread_int( buffer );
+    element_size = buffer_fread_int( buffer );
+    buffer_fread( buffer , &stored_size , sizeof stored_size , 1 );
+    buffer_fread( buffer , &encoded_size , sizeof encoded_size , 1 );
+
+    if ((size_t) stored_size != byte_size)
+      util_abort("%s: size mismatch - stored:%ld  expected:%zd \n",__func__ , (long) stored_size , byte_size);
+
+    if ((encoded_size < 0) || ((size_t) encoded_size > buffer_get_remaining_size( buffer )))
+      util_abort("%s: corrupt input - payload extends beyond end of buffer \n",__func__);
+
+    switch (codec) {
+    case(BUFFER_CODEC_RAW):
+      buffer_fread( buffer , target , 1 , byte_size );
+      break;
+    case(BUFFER_CODEC_SHUFFLE_LZ):
+      {
+        const unsigned char * src = (const unsigned char *) buffer_get_data( buffer ) + buffer_get_offset( buffer );
+
+        if (element_size > 1) {
+          unsigned char * shuffled = (unsigned char *) util_malloc( byte_size );
+          lz_decompress( src , encoded_size , shuffled , byte_size );
+          buffer_codec_unshuffle( shuffled , (unsigned char *) target , byte_size , element_size );
+          free( shuffled );
+        } else
+          lz_decompress( src , encoded_size , (unsigned char *) target , byte_size );
+
+        buffer_fskip( buffer , encoded_size );
+      }
+      break;
+    default:
+      util_abort("%s: unrecognized codec:%d \n",__func__ , codec);
+    }
+  } else {
+#ifdef ERT_HAVE_ZLIB
+    buffer_fread_compressed( buffer , buffer_get_remaining_size( buffer ) , target , byte_size );
+#else
+    util_abort("%s: ERT compiled without zlib support \n",__func__);
+#endif
+  }
+}
@@ -19,7 +19,10 @@
 #include <stdbool.h>
 
 #include <ert/util/util.hpp>
+#include <ert/util/ert_api_config.hpp>
 
+#include <ert/res_util/arg_pack.hpp>
+#include <ert/res_util/thread_pool.hpp>
 #include <ert/res_util/matrix.hpp>
 #include <ert/res_util/matrix_blas.hpp>
 
@@ -282,6 +285,133 @@ matrix_type * matrix_alloc_gram( const matrix_type * X , bool col) {
   return G;
 }
 
+
+/*****************************************************************/
+/*
+  In place multiplication A = A*B with dgemm(). dgemm() can not write
+  the result over one of the input arguments, so the rows of A are
+  processed in panels: a panel is copied over to a scratch matrix,
+  and then the product scratch*B is written back to the panel in A.
+  The scratch matrix is allocated once and reused for all the panels;
+  the number of rows in a panel is chosen so that the panel holds
+  approximately INPLACE_MATMUL_PANEL_SIZE elements, i.e. fits in the
+  cache.
+*/
+
+#define INPLACE_MATMUL_PANEL_SIZE      32768
+#define INPLACE_MATMUL_MIN_PANEL_ROWS     64
+
+
+static int matrix_inplace_matmul_panel_rows( const matrix_type * A ) {
+  int panel_rows = INPLACE_MATMUL_PANEL_SIZE / util_int_max( 1 , matrix_get_columns( A ));
+  panel_rows = util_int_max( panel_rows , INPLACE_MATMUL_MIN_PANEL_ROWS );
+  return util_int_min( panel_rows , util_int_max( 1 , matrix_get_rows( A )));
+}
+
+
+void matrix_inplace_dgemm(matrix_type * A, const matrix_type * B) {
+  int rows    = matrix_get_rows( A );
+  int columns = matrix_get_columns( A );
+
+  if ((columns != matrix_get_rows( B )) || (matrix_get_rows( B ) != matrix_get_columns( B )))
+    util_abort("%s: size mismatch: A:[%d,%d]   B:[%d,%d]\n",__func__ , rows , columns , matrix_get_rows(B) , matrix_get_columns(B));
+
+  if (rows == 0 || columns == 0)
+    return;
+
+  {
+    int panel_rows = matrix_inplace_matmul_panel_rows( A );
+    matrix_type * work = matrix_alloc( panel_rows , columns );
+
+    for (int row_offset = 0; row_offset < rows; row_offset += panel_rows) {
+      int current_rows = util_int_min( panel_rows , rows - row_offset );
+      matrix_type * panel = matrix_alloc_shared( A , row_offset , 0 , current_rows , columns );
+      matrix_type * work_panel = matrix_alloc_shared( work , 0 , 0 , current_rows , columns );
+
+      matrix_assign( work_panel , panel );
+      matrix_dgemm( panel , work_panel , B , false , false , 1 , 0 );
+
+      matrix_free( work_panel );
+      matrix_free( panel );
+    }
+    matrix_free( work );
+  }
+}
+
+
+#ifdef ERT_HAVE_THREAD_POOL
+
+static void * matrix_inplace_dgemm_mt__(void * arg) {
+  arg_pack_type * arg_pack = arg_pack_safe_cast( arg );
+  int row_offset         =                     arg_pack_iget_int( arg_pack , 0 );
+  int rows               =                     arg_pack_iget_int( arg_pack , 1 );
+  matrix_type * A        = (matrix_type*)      arg_pack_iget_ptr( arg_pack , 2 );
+  const matrix_type * B  = (const matrix_type*)arg_pack_iget_const_ptr( arg_pack , 3 );
+
+  matrix_type * A_view = matrix_alloc_shared( A , row_offset , 0 , rows , matrix_get_columns( A ));
+  matrix_inplace_dgemm( A_view , B );
+  matrix_free( A_view );
+  return NULL;
+}
+
+
+/**
+   Threaded version of matrix_inplace_dgemm(); the rows of A are split
+   in one contiguous block per thread, and each thread works through
+   its block panel by panel with a private scratch matrix. The same
+   requirements on the state of the thread_pool as for
+   matrix_inplace_matmul_mt2() apply.
+*/
+
+void matrix_inplace_dgemm_mt2(matrix_type * A, const matrix_type * B , thread_pool_type * thread_pool){
+  int num_threads  = thread_pool_get_max_running( thread_pool );
+  int panel_rows   = matrix_inplace_matmul_panel_rows( A );
+  int num_jobs     = util_int_min( num_threads , util_int_max( 1 , matrix_get_rows( A ) / panel_rows ));
+  arg_pack_type ** arglist = (arg_pack_type**)util_malloc( num_jobs * sizeof * arglist );
+
+  thread_pool_restart( thread_pool );
+  {
+    int rows       = matrix_get_rows( A ) / num_jobs;
+    int rows_mod   = matrix_get_rows( A ) % num_jobs;
+    int row_offset = 0;
+
+    for (int it = 0; it < num_jobs; it++) {
+      int row_size = rows;
+      if (it < rows_mod)
+        row_size += 1;
+
+      arglist[it] = arg_pack_alloc();
+      arg_pack_append_int(arglist[it] , row_offset );
+      arg_pack_append_int(arglist[it] , row_size   );
+      arg_pack_append_ptr(arglist[it] , A );
+      arg_pack_append_const_ptr(arglist[it] , B );
+
+      thread_pool_add_job( thread_pool , matrix_inplace_dgemm_mt__ , arglist[it]);
+      row_offset += row_size;
+    }
+  }
+  thread_pool_join( thread_pool );
+
+  for (int it = 0; it < num_jobs; it++)
+    arg_pack_free( arglist[it] );
+  free( arglist );
+}
+
+
+void matrix_inplace_dgemm_mt1(matrix_type * A, const matrix_type * B , int num_threads){
+  thread_pool_type  * thread_pool = thread_pool_alloc( num_threads , false );
+  matrix_inplace_dgemm_mt2( A , B , thread_pool );
+  thread_pool_free( thread_pool );
+}
+
+#else
+
+void matrix_inplace_dgemm_mt1(matrix_type * A, const matrix_type * B , int num_threads){
+  matrix_inplace_dgemm( A , B );
+}
+
+#endif
+
 #ifdef __cplusplus
 }
 #endif
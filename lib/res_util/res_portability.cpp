@@ -17,6 +17,7 @@
 */
 
 #include <pthread.h>
+#include <unistd.h>
 
 #include <ert/util/util.hpp>
 
@@ -35,3 +36,19 @@ void res_yield() {
 #endif
 }
 
+
+/*
+  Returns the number of online processors on the current host, or 1
+  if that can not be determined.
+*/
+
+int res_get_num_cpu() {
+  long num_cpu = -1;
+#ifdef _SC_NPROCESSORS_ONLN
+  num_cpu = sysconf( _SC_NPROCESSORS_ONLN );
+#endif
+  if (num_cpu < 1)
+    return 1;
+  return (int) num_cpu;
+}
+
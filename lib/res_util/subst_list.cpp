@@ -19,6 +19,7 @@
 #include <ctype.h>
 #include <stdlib.h>
 #include <string.h>
+#include <pthread.h>
 
 #include <ert/util/util.hpp>
 #include <ert/util/hash.hpp>
@@ -78,6 +79,9 @@ typedef enum { SUBST_DEEP_COPY   = 1,
 
 #define SUBST_LIST_TYPE_ID 6614320
 
+typedef struct subst_matcher_struct subst_matcher_type;
+static void subst_matcher_decref( subst_matcher_type * matcher );
+
 struct subst_list_struct {
   UTIL_TYPE_ID_DECLARATION;
   const subst_list_type       * parent;       /* A parent subst_list instance - can be NULL - no destructor is called for the parent. */
@@ -85,6 +89,9 @@ struct subst_list_struct {
   vector_type                 * func_data;    /* The functions we support. */
   const subst_func_pool_type  * func_pool;    /* NOT owned by the subst_list instance - can be NULL */
   hash_type                   * map;
+  int                           generation;   /* Incremented every time the keys, values or the parent are changed. */
+  subst_matcher_type mutable  * matcher;      /* Cached matcher for this instance and its parents - can be NULL. */
+  pthread_mutex_t mutable       matcher_lock;
 };
 
 
@@ -252,6 +259,7 @@ UTIL_IS_INSTANCE_FUNCTION( subst_list , SUBST_LIST_TYPE_ID )
 
 void subst_list_set_parent( subst_list_type * subst_list , const subst_list_type * parent) {
   subst_list->parent = parent;
+  subst_list->generation++;
   if (parent != NULL)
     subst_list->func_pool = subst_list->parent->func_pool;
 }
@@ -288,6 +296,9 @@ subst_list_type * subst_list_alloc(const void * input_arg) {
   subst_list->map              = hash_alloc();
   subst_list->string_data      = vector_alloc_new();
   subst_list->func_data        = vector_alloc_new();
+  subst_list->generation       = 0;
+  subst_list->matcher          = NULL;
+  pthread_mutex_init( &subst_list->matcher_lock , NULL );
 
   if (input_arg != NULL) {
     if (subst_list_is_instance( input_arg ))
@@ -323,6 +334,7 @@ static void subst_list_insert__(subst_list_type * subst_list , const char * key
   if (node == NULL) /* Did not have the node. */
     node = subst_list_insert_new_node(subst_list , key ,append);
   subst_list_string_set_value(node , value , doc_string , insert_mode);
+  subst_list->generation++;
 }
 
 
@@ -393,10 +405,14 @@ void subst_list_insert_func(subst_list_type * subst_list , const char * func_nam
 
 void subst_list_clear( subst_list_type * subst_list ) {
   vector_clear( subst_list->string_data );
+  subst_list->generation++;
 }
 
 
 void subst_list_free(subst_list_type * subst_list) {
+  if (subst_list->matcher != NULL)
+    subst_matcher_decref( subst_list->matcher );
+  pthread_mutex_destroy( &subst_list->matcher_lock );
   vector_free( subst_list->string_data );
   vector_free( subst_list->func_data );
   hash_free( subst_list->map );
@@ -426,26 +442,487 @@ void subst_list_free(subst_list_type * subst_list) {
 
 
 /**
-   Updates the buffer inplace with all the string substitutions in the
-   subst_list. This is the lowest level function, which does *NOT*
-   consider the parent pointer.
+   The string substitutions are carried out with a subst_matcher
+   instance. The matcher holds a trie with all the keys in the
+   subst_list and its parents, and the keys are ordered in stages in
+   the order they should be applied: the parent keys first, and then
+   the keys of this instance in insert order.
+
+   The semantics are the same as applying the keys one by one, every
+   key is replaced left to right in the complete buffer before the
+   next key is considered. Observe that a replacement value can
+   create an occurence of a key which comes later in the sequence,
+   e.g. with ("<PATH>" , "/tmp/run/<CASE>") followed by ("<CASE>" ,
+   "Test4"). The matcher handles this as follows:
+
+     1. The buffer is scanned once with the trie, and all the
+        occurences of all the remaining keys are found.
+
+     2. The occurences are claimed stage by stage, left to right;
+        occurences overlapping an already claimed occurence are
+        discarded.
+
+     3. If a stage with matches has a value which can possibly create
+        a new occurence of a later key, only the stages up to and
+        including that stage are written, and the procedure starts
+        over at 1. with the remaining stages. Otherwise all the stages
+        are written in one pass.
+
+   In the common case where no value can create new key occurences
+   the buffer is read and written exactly once.
+
+   The matcher is built the first time the subst_list is used, and
+   cached in the subst_list instance. It is rebuilt when the keys,
+   values or parent of the subst_list or any of its parents have been
+   changed; the generation counter of every instance in the parent
+   chain is recorded in the matcher. The parent of an instance can
+   only be replaced with subst_list_set_parent(), which updates the
+   generation, so comparing the recorded pointers with the current
+   parent chain is sufficient as long as the parents outlive the
+   subst_list - which they must anyway.
+
+   The matcher holds its own copies of the keys and values and is
+   reference counted, so a thread can keep using its matcher while
+   another thread changes the subst_list and replaces the cached
+   matcher. A value inserted with the _ref() functions must not be
+   modified in place, that change will not be seen by the matcher.
 */
-static bool subst_list_replace_strings__(const subst_list_type * subst_list , buffer_type * buffer) {
-  int index;
-  bool global_match = false;
-  for (index = 0; index < vector_get_size( subst_list->string_data ); index++) {
+
+typedef struct {
+  int            stage;     /* The first stage with the key ending at this node; -1 if no key ends here. */
+  int            child;
+  int            sibling;
+  unsigned char  c;
+} subst_trie_node_type;
+
+
+typedef struct {
+  int                    stage;
+  size_t                 pos;
+} subst_match_type;
+
+
+struct subst_matcher_struct {
+  int                    refcount;      /* Protected by the matcher_lock of the subst_list owning the matcher. */
+  int                    num_lists;
+  const subst_list_type ** lists;       /* The subst_list and its parents, the subst_list first. */
+  int                  * generations;   /* The generation of each of the lists when the matcher was built. */
+
+  int                    num_stages;
+  int                    alloc_stages;
+  char                ** keys;          /* Owned copies of the keys and values. */
+  char                ** values;
+  int                  * key_length;
+  int                  * value_length;
+  int                  * next_stage;    /* The next stage with the same key; -1 if there is none. */
+
+  int                    root[256];
+  int                    num_nodes;
+  int                    alloc_nodes;
+  subst_trie_node_type * nodes;
+};
+
+
+
+static int subst_matcher_add_node( subst_matcher_type * matcher , unsigned char c ) {
+  if (matcher->num_nodes == matcher->alloc_nodes) {
+    matcher->alloc_nodes = 2 * matcher->alloc_nodes + 16;
+    matcher->nodes = (subst_trie_node_type*)util_realloc( matcher->nodes , matcher->alloc_nodes * sizeof * matcher->nodes );
+  }
+  {
+    subst_trie_node_type * node = &matcher->nodes[ matcher->num_nodes ];
+    node->stage   = -1;
+    node->child   = -1;
+    node->sibling = -1;
+    node->c       = c;
+  }
+  return matcher->num_nodes++;
+}
+
+
+static int subst_matcher_get_child( const subst_matcher_type * matcher , int node_index , unsigned char c) {
+  int child = matcher->nodes[ node_index ].child;
+  while (child >= 0 && matcher->nodes[ child ].c != c)
+    child = matcher->nodes[ child ].sibling;
+  return child;
+}
+
+
+static void subst_matcher_add_key( subst_matcher_type * matcher , const char * key , const char * value ) {
+  int key_length = strlen( key );
+  int stage      = matcher->num_stages;
+
+  if (key_length == 0 || value == NULL)
+    return;
+
+  if (matcher->num_stages == matcher->alloc_stages) {
+    matcher->alloc_stages = 2 * matcher->alloc_stages + 16;
+    matcher->keys         = (char **)       util_realloc( matcher->keys         , matcher->alloc_stages * sizeof * matcher->keys );
+    matcher->values       = (char **)       util_realloc( matcher->values       , matcher->alloc_stages * sizeof * matcher->values );
+    matcher->key_length   = (int *)         util_realloc( matcher->key_length   , matcher->alloc_stages * sizeof * matcher->key_length );
+    matcher->value_length = (int *)         util_realloc( matcher->value_length , matcher->alloc_stages * sizeof * matcher->value_length );
+    matcher->next_stage   = (int *)         util_realloc( matcher->next_stage   , matcher->alloc_stages * sizeof * matcher->next_stage );
+  }
+  matcher->keys[stage]         = util_alloc_string_copy( key );
+  matcher->values[stage]       = util_alloc_string_copy( value );
+  matcher->key_length[stage]   = key_length;
+  matcher->value_length[stage] = strlen( value );
+  matcher->next_stage[stage]   = -1;
+  matcher->num_stages++;
+
+  {
+    const unsigned char * ukey = (const unsigned char *) key;
+    int node_index = matcher->root[ ukey[0] ];
+    if (node_index < 0) {
+      node_index = subst_matcher_add_node( matcher , ukey[0] );
+      matcher->root[ ukey[0] ] = node_index;
+    }
+
+    for (int i = 1; i < key_length; i++) {
+      int child = subst_matcher_get_child( matcher , node_index , ukey[i] );
+      if (child < 0) {
+        child = subst_matcher_add_node( matcher , ukey[i] );
+        matcher->nodes[ child ].sibling = matcher->nodes[ node_index ].child;
+        matcher->nodes[ node_index ].child = child;
+      }
+      node_index = child;
+    }
+
+    if (matcher->nodes[ node_index ].stage < 0)
+      matcher->nodes[ node_index ].stage = stage;
+    else {
+      int last = matcher->nodes[ node_index ].stage;
+      while (matcher->next_stage[ last ] >= 0)
+        last = matcher->next_stage[ last ];
+      matcher->next_stage[ last ] = stage;
+    }
+  }
+}
+
+
+static void subst_matcher_add_list( subst_matcher_type * matcher , const subst_list_type * subst_list) {
+  matcher->lists       = (const subst_list_type **) util_realloc( matcher->lists , (matcher->num_lists + 1) * sizeof * matcher->lists );
+  matcher->generations = (int *) util_realloc( matcher->generations , (matcher->num_lists + 1) * sizeof * matcher->generations );
+  matcher->lists[ matcher->num_lists ]       = subst_list;
+  matcher->generations[ matcher->num_lists ] = subst_list->generation;
+  matcher->num_lists++;
+
+  if (subst_list->parent != NULL)
+    subst_matcher_add_list( matcher , subst_list->parent );
+
+  for (int index = 0; index < vector_get_size( subst_list->string_data ); index++) {
     const subst_list_string_type * node = (const subst_list_string_type*)vector_iget_const( subst_list->string_data , index );
-    if (node->value != NULL) {
-      bool match;
-      buffer_rewind( buffer );
-      do {
-        match = buffer_search_replace( buffer , node->key , node->value);
-        if (match)
-          global_match = true;
-      } while (match);
+    subst_matcher_add_key( matcher , node->key , node->value );
+  }
+}
+
+
+static subst_matcher_type * subst_matcher_alloc( const subst_list_type * subst_list ) {
+  subst_matcher_type * matcher = (subst_matcher_type*)util_malloc( sizeof * matcher );
+  matcher->refcount     = 1;
+  matcher->num_lists    = 0;
+  matcher->lists        = NULL;
+  matcher->generations  = NULL;
+  matcher->num_stages   = 0;
+  matcher->alloc_stages = 0;
+  matcher->keys         = NULL;
+  matcher->values       = NULL;
+  matcher->key_length   = NULL;
+  matcher->value_length = NULL;
+  matcher->next_stage   = NULL;
+  matcher->num_nodes    = 0;
+  matcher->alloc_nodes  = 0;
+  matcher->nodes        = NULL;
+  for (int c = 0; c < 256; c++)
+    matcher->root[c] = -1;
+
+  subst_matcher_add_list( matcher , subst_list );
+  return matcher;
+}
+
+
+static void subst_matcher_free( subst_matcher_type * matcher ) {
+  for (int stage = 0; stage < matcher->num_stages; stage++) {
+    free( matcher->keys[stage] );
+    free( matcher->values[stage] );
+  }
+  free( matcher->lists );
+  free( matcher->generations );
+  free( matcher->keys );
+  free( matcher->values );
+  free( matcher->key_length );
+  free( matcher->value_length );
+  free( matcher->next_stage );
+  free( matcher->nodes );
+  free( matcher );
+}
+
+
+static void subst_matcher_decref( subst_matcher_type * matcher ) {
+  matcher->refcount--;
+  if (matcher->refcount == 0)
+    subst_matcher_free( matcher );
+}
+
+
+/*
+  Will return true if none of the subst_list instances in the parent
+  chain have been changed since the matcher was built.
+*/
+
+static bool subst_matcher_is_current( const subst_matcher_type * matcher , const subst_list_type * subst_list ) {
+  int index = 0;
+  while (subst_list != NULL) {
+    if (index == matcher->num_lists)
+      return false;
+
+    if ((matcher->lists[index] != subst_list) || (matcher->generations[index] != subst_list->generation))
+      return false;
+
+    subst_list = subst_list->parent;
+    index++;
+  }
+  return (index == matcher->num_lists);
+}
+
+
+/*
+  Returns the cached matcher of the subst_list, rebuilding it first if
+  it is not current. The matcher must be returned with
+  subst_list_release_matcher().
+*/
+
+static subst_matcher_type * subst_list_get_matcher( const subst_list_type * subst_list ) {
+  subst_matcher_type * matcher;
+  pthread_mutex_lock( &subst_list->matcher_lock );
+  {
+    if ((subst_list->matcher != NULL) && !subst_matcher_is_current( subst_list->matcher , subst_list )) {
+      subst_matcher_decref( subst_list->matcher );
+      subst_list->matcher = NULL;
     }
+
+    if (subst_list->matcher == NULL)
+      subst_list->matcher = subst_matcher_alloc( subst_list );
+
+    matcher = subst_list->matcher;
+    matcher->refcount++;
   }
-  return global_match;
+  pthread_mutex_unlock( &subst_list->matcher_lock );
+  return matcher;
+}
+
+
+static void subst_list_release_matcher( const subst_list_type * subst_list , subst_matcher_type * matcher ) {
+  pthread_mutex_lock( &subst_list->matcher_lock );
+  subst_matcher_decref( matcher );
+  pthread_mutex_unlock( &subst_list->matcher_lock );
+}
+
+
+/*
+  Will return true if inserting the value of stage1 can result in an
+  occurence of the key of stage2 which was not in the buffer before;
+  i.e. if the key can overlap the inserted value. An empty value can
+  join the text on both sides, and is always assumed to create new
+  occurences.
+*/
+
+static bool subst_matcher_can_create( const subst_matcher_type * matcher , int stage1 , int stage2) {
+  const char * value = matcher->values[stage1];
+  const char * key   = matcher->keys[stage2];
+  int value_length   = matcher->value_length[stage1];
+  int key_length     = matcher->key_length[stage2];
+
+  if (value_length == 0)
+    return true;
+
+  if (strstr( value , key ) != NULL || strstr( key , value ) != NULL)
+    return true;
+
+  for (int overlap = 1; overlap < key_length && overlap <= value_length; overlap++) {
+    if (strncmp( &value[ value_length - overlap ] , key , overlap ) == 0)
+      return true;
+
+    if (strncmp( value , &key[ key_length - overlap ] , overlap ) == 0)
+      return true;
+  }
+
+  return false;
+}
+
+
+static int subst_match_cmp( const void * arg1 , const void * arg2) {
+  const subst_match_type * m1 = (const subst_match_type *) arg1;
+  const subst_match_type * m2 = (const subst_match_type *) arg2;
+
+  if (m1->stage != m2->stage)
+    return (m1->stage < m2->stage) ? -1 : 1;
+
+  if (m1->pos != m2->pos)
+    return (m1->pos < m2->pos) ? -1 : 1;
+
+  return 0;
+}
+
+
+static int subst_match_pos_cmp( const void * arg1 , const void * arg2) {
+  const subst_match_type * m1 = (const subst_match_type *) arg1;
+  const subst_match_type * m2 = (const subst_match_type *) arg2;
+
+  if (m1->pos != m2->pos)
+    return (m1->pos < m2->pos) ? -1 : 1;
+
+  return 0;
+}
+
+
+/*
+  Scans the text once and returns all the occurences of the keys
+  belonging to stage @first_stage or later.
+*/
+
+static subst_match_type * subst_matcher_scan( const subst_matcher_type * matcher , const char * text , size_t length , int first_stage , int * num_matches) {
+  const unsigned char * utext = (const unsigned char *) text;
+  int alloc_size = 0;
+  subst_match_type * matches = NULL;
+
+  *num_matches = 0;
+  for (size_t pos = 0; pos < length; pos++) {
+    int node_index = matcher->root[ utext[pos] ];
+    size_t depth = 1;
+
+    while (node_index >= 0) {
+      int stage = matcher->nodes[ node_index ].stage;
+      while (stage >= 0 && stage < first_stage)
+        stage = matcher->next_stage[ stage ];
+
+      if (stage >= 0) {
+        if (*num_matches == alloc_size) {
+          alloc_size = 2 * alloc_size + 64;
+          matches = (subst_match_type*)util_realloc( matches , alloc_size * sizeof * matches );
+        }
+        matches[ *num_matches ].stage = stage;
+        matches[ *num_matches ].pos   = pos;
+        (*num_matches)++;
+      }
+
+      if (pos + depth >= length)
+        break;
+
+      node_index = subst_matcher_get_child( matcher , node_index , utext[ pos + depth ] );
+      depth++;
+    }
+  }
+  return matches;
+}
+
+
+/*
+  Performs the replacements for the stages [first_stage, ...) on the
+  buffer. Returns the first stage which has not been applied, i.e.
+  num_stages when all the stages are done.
+*/
+
+static int subst_matcher_replace_pass( const subst_matcher_type * matcher , buffer_type * buffer , int first_stage , bool * match) {
+  const char * text = (const char *) buffer_get_data( buffer );
+  size_t buffer_size = buffer_get_size( buffer );
+  size_t length      = strnlen( text , buffer_size );
+  int num_matches;
+  subst_match_type * matches = subst_matcher_scan( matcher , text , length , first_stage , &num_matches );
+  int last_stage = matcher->num_stages - 1;
+
+  if (num_matches == 0) {
+    free( matches );
+    return matcher->num_stages;
+  }
+
+  qsort( matches , num_matches , sizeof * matches , subst_match_cmp );
+  {
+    unsigned char * claimed = (unsigned char *) util_malloc( (length + 7) / 8 );
+    int num_claimed = 0;
+    int i = 0;
+
+    memset( claimed , 0 , (length + 7) / 8 );
+    while (i < num_matches) {
+      int stage = matches[i].stage;
+      int stage_claimed = 0;
+
+      if (stage > last_stage)
+        break;
+
+      for (; i < num_matches && matches[i].stage == stage; i++) {
+        size_t pos = matches[i].pos;
+        size_t end = pos + matcher->key_length[stage];
+        size_t k;
+
+        for (k = pos; k < end; k++)
+          if (claimed[ k / 8 ] & (1 << (k % 8)))
+            break;
+
+        if (k == end) {
+          for (k = pos; k < end; k++)
+            claimed[ k / 8 ] |= (1 << (k % 8));
+          matches[ num_claimed ] = matches[i];
+          num_claimed++;
+          stage_claimed++;
+        }
+      }
+
+      if (stage_claimed > 0) {
+        for (int later = stage + 1; later <= last_stage; later++) {
+          if (subst_matcher_can_create( matcher , stage , later )) {
+            last_stage = stage;
+            break;
+          }
+        }
+      }
+    }
+    free( claimed );
+
+    if (num_claimed > 0) {
+      size_t new_size = buffer_size;
+      qsort( matches , num_claimed , sizeof * matches , subst_match_pos_cmp );
+      for (i = 0; i < num_claimed; i++) {
+        int stage = matches[i].stage;
+        new_size += matcher->value_length[stage] - matcher->key_length[stage];
+      }
+
+      {
+        char * new_data = (char *) util_malloc( new_size );
+        size_t src_pos = 0;
+        size_t target_pos = 0;
+
+        for (i = 0; i < num_claimed; i++) {
+          int stage = matches[i].stage;
+          size_t pos = matches[i].pos;
+
+          memcpy( &new_data[target_pos] , &text[src_pos] , pos - src_pos );
+          target_pos += pos - src_pos;
+
+          memcpy( &new_data[target_pos] , matcher->values[stage] , matcher->value_length[stage] );
+          target_pos += matcher->value_length[stage];
+          src_pos = pos + matcher->key_length[stage];
+        }
+        memcpy( &new_data[target_pos] , &text[src_pos] , buffer_size - src_pos );
+
+        buffer_clear( buffer );
+        buffer_fwrite( buffer , new_data , 1 , new_size );
+        free( new_data );
+      }
+      *match = true;
+    }
+  }
+  free( matches );
+  return last_stage + 1;
+}
+
+
+static bool subst_matcher_replace( const subst_matcher_type * matcher , buffer_type * buffer ) {
+  bool match = false;
+  int stage = 0;
+  while (stage < matcher->num_stages)
+    stage = subst_matcher_replace_pass( matcher , buffer , stage , &match );
+  return match;
 }
 
 
@@ -590,21 +1067,10 @@ static bool subst_list_eval_funcs__(const subst_list_type * subst_list , buffer_
 
 
    Currently the implementation is purely top down, the latter case
-   above is not supported. The actual implementation here is in terms
-   of recursion, the low level function doing the stuff is
-   subst_list_replace_strings__() which is not recursive.
+   above is not supported. The ordering is established when the
+   subst_matcher is assembled in subst_matcher_add_list().
 */
 
-static bool subst_list_replace_strings( const subst_list_type * subst_list , buffer_type * buffer ) {
-  bool match = false;
-  if (subst_list->parent != NULL)
-    match = subst_list_replace_strings( subst_list->parent , buffer );
-
-  /* The actual string replace */
-  match = (subst_list_replace_strings__( subst_list , buffer ) || match);
-  return match;
-}
-
 
 /*
   This function updates a buffer instance inplace with all the
@@ -616,13 +1082,21 @@ static bool subst_list_replace_strings( const subst_list_type * subst_list , buf
 */
 
 
-bool subst_list_update_buffer( const subst_list_type * subst_list , buffer_type * buffer ) {
-  bool match1 = subst_list_replace_strings( subst_list , buffer );
+static bool subst_list_update_buffer__( const subst_list_type * subst_list , const subst_matcher_type * matcher , buffer_type * buffer ) {
+  bool match1 = subst_matcher_replace( matcher , buffer );
   bool match2 = subst_list_eval_funcs__( subst_list , buffer );
   return (match1 || match2);   // Funny construction to ensure to avoid fault short circuit.
 }
 
 
+bool subst_list_update_buffer( const subst_list_type * subst_list , buffer_type * buffer ) {
+  subst_matcher_type * matcher = subst_list_get_matcher( subst_list );
+  bool match = subst_list_update_buffer__( subst_list , matcher , buffer );
+  subst_list_release_matcher( subst_list , matcher );
+  return match;
+}
+
+
 /**
    This function reads the content of a file, and writes a new file
    where all substitutions in subst_list have been performed. Observe
@@ -748,12 +1222,17 @@ void subst_list_filtered_fprintf(const subst_list_type * subst_list , const char
 
 
 void stringlist_apply_subst(stringlist_type * stringlist , const subst_list_type * subst_list) {
+  subst_matcher_type * matcher = subst_list_get_matcher( subst_list );
   int i;
   for (i=0; i < stringlist_get_size( stringlist ); i++) {
     const char * old_string = stringlist_iget( stringlist , i );
-    char * new_string = subst_list_alloc_filtered_string( subst_list , old_string );
-    stringlist_iset_owned_ref( stringlist , i , new_string );
+    buffer_type * buffer = buffer_alloc( strlen( old_string ) + 1 );
+    buffer_fwrite( buffer , old_string , 1 , strlen( old_string ) + 1 );
+    subst_list_update_buffer__( subst_list , matcher , buffer );
+    stringlist_iset_owned_ref( stringlist , i , util_alloc_string_copy( (const char *) buffer_get_data( buffer )));
+    buffer_free( buffer );
   }
+  subst_list_release_matcher( subst_list , matcher );
 }
 
 /*****************************************************************/
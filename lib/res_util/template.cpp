@@ -19,6 +19,9 @@
 #include <stdlib.h>
 #include <stdbool.h>
 #include <stdio.h>
+#include <string.h>
+#include <pthread.h>
+#include <sys/stat.h>
 
 #include <ert/util/ert_api_config.hpp>
 
@@ -30,6 +33,91 @@
 #include <ert/res_util/template.hpp>
 #include <ert/res_util/template_type.hpp>
 
+/**
+   When the template is not internalized the content of the template
+   file is cached, together with the modification time, size and inode
+   of the file. The cache is reused as long as the (substituted)
+   filename is the same and the file has not changed on disk, so the
+   template file is only read once even if it is instantiated for a
+   large number of realizations. The cache is shared between threads
+   instantiating the same template, and protected with a mutex.
+*/
+
+struct template_cache_struct {
+  pthread_mutex_t   lock;
+  char            * filename;
+  char            * buffer;
+  struct timespec   mtime;
+  off_t             size;
+  ino_t             inode;
+};
+
+
+static template_cache_type * template_cache_alloc( ) {
+  template_cache_type * cache = (template_cache_type*)util_malloc( sizeof * cache );
+  pthread_mutex_init( &cache->lock , NULL );
+  cache->filename = NULL;
+  cache->buffer   = NULL;
+  cache->mtime.tv_sec  = 0;
+  cache->mtime.tv_nsec = 0;
+  cache->size     = 0;
+  cache->inode    = 0;
+  return cache;
+}
+
+
+static void template_cache_free( template_cache_type * cache ) {
+  pthread_mutex_destroy( &cache->lock );
+  free( cache->filename );
+  free( cache->buffer );
+  free( cache );
+}
+
+
+/*
+  The modification time is compared with nanosecond resolution, a
+  template which is rewritten within the same second with the same
+  size will otherwise not be reloaded.
+*/
+
+static char * template_cache_alloc_content( template_cache_type * cache , const char * filename ) {
+  struct stat stat_buffer;
+  char * content;
+  int buffer_size;
+
+  if (stat( filename , &stat_buffer ) != 0)
+    return util_fread_alloc_file_content( filename , &buffer_size );
+
+  pthread_mutex_lock( &cache->lock );
+  {
+#ifdef __APPLE__
+    const struct timespec mtime = stat_buffer.st_mtimespec;
+#else
+    const struct timespec mtime = stat_buffer.st_mtim;
+#endif
+    bool valid = (cache->filename != NULL) &&
+                 (strcmp( cache->filename , filename ) == 0) &&
+                 (cache->mtime.tv_sec  == mtime.tv_sec) &&
+                 (cache->mtime.tv_nsec == mtime.tv_nsec) &&
+                 (cache->size  == stat_buffer.st_size) &&
+                 (cache->inode == stat_buffer.st_ino);
+
+    if (!valid) {
+      free( cache->buffer );
+      cache->buffer   = util_fread_alloc_file_content( filename , &buffer_size );
+      cache->filename = util_realloc_string_copy( cache->filename , filename );
+      cache->mtime    = mtime;
+      cache->size     = stat_buffer.st_size;
+      cache->inode    = stat_buffer.st_ino;
+    }
+    content = util_alloc_string_copy( cache->buffer );
+  }
+  pthread_mutex_unlock( &cache->lock );
+
+  return content;
+}
+
+
 /**
    Iff the template is set up with internaliz_template == false the
    template content is loaded at instantiation time, and in that case
@@ -38,11 +126,10 @@
    templates.
 
    To avoid race issues this function does not set actually update the
-   state of the template object.
+   state of the template object; only the content cache is updated.
 */
 
 static char * template_load( const template_type * _template , const subst_list_type * ext_arg_list) {
-  int buffer_size;
   char * template_file = util_alloc_string_copy( _template->template_file );
   char * template_buffer;
 
@@ -50,7 +137,11 @@ static char * template_load( const template_type * _template , const subst_list_
   if (ext_arg_list != NULL)
     subst_list_update_string( ext_arg_list , &template_file);
 
-  template_buffer = util_fread_alloc_file_content( template_file , &buffer_size );
+  if (_template->internalize_template) {
+    int buffer_size;
+    template_buffer = util_fread_alloc_file_content( template_file , &buffer_size );
+  } else
+    template_buffer = template_cache_alloc_content( _template->cache , template_file );
   free( template_file );
 
   return template_buffer;
@@ -90,6 +181,7 @@ template_type * template_alloc( const char * template_file , bool internalize_te
   _template->template_file        = NULL;
   _template->internalize_template = internalize_template;
   _template->arg_string           = NULL;
+  _template->cache                = template_cache_alloc( );
   template_set_template_file( _template , template_file );
 
 #ifdef ERT_HAVE_REGEXP
@@ -109,6 +201,7 @@ void template_free( template_type * _template ) {
   free( _template->template_file );
   free( _template->template_buffer );
   free( _template->arg_string );
+  template_cache_free( _template->cache );
 
 #ifdef ERT_HAVE_REGEXP
   regfree( &_template->start_regexp );
@@ -168,7 +261,8 @@ void template_instantiate( const template_type * template_ , const char * __targ
 
 
 #ifdef ERT_HAVE_REGEXP
-    {
+    /* The loop evaluation is only needed if there is a loop tag left after the substitutions. */
+    if (strstr( char_buffer , "{%" ) != NULL) {
       buffer_type * buffer = buffer_alloc_private_wrapper( char_buffer , strlen( char_buffer ) + 1);
       template_eval_loops( template_ , buffer );
       char_buffer = (char*)buffer_get_data( buffer );
@@ -188,7 +282,7 @@ void template_instantiate( const template_type * template_ , const char * __targ
     /* Write the content out. */
     {
       FILE * stream = util_mkdir_fopen( target_file , "w");
-      fprintf(stream , "%s" , char_buffer);
+      fputs( char_buffer , stream );
       fclose( stream );
     }
     free( char_buffer );
@@ -16,6 +16,7 @@
    for more details.
 */
 #include <stdlib.h>
+#include <string.h>
 #include <stdbool.h>
 #include <sys/types.h>
 #include <unistd.h>
@@ -23,6 +24,9 @@
 
 #include <ert/util/test_util.hpp>
 #include <ert/util/test_work_area.hpp>
+#include <ert/util/stringlist.hpp>
+#include <ert/util/vector.hpp>
+#include <ert/util/buffer.hpp>
 #include <ert/res_util/block_fs.hpp>
 
 void test_assert_util_abort(const char * function_name , void call_func (void *) , void * arg);
@@ -102,8 +106,338 @@ void test_lock_conflict() {
 
 
 
+void free_buffer__( void * arg ) {
+  buffer_free( (buffer_type *) arg );
+}
+
+
+void test_fwrite_buffer_list() {
+  test_work_area_type * work_area = test_work_area_alloc("block_fs/buffer_list");
+  {
+    block_fs_type * bfs = block_fs_mount( "test.mnt" , 1000 , 10000 , 0.67 , 10 , true , false , false );
+    stringlist_type * filenames = stringlist_alloc_new( );
+    vector_type * buffers = vector_alloc_new( );
+
+    for (int i = 0; i < 100; i++) {
+      buffer_type * buffer = buffer_alloc( 100 );
+      for (int j = 0; j <= i; j++)
+        buffer_fwrite_int( buffer , i );
+
+      stringlist_append_owned_ref( filenames , util_alloc_sprintf("FILE.%d" , i ));
+      vector_append_owned_ref( buffers , buffer , free_buffer__ );
+    }
+    block_fs_fwrite_buffer_list( bfs , filenames , buffers );
+    block_fs_close( bfs , false );
+
+    bfs = block_fs_mount( "test.mnt" , 1000 , 10000 , 0.67 , 10 , true , false , false );
+    {
+      buffer_type * buffer = buffer_alloc( 100 );
+      for (int i = 0; i < 100; i++) {
+        test_assert_true( block_fs_has_file( bfs , stringlist_iget( filenames , i )));
+        block_fs_fread_realloc_buffer( bfs , stringlist_iget( filenames , i ) , buffer );
+        test_assert_int_equal( buffer_get_size( buffer ) , (i + 1) * sizeof(int) );
+        for (int j = 0; j <= i; j++)
+          test_assert_int_equal( buffer_fread_int( buffer ) , i );
+      }
+      buffer_free( buffer );
+    }
+    block_fs_close( bfs , true );
+
+    vector_free( buffers );
+    stringlist_free( filenames );
+  }
+  test_work_area_free( work_area );
+}
+
+
+void test_mmap() {
+  test_work_area_type * work_area = test_work_area_alloc("block_fs/mmap");
+  {
+    block_fs_type * bfs = block_fs_mount( "test.mnt" , 1000 , 10000 , 0.67 , 10 , true , false , false );
+    int data[100];
+    for (int i = 0; i < 100; i++)
+      data[i] = i;
+
+    block_fs_fwrite_file( bfs , "FILE1" , data , 10 * sizeof(int));
+    test_assert_true( block_fs_enable_mmap( bfs ));
+    test_assert_true( block_fs_use_mmap( bfs ));
+
+    /* Write after the mapping has been established. */
+    block_fs_fwrite_file( bfs , "FILE2" , data , 100 * sizeof(int));
+    {
+      int copy[100];
+      block_fs_fread_file( bfs , "FILE2" , copy );
+      test_assert_int_equal( 0 , memcmp( data , copy , 100 * sizeof(int)));
+    }
+    {
+      buffer_type * buffer = buffer_alloc( 100 );
+      block_fs_fread_realloc_buffer( bfs , "FILE1" , buffer );
+      test_assert_int_equal( buffer_get_size( buffer ) , 10 * sizeof(int));
+      test_assert_int_equal( buffer_fread_int( buffer ) , 0 );
+      buffer_free( buffer );
+    }
+    {
+      size_t data_size;
+      const int * view = (const int *) block_fs_aquire_view( bfs , "FILE2" , &data_size );
+      test_assert_not_NULL( view );
+      test_assert_int_equal( data_size , 100 * sizeof(int));
+      test_assert_int_equal( view[99] , 99 );
+      block_fs_release_view( bfs );
+
+      test_assert_NULL( block_fs_aquire_view( bfs , "NO_SUCH_FILE" , &data_size ));
+    }
+    /* The payload cache is not used in mmap mode. */
+    test_assert_int_equal( block_fs_get_cache_usage( bfs ) , 0 );
+    test_assert_int_equal( block_fs_get_cache_misses( bfs ) , 0 );
+    block_fs_close( bfs , true );
+  }
+  test_work_area_free( work_area );
+}
+
+
+void test_index_file_content( int num_files ) {
+  block_fs_type * bfs = block_fs_mount( "test.mnt" , 1000 , 10000 , 0.67 , 10 , true , false , false );
+  for (int i = 0; i < num_files; i++) {
+    char * filename = util_alloc_sprintf("FILE.%d" , i);
+    int value;
+    test_assert_true( block_fs_has_file( bfs , filename ));
+    test_assert_int_equal( block_fs_get_filesize( bfs , filename ) , sizeof value );
+    block_fs_fread_file( bfs , filename , &value );
+    test_assert_int_equal( value , i );
+    free( filename );
+  }
+  test_assert_false( block_fs_has_file( bfs , "FILE.X" ));
+  {
+    vector_type * files = block_fs_alloc_filelist( bfs , NULL , STRING_SORT , false );
+    test_assert_int_equal( vector_get_size( files ) , num_files );
+    vector_free( files );
+  }
+  block_fs_close( bfs , false );
+}
+
+
+void test_sorted_index() {
+  test_work_area_type * work_area = test_work_area_alloc("block_fs/sorted_index");
+  {
+    block_fs_type * bfs = block_fs_mount( "test.mnt" , 1000 , 10000 , 0.67 , 10 , true , false , false );
+    for (int i = 0; i < 50; i++) {
+      char * filename = util_alloc_sprintf("FILE.%d" , i);
+      block_fs_fwrite_file( bfs , filename , &i , sizeof i );
+      free( filename );
+    }
+    block_fs_close( bfs , false );
+  }
+  test_assert_true( util_file_exists( "test.index" ));
+  test_index_file_content( 50 );
+
+  /* Writing to a filesystem mounted from the sorted index. */
+  {
+    block_fs_type * bfs = block_fs_mount( "test.mnt" , 1000 , 10000 , 0.67 , 10 , true , false , false );
+    for (int i = 50; i < 60; i++) {
+      char * filename = util_alloc_sprintf("FILE.%d" , i);
+      block_fs_fwrite_file( bfs , filename , &i , sizeof i );
+      free( filename );
+    }
+    block_fs_unlink_file( bfs , "FILE.59");
+    block_fs_close( bfs , false );
+  }
+  test_index_file_content( 59 );
+
+  /* A corrupt index file is discarded, and the index is rebuilt from the data file. */
+  {
+    FILE * stream = util_fopen( "test.index" , "r+");
+    fseek( stream , -1 , SEEK_END );
+    fputc( 'X' , stream );
+    fclose( stream );
+  }
+  test_index_file_content( 59 );
+  test_work_area_free( work_area );
+}
+
+
+static void write_file( block_fs_type * bfs , const char * filename , int size , char value) {
+  char * data = (char *) util_malloc( size );
+  memset( data , value , size );
+  block_fs_fwrite_file( bfs , filename , data , size );
+  free( data );
+}
+
+
+static void assert_file( block_fs_type * bfs , const char * filename , int size , char value) {
+  char * data = (char *) util_malloc( size );
+  test_assert_int_equal( block_fs_get_filesize( bfs , filename ) , size );
+  block_fs_fread_file( bfs , filename , data );
+  for (int i = 0; i < size; i++)
+    test_assert_int_equal( data[i] , value );
+  free( data );
+}
+
+
+static int count_free_nodes( block_fs_type * bfs ) {
+  vector_type * files = block_fs_alloc_filelist( bfs , NULL , OFFSET_SORT , true );
+  int num_free = 0;
+  for (int i = 0; i < vector_get_size( files ); i++) {
+    const user_file_node_type * node = (const user_file_node_type *) vector_iget_const( files , i );
+    if (!user_file_node_in_use( node ))
+      num_free++;
+  }
+  vector_free( files );
+  return num_free;
+}
+
+
+void test_free_space() {
+  test_work_area_type * work_area = test_work_area_alloc("block_fs/free_space");
+  {
+    block_fs_type * bfs = block_fs_mount( "test.mnt" , 16 , 10000 , 1.0 , 10 , true , false , false );
+    write_file( bfs , "A" , 1000 , 'A');
+    write_file( bfs , "B" , 1000 , 'B');
+    write_file( bfs , "C" , 1000 , 'C');
+    write_file( bfs , "D" , 1000 , 'D');
+
+    /* Adjacent holes are merged. */
+    block_fs_unlink_file( bfs , "B");
+    block_fs_unlink_file( bfs , "C");
+    test_assert_int_equal( count_free_nodes( bfs ) , 1 );
+
+    /* A small file is placed in the hole, and the rest of the hole is split off. */
+    write_file( bfs , "E" , 100 , 'E');
+    test_assert_int_equal( count_free_nodes( bfs ) , 1 );
+    {
+      vector_type * files = block_fs_alloc_filelist( bfs , "E" , NO_SORT , false );
+      const user_file_node_type * node = (const user_file_node_type *) vector_iget_const( files , 0 );
+      test_assert_true( user_file_node_get_node_size( node ) < 1000 );
+      vector_free( files );
+    }
+
+    /* Best fit; F is placed in the hole left by A, which has exactly the right size. */
+    block_fs_unlink_file( bfs , "A");
+    write_file( bfs , "F" , 1000 , 'F');
+    {
+      vector_type * files = block_fs_alloc_filelist( bfs , "F" , NO_SORT , false );
+      const user_file_node_type * node = (const user_file_node_type *) vector_iget_const( files , 0 );
+      test_assert_int_equal( user_file_node_get_node_offset( node ) , 0 );
+      vector_free( files );
+    }
+    assert_file( bfs , "D" , 1000 , 'D');
+    assert_file( bfs , "E" , 100 , 'E');
+    assert_file( bfs , "F" , 1000 , 'F');
+    block_fs_close( bfs , false );
+  }
+
+  /* The free nodes written to the data file are consistent when the index is rebuilt. */
+  util_unlink_existing( "test.index" );
+  {
+    block_fs_type * bfs = block_fs_mount( "test.mnt" , 16 , 10000 , 1.0 , 10 , true , false , false );
+    assert_file( bfs , "D" , 1000 , 'D');
+    assert_file( bfs , "E" , 100 , 'E');
+    assert_file( bfs , "F" , 1000 , 'F');
+    test_assert_false( block_fs_has_file( bfs , "B" ));
+
+    /* Defragmentation when closing. */
+    block_fs_unlink_file( bfs , "D");
+    block_fs_unlink_file( bfs , "F");
+    test_assert_true( block_fs_get_fragmentation( bfs ) > 0.5 );
+    block_fs_set_close_fragmentation_limit( bfs , 0.5 );
+    block_fs_close( bfs , false );
+  }
+  {
+    block_fs_type * bfs = block_fs_mount( "test.mnt" , 16 , 10000 , 1.0 , 10 , true , false , false );
+    test_assert_double_equal( block_fs_get_fragmentation( bfs ) , 0 );
+    assert_file( bfs , "E" , 100 , 'E');
+    block_fs_close( bfs , false );
+  }
+  test_work_area_free( work_area );
+}
+
+
+void test_cache() {
+  test_work_area_type * work_area = test_work_area_alloc("block_fs/cache");
+  {
+    block_fs_type * bfs = block_fs_mount( "test.mnt" , 16 , 1000 , 1.0 , 10 , false , false , false );
+    block_fs_set_max_total_cache_size( bfs , 2500 );
+    write_file( bfs , "A" , 1000 , 'A');
+    write_file( bfs , "B" , 1000 , 'B');
+    write_file( bfs , "C" , 1000 , 'C');
+    write_file( bfs , "BIG" , 2000 , 'X');
+    test_assert_int_equal( block_fs_get_cache_usage( bfs ) , 0 );
+
+    assert_file( bfs , "A" , 1000 , 'A');
+    assert_file( bfs , "A" , 1000 , 'A');
+    test_assert_int_equal( block_fs_get_cache_misses( bfs ) , 1 );
+    test_assert_int_equal( block_fs_get_cache_hits( bfs ) , 1 );
+
+    /* Nodes larger than max_cache_size are not cached. */
+    assert_file( bfs , "BIG" , 2000 , 'X');
+    test_assert_int_equal( block_fs_get_cache_usage( bfs ) , 1000 );
+
+    /* Only room for two nodes; A is evicted when C is read. */
+    assert_file( bfs , "B" , 1000 , 'B');
+    assert_file( bfs , "C" , 1000 , 'C');
+    test_assert_int_equal( block_fs_get_cache_usage( bfs ) , 2000 );
+    assert_file( bfs , "C" , 1000 , 'C');
+    test_assert_int_equal( block_fs_get_cache_hits( bfs ) , 2 );
+    assert_file( bfs , "A" , 1000 , 'A');
+    test_assert_int_equal( block_fs_get_cache_hits( bfs ) , 2 );
+
+    /* Invalidation on write and unlink. */
+    write_file( bfs , "A" , 500 , 'a');
+    assert_file( bfs , "A" , 500 , 'a');
+    {
+      buffer_type * buffer = buffer_alloc( 100 );
+      block_fs_fread_realloc_buffer( bfs , "A" , buffer );
+      test_assert_int_equal( buffer_get_size( buffer ) , 500 );
+      test_assert_int_equal( ((char *) buffer_get_data( buffer ))[0] , 'a' );
+      buffer_free( buffer );
+    }
+    block_fs_unlink_file( bfs , "C" );
+    test_assert_int_equal( block_fs_get_cache_usage( bfs ) , 500 );
+
+    block_fs_close( bfs , false );
+  }
+  test_work_area_free( work_area );
+}
+
+
+/*
+  With fsync_interval == 0 nothing is synced while writing; the
+  content must still be complete after an explicit block_fs_fsync()
+  and when the file is mounted again.
+*/
+
+void test_group_commit() {
+  test_work_area_type * work_area = test_work_area_alloc("block_fs/group_commit");
+  {
+    block_fs_type * bfs = block_fs_mount( "test.mnt" , 16 , 0 , 1.0 , 10 , false , false , false );
+    test_assert_int_equal( block_fs_get_fsync_interval( bfs ) , 10 );
+    block_fs_set_fsync_interval( bfs , 0 );
+    test_assert_int_equal( block_fs_get_fsync_interval( bfs ) , 0 );
+
+    write_file( bfs , "A" , 1000 , 'A');
+    write_file( bfs , "B" , 1000 , 'B');
+    write_file( bfs , "A" , 3000 , 'a');
+    block_fs_unlink_file( bfs , "B" );
+    block_fs_fsync( bfs );
+    block_fs_close( bfs , false );
+  }
+  {
+    block_fs_type * bfs = block_fs_mount( "test.mnt" , 16 , 0 , 1.0 , 10 , false , false , false );
+    assert_file( bfs , "A" , 3000 , 'a');
+    test_assert_false( block_fs_has_file( bfs , "B" ));
+    block_fs_close( bfs , false );
+  }
+  test_work_area_free( work_area );
+}
+
+
 int main(int argc , char ** argv) {
   test_readonly();
   test_lock_conflict();
+  test_fwrite_buffer_list();
+  test_mmap();
+  test_sorted_index();
+  test_free_space();
+  test_cache();
+  test_group_commit();
   exit(0);
 }
@@ -0,0 +1,114 @@
+/*
+   Copyright (C) 2019  Statoil ASA, Norway.
+
+   The file 'ert_util_buffer_codec.cpp' is part of ERT - Ensemble based Reservoir Tool.
+
+   ERT is free software: you can redistribute it and/or modify
+   it under the terms of the GNU General Public License as published by
+   the Free Software Foundation, either version 3 of the License, or
+   (at your option) any later version.
+
+   ERT is distributed in the hope that it will be useful, but WITHOUT ANY
+   WARRANTY; without even the implied warranty of MERCHANTABILITY or
+   FITNESS FOR A PARTICULAR PURPOSE.
+
+   See the GNU General Public License at <http://www.gnu.org/licenses/gpl.html>
+   for more details.
+*/
+#include <stdlib.h>
+#include <string.h>
+#include <math.h>
+
+#include <ert/util/test_util.hpp>
+#include <ert/util/util.hpp>
+#include <ert/util/buffer.hpp>
+
+#include <ert/res_util/buffer_codec.hpp>
+
+
+static void test_roundtrip( buffer_codec_type codec , const void * data , size_t byte_size , int element_size) {
+  buffer_type * buffer = buffer_alloc( 100 );
+  char * copy = (char *) util_malloc( byte_size + 1 );
+
+  buffer_fwrite_int( buffer , 77 );
+  buffer_codec_fwrite( buffer , codec , data , byte_size , element_size );
+  buffer_rewind( buffer );
+
+  test_assert_int_equal( buffer_fread_int( buffer ) , 77 );
+  buffer_codec_fread( buffer , copy , byte_size );
+  test_assert_int_equal( buffer_get_remaining_size( buffer ) , 0 );
+  test_assert_true( memcmp( data , copy , byte_size ) == 0 );
+
+  free( copy );
+  buffer_free( buffer );
+}
+
+
+static void test_codecs( const void * data , size_t byte_size , int element_size) {
+  test_roundtrip( BUFFER_CODEC_ZLIB , data , byte_size , element_size );
+  test_roundtrip( BUFFER_CODEC_RAW , data , byte_size , element_size );
+  test_roundtrip( BUFFER_CODEC_SHUFFLE_LZ , data , byte_size , element_size );
+}
+
+
+void test_float_field() {
+  int size = 100000;
+  float * data = (float *) util_malloc( size * sizeof * data );
+  for (int i = 0; i < size; i++)
+    data[i] = 100 + 50 * sin( i * 0.001 ) + (i % 7) * 0.25;
+
+  test_codecs( data , size * sizeof * data , sizeof * data );
+  /* Size which is not a multiple of the element size. */
+  test_codecs( data , size * sizeof * data - 3 , sizeof * data );
+  free( data );
+}
+
+
+void test_special_input() {
+  int size = 50000;
+  char * data = (char *) util_malloc( size );
+
+  for (int i = 0; i < size; i++)
+    data[i] = rand();
+  test_codecs( data , size , 1 );
+
+  memset( data , 0 , size );
+  test_codecs( data , size , sizeof(double) );
+
+  test_codecs( data , 0 , sizeof(double) );
+  test_codecs( "ABCDEFGH" , 5 , 1 );
+  free( data );
+}
+
+
+void test_compression() {
+  int size = 100000;
+  double * data = (double *) util_malloc( size * sizeof * data );
+  buffer_type * buffer = buffer_alloc( 100 );
+  for (int i = 0; i < size; i++)
+    data[i] = 1.0;
+
+  test_assert_true( buffer_codec_fwrite( buffer , BUFFER_CODEC_SHUFFLE_LZ , data , size * sizeof * data , sizeof * data) < size * sizeof * data / 10);
+
+  buffer_free( buffer );
+  free( data );
+}
+
+
+void test_sscanf() {
+  buffer_codec_type codec;
+  test_assert_true( buffer_codec_sscanf( "RAW" , &codec ));
+  test_assert_int_equal( codec , BUFFER_CODEC_RAW );
+  test_assert_true( buffer_codec_sscanf( buffer_codec_get_name( BUFFER_CODEC_SHUFFLE_LZ ) , &codec ));
+  test_assert_int_equal( codec , BUFFER_CODEC_SHUFFLE_LZ );
+  test_assert_false( buffer_codec_sscanf( "LZMA" , &codec ));
+}
+
+
+int main(int argc , char ** argv) {
+  test_float_field();
+  test_special_input();
+  test_compression();
+  test_sscanf();
+  exit(0);
+}
@@ -0,0 +1,127 @@
+/*
+   Copyright (C) 2019  Statoil ASA, Norway.
+
+   The file 'ert_util_buffer_codec_benchmark.cpp' is part of ERT - Ensemble based Reservoir Tool.
+
+   ERT is free software: you can redistribute it and/or modify
+   it under the terms of the GNU General Public License as published by
+   the Free Software Foundation, either version 3 of the License, or
+   (at your option) any later version.
+
+   ERT is distributed in the hope that it will be useful, but WITHOUT ANY
+   WARRANTY; without even the implied warranty of MERCHANTABILITY or
+   FITNESS FOR A PARTICULAR PURPOSE.
+
+   See the GNU General Public License at <http://www.gnu.org/licenses/gpl.html>
+   for more details.
+*/
+
+/*
+  Benchmark of the codecs available for storing node payloads; for
+  each codec the encode and decode throughput in MB/s and the
+  compression ratio is reported. The data is a synthetic float
+  permeability field with layered, log-normal like structure. This is
+  not run as part of the test suite:
+
+     ert_util_buffer_codec_benchmark [nx ny nz]
+*/
+
+#include <stdlib.h>
+#include <stdio.h>
+#include <math.h>
+#include <time.h>
+
+#include <ert/util/util.hpp>
+#include <ert/util/buffer.hpp>
+#include <ert/util/rng.hpp>
+
+#include <ert/res_util/buffer_codec.hpp>
+
+
+static double wall_time( ) {
+  struct timespec ts;
+  clock_gettime( CLOCK_MONOTONIC , &ts );
+  return ts.tv_sec + ts.tv_nsec * 1e-9;
+}
+
+
+static float * alloc_field( int nx , int ny , int nz ) {
+  rng_type * rng = rng_alloc( MZRAN , INIT_DEFAULT );
+  float * field = (float *) util_malloc( nx * ny * nz * sizeof * field );
+
+  for (int k = 0; k < nz; k++) {
+    double layer_mean = 2 + (k % 5) * 0.5;
+    for (int j = 0; j < ny; j++) {
+      for (int i = 0; i < nx; i++) {
+        double trend = 0.3 * sin( i * 0.05 ) * cos( j * 0.05 );
+        double noise = 0.1 * (rng_get_double( rng ) - 0.5);
+        field[ i + j * nx + k * nx * ny ] = (float) exp( layer_mean + trend + noise );
+      }
+    }
+  }
+
+  rng_free( rng );
+  return field;
+}
+
+
+static void benchmark_codec( buffer_codec_type codec , const float * field , size_t byte_size ) {
+  const int repeats = 5;
+  buffer_type * buffer = buffer_alloc( byte_size );
+  float * copy = (float *) util_malloc( byte_size );
+  size_t encoded_size = 0;
+  double encode_time = 0;
+  double decode_time = 0;
+
+  for (int r = 0; r < repeats; r++) {
+    double start;
+
+    buffer_clear( buffer );
+    start = wall_time( );
+    encoded_size = buffer_codec_fwrite( buffer , codec , field , byte_size , sizeof * field );
+    encode_time += wall_time( ) - start;
+
+    buffer_rewind( buffer );
+    start = wall_time( );
+    buffer_codec_fread( buffer , copy , byte_size );
+    decode_time += wall_time( ) - start;
+  }
+
+  {
+    double MB = 1.0 * repeats * byte_size / (1024 * 1024);
+    printf("%-12s  encode: %8.1f MB/s   decode: %8.1f MB/s   ratio: %6.3f \n",
+           buffer_codec_get_name( codec ) ,
+           MB / encode_time ,
+           MB / decode_time ,
+           1.0 * byte_size / encoded_size );
+  }
+
+  free( copy );
+  buffer_free( buffer );
+}
+
+
+int main(int argc , char ** argv) {
+  int nx = 100;
+  int ny = 100;
+  int nz = 50;
+
+  if (argc == 4) {
+    util_sscanf_int( argv[1] , &nx );
+    util_sscanf_int( argv[2] , &ny );
+    util_sscanf_int( argv[3] , &nz );
+  }
+
+  {
+    float * field = alloc_field( nx , ny , nz );
+    size_t byte_size = nx * ny * nz * sizeof * field;
+
+    printf("Field: %d x %d x %d  (%.1f MB) \n", nx , ny , nz , 1.0 * byte_size / (1024 * 1024));
+    benchmark_codec( BUFFER_CODEC_ZLIB , field , byte_size );
+    benchmark_codec( BUFFER_CODEC_RAW , field , byte_size );
+    benchmark_codec( BUFFER_CODEC_SHUFFLE_LZ , field , byte_size );
+
+    free( field );
+  }
+  exit(0);
+}
@@ -0,0 +1,112 @@
+/*
+   Copyright (C) 2018  Statoil ASA, Norway.
+
+   The file 'ert_util_matrix_inplace_dgemm.cpp' is part of ERT - Ensemble based Reservoir Tool.
+
+   ERT is free software: you can redistribute it and/or modify
+   it under the terms of the GNU General Public License as published by
+   the Free Software Foundation, either version 3 of the License, or
+   (at your option) any later version.
+
+   ERT is distributed in the hope that it will be useful, but WITHOUT ANY
+   WARRANTY; without even the implied warranty of MERCHANTABILITY or
+   FITNESS FOR A PARTICULAR PURPOSE.
+
+   See the GNU General Public License at <http://www.gnu.org/licenses/gpl.html>
+   for more details.
+*/
+#include <stdlib.h>
+#include <math.h>
+
+#include <ert/util/test_util.hpp>
+#include <ert/util/rng.hpp>
+
+#include <ert/res_util/matrix.hpp>
+#include <ert/res_util/matrix_blas.hpp>
+#include <ert/res_util/thread_pool.hpp>
+
+
+bool matrix_similar( const matrix_type * m1 , const matrix_type * m2 , double epsilon) {
+  if (matrix_get_rows( m1 ) != matrix_get_rows( m2 ) || matrix_get_columns( m1 ) != matrix_get_columns( m2 ))
+    return false;
+
+  for (int i = 0; i < matrix_get_rows( m1 ); i++)
+    for (int j = 0; j < matrix_get_columns( m1 ); j++)
+      if (fabs( matrix_iget( m1 , i , j ) - matrix_iget( m2 , i , j )) > epsilon)
+        return false;
+
+  return true;
+}
+
+
+void test_inplace_dgemm( int rows , int columns , rng_type * rng) {
+  matrix_type * A = matrix_alloc( rows , columns );
+  matrix_type * X = matrix_alloc( columns , columns );
+  matrix_type * A1 , * A2 , * A3;
+
+  matrix_random_init( A , rng );
+  matrix_random_init( X , rng );
+  A1 = matrix_alloc_copy( A );
+  A2 = matrix_alloc_copy( A );
+  A3 = matrix_alloc_copy( A );
+
+  matrix_inplace_matmul( A1 , X );
+  matrix_inplace_dgemm( A2 , X );
+  test_assert_true( matrix_similar( A1 , A2 , 1e-10 ));
+
+  {
+    thread_pool_type * tp = thread_pool_alloc( 4 , false );
+    matrix_inplace_dgemm_mt2( A3 , X , tp );
+    test_assert_true( matrix_similar( A1 , A3 , 1e-10 ));
+    thread_pool_free( tp );
+  }
+
+  matrix_free( A3 );
+  matrix_free( A2 );
+  matrix_free( A1 );
+  matrix_free( X );
+  matrix_free( A );
+}
+
+
+/*
+  The row offset view has a column stride which is larger than the
+  number of rows.
+*/
+
+void test_inplace_dgemm_view( rng_type * rng ) {
+  matrix_type * A = matrix_alloc( 500 , 20 );
+  matrix_type * X = matrix_alloc( 20 , 20 );
+  matrix_random_init( A , rng );
+  matrix_random_init( X , rng );
+  {
+    matrix_type * A1 = matrix_alloc_copy( A );
+    matrix_type * view1 = matrix_alloc_shared( A1 , 100 , 0 , 300 , 20 );
+    matrix_type * view2 = matrix_alloc_shared( A , 100 , 0 , 300 , 20 );
+
+    matrix_inplace_matmul( view1 , X );
+    matrix_inplace_dgemm( view2 , X );
+    test_assert_true( matrix_similar( A1 , A , 1e-10 ));
+
+    matrix_free( view2 );
+    matrix_free( view1 );
+    matrix_free( A1 );
+  }
+  matrix_free( X );
+  matrix_free( A );
+}
+
+
+int main(int argc , char ** argv) {
+  rng_type * rng = rng_alloc( MZRAN , INIT_DEFAULT );
+
+  test_inplace_dgemm( 1 , 1 , rng );
+  test_inplace_dgemm( 3 , 10 , rng );
+  test_inplace_dgemm( 100 , 10 , rng );
+  test_inplace_dgemm( 1000 , 50 , rng );
+  test_inplace_dgemm( 10001 , 100 , rng );
+  test_inplace_dgemm_view( rng );
+
+  rng_free( rng );
+  exit(0);
+}
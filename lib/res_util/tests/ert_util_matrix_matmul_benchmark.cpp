@@ -0,0 +1,101 @@
+/*
+   Copyright (C) 2018  Statoil ASA, Norway.
+
+   The file 'ert_util_matrix_matmul_benchmark.cpp' is part of ERT - Ensemble based Reservoir Tool.
+
+   ERT is free software: you can redistribute it and/or modify
+   it under the terms of the GNU General Public License as published by
+   the Free Software Foundation, either version 3 of the License, or
+   (at your option) any later version.
+
+   ERT is distributed in the hope that it will be useful, but WITHOUT ANY
+   WARRANTY; without even the implied warranty of MERCHANTABILITY or
+   FITNESS FOR A PARTICULAR PURPOSE.
+
+   See the GNU General Public License at <http://www.gnu.org/licenses/gpl.html>
+   for more details.
+*/
+
+/*
+  Benchmark of the in place A = A*X multiplication used in the EnKF/ES
+  update; compares matrix_inplace_matmul_mt2() with the dgemm() based
+  matrix_inplace_dgemm_mt2() for a range of (rows , ensemble size)
+  combinations. This is not run as part of the test suite:
+
+     ert_util_matrix_matmul_benchmark [num_threads] [max_rows]
+*/
+
+#include <stdlib.h>
+#include <stdio.h>
+#include <time.h>
+
+#define HAVE_THREAD_POOL 1
+
+#include <ert/util/util.hpp>
+#include <ert/util/rng.hpp>
+
+#include <ert/res_util/matrix.hpp>
+#include <ert/res_util/matrix_blas.hpp>
+#include <ert/res_util/thread_pool.hpp>
+
+
+static double wall_time( ) {
+  struct timespec ts;
+  clock_gettime( CLOCK_MONOTONIC , &ts );
+  return ts.tv_sec + ts.tv_nsec * 1e-9;
+}
+
+
+static double time_matmul( matrix_type * A , const matrix_type * X , thread_pool_type * tp , bool use_dgemm) {
+  double start = wall_time( );
+  if (use_dgemm)
+    matrix_inplace_dgemm_mt2( A , X , tp );
+  else
+    matrix_inplace_matmul_mt2( A , X , tp );
+  return wall_time( ) - start;
+}
+
+
+int main(int argc , char ** argv) {
+  int num_threads = 4;
+  int max_rows = 1000000;
+  const int row_list[] = {10000 , 100000 , 1000000};
+  const int ens_list[] = {50 , 100 , 200};
+  rng_type * rng = rng_alloc( MZRAN , INIT_DEFAULT );
+
+  if (argc > 1)
+    util_sscanf_int( argv[1] , &num_threads );
+  if (argc > 2)
+    util_sscanf_int( argv[2] , &max_rows );
+
+  {
+    thread_pool_type * tp = thread_pool_alloc( num_threads , false );
+    printf("%10s %6s %14s %14s %10s\n" , "rows" , "ens" , "matmul [s]" , "dgemm [s]" , "speedup");
+    for (size_t ir = 0; ir < sizeof row_list / sizeof row_list[0]; ir++) {
+      int rows = row_list[ir];
+      if (rows > max_rows)
+        continue;
+
+      for (size_t ie = 0; ie < sizeof ens_list / sizeof ens_list[0]; ie++) {
+        int ens_size = ens_list[ie];
+        matrix_type * A = matrix_alloc( rows , ens_size );
+        matrix_type * X = matrix_alloc( ens_size , ens_size );
+        double matmul_time , dgemm_time;
+
+        matrix_random_init( A , rng );
+        matrix_random_init( X , rng );
+
+        matmul_time = time_matmul( A , X , tp , false );
+        dgemm_time  = time_matmul( A , X , tp , true );
+        printf("%10d %6d %14.3f %14.3f %10.1f\n" , rows , ens_size , matmul_time , dgemm_time , matmul_time / dgemm_time);
+
+        matrix_free( X );
+        matrix_free( A );
+      }
+    }
+    thread_pool_free( tp );
+  }
+
+  rng_free( rng );
+  exit(0);
+}
@@ -90,8 +90,106 @@ void test_filter_file2() {
 
 
 
+void test_cascade() {
+  subst_list_type * parent = subst_list_alloc( NULL );
+  subst_list_type * subst_list = subst_list_alloc( parent );
+
+  subst_list_append_copy( parent , "<PATH>" , "/tmp/run/<CASE>" , NULL);
+  subst_list_append_copy( subst_list , "<CASE>" , "Test<N>" , NULL);
+  subst_list_append_copy( subst_list , "<N>" , "4" , NULL);
+  {
+    char * s = subst_list_alloc_filtered_string( subst_list , "<PATH>/<CASE>.DATA" );
+    test_assert_string_equal( s , "/tmp/run/Test4/Test4.DATA");
+    free( s );
+  }
+
+  /* The value of a key is not substituted by a key which comes before it. */
+  subst_list_append_copy( subst_list , "<M>" , "<N>" , NULL);
+  {
+    char * s = subst_list_alloc_filtered_string( subst_list , "<M>" );
+    test_assert_string_equal( s , "<N>");
+    free( s );
+  }
+
+  subst_list_free( subst_list );
+  subst_list_free( parent );
+}
+
+
+void test_overlapping_keys() {
+  subst_list_type * subst_list = subst_list_alloc( NULL );
+  subst_list_append_copy( subst_list , "AA" , "b" , NULL);
+  subst_list_append_copy( subst_list , "Ab" , "c" , NULL);
+  {
+    char * s = subst_list_alloc_filtered_string( subst_list , "AAAAA" );
+    test_assert_string_equal( s , "bbA");
+    free( s );
+  }
+  {
+    char * s = subst_list_alloc_filtered_string( subst_list , "AAAb" );
+    test_assert_string_equal( s , "bc");
+    free( s );
+  }
+  subst_list_free( subst_list );
+}
+
+
+/*
+  The matcher is cached in the subst_list; changes to the list or to
+  the parent must be picked up.
+*/
+
+void test_update_after_change() {
+  subst_list_type * parent = subst_list_alloc( NULL );
+  subst_list_type * subst_list = subst_list_alloc( parent );
+
+  subst_list_append_copy( parent , "<A>" , "a" , NULL);
+  subst_list_append_copy( subst_list , "<B>" , "b" , NULL);
+  {
+    char * s = subst_list_alloc_filtered_string( subst_list , "<A><B><C>" );
+    test_assert_string_equal( s , "ab<C>");
+    free( s );
+  }
+
+  subst_list_append_copy( subst_list , "<C>" , "c" , NULL);
+  subst_list_append_copy( subst_list , "<B>" , "B" , NULL);
+  {
+    char * s = subst_list_alloc_filtered_string( subst_list , "<A><B><C>" );
+    test_assert_string_equal( s , "aBc");
+    free( s );
+  }
+
+  subst_list_append_copy( parent , "<A>" , "A" , NULL);
+  {
+    char * s = subst_list_alloc_filtered_string( subst_list , "<A><B><C>" );
+    test_assert_string_equal( s , "ABc");
+    free( s );
+  }
+
+  subst_list_set_parent( subst_list , NULL );
+  {
+    char * s = subst_list_alloc_filtered_string( subst_list , "<A><B><C>" );
+    test_assert_string_equal( s , "<A>Bc");
+    free( s );
+  }
+
+  subst_list_clear( subst_list );
+  {
+    char * s = subst_list_alloc_filtered_string( subst_list , "<A><B><C>" );
+    test_assert_string_equal( s , "<A><B><C>");
+    free( s );
+  }
+
+  subst_list_free( subst_list );
+  subst_list_free( parent );
+}
+
+
 int main(int argc , char ** argv) {
   test_create();
   test_filter_file1();
   test_filter_file2();
+  test_cascade();
+  test_overlapping_keys();
+  test_update_after_change();
 }
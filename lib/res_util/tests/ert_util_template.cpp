@@ -0,0 +1,139 @@
+/*
+   Copyright (C) 2018  Statoil ASA, Norway.
+
+   The file 'ert_util_template.cpp' is part of ERT - Ensemble based Reservoir Tool.
+
+   ERT is free software: you can redistribute it and/or modify
+   it under the terms of the GNU General Public License as published by
+   the Free Software Foundation, either version 3 of the License, or
+   (at your option) any later version.
+
+   ERT is distributed in the hope that it will be useful, but WITHOUT ANY
+   WARRANTY; without even the implied warranty of MERCHANTABILITY or
+   FITNESS FOR A PARTICULAR PURPOSE.
+
+   See the GNU General Public License at <http://www.gnu.org/licenses/gpl.html>
+   for more details.
+*/
+#include <stdlib.h>
+#include <stdbool.h>
+#include <string.h>
+#include <fcntl.h>
+#include <sys/stat.h>
+
+#include <ert/util/test_work_area.hpp>
+#include <ert/util/test_util.hpp>
+#include <ert/res_util/subst_list.hpp>
+#include <ert/res_util/template.hpp>
+
+
+static void write_file( const char * filename , const char * content ) {
+  FILE * stream = util_fopen( filename , "w");
+  fputs( content , stream );
+  fclose( stream );
+}
+
+
+static void assert_file_content( const char * filename , const char * expected ) {
+  char * content = util_fread_alloc_file_content( filename , NULL );
+  test_assert_string_equal( content , expected );
+  free( content );
+}
+
+
+void test_instantiate() {
+  test_work_area_type * work_area = test_work_area_alloc("template/instantiate");
+  subst_list_type * arg_list = subst_list_alloc( NULL );
+  template_type * tmpl;
+
+  write_file( "template" , "<KEY>:{% for x in [1,2] %}x{% endfor %}");
+  tmpl = template_alloc( "template" , false , NULL );
+
+  subst_list_append_copy( arg_list , "<KEY>" , "Value1" , NULL );
+  template_instantiate( tmpl , "target1" , arg_list , false );
+  assert_file_content( "target1" , "Value1:12" );
+
+  subst_list_append_copy( arg_list , "<KEY>" , "Value2" , NULL );
+  template_instantiate( tmpl , "target2" , arg_list , false );
+  assert_file_content( "target2" , "Value2:12" );
+
+  /* The template file is updated on disk; the cached content must be discarded. */
+  write_file( "template" , "New content: <KEY>");
+  template_instantiate( tmpl , "target3" , arg_list , false );
+  assert_file_content( "target3" , "New content: Value2" );
+
+  template_free( tmpl );
+  subst_list_free( arg_list );
+  test_work_area_free( work_area );
+}
+
+
+static void set_mtime( const char * filename , time_t sec , long nsec ) {
+  struct timespec times[2];
+  times[0].tv_sec  = sec;
+  times[0].tv_nsec = nsec;
+  times[1].tv_sec  = sec;
+  times[1].tv_nsec = nsec;
+  test_assert_int_equal( utimensat( AT_FDCWD , filename , times , 0 ) , 0 );
+}
+
+
+/*
+  The template is rewritten with content of the same size, and a
+  modification time which only differs in the nanoseconds.
+*/
+
+void test_update_same_second() {
+  test_work_area_type * work_area = test_work_area_alloc("template/same_second");
+  subst_list_type * arg_list = subst_list_alloc( NULL );
+  template_type * tmpl;
+
+  subst_list_append_copy( arg_list , "<KEY>" , "Value" , NULL );
+  write_file( "template" , "Content A: <KEY>");
+  set_mtime( "template" , 1000000 , 0 );
+  tmpl = template_alloc( "template" , false , NULL );
+  template_instantiate( tmpl , "target1" , arg_list , false );
+  assert_file_content( "target1" , "Content A: Value" );
+
+  write_file( "template" , "Content B: <KEY>");
+  set_mtime( "template" , 1000000 , 500000000 );
+  template_instantiate( tmpl , "target2" , arg_list , false );
+  assert_file_content( "target2" , "Content B: Value" );
+
+  template_free( tmpl );
+  subst_list_free( arg_list );
+  test_work_area_free( work_area );
+}
+
+
+void test_template_file_key() {
+  test_work_area_type * work_area = test_work_area_alloc("template/file_key");
+  subst_list_type * arg_list = subst_list_alloc( NULL );
+  template_type * tmpl;
+
+  write_file( "template0" , "Template 0");
+  write_file( "template1" , "Template 1");
+  tmpl = template_alloc( "template<IENS>" , false , NULL );
+
+  for (int iens = 0; iens < 4; iens++) {
+    char * iens_string = util_alloc_sprintf("%d" , iens % 2);
+    char * expected = util_alloc_sprintf("Template %d" , iens % 2);
+
+    subst_list_append_owned_ref( arg_list , "<IENS>" , iens_string , NULL );
+    template_instantiate( tmpl , "target" , arg_list , false );
+    assert_file_content( "target" , expected );
+
+    free( expected );
+  }
+
+  template_free( tmpl );
+  subst_list_free( arg_list );
+  test_work_area_free( work_area );
+}
+
+
+int main(int argc , char ** argv) {
+  test_instantiate();
+  test_update_same_second();
+  test_template_file_key();
+}
@@ -23,6 +23,7 @@
 
 #include <ert/util/hash.hpp>
 #include <ert/util/vector.hpp>
+#include <ert/util/long_vector.hpp>
 #include <ert/util/util.hpp>
 
 #include <ert/rms/rms_type.hpp>
@@ -49,6 +50,10 @@ struct rms_file_struct {
   hash_type    * type_map;
   vector_type  * tag_list;
   FILE         * stream;
+
+  bool               indexed;     /* The index below is built on the first rms_file_fread_alloc_tag() call. */
+  vector_type      * tag_index;   /* Tags with only the scalar and char tagkeys - see rms_tag_fread_alloc_header(). */
+  long_vector_type * tag_offset;  /* The offset in the file of the corresponding tag in tag_index. */
 };
 
 
@@ -123,6 +128,9 @@ rms_file_type * rms_file_alloc(const char *filename, bool fmt_file) {
   rms_file->endian_convert  = false;
   rms_file->type_map        = hash_alloc();
   rms_file->tag_list        = vector_alloc_new();
+  rms_file->tag_index       = vector_alloc_new();
+  rms_file->tag_offset      = long_vector_alloc(0 , 0);
+  rms_file->indexed         = false;
 
   hash_insert_hash_owned_ref(rms_file->type_map , "byte"   , rms_type_alloc(rms_byte_type ,    1) ,  rms_type_free);
   hash_insert_hash_owned_ref(rms_file->type_map , "bool"   , rms_type_alloc(rms_bool_type,     1) ,  rms_type_free);
@@ -139,9 +147,17 @@ rms_file_type * rms_file_alloc(const char *filename, bool fmt_file) {
 }
 
 
+static void rms_file_clear_index(rms_file_type * rms_file) {
+  vector_clear( rms_file->tag_index );
+  long_vector_reset( rms_file->tag_offset );
+  rms_file->indexed = false;
+}
+
+
 void rms_file_set_filename(rms_file_type * rms_file , const char *filename , bool fmt_file) {
   rms_file->filename = util_realloc_string_copy(rms_file->filename , filename);
   rms_file->fmt_file   = fmt_file;
+  rms_file_clear_index(rms_file);
 }
 
 
@@ -153,6 +169,8 @@ void rms_file_free_data(rms_file_type * rms_file) {
 void rms_file_free(rms_file_type * rms_file) {
   rms_file_free_data(rms_file);
   vector_free( rms_file->tag_list );
+  vector_free( rms_file->tag_index );
+  long_vector_free( rms_file->tag_offset );
   hash_free(rms_file->type_map);
   free(rms_file->filename);
   free(rms_file);
@@ -238,6 +256,38 @@ static void rms_file_init_fread(rms_file_type * rms_file) {
 }
 
 
+/*
+   Scans the file once and records the offset of every tag, along with
+   the tag itself without the data of the array tagkeys. The stream
+   must be open for reading and positioned at the start of the file.
+*/
+static void rms_file_build_index(rms_file_type * rms_file) {
+  rms_file_init_fread(rms_file);
+  while (true) {
+    bool eof_tag = false;
+    long int offset = util_ftell(rms_file->stream);
+    rms_tag_type * tag = rms_tag_fread_alloc_header(rms_file->stream,
+                                                    rms_file->type_map,
+                                                    rms_file->endian_convert,
+                                                    &eof_tag);
+    if (eof_tag) {
+      rms_tag_free(tag);
+      break;
+    }
+
+    vector_append_owned_ref(rms_file->tag_index , tag , rms_tag_free__);
+    long_vector_append(rms_file->tag_offset , offset);
+  }
+  rms_file->indexed = true;
+}
+
+
+/*
+   The first call builds the tag index of the file; this and the
+   subsequent calls then seek directly to the tag which is looked for,
+   and only that tag is loaded. The index is not updated if the file
+   is modified on disk.
+*/
 rms_tag_type * rms_file_fread_alloc_tag(rms_file_type * rms_file,
                                         const char *tagname,
                                         const char *keyname,
@@ -245,35 +295,31 @@ rms_tag_type * rms_file_fread_alloc_tag(rms_file_type * rms_file,
   rms_tag_type * tag = NULL;
   rms_file_fopen_r(rms_file);
 
-  long int start_pos = util_ftell(rms_file->stream);
-  fseek(rms_file->stream , 0 , SEEK_SET);
-  rms_file_init_fread(rms_file);
-  while (true) {
-    bool eof_tag = false;  // will be set by rms_tag
-    rms_tag_type * tmp_tag = rms_tag_fread_alloc(rms_file->stream,
-                                                 rms_file->type_map,
-                                                 rms_file->endian_convert,
-                                                 &eof_tag);
-
-    if (!rms_tag_name_eq(tmp_tag, tagname, keyname, keyvalue)) {
-      rms_tag_free(tmp_tag);
-      continue;
+  if (!rms_file->indexed)
+    rms_file_build_index(rms_file);
+
+  for (int index = 0; index < vector_get_size(rms_file->tag_index); index++) {
+    const rms_tag_type * index_tag = (const rms_tag_type *) vector_iget_const(rms_file->tag_index , index);
+    if (rms_tag_name_eq(index_tag , tagname , keyname , keyvalue)) {
+      bool eof_tag = false;
+      fseek(rms_file->stream , long_vector_iget(rms_file->tag_offset , index) , SEEK_SET);
+      tag = rms_tag_fread_alloc(rms_file->stream,
+                                rms_file->type_map,
+                                rms_file->endian_convert,
+                                &eof_tag);
+      break;
     }
-    tag = tmp_tag;
-    break;
   }
+  rms_file_fclose(rms_file);
 
-  if (tag == NULL) {
-    fseek(rms_file->stream , start_pos , SEEK_SET);
+  if (tag == NULL)
     util_abort("%s: could not find tag: \"%s\" (with %s=%s) in file:%s - aborting.\n",
                __func__,
                tagname,
                keyname,
                keyvalue,
                rms_file->filename);
-  }
 
-  rms_file_fclose(rms_file);
   return tag;
 }
 
@@ -285,6 +331,7 @@ FILE * rms_file_fopen_r(rms_file_type *rms_file) {
 
 
 FILE * rms_file_fopen_w(rms_file_type *rms_file) {
+  rms_file_clear_index(rms_file);
   rms_file->stream = util_mkdir_fopen(rms_file->filename , "w");
   return rms_file->stream;
 }
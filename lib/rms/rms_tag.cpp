@@ -240,6 +240,32 @@ rms_tag_type * rms_tag_fread_alloc(FILE *stream,
 
 
 
+/*
+   Reads a tag without loading the data of the numeric array tagkeys,
+   i.e. the tag only contains the scalar and char tagkeys; that is
+   sufficient for rms_tag_name_eq(). Used to index a file.
+*/
+rms_tag_type * rms_tag_fread_alloc_header(FILE *stream,
+                                          hash_type *type_map,
+                                          bool endian_convert,
+                                          bool *at_eof) {
+  rms_tag_type *tag = rms_tag_alloc(NULL);
+  rms_tag_fread_header(tag , stream , at_eof);
+  if (*at_eof)
+    return tag;
+
+  while (! rms_tag_at_endtag(stream)) {
+    rms_tagkey_type *tagkey = rms_tagkey_alloc_empty(endian_convert);
+    if (rms_tagkey_load_or_skip(tagkey , endian_convert , stream , type_map))
+      rms_tag_add_tagkey(tag , tagkey , OWNED_REF);
+    else
+      rms_tagkey_free(tagkey);
+  }
+  return tag;
+}
+
+
+
 void rms_tag_fwrite(const rms_tag_type * tag , FILE * stream) {
   rms_util_fwrite_string("tag"     , stream);
   rms_util_fwrite_string(tag->name , stream);
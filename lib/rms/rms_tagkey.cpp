@@ -559,6 +559,24 @@ void rms_tagkey_load(rms_tagkey_type *tagkey , bool endian_convert , FILE *strea
 }
 
 
+/*
+   Scalar and char tagkeys are loaded as with rms_tagkey_load(); for
+   the other array tagkeys only the header is read, and the stream is
+   positioned after the data. Returns true if the data was loaded.
+*/
+bool rms_tagkey_load_or_skip(rms_tagkey_type *tagkey , bool endian_convert , FILE *stream, hash_type *type_map) {
+  rms_fread_tagkey_header(tagkey , stream , type_map);
+  if ((tagkey->size == 1) || (tagkey->rms_type == rms_char_type)) {
+    rms_tagkey_alloc_data(tagkey);
+    rms_tagkey_fread_data(tagkey , endian_convert , stream);
+    return true;
+  } else {
+    fseek(stream , tagkey->data_size , SEEK_CUR);
+    return false;
+  }
+}
+
+
 bool rms_tagkey_char_eq(const rms_tagkey_type *tagkey , const char *keyvalue) {
   bool eq = false;
   if (tagkey->rms_type == rms_char_type) {
@@ -21,6 +21,7 @@
 #include <unistd.h>
 
 #include <ert/util/test_util.hpp>
+#include <ert/util/test_work_area.hpp>
 #include <ert/util/util.hpp>
 
 #include <ert/rms/rms_util.hpp>
@@ -44,7 +45,81 @@ void test_rms_file_fread_alloc_data_tagkey(rms_file_type *rms_file) {
 }
 
 
+static void write_parameters(const char * filename , int nx , int ny , int nz , int num_param) {
+  rms_file_type * rms_file = rms_file_alloc(filename , false);
+  int size = nx * ny * nz;
+  float * data = (float *) util_calloc(size , sizeof * data);
+
+  rms_file_fopen_w(rms_file);
+  rms_file_init_fwrite(rms_file , "parameter");
+  rms_tag_fwrite_dimensions(nx , ny , nz , rms_file_get_FILE(rms_file));
+  for (int iparam = 0; iparam < num_param; iparam++) {
+    char * name = util_alloc_sprintf("PARAM%d" , iparam);
+    for (int i = 0; i < size; i++)
+      data[i] = iparam * 1000 + i;
+    {
+      rms_tagkey_type * data_key = rms_tagkey_alloc_complete("data" , size , rms_float_type , data , true);
+      rms_tag_fwrite_parameter(name , data_key , rms_file_get_FILE(rms_file));
+      rms_tagkey_free(data_key);
+    }
+    free(name);
+  }
+  rms_file_complete_fwrite(rms_file);
+  rms_file_fclose(rms_file);
+  rms_file_free(rms_file);
+  free(data);
+}
+
+
+static void fread_missing_tag(void * arg) {
+  rms_file_type * rms_file = (rms_file_type *) arg;
+  rms_file_fread_alloc_tag(rms_file , "parameter" , "name" , "MISSING");
+}
+
+
+void test_tag_index() {
+  test_work_area_type * work_area = test_work_area_alloc("rms_file/tag_index");
+  const int nx = 4, ny = 5, nz = 3;
+  const int num_param = 10;
+  write_parameters("multi.roff" , nx , ny , nz , num_param);
+  {
+    rms_file_type * rms_file = rms_file_alloc("multi.roff" , false);
+
+    /* Lookups in reverse order - all served from the same index. */
+    for (int iparam = num_param - 1; iparam >= 0; iparam--) {
+      char * name = util_alloc_sprintf("PARAM%d" , iparam);
+      rms_tagkey_type * data_key = rms_file_fread_alloc_data_tagkey(rms_file , "parameter" , "name" , name);
+      const float * data = (const float *) rms_tagkey_get_data_ref(data_key);
+
+      test_assert_int_equal(nx * ny * nz , rms_tagkey_get_size(data_key));
+      test_assert_float_equal(iparam * 1000 , data[0]);
+      test_assert_float_equal(iparam * 1000 + 7 , data[7]);
+      rms_tagkey_free(data_key);
+      free(name);
+    }
+
+    {
+      rms_tag_type * dim_tag = rms_file_fread_alloc_tag(rms_file , "dimensions" , NULL , NULL);
+      test_assert_int_equal(ny , *(int *) rms_tagkey_get_data_ref(rms_tag_get_key(dim_tag , "nY")));
+      rms_tag_free(dim_tag);
+    }
+
+    {
+      rms_tag_type * param_tag = rms_file_fread_alloc_tag(rms_file , "parameter" , NULL , NULL);
+      test_assert_string_equal("PARAM0" , rms_tag_get_namekey_name(param_tag));
+      rms_tag_free(param_tag);
+    }
+
+    test_assert_util_abort("rms_file_fread_alloc_tag" , fread_missing_tag , rms_file);
+    rms_file_free(rms_file);
+  }
+  test_work_area_free(work_area);
+}
+
+
 int main(int argc , char ** argv) {
+  test_tag_index();
+
   const char * filename    = argv[1];
   rms_file_type * rms_file = rms_file_alloc(filename , false);
   test_assert_not_NULL(rms_file);
@@ -196,14 +196,23 @@ bool history_init_ts( const history_type * history , const char * summary_key ,
 
     if (local_key) {
       if (ecl_sum_has_general_var( history->refcase , local_key )) {
+        /*
+          The key is resolved to a parameter index once, and the full
+          time series is fetched in one go; the values are then picked
+          out at the end of each report step.
+        */
+        int params_index = ecl_sum_get_general_var_params_index( history->refcase , local_key );
+        double_vector_type * data = ecl_sum_alloc_data_vector( history->refcase , params_index , false );
+
         for (int tstep = 0; tstep <= history_get_last_restart(history); tstep++) {
           if (ecl_sum_has_report_step(history->refcase, tstep)) {
             int time_index = ecl_sum_iget_report_end( history->refcase , tstep );
-            double_vector_iset( value , tstep , ecl_sum_get_general_var( history->refcase , time_index , local_key ));
+            double_vector_iset( value , tstep , double_vector_iget( data , time_index ));
             bool_vector_iset( valid , tstep , true );
           } else
             bool_vector_iset( valid , tstep , false );    /* Did not have this report step */
         }
+        double_vector_free( data );
         initOK = true;
       }
 
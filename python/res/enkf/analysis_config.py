@@ -52,6 +52,10 @@ class AnalysisConfig(BaseCClass):
     _set_alpha = ResPrototype("void analysis_config_set_alpha(analysis_config, double)")
     _get_std_cutoff = ResPrototype("double analysis_config_get_std_cutoff(analysis_config)")
     _set_std_cutoff = ResPrototype("void analysis_config_set_std_cutoff(analysis_config, double)")
+    _get_update_threads = ResPrototype("int analysis_config_get_update_threads(analysis_config)")
+    _set_update_threads = ResPrototype("void analysis_config_set_update_threads(analysis_config, int)")
+    _get_row_block_size = ResPrototype("int analysis_config_get_row_block_size(analysis_config)")
+    _set_row_block_size = ResPrototype("void analysis_config_set_row_block_size(analysis_config, int)")
     _set_global_std_scaling = ResPrototype("void analysis_config_set_global_std_scaling(analysis_config, double)")
     _get_global_std_scaling = ResPrototype("double analysis_config_get_global_std_scaling(analysis_config)")
 
@@ -101,6 +105,20 @@ class AnalysisConfig(BaseCClass):
     def setStdCutoff(self, std_cutoff):
         self._set_std_cutoff(std_cutoff)
 
+    def get_update_threads(self):
+        """ @rtype: int """
+        return self._get_update_threads()
+
+    def set_update_threads(self, threads):
+        self._set_update_threads(threads)
+
+    def get_row_block_size(self):
+        """ @rtype: int """
+        return self._get_row_block_size()
+
+    def set_row_block_size(self, row_block_size):
+        self._set_row_block_size(row_block_size)
+
     def get_merge_observations(self):
         return self._get_merge_observations()
 
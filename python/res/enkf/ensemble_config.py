@@ -13,8 +13,11 @@
 #
 #  See the GNU General Public License at <http://www.gnu.org/licenses/gpl.html>
 #  for more details.
+import ctypes
+
+import numpy
 from cwrap import BaseCClass
-from ecl.util.util import StringList
+from ecl.util.util import StringList, IntVector
 from ecl.grid import EclGrid
 from ecl.summary import EclSum
 from res import ResPrototype
@@ -41,6 +44,7 @@ class EnsembleConfig(BaseCClass):
     _add_node = ResPrototype("void ensemble_config_add_node( ens_config , enkf_config_node )")
     _summary_key_matcher = ResPrototype("summary_key_matcher_ref ensemble_config_get_summary_key_matcher(ens_config)")
     _add_defined_custom_kw = ResPrototype("enkf_config_node_ref ensemble_config_add_defined_custom_kw(ens_config, char*, integer_hash)")
+    _store_ext_param_values = ResPrototype("void ext_param_store_values(enkf_fs, ens_config, stringlist, int, int_vector, double*)", bind = False)
 
 
 
@@ -116,3 +120,49 @@ class EnsembleConfig(BaseCClass):
 
         return self[group_name]
 
+
+    def storeExtParamValues(self, file_system, values, realizations=None, report_step=0):
+        """
+        Will store the values for several EXT_PARAM nodes and several
+        realizations with one write to the file system.
+
+        The @values argument should be a dictionary where the keys are
+        the names of EXT_PARAM nodes, and the values are numpy arrays
+        with shape [num_realizations x node size]; row i holds the
+        values for realization realizations[i]. If @realizations is not
+        given the rows are stored as realizations 0, 1, 2, ...
+        """
+        keys = list(values.keys())
+        arrays = []
+        num_realizations = None
+        for key in keys:
+            config_node = self[key]
+            if config_node.getImplementationType() != ErtImplType.EXT_PARAM:
+                raise TypeError("The node: %s is not an EXT_PARAM node" % key)
+
+            array = numpy.asarray(values[key], dtype=numpy.float64)
+            size = len(config_node.getModelConfig())
+            if array.ndim != 2 or array.shape[1] != size:
+                raise ValueError("Expected values with shape (num_realizations, %d) for: %s" % (size, key))
+
+            if num_realizations is None:
+                num_realizations = array.shape[0]
+            elif array.shape[0] != num_realizations:
+                raise ValueError("All the value arrays must have the same number of realizations")
+            arrays.append(array)
+
+        if not keys:
+            return
+
+        if realizations is None:
+            realizations = range(num_realizations)
+        if len(realizations) != num_realizations:
+            raise ValueError("Expected %d realizations, got %d" % (num_realizations, len(realizations)))
+
+        iens_list = IntVector()
+        for iens in realizations:
+            iens_list.append(iens)
+
+        data = numpy.ascontiguousarray(numpy.hstack(arrays))
+        self._store_ext_param_values(file_system, self, StringList(initial=keys), report_step, iens_list,
+                                     data.ctypes.data_as(ctypes.POINTER(ctypes.c_double)))
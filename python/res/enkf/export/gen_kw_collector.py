@@ -1,10 +1,9 @@
-import math
 from pandas import DataFrame, MultiIndex
 import numpy
 from res.enkf import ErtImplType, EnKFMain, EnkfFs, RealizationStateEnum, GenKwConfig
 from res.enkf.key_manager import KeyManager
 from res.enkf.plot_data import EnsemblePlotGenKW
-from ecl.util.util import BoolVector
+from ecl.util.util import BoolVector, IntVector
 
 
 class GenKwCollector(object):
@@ -44,6 +43,9 @@ class GenKwCollector(object):
         gen_kw_array = numpy.empty(shape=(len(gen_kw_keys), len(realizations)), dtype=numpy.float64)
         gen_kw_array.fill(numpy.nan)
 
+        # Group the columns by GEN_KW node so every node is loaded once
+        # per realization, irrespective of how many keywords are requested.
+        node_columns = {}
         for column_index, key in enumerate(gen_kw_keys):
             key, keyword = key.split(":")
 
@@ -52,19 +54,30 @@ class GenKwCollector(object):
                 key = key[6:]
                 use_log_scale = True
 
+            node_columns.setdefault(key, []).append((column_index, keyword, use_log_scale))
+
+        ens_mask = BoolVector(False, ert.getEnsembleSize())
+        realization_vector = IntVector()
+        for realization_number in realizations:
+            ens_mask[realization_number] = True
+            realization_vector.append(realization_number)
+
+        for key, columns in node_columns.items():
             ensemble_config_node = ert.ensembleConfig().getNode(key)
-            ensemble_data = EnsemblePlotGenKW(ensemble_config_node, fs)
-            keyword_index = ensemble_data.getIndexForKeyword(keyword)
+            ensemble_data = EnsemblePlotGenKW(ensemble_config_node, fs, ens_mask)
 
-            for realization_index, realization_number in enumerate(realizations):
-                realization_vector = ensemble_data[realization_number]
+            node_array = numpy.empty(shape=(len(realizations), ensemble_data.getKeyWordCount()), dtype=numpy.float64)
+            node_array.fill(numpy.nan)
+            ensemble_data.exportValues(realization_vector, node_array)
 
-                value = realization_vector[keyword_index]
+            for column_index, keyword, use_log_scale in columns:
+                keyword_index = ensemble_data.getIndexForKeyword(keyword)
+                values = node_array[:, keyword_index]
 
                 if use_log_scale:
-                    value = math.log10(value)
+                    values = numpy.log10(values)
 
-                gen_kw_array[column_index][realization_index] = value
+                gen_kw_array[column_index] = values
 
         gen_kw_data = DataFrame(data=numpy.transpose(gen_kw_array), index=realizations, columns=gen_kw_keys)
         gen_kw_data.index.name = "Realization"
@@ -3,7 +3,7 @@ import numpy
 from res.enkf import ErtImplType, EnKFMain, EnkfFs, RealizationStateEnum
 from res.enkf.key_manager import KeyManager
 from res.enkf.plot_data import EnsemblePlotData
-from ecl.util.util import BoolVector
+from ecl.util.util import BoolVector, IntVector
 
 
 class SummaryCollector(object):
@@ -23,6 +23,40 @@ class SummaryCollector(object):
         key_manager = KeyManager(ert)
         return key_manager.summaryKeys()
 
+    @staticmethod
+    def loadSummaryArray(ert, fs, summary_keys, realizations, step_count, step_offset=1):
+        """
+        Will load the summary keys for the realizations into two numpy
+        arrays (data, active) with shape [keys x realizations x
+        step_count]; element [k, r, s] corresponds to report step
+        step_offset + s. The values for each key are copied into a view
+        of the preallocated arrays with one call into the C library,
+        inactive elements are NaN in data and False in active.
+
+        @type ert: EnKFMain
+        @type fs: EnkfFs
+        @type summary_keys: list of str
+        @type realizations: list of int
+        @type step_count: int
+        @type step_offset: int
+        @rtype: tuple of numpy.ndarray
+        """
+        shape = (len(summary_keys), len(realizations), step_count)
+        summary_array = numpy.empty(shape=shape, dtype=numpy.float64)
+        summary_array.fill(numpy.nan)
+        active_array = numpy.zeros(shape=shape, dtype=numpy.bool_)
+
+        realization_vector = IntVector()
+        for realization_number in realizations:
+            realization_vector.append(realization_number)
+
+        for key_index, key in enumerate(summary_keys):
+            ensemble_config_node = ert.ensembleConfig().getNode(key)
+            ensemble_data = EnsemblePlotData(ensemble_config_node, fs)
+            ensemble_data.exportValues(realization_vector, step_offset, summary_array[key_index], active_array[key_index])
+
+        return summary_array, active_array
+
     @staticmethod
     def loadAllSummaryData(ert, case_name, keys=None):
         """
@@ -41,25 +75,8 @@ class SummaryCollector(object):
         if keys is not None:
             summary_keys = [key for key in keys if key in summary_keys] # ignore keys that doesn't exist
 
-        summary_array = numpy.empty(shape=(len(summary_keys), len(realizations) * len(dates)), dtype=numpy.float64)
-        summary_array.fill(numpy.nan)
-
-        for key_index, key in enumerate(summary_keys):
-            ensemble_config_node = ert.ensembleConfig().getNode(key)
-            ensemble_data = EnsemblePlotData(ensemble_config_node, fs)
-            summary_row = summary_array[key_index]
-
-            for realization_index, realization_number in enumerate(realizations):
-                realization_vector = ensemble_data[realization_number]
-                column_index = realization_index * len(dates)
-
-                for index in range(1, len(realization_vector)):
-                    if realization_vector.isActive(index):
-                        # assert time_map[index] == realization_vector.getTime(index)
-                        # assert time_map[index].datetime() == dates[index - 1]
-                        value = realization_vector.getValue(index)
-                        summary_row[column_index + index - 1] = value
-
+        summary_array, _ = SummaryCollector.loadSummaryArray(ert, fs, summary_keys, realizations, len(dates))
+        summary_array = summary_array.reshape(len(summary_keys), len(realizations) * len(dates))
 
         multi_index = MultiIndex.from_product([realizations, dates], names=["Realization", "Date"])
         summary_data = DataFrame(data=numpy.transpose(summary_array), index=multi_index, columns=summary_keys)
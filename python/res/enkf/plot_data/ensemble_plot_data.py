@@ -1,8 +1,11 @@
+import ctypes
+
+import numpy
 from cwrap import BaseCClass
 from res import ResPrototype
 from res.enkf.config import EnkfConfigNode
 from res.enkf.enkf_fs import EnkfFs
-from ecl.util.util import BoolVector
+from ecl.util.util import BoolVector, IntVector
 
 
 class EnsemblePlotData(BaseCClass):
@@ -13,6 +16,7 @@ class EnsemblePlotData(BaseCClass):
     _size  = ResPrototype("int   enkf_plot_data_get_size(ensemble_plot_data)")
     _get   = ResPrototype("ensemble_plot_data_vector_ref enkf_plot_data_iget(ensemble_plot_data, int)")
     _free  = ResPrototype("void  enkf_plot_data_free(ensemble_plot_data)")
+    _export_values = ResPrototype("void enkf_plot_data_export_values(ensemble_plot_data, int_vector, int, int, double*, bool*)")
 
 
     def __init__(self, ensemble_config_node, file_system=None, user_index=None, input_mask=None):
@@ -47,6 +51,40 @@ class EnsemblePlotData(BaseCClass):
             cur += 1
 
 
+    def exportValues(self, realizations, step_offset, data, active):
+        """
+        Will copy the loaded values for the realizations into the numpy
+        arrays data and active with one call into the C library. Both
+        arrays must be C contiguous with shape [len(realizations) x
+        num_steps] and dtype float64 and bool respectively; row i is
+        filled with the values from step_offset to step_offset +
+        num_steps for realization realizations[i]. Elements which are
+        not active are left untouched in data.
+
+        @type realizations: IntVector
+        @type step_offset: int
+        @type data: numpy.ndarray
+        @type active: numpy.ndarray
+        """
+        assert isinstance(realizations, IntVector)
+
+        if data.dtype != numpy.float64 or active.dtype != numpy.bool_:
+            raise TypeError("The data and active arrays must have dtype float64 and bool")
+
+        if not (data.flags["C_CONTIGUOUS"] and active.flags["C_CONTIGUOUS"]):
+            raise ValueError("The data and active arrays must be C contiguous")
+
+        if data.ndim != 2 or data.shape != active.shape or data.shape[0] != len(realizations):
+            raise ValueError("Expected data and active with shape (%d, num_steps)" % len(realizations))
+
+        num_steps = data.shape[1]
+        self._export_values(realizations,
+                            step_offset,
+                            num_steps,
+                            data.ctypes.data_as(ctypes.POINTER(ctypes.c_double)),
+                            active.ctypes.data_as(ctypes.POINTER(ctypes.c_bool)))
+
+
     def free(self):
         self._free()
 
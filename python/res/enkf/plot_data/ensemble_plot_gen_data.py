@@ -14,12 +14,14 @@
 #  See the GNU General Public License at <http://www.gnu.org/licenses/gpl.html>
 #  for more details.
 
+import ctypes
+import numpy
 from cwrap import BaseCClass
 from res import ResPrototype
 from res.enkf.config import EnkfConfigNode
 from res.enkf.enkf_fs import EnkfFs
 from res.enkf.enums.ert_impl_type_enum import ErtImplType
-from ecl.util.util import BoolVector, DoubleVector
+from ecl.util.util import BoolVector, DoubleVector, IntVector
 
 
 class EnsemblePlotGenData(BaseCClass):
@@ -28,12 +30,20 @@ class EnsemblePlotGenData(BaseCClass):
     _alloc      = ResPrototype("void* enkf_plot_gendata_alloc(enkf_config_node)", bind = False)
     _size       = ResPrototype("int   enkf_plot_gendata_get_size(ensemble_plot_gen_data)")
     _load       = ResPrototype("void  enkf_plot_gendata_load(ensemble_plot_gen_data, enkf_fs, int, bool_vector)")
+    _load_realizations = ResPrototype("void  enkf_plot_gendata_load_realizations(ensemble_plot_gen_data, enkf_fs, int, int_vector)")
     _get        = ResPrototype("ensemble_plot_gen_data_vector_ref enkf_plot_gendata_iget(ensemble_plot_gen_data, int)")
     _min_values = ResPrototype("double_vector_ref enkf_plot_gendata_get_min_values(ensemble_plot_gen_data)")
     _max_values = ResPrototype("double_vector_ref enkf_plot_gendata_get_max_values(ensemble_plot_gen_data)")
+    _export_values = ResPrototype("void  enkf_plot_gendata_export_values(ensemble_plot_gen_data, int_vector, int, double*)")
     _free       = ResPrototype("void  enkf_plot_gendata_free(ensemble_plot_gen_data)")
 
-    def __init__(self, ensemble_config_node, file_system, report_step, input_mask=None):
+    def __init__(self, ensemble_config_node, file_system, report_step, input_mask=None, realizations=None):
+        """
+        By default all the realizations with data are loaded, in addition
+        to the realizations selected in @input_mask. If the IntVector
+        @realizations is given, only those of the listed realizations
+        which have data are loaded, and @input_mask is ignored.
+        """
         assert isinstance(ensemble_config_node, EnkfConfigNode)
         assert ensemble_config_node.getImplementationType() == ErtImplType.GEN_DATA
 
@@ -43,7 +53,12 @@ class EnsemblePlotGenData(BaseCClass):
         else:
             raise ValueError('Unable to construct EnsemplePlotGenData from given config node!')
 
-        self.__load(file_system, report_step, input_mask)
+        if realizations is None:
+            self.__load(file_system, report_step, input_mask)
+        else:
+            assert isinstance(file_system, EnkfFs)
+            assert isinstance(realizations, IntVector)
+            self._load_realizations(file_system, report_step, realizations)
 
 
     def __load(self, file_system, report_step, input_mask=None):
@@ -76,6 +91,30 @@ class EnsemblePlotGenData(BaseCClass):
         """ @rtype: DoubleVector """
         return self._min_values().setParent(self)
 
+    def exportValues(self, realizations, data):
+        """
+        Will copy the loaded data for the realizations into the numpy
+        array data with one call into the C library. The array must be
+        C contiguous with dtype float64 and shape [len(realizations) x
+        data size]; row i is filled with the values for realization
+        realizations[i]. Realizations without data are left untouched.
+
+        @type realizations: IntVector
+        @type data: numpy.ndarray
+        """
+        assert isinstance(realizations, IntVector)
+
+        if data.dtype != numpy.float64:
+            raise TypeError("The data array must have dtype float64")
+
+        if not data.flags["C_CONTIGUOUS"]:
+            raise ValueError("The data array must be C contiguous")
+
+        if data.ndim != 2 or data.shape[0] != len(realizations):
+            raise ValueError("Expected data with shape (%d, data_size)" % len(realizations))
+
+        self._export_values(realizations, data.shape[1], data.ctypes.data_as(ctypes.POINTER(ctypes.c_double)))
+
     def free(self):
         self._free()
 
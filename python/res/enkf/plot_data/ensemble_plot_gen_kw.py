@@ -14,12 +14,15 @@
 #  See the GNU General Public License at <http://www.gnu.org/licenses/gpl.html>
 #  for more details.
 
+import ctypes
+
+import numpy
 from cwrap import BaseCClass
 from res import ResPrototype
 from res.enkf.config import EnkfConfigNode
 from res.enkf.enkf_fs import EnkfFs
 from res.enkf.enums.ert_impl_type_enum import ErtImplType
-from ecl.util.util import BoolVector
+from ecl.util.util import BoolVector, IntVector
 from res.enkf.plot_data import EnsemblePlotGenKWVector
 
 
@@ -33,6 +36,7 @@ class EnsemblePlotGenKW(BaseCClass):
     _iget_key             = ResPrototype("char* enkf_plot_gen_kw_iget_key(ensemble_plot_gen_kw, int)")
     _get_keyword_count    = ResPrototype("int   enkf_plot_gen_kw_get_keyword_count(ensemble_plot_gen_kw)")
     _should_use_log_scale = ResPrototype("bool  enkf_plot_gen_kw_should_use_log_scale(ensemble_plot_gen_kw, int)")
+    _export_values        = ResPrototype("void  enkf_plot_gen_kw_export_values(ensemble_plot_gen_kw, int_vector, double*)")
     _free                 = ResPrototype("void  enkf_plot_gen_kw_free(ensemble_plot_gen_kw)")
 
     def __init__(self, ensemble_config_node, file_system, input_mask=None):
@@ -86,6 +90,30 @@ class EnsemblePlotGenKW(BaseCClass):
         """ @rtype: bool """
         return bool(self._should_use_log_scale(index))
 
+    def exportValues(self, realizations, data):
+        """
+        Will copy all the keywords for the realizations into the numpy
+        array data with one call into the C library. The array must be
+        C contiguous with dtype float64 and shape [len(realizations) x
+        keyword count]; row i is filled with the values for realization
+        realizations[i]. Realizations without data are left untouched.
+
+        @type realizations: IntVector
+        @type data: numpy.ndarray
+        """
+        assert isinstance(realizations, IntVector)
+
+        if data.dtype != numpy.float64:
+            raise TypeError("The data array must have dtype float64")
+
+        if not data.flags["C_CONTIGUOUS"]:
+            raise ValueError("The data array must be C contiguous")
+
+        if data.shape != (len(realizations), self.getKeyWordCount()):
+            raise ValueError("Expected data with shape (%d, %d)" % (len(realizations), self.getKeyWordCount()))
+
+        self._export_values(realizations, data.ctypes.data_as(ctypes.POINTER(ctypes.c_double)))
+
     def free(self):
         self._free()
 
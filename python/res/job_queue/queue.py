@@ -49,6 +49,8 @@ class JobQueue(BaseCClass):
     _get_max_running      = ResPrototype("int  job_queue_get_max_running( job_queue )")
     _set_max_job_duration = ResPrototype("void job_queue_set_max_job_duration( job_queue , int)")
     _get_max_job_duration = ResPrototype("int  job_queue_get_max_job_duration( job_queue )")
+    _set_submit_batch_size = ResPrototype("void job_queue_set_submit_batch_size( job_queue , int)")
+    _get_submit_batch_size = ResPrototype("int  job_queue_get_submit_batch_size( job_queue )")
     _set_driver           = ResPrototype("void job_queue_set_driver( job_queue , void* )")
     _kill_job             = ResPrototype("bool job_queue_kill_job( job_queue , int )")
     _start_queue          = ResPrototype("void job_queue_run_jobs( job_queue , int , bool)")
@@ -205,6 +207,12 @@ class JobQueue(BaseCClass):
     def set_max_job_duration(self, max_duration):
         self._set_max_job_duration(max_duration)
 
+    def get_submit_batch_size(self):
+        return self._get_submit_batch_size()
+
+    def set_submit_batch_size(self, batch_size):
+        self._set_submit_batch_size(batch_size)
+
     def killAllJobs(self):
         # The queue will not set the user_exit flag before the
         # queue is in a running state. If the queue does not
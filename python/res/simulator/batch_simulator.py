@@ -1,6 +1,7 @@
+import numpy as np
 from ecl.util.util import BoolVector
 
-from res.enkf import ResConfig, EnKFMain, EnkfConfigNode, EnkfNode, NodeId
+from res.enkf import ResConfig, EnKFMain, EnkfConfigNode
 from .batch_simulator_context import BatchContext
 
 def _slug(entity):
@@ -76,28 +77,35 @@ class BatchSimulator(object):
 
 
     def _setup_case(self, case, file_system):
+        ens_config = self.res_config.ensemble_config
+        key_index = {}
+        values = {}
+        for control_name in self.control_keys:
+            ext_config = ens_config[control_name].getModelConfig()
+            key_index[control_name] = {key: index for index, key in enumerate(ext_config.keys())}
+            values[control_name] = np.empty((len(case), len(ext_config)))
+
         for sim_id, (geo_id, controls)  in enumerate(case):
             assert isinstance(geo_id, int)
 
-            node_id = NodeId(0, sim_id)
             if set(controls.keys()) != set(self.control_keys):
                 err_msg = "Mismatch between initialized and provided control names."
                 raise KeyError(err_msg)
 
             for control_name, control in controls.items():
-                ens_config = self.res_config.ensemble_config
-                node = EnkfNode(ens_config[control_name])
-                ext_node = node.as_ext_param()
-
-                if len(ext_node) != len(control.keys()):
+                index = key_index[control_name]
+                if len(index) != len(control.keys()):
                     err_msg = "Expected %d variables for control: %s, received %d."
-                    err_in = (len(ext_node), control_name, len(control.keys()))
+                    err_in = (len(index), control_name, len(control.keys()))
                     raise KeyError(err_msg % err_in)
 
+                row = values[control_name][sim_id]
                 for var_name, value in control.items():
-                    ext_node[var_name] = value
+                    if var_name not in index:
+                        raise KeyError("No such key: %s" % var_name)
+                    row[index[var_name]] = value
 
-                node.save(file_system, node_id)
+        ens_config.storeExtParamValues(file_system, values)
 
 
     def start(self, case_name, case_data):
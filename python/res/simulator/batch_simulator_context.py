@@ -1,6 +1,7 @@
 import time
 from collections import namedtuple
-from res.enkf import NodeId, EnkfNode
+from res.enkf.plot_data import EnsemblePlotGenData
+from ecl.util.util import IntVector
 import logging
 import numpy as np
 from .simulation_context import SimulationContext
@@ -71,22 +72,63 @@ class BatchContext(SimulationContext):
         call.
 
         """
-        if self.running():
-            raise RuntimeError("Simulations are still running - need to wait before gettting results")
+        result_arrays = self.result_arrays()
 
         res = []
-        nodes = [ EnkfNode(self.res_config.ensemble_config[key]) for key in self.result_keys ]
         for sim_id in range(len(self)):
-            node_id = NodeId( 0, sim_id)
             if not self.didRealizationSucceed(sim_id):
-                logging.error('Simulation %d (node %s) failed.' % (sim_id, str(node_id)))
+                logging.error('Simulation %d failed.' % sim_id)
                 res.append(None)
                 continue
-            d = {}
-            for node in nodes:
-                node.load(self.get_sim_fs(), node_id)
-                data = node.asGenData().getData()
-                d[node.name()] = np.array(data)
-            res.append(d)
+
+            res.append({key : result_arrays[key][sim_id] for key in self.result_keys})
 
         return res
+
+
+    def result_arrays(self):
+        """Will return the results of the simulations as one numpy array per key.
+
+        The return value is a dictionary with one entry for each of the
+        @results configured when the simulator was created. Each entry
+        is a two dimensional array where row i holds the result for
+        simulation i, and the rows for the simulations which failed are
+        filled with NaN. The data for each key is loaded for all the
+        simulations with one call to the C library, and the storage is
+        read in parallel.
+
+        As for the results() method a RuntimeError is raised if the
+        simulations are still running.
+        """
+        if self.running():
+            raise RuntimeError("Simulations are still running - need to wait before gettting results")
+
+        fs = self.get_sim_fs()
+        realizations = IntVector()
+        for sim_id in range(len(self)):
+            if self.didRealizationSucceed(sim_id):
+                realizations.append(sim_id)
+
+        # Only the simulations which succeeded are loaded and exported;
+        # a failed simulation, or a realization from an earlier and
+        # larger run of the same case, can still have stale data in
+        # the storage.
+        rows = list(realizations)
+
+        result_arrays = {}
+        for key in self.result_keys:
+            config_node = self.res_config.ensemble_config[key]
+            ensemble_data = EnsemblePlotGenData(config_node, fs, 0, realizations=realizations)
+
+            data_size = 0
+            if len(realizations) > 0:
+                data_size = config_node.getModelConfig().getDataSize(0)
+
+            succeeded_data = np.full((len(realizations), data_size), np.nan)
+            ensemble_data.exportValues(realizations, succeeded_data)
+
+            data = np.full((len(self), data_size), np.nan)
+            data[rows] = succeeded_data
+            result_arrays[key] = data
+
+        return result_arrays
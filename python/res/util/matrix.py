@@ -25,8 +25,12 @@
 # implementation; it is only here facilitate use of C libraries which
 # expect a matrix instance as input (i.e. the LARS estimator). For
 # general linear algebra in Python the numpy library is a natural
-# choice.
+# choice; the numpy() method gives a numpy view of the matrix storage
+# and copy_from() copies a numpy array into the matrix.
 
+import ctypes
+
+import numpy
 
 from cwrap import BaseCClass,CFILE
 from res import ResPrototype
@@ -53,6 +57,9 @@ class Matrix(BaseCClass):
     _fprint            = ResPrototype("void matrix_fprintf(matrix, char*, FILE)")
     _random_init       = ResPrototype("void matrix_random_init(matrix, rng)")
     _dump_csv          = ResPrototype("void matrix_dump_csv(matrix, char*)")
+    _get_data          = ResPrototype("void* matrix_get_data(matrix)")
+    _row_stride        = ResPrototype("int matrix_get_row_stride(matrix)")
+    _column_stride     = ResPrototype("int matrix_get_column_stride(matrix)")
 
     # Requires BLAS. If the library does not have the
     # matrix_alloc_matmul() function the prototype will have _func =
@@ -220,6 +227,47 @@ class Matrix(BaseCClass):
         self._fprint( fmt , CFILE( fileH))
 
 
+    def numpy(self):
+        """Will return a numpy view of the matrix storage.
+
+        No data is copied; the view has shape (rows, columns) and the
+        strides of the underlying C storage, so updates through the
+        view are visible in the matrix and vice versa. The view keeps
+        the matrix alive, but it is invalid after the matrix has been
+        resized or transposed in place.
+        """
+        rows, columns = self.dims()
+        if rows == 0 or columns == 0:
+            return numpy.empty((rows, columns), dtype=numpy.float64)
+
+        row_stride = self._row_stride()
+        column_stride = self._column_stride()
+        size = (rows - 1) * row_stride + (columns - 1) * column_stride + 1
+        storage = (ctypes.c_double * size).from_address(self._get_data())
+        storage._matrix = self
+
+        itemsize = ctypes.sizeof(ctypes.c_double)
+        return numpy.ndarray(shape=(rows, columns),
+                             dtype=numpy.float64,
+                             buffer=storage,
+                             strides=(row_stride * itemsize, column_stride * itemsize))
+
+
+    def copy_from(self, array):
+        """Will copy the content of a numpy array into the matrix.
+
+        The array must have the same shape as the matrix; the data is
+        copied in one operation, and the strides of the matrix are
+        respected.
+        """
+        array = numpy.asarray(array, dtype=numpy.float64)
+        if array.shape != self.dims():
+            raise ValueError("Shape mismatch: matrix is %s, array is %s" % (self.dims(), array.shape))
+
+        if array.size > 0:
+            self.numpy()[:, :] = array
+
+
     def randomInit(self, rng):
         self._random_init(rng)
 
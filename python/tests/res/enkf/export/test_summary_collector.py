@@ -1,4 +1,5 @@
 import os
+import numpy
 from tests import ResTest
 from res.test import ErtTestContext
 
@@ -34,3 +35,20 @@ class SummaryCollectorTest(ResTest):
 
             with self.assertRaises(KeyError):
                 data["FOPR"]
+
+    def test_summary_array(self):
+        with ErtTestContext("python/enkf/export/summary_array", self.config) as context:
+            ert = context.getErt()
+            fs = ert.getEnkfFsManager().getFileSystem("default_0")
+            time_map = fs.getTimeMap()
+            step_count = len(time_map) - 1
+            realizations = SummaryCollector.createActiveList(ert, fs)
+
+            data, active = SummaryCollector.loadSummaryArray(ert, fs, ["FOPR", "WWCT:OP2"], realizations, step_count)
+            self.assertEqual(data.shape, (2, len(realizations), step_count))
+            self.assertEqual(active.shape, data.shape)
+            self.assertTrue(numpy.all(numpy.isnan(data[~active])))
+
+            frame = SummaryCollector.loadAllSummaryData(ert, "default_0", ["FOPR", "WWCT:OP2"])
+            self.assertFloatEqual(data[0][0][0], frame["FOPR"][0].iloc[0])
+            self.assertFloatEqual(data[1][24][0], frame["WWCT:OP2"][24].iloc[0])
@@ -57,6 +57,17 @@ class AnalysisConfigTest(ResTest):
         ac.setGlobalStdScaling(0.77)
         self.assertFloatEqual(ac.getGlobalStdScaling(), 0.77)
 
+    def test_update_threads_and_row_block_size(self):
+        ac = AnalysisConfig()
+        self.assertEqual(0, ac.get_update_threads())
+        self.assertEqual(250000, ac.get_row_block_size())
+
+        ac.set_update_threads(16)
+        self.assertEqual(16, ac.get_update_threads())
+
+        ac.set_row_block_size(1000)
+        self.assertEqual(1000, ac.get_row_block_size())
+
     def test_init(self):
         with TestAreaContext("analysis_config_init_test") as work_area:
             work_area.copy_directory(self.case_directory)
@@ -1,8 +1,12 @@
+import numpy as np
+
 from tests import ResTest
 from res.test import ErtTestContext
 
+from ecl.util.test import TestAreaContext
 from ecl.util.util import BoolVector,IntVector
-from res.enkf import ActiveMode, EnsembleConfig
+from res.enkf import ActiveMode, EnsembleConfig, EnkfConfigNode, EnkfFs, EnkfNode, NodeId
+from res.enkf.enums import EnKFFSType
 from res.enkf import ObsVector , LocalObsdata
 
 
@@ -15,3 +19,37 @@ class EnsembleConfigTest(ResTest):
 
         with self.assertRaises(KeyError):
             node = conf["KEY"]
+
+
+    def test_store_ext_param_values(self):
+        conf = EnsembleConfig( )
+        conf.addNode( EnkfConfigNode.create_ext_param("CTRL1", ["W1", "W2"]))
+        conf.addNode( EnkfConfigNode.create_ext_param("CTRL2", ["W1", "W2", "W3"]))
+
+        values = {"CTRL1": np.array([[1, 2], [3, 4], [5, 6]]),
+                  "CTRL2": np.array([[10, 20, 30], [40, 50, 60], [70, 80, 90]])}
+
+        with TestAreaContext("store_ext_param_values"):
+            fs = EnkfFs.createFileSystem("storage", EnKFFSType.BLOCK_FS_DRIVER_ID, mount = True)
+
+            with self.assertRaises(ValueError):
+                conf.storeExtParamValues(fs, {"CTRL1": np.zeros((3, 3))})
+
+            with self.assertRaises(ValueError):
+                conf.storeExtParamValues(fs, {"CTRL1": np.zeros((3, 2)), "CTRL2": np.zeros((2, 3))})
+
+            with self.assertRaises(ValueError):
+                conf.storeExtParamValues(fs, values, realizations = [0, 1])
+
+            with self.assertRaises(KeyError):
+                conf.storeExtParamValues(fs, {"NO_SUCH_KEY": np.zeros((3, 2))})
+
+            conf.storeExtParamValues(fs, values, realizations = [0, 7, 2])
+            for key, array in values.items():
+                node = EnkfNode(conf[key])
+                for row, iens in enumerate([0, 7, 2]):
+                    self.assertTrue( node.tryLoad(fs, NodeId(0, iens)))
+                    ext_param = node.as_ext_param()
+                    self.assertEqual( [ext_param[i] for i in range(len(ext_param))], list(array[row]))
+
+                self.assertFalse( node.tryLoad(fs, NodeId(0, 1)))
@@ -5,10 +5,15 @@ import unittest
 import datetime
 from functools import partial
 
+import numpy as np
+
 from ecl.util.test import TestAreaContext
 
 from res.simulator import BatchSimulator, BatchContext
 from res.enkf import ResConfig
+from res.enkf.enums import RealizationStateEnum
+from res.enkf.plot_data import EnsemblePlotGenData
+from ecl.util.util import IntVector
 
 from tests import ResTest
 
@@ -219,9 +224,74 @@ class BatchSimulatorTest(ResTest):
                         list(result[res_key])
                         )
 
+            result_arrays = ctx.result_arrays()
+            self.assertEqual(sorted(["ORDER", "ON_OFF"]), sorted(result_arrays.keys()))
+            self.assertEqual(result_arrays["ORDER"].shape, (2, 3))
+            self.assertEqual([1, 4, 9], list(result_arrays["ORDER"][0]))
+            self.assertEqual([100, 121, 144], list(result_arrays["ON_OFF"][1]))
+
             self.assertTrue( isinstance(monitor.sim_context, BatchContext))
 
 
+    def test_result_arrays_failed_sim(self):
+        config_file = self.createTestPath("local/batch_sim/batch_sim.ert")
+        with TestAreaContext("batch_sim_failed") as test_area:
+            test_area.copy_parent_content(config_file)
+            res_config = ResConfig(user_config_file=os.path.basename(config_file))
+
+            rsim = BatchSimulator(res_config,
+                                  {
+                                      "WELL_ORDER" : ["W1", "W2", "W3"],
+                                      "WELL_ON_OFF" : ["W1", "W2", "W3"]
+                                  },
+                                  ["ORDER", "ON_OFF"])
+
+            ok_data = (2,
+                       {
+                           "WELL_ORDER": {"W1": 1, "W2": 2, "W3": 3},
+                           "WELL_ON_OFF": {"W1": 4, "W2": 5, "W3": 6}
+                       })
+
+            # The first run leaves results in the storage for both simulations.
+            ctx = rsim.start("case", [ok_data, ok_data])
+            ctx.join()
+            self.assertEqual(ctx.status.complete, 2)
+
+            # In the second run of the same case the second simulation fails;
+            # the stale results from the first run must not be returned.
+            failing_data = (1,
+                            {
+                                "WELL_ORDER": {"W1": -1, "W2": 0, "W3": 0},
+                                "WELL_ON_OFF": {"W1": -1, "W2": 0, "W3": 0}
+                            })
+            ctx = rsim.start("case", [ok_data, failing_data])
+            ctx.join()
+            self.assertEqual(ctx.status.complete, 1)
+            self.assertEqual(ctx.status.failed, 1)
+
+            # The state map entry of a failed simulation is not necessarily
+            # updated, e.g. if the simulation is killed; the result
+            # selection must be based on the simulation status.
+            ctx.get_sim_fs().getStateMap()[1] = RealizationStateEnum.STATE_HAS_DATA
+
+            result_arrays = ctx.result_arrays()
+            for key in ["ORDER", "ON_OFF"]:
+                self.assertEqual(result_arrays[key].shape, (2, 3))
+                self.assertTrue(np.isnan(result_arrays[key][1]).all())
+
+            self.assertEqual([1, 4, 9], list(result_arrays["ORDER"][0]))
+            self.assertEqual([16, 25, 36], list(result_arrays["ON_OFF"][0]))
+            self.assertIsNone(ctx.results()[1])
+
+            # Only the listed realizations are loaded from the storage.
+            realizations = IntVector()
+            realizations.append(0)
+            config_node = res_config.ensemble_config["ORDER"]
+            ensemble_data = EnsemblePlotGenData(config_node, ctx.get_sim_fs(), 0, realizations=realizations)
+            self.assertEqual(3, len(ensemble_data[0]))
+            self.assertEqual(0, len(ensemble_data[1]))
+
+
     def test_stop_sim(self):
         config_file = self.createTestPath("local/batch_sim/batch_sim.ert")
         with TestAreaContext("batch_sim_stop") as test_area:
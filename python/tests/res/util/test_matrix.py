@@ -1,3 +1,5 @@
+import numpy
+
 from ecl.util.util import RandomNumberGenerator
 from ecl.util.enums import RngAlgTypeEnum, RngInitModeEnum
 from ecl.util.test import TestAreaContext
@@ -220,6 +222,43 @@ class MatrixTest(ResTest):
         self.assertEqual( m2[2,2] , 41 )
         
 
+    def test_numpy(self):
+        m = Matrix(3, 2)
+        for i in range(3):
+            for j in range(2):
+                m[i, j] = 10 * i + j
+
+        view = m.numpy()
+        self.assertEqual(view.shape, (3, 2))
+        for i in range(3):
+            for j in range(2):
+                self.assertEqual(view[i, j], m[i, j])
+
+        view[2, 1] = 99
+        self.assertEqual(m[2, 1], 99)
+        m[0, 1] = -1
+        self.assertEqual(view[0, 1], -1)
+
+        mt = m.transpose()
+        m.transpose(inplace = True)
+        self.assertEqual(m.numpy().tolist(), mt.numpy().tolist())
+
+
+    def test_copy_from(self):
+        m = Matrix(2, 3)
+        data = numpy.arange(6, dtype=numpy.float64).reshape(2, 3)
+        m.copy_from(data)
+        for i in range(2):
+            for j in range(3):
+                self.assertEqual(m[i, j], data[i, j])
+
+        m.copy_from(data[:, ::-1])
+        self.assertEqual(m[0, 0], 2)
+
+        with self.assertRaises(ValueError):
+            m.copy_from(data.T)
+
+
     def test_csv(self):
         m = Matrix(2, 2)
         m[0, 0] = 2
@@ -9,6 +9,11 @@ keys = ["W1", "W2", "W3"]
 def copy_file(input_file, output_file):
     data = json.load(open(input_file))
 
+    # Negative control values are used by the tests to make the
+    # simulation fail.
+    if any(data[key] < 0 for key in keys):
+        sys.exit("Negative control value in %s" % input_file)
+
     with open(output_file, "w") as f:
         for key in keys:
             sq = data[key] * data[key]